@@ -58,6 +58,11 @@ class log_function(object):
         @functools.wraps(func)
         def wrapper(*args, **kwds):
 
+            # Messages can be expensive to build (arguments and results can be very big), so skip them if the level
+            # is not enabled
+            if self.logger and not self.logger.isEnabledFor(self.level):
+                return func(*args, **kwds)
+
             first_position_variable = 0
             if len(func.__code__.co_varnames) > 0 and func.__code__.co_varnames[0] == 'self':
                 first_position_variable = 1
@@ -0,0 +1,20 @@
+import threading
+
+
+class KeyedLock(object):
+    """Set of locks, one for each key, created when they are used for the first time"""
+
+    def __init__(self):
+        self._locks = dict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> threading.Lock:
+        """Get the lock of a key"""
+
+        # Fast path without global lock, because dict access is atomic
+        lock = self._locks.get(key)
+        if lock is None:
+            with self._lock:
+                lock = self._locks.setdefault(key, threading.Lock())
+
+        return lock
@@ -0,0 +1,202 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from common import config
+from common.infra_config import InfraConfig
+from common.infra_exception import InfraException
+from common.infra_module import InfraModule
+from database_object_module import MODULE_NAME
+from database_object_module.data_model import DatabaseObjectResult, DatabaseObject
+from database_object_module.database_object_module import DatabaseObjectModule
+from database_object_module.impl.access_database import AccessDatabase
+
+logger = config.get_log(MODULE_NAME)
+
+# Default number of calls to the datastore running at same time
+DEFAULT_ASYNC_MAX_WORKERS = 10
+
+
+class AsyncDatabaseObjectModule(InfraModule):
+    """
+    Asyncio facade of database access. Calls to the datastore run in a bounded executor, so they do not block the
+    event loop and many of them can be awaited at same time
+    """
+
+    def __init__(self, config_module: InfraConfig, module: DatabaseObjectModule = None,
+                 max_workers: int = None) -> None:
+        """
+        Constructor that gets configuration and creates the executor
+
+        :param config_module: configuration
+        :type config_module: InfraConfig
+
+        :param module: database access used by the facade. If it is None, a new one is created
+        :type module: DatabaseObjectModule
+
+        :param max_workers: maximum number of calls to the datastore running at same time. If it is None, it is read
+                            from configuration
+        :type max_workers: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        # Only a module created by the facade is closed with it
+        self.own_module = module is None
+        self.module = DatabaseObjectModule(config_module) if module is None else module
+
+        if max_workers is None:
+            try:
+                max_workers = int(config_module.get_value(MODULE_NAME, 'async_max_workers'))
+            except InfraException:
+                max_workers = DEFAULT_ASYNC_MAX_WORKERS
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=MODULE_NAME)
+        logger.info('Async facade started with {} workers'.format(max_workers))
+
+    def exit(self) -> None:
+        self.executor.shutdown(wait=True)
+        if self.own_module:
+            self.module.exit()
+
+    async def get(self, schema: str, sub_schema: str, conditions: list = ((AccessDatabase.ID_FIELD, '!=', None),),
+                  criteria: str = '', native_criteria: bool = False, fields: list = None,
+                  sort: list = AccessDatabase.DEFAULT_SORT, limit: int = 0) -> DatabaseObjectResult:
+        """
+        Awaitable version of DatabaseObjectModule.get
+        """
+
+        return await self._run(self.module.get, schema, sub_schema, conditions, criteria, native_criteria, fields,
+                               sort, limit)
+
+    async def get_page(self, schema: str, sub_schema: str,
+                       conditions: list = ((AccessDatabase.ID_FIELD, '!=', None),), criteria: str = '',
+                       native_criteria: bool = False, after: object = None, page_size: int = 100,
+                       order: str = AccessDatabase.ORDER_ASCENDING, fields: list = None) -> DatabaseObjectResult:
+        """
+        Awaitable version of DatabaseObjectModule.get_page
+        """
+
+        return await self._run(self.module.get_page, schema, sub_schema, conditions, criteria, native_criteria,
+                               after, page_size, order, fields)
+
+    async def count(self, schema: str, sub_schema: str, conditions: list = ((AccessDatabase.ID_FIELD, '!=', None),),
+                    criteria: str = '', native_criteria: bool = False) -> DatabaseObjectResult:
+        """
+        Awaitable version of DatabaseObjectModule.count
+        """
+
+        return await self._run(self.module.count, schema, sub_schema, conditions, criteria, native_criteria)
+
+    async def exists(self, schema: str, sub_schema: str, conditions: list = ((AccessDatabase.ID_FIELD, '!=', None),),
+                     criteria: str = '', native_criteria: bool = False) -> DatabaseObjectResult:
+        """
+        Awaitable version of DatabaseObjectModule.exists
+        """
+
+        return await self._run(self.module.exists, schema, sub_schema, conditions, criteria, native_criteria)
+
+    async def distinct(self, schema: str, sub_schema: str, field: str,
+                       conditions: list = ((AccessDatabase.ID_FIELD, '!=', None),), criteria: str = '',
+                       native_criteria: bool = False) -> DatabaseObjectResult:
+        """
+        Awaitable version of DatabaseObjectModule.distinct
+        """
+
+        return await self._run(self.module.distinct, schema, sub_schema, field, conditions, criteria,
+                               native_criteria)
+
+    async def put_object(self, schema: str, sub_schema: str, data: DatabaseObject,
+                         write_concern: dict = None) -> DatabaseObjectResult:
+        """
+        Awaitable version of DatabaseObjectModule.put_object
+        """
+
+        return await self._run(self.module.put_object, schema, sub_schema, data, write_concern)
+
+    async def put_objects(self, schema: str, sub_schema: str, data_list: list, chunk_size: int = None,
+                          write_concern: dict = None, ordered: bool = None) -> DatabaseObjectResult:
+        """
+        Awaitable version of DatabaseObjectModule.put_objects
+        """
+
+        return await self._run(self.module.put_objects, schema, sub_schema, data_list, chunk_size, write_concern,
+                               ordered)
+
+    async def put(self, schema: str, sub_schema: str, data: dict, write_concern: dict = None) -> DatabaseObjectResult:
+        """
+        Awaitable version of DatabaseObjectModule.put
+        """
+
+        return await self._run(self.module.put, schema, sub_schema, data, write_concern)
+
+    async def put_many(self, schema: str, sub_schema: str, data_list: list, chunk_size: int = None,
+                       write_concern: dict = None, ordered: bool = None) -> DatabaseObjectResult:
+        """
+        Awaitable version of DatabaseObjectModule.put_many
+        """
+
+        return await self._run(self.module.put_many, schema, sub_schema, data_list, chunk_size, write_concern,
+                               ordered)
+
+    async def update_object(self, schema: str, sub_schema: str, data: DatabaseObject,
+                            conditions: list = ((AccessDatabase.ID_FIELD, '!=', None),), criteria: str = '',
+                            native_criteria: bool = False, write_concern: dict = None) -> DatabaseObjectResult:
+        """
+        Awaitable version of DatabaseObjectModule.update_object
+        """
+
+        return await self._run(self.module.update_object, schema, sub_schema, data, conditions, criteria,
+                               native_criteria, write_concern)
+
+    async def update(self, schema: str, sub_schema: str, data: dict,
+                     conditions: list = ((AccessDatabase.ID_FIELD, '!=', ''),), criteria: str = '',
+                     native_criteria: bool = False, write_concern: dict = None) -> DatabaseObjectResult:
+        """
+        Awaitable version of DatabaseObjectModule.update
+        """
+
+        return await self._run(self.module.update, schema, sub_schema, data, conditions, criteria, native_criteria,
+                               write_concern)
+
+    async def update_many_objects(self, schema: str, sub_schema: str, updates: list, chunk_size: int = None,
+                                  write_concern: dict = None, ordered: bool = None) -> DatabaseObjectResult:
+        """
+        Awaitable version of DatabaseObjectModule.update_many_objects
+        """
+
+        return await self._run(self.module.update_many_objects, schema, sub_schema, updates, chunk_size,
+                               write_concern, ordered)
+
+    async def remove(self, schema: str, sub_schema: str, conditions: list = ((AccessDatabase.ID_FIELD, '!=', None),),
+                     criteria: str = '', native_criteria: bool = False,
+                     write_concern: dict = None) -> DatabaseObjectResult:
+        """
+        Awaitable version of DatabaseObjectModule.remove
+        """
+
+        return await self._run(self.module.remove, schema, sub_schema, conditions, criteria, native_criteria,
+                               write_concern)
+
+    async def register_indexes(self, schema: str, sub_schema: str, indexes: list) -> DatabaseObjectResult:
+        """
+        Awaitable version of DatabaseObjectModule.register_indexes
+        """
+
+        return await self._run(self.module.register_indexes, schema, sub_schema, indexes)
+
+    async def _run(self, func, *args) -> DatabaseObjectResult:
+        """
+        Run a blocking call in the executor. If the awaiting task is cancelled before the call starts, the call is
+        cancelled too. A call already running can not be interrupted, but its result is discarded
+
+        :param func: blocking function
+        :type func: function
+
+        :return: result of the function
+        :rtype: DatabaseObjectResult
+        """
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args))
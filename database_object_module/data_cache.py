@@ -0,0 +1,325 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+class DataCache(object):
+    """
+    Read-through cache of results of get. Entries are grouped by collection so they can be invalidated when the
+    collection is modified, and they are evicted in LRU order when the cache exceeds its limits
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float = 0) -> None:
+        """
+        Constructor with limits of the cache
+
+        :param max_entries: maximum number of results stored
+        :type max_entries: int
+
+        :param max_bytes: approximate maximum memory used by stored results
+        :type max_bytes: int
+
+        :param ttl: seconds that a result is valid, 0 if results never expire
+        :type ttl: float
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        # Entries in LRU order. Key is (schema_collection, key of query) and value is (expiration, size, result)
+        self.entries = OrderedDict()
+        self.size = 0
+
+        # Keys of entries of each collection and generation of each collection, incremented when it is modified
+        self.collection_keys = dict()
+        self.generations = dict()
+
+        # Counters of the cache and of each collection
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.collection_hits = dict()
+        self.collection_misses = dict()
+
+        self._lock = threading.Lock()
+
+    def get(self, schema_collection: str, conditions: list, criteria: str, native_criteria: bool,
+            fields: list = None, sort: list = None, limit: int = 0) -> list:
+        """
+        Get result of a query from cache
+
+        :param schema_collection: collection of the query
+        :type schema_collection: str
+
+        :param conditions: list of tuple conditions
+        :type conditions: list
+
+        :param criteria: criteria search
+        :type criteria: str
+
+        :param native_criteria: criteria native from database
+        :type native_criteria: bool
+
+        :param fields: fields of the query
+        :type fields: list
+
+        :param sort: sort of the query
+        :type sort: list
+
+        :param limit: limit of the query
+        :type limit: int
+
+        :return: result stored or None if the query is not in cache
+        :rtype: list
+        """
+
+        entry_key = (schema_collection, DataCache._get_key(conditions, criteria, native_criteria, fields, sort, limit))
+
+        with self._lock:
+            entry = self.entries.get(entry_key)
+
+            # Expired entries are removed as if they were not in cache
+            if entry is not None and entry[0] is not None and entry[0] < time.monotonic():
+                self._remove_entry(entry_key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                self.collection_misses[schema_collection] = self.collection_misses.get(schema_collection, 0) + 1
+                return None
+
+            self.entries.move_to_end(entry_key)
+            self.hits += 1
+            self.collection_hits[schema_collection] = self.collection_hits.get(schema_collection, 0) + 1
+
+        # Each caller gets its own copy of stored documents. Nested values are shared and must not be modified.
+        # Documents that are not dict (raw documents) are read-only, so they are shared too
+        return [dict(element) if isinstance(element, dict) else element for element in entry[2]]
+
+    def get_generation(self, schema_collection: str) -> int:
+        """
+        Get generation of a collection. It must be recovered before reading the datastore, so the result is not
+        stored if the collection is modified meanwhile
+
+        :param schema_collection: collection
+        :type schema_collection: str
+
+        :return: generation of the collection
+        :rtype: int
+        """
+
+        with self._lock:
+            return self.generations.get(schema_collection, 0)
+
+    def put(self, schema_collection: str, conditions: list, criteria: str, native_criteria: bool, fields: list,
+            result: list, generation: int, sort: list = None, limit: int = 0) -> None:
+        """
+        Store result of a query in cache
+
+        :param schema_collection: collection of the query
+        :type schema_collection: str
+
+        :param conditions: list of tuple conditions
+        :type conditions: list
+
+        :param criteria: criteria search
+        :type criteria: str
+
+        :param native_criteria: criteria native from database
+        :type native_criteria: bool
+
+        :param fields: fields of the query
+        :type fields: list
+
+        :param result: result of the query
+        :type result: list
+
+        :param generation: generation of the collection before reading the datastore
+        :type generation: int
+
+        :param sort: sort of the query
+        :type sort: list
+
+        :param limit: limit of the query
+        :type limit: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        # Results bigger than the cache are never stored
+        size = DataCache._get_size(result)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+
+        entry_key = (schema_collection, DataCache._get_key(conditions, criteria, native_criteria, fields, sort, limit))
+        expiration = time.monotonic() + self.ttl if self.ttl > 0 else None
+
+        with self._lock:
+            if generation != self.generations.get(schema_collection, 0):
+                return
+
+            if entry_key in self.entries:
+                self._remove_entry(entry_key)
+
+            # Caller keeps the result, so a copy of the documents is stored
+            self.entries[entry_key] = (expiration, size, [dict(element) if isinstance(element, dict) else element
+                                                          for element in result])
+            self.collection_keys.setdefault(schema_collection, set()).add(entry_key)
+            self.size += size
+
+            # Evict least recently used entries until the cache is under its limits
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove_entry(next(iter(self.entries)))
+                self.evictions += 1
+
+    def invalidate(self, schema_collection: str) -> None:
+        """
+        Remove all results of a collection, because it has been modified
+
+        :param schema_collection: collection
+        :type schema_collection: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        with self._lock:
+            self.generations[schema_collection] = self.generations.get(schema_collection, 0) + 1
+            for entry_key in list(self.collection_keys.get(schema_collection, ())):
+                self._remove_entry(entry_key)
+
+    def get_stats(self) -> dict:
+        """
+        Get counters of the cache
+
+        :return: counters of the cache and hits and misses of each collection
+        :rtype: dict
+        """
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self.entries),
+                'size': self.size,
+                'collections': {
+                    schema_collection: {'hits': self.collection_hits.get(schema_collection, 0),
+                                        'misses': self.collection_misses.get(schema_collection, 0)}
+                    for schema_collection in set(self.collection_hits) | set(self.collection_misses)
+                }
+            }
+
+    def _remove_entry(self, entry_key: tuple) -> None:
+        """
+        Remove an entry. Lock must be acquired
+
+        :param entry_key: key of the entry
+        :type entry_key: tuple
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        entry = self.entries.pop(entry_key)
+        self.size -= entry[1]
+        self.collection_keys[entry_key[0]].discard(entry_key)
+
+    @staticmethod
+    def _get_key(conditions: list, criteria: str, native_criteria: bool, fields: list, sort: list,
+                 limit: int) -> tuple:
+        """
+        Get a normalized key of a query. Order of conditions does not matter because all of them must be true
+
+        :param conditions: list of tuple conditions
+        :type conditions: list
+
+        :param criteria: criteria search
+        :type criteria: str
+
+        :param native_criteria: criteria native from database
+        :type native_criteria: bool
+
+        :param fields: fields of the query, order does not matter
+        :type fields: list
+
+        :param sort: sort of the query, order matters
+        :type sort: list
+
+        :param limit: limit of the query
+        :type limit: int
+
+        :return: key of the query
+        :rtype: tuple
+        """
+
+        key_conditions = tuple(sorted((tuple(DataCache._freeze(item) for item in condition)
+                                       for condition in conditions), key=repr))
+
+        # Criteria is only used if it is native
+        key_criteria = DataCache._freeze(criteria) if native_criteria and len(criteria) > 0 else None
+
+        key_fields = None if fields is None else tuple(sorted(set(fields)))
+
+        key_sort = None if sort is None else DataCache._freeze(sort)
+
+        return key_conditions, key_criteria, key_fields, key_sort, limit
+
+    @staticmethod
+    def _freeze(value: object) -> tuple:
+        """
+        Convert a value to a hashable value. Type is kept because, for example, True and 1 are different values
+        for the datastore
+
+        :param value: value to convert
+        :type value: object
+
+        :return: hashable value
+        :rtype: tuple
+        """
+
+        if isinstance(value, (list, tuple)):
+            frozen = tuple(DataCache._freeze(item) for item in value)
+        elif isinstance(value, dict):
+            frozen = tuple(sorted((repr(key), DataCache._freeze(item)) for key, item in value.items()))
+        elif isinstance(value, (set, frozenset)):
+            frozen = tuple(sorted(repr(item) for item in value))
+        else:
+            try:
+                hash(value)
+                frozen = value
+            except TypeError:
+                frozen = repr(value)
+
+        return value.__class__.__name__, frozen
+
+    @staticmethod
+    def _get_size(value: object) -> int:
+        """
+        Get approximate size in memory of a result
+
+        :param value: result or part of a result
+        :type value: object
+
+        :return: size in bytes
+        :rtype: int
+        """
+
+        size = sys.getsizeof(value)
+
+        # Raw documents are measured by their encoded form, so they are not decoded
+        raw = getattr(value, 'raw', None)
+        if isinstance(raw, bytes):
+            size += sys.getsizeof(raw)
+        elif isinstance(value, dict):
+            size += sum(DataCache._get_size(key) + DataCache._get_size(item) for key, item in value.items())
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            size += sum(DataCache._get_size(item) for item in value)
+
+        return size
@@ -1,13 +1,58 @@
 import ast
+from collections.abc import Mapping
 
 from database_object_module.impl.access_database import AccessDatabase
 
 
+class DatabaseObjectIndex:
+    """
+    Class of secondary index definition
+    """
+
+    # Directions of fields
+    ASCENDING = 1
+    DESCENDING = -1
+
+    def __init__(self, fields: list, unique: bool = False, partial: list = None, name: str = None) -> None:
+        """
+        Constructor with fields and options of the index
+
+        :param fields: fields of the index. Each field is a name (ascending) or a tuple (name, direction). More than
+                       one field creates a compound index
+        :type fields: list
+
+        :param unique: the index does not allow repeated values
+        :type unique: bool
+
+        :param partial: list of tuple conditions, only objects that match them are indexed
+        :type partial: list
+
+        :param name: name of the index. If it is None, it is generated from fields
+        :type name: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self.fields = [(field, DatabaseObjectIndex.ASCENDING) if isinstance(field, str) else tuple(field)
+                       for field in fields]
+        self.unique = unique
+        self.partial = partial
+        self.name = name if name is not None else '_'.join('{}_{}'.format(*field) for field in self.fields)
+
+    def __repr__(self):
+        return str(self.__dict__)
+
+
 class DatabaseObject:
     """
     Class of standard data input
     """
 
+    # Secondary indexes of the class, created when objects are stored. Subclasses can declare a list of
+    # DatabaseObjectIndex
+    INDEXES = ()
+
     def __init__(self) -> None:
         """
         Constructor without parameters
@@ -60,27 +105,51 @@ class DatabaseObjectResult:
     CODE_OK = 'OK'
     CODE_KO = 'KO'
 
-    def __init__(self, code: str, data: str = '', msg: str = '', exception: Exception = None) -> None:
+    def __init__(self, code: str, data: list = None, msg: str = '', exception: Exception = None,
+                 fields: list = None, next_token: str = None) -> None:
         self.code_list = (DatabaseObjectResult.CODE_OK, DatabaseObjectResult.CODE_KO)
         self.code = code
-        self.data = data
+        self.data = list() if data is None else data
         self.msg = msg
         self.exception = exception
 
+        # Fields of data if it has been gotten with a projection, None if data has all fields
+        self.fields = fields
+
+        # Continuation token to get next page, None if there are not more pages
+        self.next_token = next_token
+
     def get_object_from_data(self, obj=DatabaseObject()) -> list:
 
+        # Return list of the objects
+        return list(self.iter_object_from_data(obj))
+
+    def iter_object_from_data(self, obj=DatabaseObject()):
+        """
+        Generate objects from data one by one. If data is a stream, only one document is in memory at a time
+
+        :param obj: instance of the class of generated objects
+        :type obj: DatabaseObject
+
+        :return: generator of objects
+        :rtype: generator
+        """
+
         if self.code == self.CODE_KO:
             raise (DatabaseObjectException(ErrorMessages.KO_ERROR))
 
-        # Recover list of dictionaries from string
-        datas = ast.literal_eval(self.data)
+        # Data is a list of dictionaries or a stream of them. Legacy results in string format are recovered with
+        # literal_eval
+        datas = ast.literal_eval(self.data) if isinstance(self.data, str) else self.data
 
-        # Recover all attributes from obj and get a class except private attrs from python and internal variables
+        # Recover all attributes from obj and get a class except private attrs from python and internal variables.
+        # If data has only some fields, only those attributes are checked and the rest keep default values
         attrs = [i for i in obj.__dict__.keys() if i[:1] != '_']
         attrs_set = set(attrs)
+        if self.fields is not None:
+            attrs_set.intersection_update(self.fields)
         cls = obj.__class__
 
-        output = list()
         for data in datas:
 
             # If user not set the class, then create a DatabaseObject instance and copy values
@@ -94,12 +163,13 @@ class DatabaseObjectResult:
             c = cls()
 
             # Check if exists all attributes (except internal variables),only if there are attributes
-            if len(attrs) != 0:
-                data_key_set = set(list(data))
-                data_key_set.remove(AccessDatabase.ID_FIELD)
-                data_key_set.remove(AccessDatabase.TIMESTAMP_FIELD)
-                data_key_set.remove(AccessDatabase.DELETED_COUNT)
-                data_key_set.remove(AccessDatabase.UPDATED_COUNT)
+            if len(attrs_set) != 0:
+                data_key_set = set(data)
+                data_key_set.discard(AccessDatabase.ID_FIELD)
+                data_key_set.discard(AccessDatabase.TIMESTAMP_FIELD)
+                data_key_set.discard(AccessDatabase.DELETED_COUNT)
+                data_key_set.discard(AccessDatabase.UPDATED_COUNT)
+                data_key_set.discard(AccessDatabase.MATCHED_COUNT)
                 intersect = attrs_set.intersection(data_key_set)
                 attrs_eq = intersect == attrs_set
 
@@ -110,14 +180,42 @@ class DatabaseObjectResult:
             for attr, value in data.items():
                 setattr(c, attr, value)
 
-            # Add to output
-            output.append(c)
+            yield c
 
-        # Return list of the objects
-        return output
+    def get_legacy_data(self) -> str:
+        """
+        Get data in string format, as it was returned by previous versions of the module
+
+        :return: data in string format
+        :rtype: str
+        """
+
+        return self.data if isinstance(self.data, str) else str(DatabaseObjectResult._get_native_data(self.data))
+
+    @staticmethod
+    def _get_native_data(value: object) -> object:
+        """
+        Convert read-only mappings (as raw documents) to dict, so they are printed as dict
+
+        :param value: data or part of data
+        :type value: object
+
+        :return: data with only dict and list
+        :rtype: object
+        """
+
+        if isinstance(value, Mapping):
+            return {key: DatabaseObjectResult._get_native_data(item) for key, item in value.items()}
+        elif isinstance(value, list):
+            return [DatabaseObjectResult._get_native_data(item) for item in value]
+
+        return value
 
     def __repr__(self):
-        return str(self.__dict__)
+        # Data is not included, because it can be very big
+        output = dict(self.__dict__)
+        output['data'] = '<{} elements>'.format(len(self.data)) if isinstance(self.data, list) else self.data
+        return str(output)
 
 
 class DatabaseObjectException(Exception):
@@ -165,3 +263,5 @@ class ErrorMessages:
     INDEX_VALUE_ERROR = 'Wrong value of id'
     GET_INDEX_ERROR = 'Error recovering index'
     UPDATE_INDEX_ERROR = 'Error updating index in datastore'
+    TOKEN_ERROR = 'Wrong continuation token'
+    INDEX_ERROR = 'Error creating indexes'
@@ -1,19 +1,43 @@
+import base64
+import json
 import time
 
 from common import config
 from common.infra_config import InfraConfig
+from common.infra_exception import InfraException
 from common.infra_module import InfraModule
 from common.tools.decorators import log_function
+from common.tools.keyed_lock import KeyedLock
 from common.tools.task_thread import TaskThread
 from database_object_module import MODULE_NAME
+from database_object_module.data_cache import DataCache
 from database_object_module.data_model import DatabaseObjectResult, DatabaseObjectException, ErrorMessages, \
     DatabaseObject
 from database_object_module.impl.access_database import AccessDatabase
 from database_object_module.impl.access_database_factory import AccessDatabaseFactory
+from database_object_module.index_allocator import IndexAllocator
 
 
 logger = config.get_log(MODULE_NAME)
 
+# Default number of objects written in each call to the datastore by put_many
+DEFAULT_BULK_CHUNK_SIZE = 1000
+
+# Default number of objects read from the datastore in each batch by iter_get
+DEFAULT_STREAM_BATCH_SIZE = 1000
+
+# Default number of identifiers reserved in each write to the index
+DEFAULT_INDEX_BLOCK_SIZE = 100
+
+# Default limits of data cache: number of results, approximate memory in bytes and seconds of validity (0 is forever)
+DEFAULT_CACHE_MAX_ENTRIES = 1000
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_CACHE_TTL = 0
+
+# Default window of hot tier of tiered datastore: number of recent objects and seconds (0 is no limit)
+DEFAULT_HOT_WINDOW_DOCUMENTS = 1000
+DEFAULT_HOT_WINDOW_SECONDS = 0
+
 
 class DatabaseObjectModule(InfraModule):
     """
@@ -30,19 +54,56 @@ class DatabaseObjectModule(InfraModule):
         try:
             self.config_module = config_module
 
-            self.use_cache = config_module.get_value(MODULE_NAME, 'use_cache')
+            self.use_cache = self._get_config_value('use_cache', 'False') == 'True'
             name_database = config_module.get_value(MODULE_NAME, 'name_database')
             connection_database = config_module.get_value(MODULE_NAME, 'connection_database')
+            self.stream_batch_size = int(self._get_config_value('stream_batch_size', DEFAULT_STREAM_BATCH_SIZE))
+            self.bulk_chunk_size = int(self._get_config_value('bulk_chunk_size', DEFAULT_BULK_CHUNK_SIZE))
+            index_block_size = int(self._get_config_value('index_block_size', DEFAULT_INDEX_BLOCK_SIZE))
+            index_allocation = self._get_config_value('index_allocation', IndexAllocator.MODE_BLOCK)
+
+            # Default write options. They can be configured for each sub_schema too
+            self.write_concern = DatabaseObjectModule._parse_write_concern(self._get_config_value('write_concern', ''))
+            self.ordered_writes = DatabaseObjectModule._parse_ordered(self._get_config_value('ordered_writes', ''))
+
+            # Default read mode. Raw documents are decoded only when they are accessed
+            self.raw_documents = self._get_config_value('raw_documents', 'False') == 'True'
+
+            # Default compression of fields. Selected fields, and fields bigger than minimum size, are compressed
+            self.compress_fields = self._get_config_value('compress_fields', '')
+            self.compress_min_size = int(self._get_config_value('compress_min_size', 0))
+
+            # Default window of hot tier, used only with tiered datastore
+            self.hot_window_documents = int(self._get_config_value('hot_window_documents',
+                                                                   DEFAULT_HOT_WINDOW_DOCUMENTS))
+            self.hot_window_seconds = float(self._get_config_value('hot_window_seconds', DEFAULT_HOT_WINDOW_SECONDS))
+
+            # Default size of time buckets (day, week or month), used only with bucketed datastore. Empty is no buckets
+            self.time_buckets = self._get_config_value('time_buckets', '')
 
             # Connect to datastore
             self.access_db = AccessDatabaseFactory.get_access_database(name_database, connection_database)
             self.is_connected = True
 
-            # Index cache. This variable has index data reading last objects inserted (or last index if there are not
-            # data in collection) when inserting data
-            self.cache_index = dict()
+            # Index allocator. It reserves blocks of identifiers in datastore and hands them out from memory
+            self.index_allocator = IndexAllocator(self.access_db, index_block_size, index_allocation)
+
+            # Sub_schemas whose specific configuration has already been applied, and sub_schemas whose secondary
+            # indexes have already been declared
+            self.configured_collections = set()
+            self.indexed_collections = set()
+
+            # Timestamp cache. This variable has last timestamp assigned to each collection, so timestamps of
+            # objects inserted in a batch are unique and always greater than previous ones
+            self.cache_timestamp = dict()
+            self.timestamp_locks = KeyedLock()
 
-            # Data cache
+            # Data cache. Results of get are stored until the collection is modified
+            self.data_cache = None
+            if self.use_cache:
+                self.data_cache = DataCache(int(self._get_config_value('cache_max_entries', DEFAULT_CACHE_MAX_ENTRIES)),
+                                            int(self._get_config_value('cache_max_bytes', DEFAULT_CACHE_MAX_BYTES)),
+                                            float(self._get_config_value('cache_ttl', DEFAULT_CACHE_TTL)))
 
             logger.info('Datastore connected')
 
@@ -61,7 +122,8 @@ class DatabaseObjectModule(InfraModule):
 
     @log_function(logger)
     def get(self, schema: str, sub_schema: str, conditions: list = ((AccessDatabase.ID_FIELD, '!=', None),),
-            criteria: str = '', native_criteria: bool = False) -> DatabaseObjectResult:
+            criteria: str = '', native_criteria: bool = False, fields: list = None,
+            sort: list = AccessDatabase.DEFAULT_SORT, limit: int = 0) -> DatabaseObjectResult:
         """
         Get data from data store
 
@@ -80,6 +142,17 @@ class DatabaseObjectModule(InfraModule):
         :param native_criteria: criteria native from database
         :type native_criteria: bool
 
+        :param fields: attributes to get, besides _identifier and _timestamp. None to get all attributes. Objects
+                       built from the result only have these attributes populated from the datastore
+        :type fields: list
+
+        :param sort: list of tuples (attribute, direction) with direction asc or desc. By default objects are sorted
+                     by _timestamp. None to not sort them, which is faster when order does not matter
+        :type sort: list
+
+        :param limit: maximum number of objects, 0 to get all objects. With sort, these are the first objects
+        :type limit: int
+
         :return: database object result
         :rtype: DatabaseObjectResult
         """
@@ -90,9 +163,29 @@ class DatabaseObjectModule(InfraModule):
                 logger.error('Error opening connection to datastore', exc_info=True)
                 raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
 
+            if limit < 0:
+                raise DatabaseObjectException(ErrorMessages.CRITERIA_ERROR)
+
+            self._configure_sub_schema(schema, sub_schema)
             schema_collection = AccessDatabase.get_schema_collection(schema, sub_schema)
-            ret = self.access_db.get(schema_collection, conditions, criteria, native_criteria)
-            return DatabaseObjectModule._get_data_object_result_from_json('get', result=ret)
+
+            # Without cache, always read from datastore
+            if self.data_cache is None:
+                ret = self.access_db.get(schema_collection, conditions, criteria, native_criteria, fields, sort,
+                                         limit)
+
+            # With cache, read from datastore only if result is not stored, and then store it
+            else:
+                ret = self.data_cache.get(schema_collection, conditions, criteria, native_criteria, fields, sort,
+                                          limit)
+                if ret is None:
+                    generation = self.data_cache.get_generation(schema_collection)
+                    ret = self.access_db.get(schema_collection, conditions, criteria, native_criteria, fields, sort,
+                                             limit)
+                    self.data_cache.put(schema_collection, conditions, criteria, native_criteria, fields, ret,
+                                        generation, sort, limit)
+
+            return DatabaseObjectModule._get_data_object_result_from_json('get', result=ret, fields=fields)
 
         except DatabaseObjectException as e:
 
@@ -105,7 +198,299 @@ class DatabaseObjectModule(InfraModule):
             return DatabaseObjectModule._get_data_object_result_from_json('get', exception=e)
 
     @log_function(logger)
-    def put_object(self, schema: str, sub_schema: str, data: DatabaseObject) -> DatabaseObjectResult:
+    def iter_get(self, schema: str, sub_schema: str, conditions: list = ((AccessDatabase.ID_FIELD, '!=', None),),
+                 criteria: str = '', native_criteria: bool = False, batch_size: int = None, limit: int = 0,
+                 skip: int = 0, fields: list = None, sort: list = AccessDatabase.DEFAULT_SORT) -> DatabaseObjectResult:
+        """
+        Get data from data store as a stream. Data of the result is a generator that reads documents in batches, so
+        memory is bounded by batch size instead of by number of documents. Data cache is not used
+
+        :param schema: connection schema
+        :type schema: str
+
+        :param sub_schema: object type to save
+        :type sub_schema: str
+
+        :param conditions: list of tuple conditions
+        :type conditions: list
+
+        :param criteria: criteria search
+        :type criteria: str
+
+        :param native_criteria: criteria native from database
+        :type native_criteria: bool
+
+        :param batch_size: number of objects read from the datastore in each batch
+        :type batch_size: int
+
+        :param limit: maximum number of objects, 0 if there is no limit
+        :type limit: int
+
+        :param skip: number of objects skipped before the first one
+        :type skip: int
+
+        :param fields: attributes to get, besides _identifier and _timestamp. None to get all attributes
+        :type fields: list
+
+        :param sort: list of tuples (attribute, direction) with direction asc or desc. By default objects are sorted
+                     by _timestamp. None to not sort them
+        :type sort: list
+
+        :return: database object result with a generator as data
+        :rtype: DatabaseObjectResult
+        """
+
+        try:
+            # Check if database is up
+            if not self.is_connected:
+                logger.error('Error opening connection to datastore', exc_info=True)
+                raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+
+            batch_size = self.stream_batch_size if batch_size is None else batch_size
+            if batch_size <= 0 or limit < 0 or skip < 0:
+                raise DatabaseObjectException(ErrorMessages.CRITERIA_ERROR)
+
+            self._configure_sub_schema(schema, sub_schema)
+            schema_collection = AccessDatabase.get_schema_collection(schema, sub_schema)
+            ret = self.access_db.iter_get(schema_collection, conditions, criteria, native_criteria, batch_size,
+                                          limit, skip, fields, sort)
+            return DatabaseObjectModule._get_data_object_result_from_json('iter_get', result=ret, fields=fields)
+
+        except DatabaseObjectException as e:
+
+            # Set false only if socket timeout exception and if another process has not set it to false
+            if str(e) == ErrorMessages.CONNECTION_ERROR and self.is_connected:
+                self.is_connected = False
+                logger.critical('Connection to datastore lost')
+
+            logger.error('Error recovering data from datastore', exc_info=True)
+            return DatabaseObjectModule._get_data_object_result_from_json('iter_get', exception=e)
+
+    @log_function(logger)
+    def get_page(self, schema: str, sub_schema: str, conditions: list = ((AccessDatabase.ID_FIELD, '!=', None),),
+                 criteria: str = '', native_criteria: bool = False, after: object = None, page_size: int = 100,
+                 order: str = AccessDatabase.ORDER_ASCENDING, fields: list = None) -> DatabaseObjectResult:
+        """
+        Get a page of data from data store ordered by _identifier. Pages are sought using the index of _identifier, so
+        cost of a page does not depend on its depth
+
+        :param schema: connection schema
+        :type schema: str
+
+        :param sub_schema: object type to save
+        :type sub_schema: str
+
+        :param conditions: list of tuple conditions
+        :type conditions: list
+
+        :param criteria: criteria search
+        :type criteria: str
+
+        :param native_criteria: criteria native from database
+        :type native_criteria: bool
+
+        :param after: continuation token of the previous page or last _identifier of the previous page. None for the
+                      first page
+        :type after: object
+
+        :param page_size: maximum number of objects of the page
+        :type page_size: int
+
+        :param order: order of _identifier, 'asc' or 'desc'
+        :type order: str
+
+        :param fields: attributes to get, besides _identifier and _timestamp. None to get all attributes
+        :type fields: list
+
+        :return: database object result with the page and continuation token of next page (None if it is the last)
+        :rtype: DatabaseObjectResult
+        """
+
+        try:
+            # Check if database is up
+            if not self.is_connected:
+                logger.error('Error opening connection to datastore', exc_info=True)
+                raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+
+            if page_size <= 0 or order not in (AccessDatabase.ORDER_ASCENDING, AccessDatabase.ORDER_DESCENDING):
+                raise DatabaseObjectException(ErrorMessages.CRITERIA_ERROR)
+
+            if isinstance(after, str):
+                after = DatabaseObjectModule._decode_token(after, order)
+
+            # One more object is recovered to know if there is a next page
+            self._configure_sub_schema(schema, sub_schema)
+            schema_collection = AccessDatabase.get_schema_collection(schema, sub_schema)
+            ret = self.access_db.get_page(schema_collection, conditions, criteria, native_criteria, after,
+                                          page_size + 1, order, fields)
+
+            next_token = None
+            if len(ret) > page_size:
+                ret = ret[:page_size]
+                next_token = DatabaseObjectModule._encode_token(ret[-1][AccessDatabase.ID_FIELD], order)
+
+            return DatabaseObjectModule._get_data_object_result_from_json('get_page', result=ret, fields=fields,
+                                                                         next_token=next_token)
+
+        except DatabaseObjectException as e:
+
+            # Set false only if socket timeout exception and if another process has not set it to false
+            if str(e) == ErrorMessages.CONNECTION_ERROR and self.is_connected:
+                self.is_connected = False
+                logger.critical('Connection to datastore lost')
+
+            logger.error('Error recovering data from datastore', exc_info=True)
+            return DatabaseObjectModule._get_data_object_result_from_json('get_page', exception=e)
+
+    @log_function(logger)
+    def count(self, schema: str, sub_schema: str, conditions: list = ((AccessDatabase.ID_FIELD, '!=', None),),
+              criteria: str = '', native_criteria: bool = False) -> DatabaseObjectResult:
+        """
+        Count objects in data store that match the conditions, without recovering them
+
+        :param schema: connection schema
+        :type schema: str
+
+        :param sub_schema: object type
+        :type sub_schema: str
+
+        :param conditions: list of tuple conditions
+        :type conditions: list
+
+        :param criteria: criteria search
+        :type criteria: str
+
+        :param native_criteria: criteria native from database
+        :type native_criteria: bool
+
+        :return: database object result with number of objects in _count
+        :rtype: DatabaseObjectResult
+        """
+
+        try:
+            # Check if database is up
+            if not self.is_connected:
+                logger.error('Error opening connection to datastore', exc_info=True)
+                raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+
+            self._configure_sub_schema(schema, sub_schema)
+            schema_collection = AccessDatabase.get_schema_collection(schema, sub_schema)
+            ret = self.access_db.count(schema_collection, conditions, criteria, native_criteria)
+
+            return DatabaseObjectModule._get_data_object_result_from_json('count', result=ret)
+
+        except DatabaseObjectException as e:
+
+            # Set false only if socket timeout exception and if another process has not set it to false
+            if str(e) == ErrorMessages.CONNECTION_ERROR and self.is_connected:
+                self.is_connected = False
+                logger.critical('Connection to datastore lost')
+
+            logger.error('Error counting data from datastore', exc_info=True)
+            return DatabaseObjectModule._get_data_object_result_from_json('count', exception=e)
+
+    @log_function(logger)
+    def exists(self, schema: str, sub_schema: str, conditions: list = ((AccessDatabase.ID_FIELD, '!=', None),),
+               criteria: str = '', native_criteria: bool = False) -> DatabaseObjectResult:
+        """
+        Check if any object in data store matches the conditions, without recovering it
+
+        :param schema: connection schema
+        :type schema: str
+
+        :param sub_schema: object type
+        :type sub_schema: str
+
+        :param conditions: list of tuple conditions
+        :type conditions: list
+
+        :param criteria: criteria search
+        :type criteria: str
+
+        :param native_criteria: criteria native from database
+        :type native_criteria: bool
+
+        :return: database object result with true or false in _exists
+        :rtype: DatabaseObjectResult
+        """
+
+        try:
+            # Check if database is up
+            if not self.is_connected:
+                logger.error('Error opening connection to datastore', exc_info=True)
+                raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+
+            self._configure_sub_schema(schema, sub_schema)
+            schema_collection = AccessDatabase.get_schema_collection(schema, sub_schema)
+            ret = self.access_db.exists(schema_collection, conditions, criteria, native_criteria)
+
+            return DatabaseObjectModule._get_data_object_result_from_json('exists', result=ret)
+
+        except DatabaseObjectException as e:
+
+            # Set false only if socket timeout exception and if another process has not set it to false
+            if str(e) == ErrorMessages.CONNECTION_ERROR and self.is_connected:
+                self.is_connected = False
+                logger.critical('Connection to datastore lost')
+
+            logger.error('Error checking data from datastore', exc_info=True)
+            return DatabaseObjectModule._get_data_object_result_from_json('exists', exception=e)
+
+    @log_function(logger)
+    def distinct(self, schema: str, sub_schema: str, field: str,
+                 conditions: list = ((AccessDatabase.ID_FIELD, '!=', None),), criteria: str = '',
+                 native_criteria: bool = False) -> DatabaseObjectResult:
+        """
+        Get different values of an attribute in objects of data store that match the conditions, without recovering
+        the objects
+
+        :param schema: connection schema
+        :type schema: str
+
+        :param sub_schema: object type
+        :type sub_schema: str
+
+        :param field: attribute whose different values are recovered
+        :type field: str
+
+        :param conditions: list of tuple conditions
+        :type conditions: list
+
+        :param criteria: criteria search
+        :type criteria: str
+
+        :param native_criteria: criteria native from database
+        :type native_criteria: bool
+
+        :return: database object result with one element for each different value
+        :rtype: DatabaseObjectResult
+        """
+
+        try:
+            # Check if database is up
+            if not self.is_connected:
+                logger.error('Error opening connection to datastore', exc_info=True)
+                raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+
+            self._configure_sub_schema(schema, sub_schema)
+            schema_collection = AccessDatabase.get_schema_collection(schema, sub_schema)
+            ret = self.access_db.distinct(schema_collection, field, conditions, criteria, native_criteria)
+
+            return DatabaseObjectModule._get_data_object_result_from_json('distinct', result=ret)
+
+        except DatabaseObjectException as e:
+
+            # Set false only if socket timeout exception and if another process has not set it to false
+            if str(e) == ErrorMessages.CONNECTION_ERROR and self.is_connected:
+                self.is_connected = False
+                logger.critical('Connection to datastore lost')
+
+            logger.error('Error recovering data from datastore', exc_info=True)
+            return DatabaseObjectModule._get_data_object_result_from_json('distinct', exception=e)
+
+    @log_function(logger)
+    def put_object(self, schema: str, sub_schema: str, data: DatabaseObject,
+                   write_concern: dict = None) -> DatabaseObjectResult:
         """
         Write object to object store
 
@@ -118,6 +503,10 @@ class DatabaseObjectModule(InfraModule):
         :param data: data to save
         :type data: DatabaseObject
 
+        :param write_concern: write concern of this call (w, j, wtimeout). If it is None, write concern configured
+                              for the sub_schema is used
+        :type write_concern: dict
+
         :return: database object result with _id
         :rtype: DatabaseObjectResult
         """
@@ -127,10 +516,15 @@ class DatabaseObjectModule(InfraModule):
             e = DatabaseObjectException(ErrorMessages.INHERITANCE_ERROR)
             return DatabaseObjectModule._get_data_object_result_from_json('put', exception=e)
 
-        return self.put(schema, sub_schema, data.__dict__)
+        # Declare secondary indexes of the class the first time
+        result = self._register_class_indexes(schema, sub_schema, data.__class__, 'put')
+        if result is not None:
+            return result
+
+        return self.put(schema, sub_schema, data.__dict__, write_concern)
 
     @log_function(logger)
-    def put(self, schema: str, sub_schema: str, data: dict) -> DatabaseObjectResult:
+    def put(self, schema: str, sub_schema: str, data: dict, write_concern: dict = None) -> DatabaseObjectResult:
         """
         Write object to object store
 
@@ -143,6 +537,10 @@ class DatabaseObjectModule(InfraModule):
         :param data: data to save
         :type data: dict
 
+        :param write_concern: write concern of this call (w, j, wtimeout). If it is None, write concern configured
+                              for the sub_schema is used
+        :type write_concern: dict
+
         :return: database object result with _id
         :rtype: DatabaseObjectResult
         """
@@ -156,22 +554,21 @@ class DatabaseObjectModule(InfraModule):
             # Validate data, checking that object has mandatory fields
             self._validate_data(data)
 
-            # Recover collection joining schema and sub_schema, same for index
+            # Recover collection joining schema and sub_schema
+            self._configure_sub_schema(schema, sub_schema)
             schema_collection = AccessDatabase.get_schema_collection(schema, sub_schema)
-            schema_collection_index = AccessDatabase.get_schema_collection_index(schema, sub_schema)
 
             # Get next index and set index to data
             next_index = self._get_next_index(data, schema, sub_schema)
             data[AccessDatabase.ID_FIELD] = next_index
 
             # Set timestamp attribute
-            data[AccessDatabase.TIMESTAMP_FIELD] = int(time.time() * 10000000)
+            data[AccessDatabase.TIMESTAMP_FIELD] = self._get_next_timestamp(schema_collection)
 
-            ret = self.access_db.put(schema_collection, data)
-
-            # Update cache index
-            self.cache_index[schema_collection_index] = next_index
-            self.access_db.update_index(schema_collection_index, next_index)
+            try:
+                ret = self.access_db.put(schema_collection, data, write_concern)
+            finally:
+                self._invalidate_cache(schema_collection)
 
             return DatabaseObjectModule._get_data_object_result_from_json('put', result=ret)
 
@@ -185,10 +582,133 @@ class DatabaseObjectModule(InfraModule):
             logger.error('Error inserting data to datastore', exc_info=True)
             return DatabaseObjectModule._get_data_object_result_from_json('put', exception=e)
 
+    @log_function(logger)
+    def put_objects(self, schema: str, sub_schema: str, data_list: list, chunk_size: int = None,
+                    write_concern: dict = None, ordered: bool = None) -> DatabaseObjectResult:
+        """
+        Write a batch of objects to object store
+
+        :param schema: connection schema
+        :type schema: str
+
+        :param sub_schema: object type to save
+        :type sub_schema: str
+
+        :param data_list: list of DatabaseObject to save
+        :type data_list: list
+
+        :param chunk_size: maximum number of objects written in each call to the datastore
+        :type chunk_size: int
+
+        :param write_concern: write concern of this call (w, j, wtimeout). If it is None, write concern configured
+                              for the sub_schema is used
+        :type write_concern: dict
+
+        :param ordered: stop at first error (True) or write the rest of objects (False). If it is None, mode
+                        configured for the sub_schema is used
+        :type ordered: bool
+
+        :return: database object result with first _id and number of inserted objects of each chunk
+        :rtype: DatabaseObjectResult
+        """
+
+        # Validate data, checking that all objects have inheritance from DatabaseObject
+        if not all(issubclass(data.__class__, DatabaseObject) for data in data_list):
+            e = DatabaseObjectException(ErrorMessages.INHERITANCE_ERROR)
+            return DatabaseObjectModule._get_data_object_result_from_json('put_many', exception=e)
+
+        # Declare secondary indexes of the classes the first time
+        for cls in set(data.__class__ for data in data_list):
+            result = self._register_class_indexes(schema, sub_schema, cls, 'put_many')
+            if result is not None:
+                return result
+
+        return self.put_many(schema, sub_schema, [data.__dict__ for data in data_list], chunk_size, write_concern,
+                             ordered)
+
+    @log_function(logger)
+    def put_many(self, schema: str, sub_schema: str, data_list: list, chunk_size: int = None,
+                 write_concern: dict = None, ordered: bool = None) -> DatabaseObjectResult:
+        """
+        Write a batch of objects to object store. All objects get a contiguous range of _identifier and the index
+        is updated only once for the whole batch
+
+        :param schema: connection schema
+        :type schema: str
+
+        :param sub_schema: object type to save
+        :type sub_schema: str
+
+        :param data_list: list of data to save
+        :type data_list: list
+
+        :param chunk_size: maximum number of objects written in each call to the datastore
+        :type chunk_size: int
+
+        :param write_concern: write concern of this call (w, j, wtimeout). If it is None, write concern configured
+                              for the sub_schema is used
+        :type write_concern: dict
+
+        :param ordered: stop at first error (True) or write the rest of objects (False). If it is None, mode
+                        configured for the sub_schema is used
+        :type ordered: bool
+
+        :return: database object result with first _id and number of inserted objects of each chunk
+        :rtype: DatabaseObjectResult
+        """
+
+        try:
+            # Check if database is up
+            if not self.is_connected:
+                logger.error('Error opening connection to datastore', exc_info=True)
+                raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+
+            # Validate all data before storing anything. Identifiers of a batch are always generated
+            for data in data_list:
+                self._validate_data(data)
+                if data[AccessDatabase.ID_FIELD] is not None:
+                    raise DatabaseObjectException(ErrorMessages.INDEX_VALUE_ERROR)
+
+            chunk_size = self.bulk_chunk_size if chunk_size is None else chunk_size
+            if chunk_size <= 0:
+                raise DatabaseObjectException(ErrorMessages.DATA_ERROR)
+
+            if len(data_list) == 0:
+                return DatabaseObjectModule._get_data_object_result_from_json('put_many', result=list())
+
+            # Recover collection joining schema and sub_schema
+            self._configure_sub_schema(schema, sub_schema)
+            schema_collection = AccessDatabase.get_schema_collection(schema, sub_schema)
+
+            # Get a contiguous range of indexes and timestamps for the whole batch. The index is reserved in
+            # datastore once for the whole batch
+            first_index = self.index_allocator.get_next_index(schema, sub_schema, len(data_list))
+            first_timestamp = self._get_next_timestamp(schema_collection, len(data_list))
+            for position, data in enumerate(data_list):
+                data[AccessDatabase.ID_FIELD] = first_index + position
+                data[AccessDatabase.TIMESTAMP_FIELD] = first_timestamp + position
+
+            try:
+                ret = self.access_db.put_many(schema_collection, data_list, chunk_size, write_concern, ordered)
+            finally:
+                self._invalidate_cache(schema_collection)
+
+            return DatabaseObjectModule._get_data_object_result_from_json('put_many', result=ret)
+
+        except DatabaseObjectException as e:
+
+            # Set false only if socket timeout exception and if another process has not set it to false
+            if str(e) == ErrorMessages.CONNECTION_ERROR and self.is_connected:
+                self.is_connected = False
+                logger.critical('Connection to datastore lost')
+
+            logger.error('Error inserting data to datastore', exc_info=True)
+            return DatabaseObjectModule._get_data_object_result_from_json('put_many', exception=e)
+
     @log_function(logger)
     def update_object(self, schema: str, sub_schema: str, data: DatabaseObject,
                       conditions: list = ((AccessDatabase.ID_FIELD, '!=', None),), criteria: str = '',
-                      native_criteria: bool = False) -> DatabaseObjectResult:
+                      native_criteria: bool = False, write_concern: dict = None) -> DatabaseObjectResult:
         """
         Update data in object store. This method will update all object data defined in "data" attribute
 
@@ -210,6 +730,10 @@ class DatabaseObjectModule(InfraModule):
         :param native_criteria: use native criteria from database or not
         :type native_criteria: bool
 
+        :param write_concern: write concern of this call (w, j, wtimeout). If it is None, write concern configured
+                              for the sub_schema is used
+        :type write_concern: dict
+
         :return: data object result wit number of updated objects
         :rtype: DatabaseObjectResult
         """
@@ -220,12 +744,12 @@ class DatabaseObjectModule(InfraModule):
             return DatabaseObjectModule._get_data_object_result_from_json('update', exception=e)
 
         # This updates all object data defined in "data" attribute because we pass __dict__ to update method
-        return self.update(schema, sub_schema, data.__dict__, conditions, criteria, native_criteria)
+        return self.update(schema, sub_schema, data.__dict__, conditions, criteria, native_criteria, write_concern)
 
     @log_function(logger)
     def update(self, schema: str, sub_schema: str, data: dict,
                conditions: list = ((AccessDatabase.ID_FIELD, '!=', ''),),
-               criteria: str = '', native_criteria: bool = False) -> DatabaseObjectResult:
+               criteria: str = '', native_criteria: bool = False, write_concern: dict = None) -> DatabaseObjectResult:
         """
         Update data in object store. . This method will update only fields defined in "data" attribute
 
@@ -247,6 +771,10 @@ class DatabaseObjectModule(InfraModule):
         :param native_criteria: use native criteria from database or not
         :type native_criteria: bool
 
+        :param write_concern: write concern of this call (w, j, wtimeout). If it is None, write concern configured
+                              for the sub_schema is used
+        :type write_concern: dict
+
         :return: data object result wit number of updated objects
         :rtype: DatabaseObjectResult
         """
@@ -263,8 +791,13 @@ class DatabaseObjectModule(InfraModule):
             del data[AccessDatabase.UPDATED_COUNT]
             del data[AccessDatabase.DELETED_COUNT]
 
+            self._configure_sub_schema(schema, sub_schema)
             schema_collection = AccessDatabase.get_schema_collection(schema, sub_schema)
-            ret = self.access_db.update(schema_collection, data, conditions, criteria, native_criteria)
+            try:
+                ret = self.access_db.update(schema_collection, data, conditions, criteria, native_criteria,
+                                            write_concern)
+            finally:
+                self._invalidate_cache(schema_collection)
 
             return DatabaseObjectModule._get_data_object_result_from_json('update', result=ret)
 
@@ -278,10 +811,91 @@ class DatabaseObjectModule(InfraModule):
             logger.error('Error updating data from datastore', exc_info=True)
             return DatabaseObjectModule._get_data_object_result_from_json('update', exception=e)
 
+    @log_function(logger)
+    def update_many_objects(self, schema: str, sub_schema: str, updates: list, chunk_size: int = None,
+                            write_concern: dict = None, ordered: bool = None) -> DatabaseObjectResult:
+        """
+        Update different objects with different data in only a few requests. Each update only modifies fields
+        defined in its data
+
+        :param schema: connection schema
+        :type schema: str
+
+        :param sub_schema: object type to update
+        :type sub_schema: str
+
+        :param updates: list of tuples (conditions, data), where data is a DatabaseObject or a dict
+        :type updates: list
+
+        :param chunk_size: maximum number of updates written in each request. If it is None, bulk_chunk_size of
+                           configuration is used
+        :type chunk_size: int
+
+        :param write_concern: write concern of this call (w, j, wtimeout). If it is None, write concern configured
+                              for the sub_schema is used
+        :type write_concern: dict
+
+        :param ordered: stop at first error (True) or write the rest of objects (False). If it is None, mode
+                        configured for the sub_schema is used
+        :type ordered: bool
+
+        :return: data object result with number of matched and updated objects
+        :rtype: DatabaseObjectResult
+        """
+
+        try:
+            # Check if database is up
+            if not self.is_connected:
+                logger.error('Error opening connection to datastore', exc_info=True)
+                raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+
+            if chunk_size is None:
+                chunk_size = self.bulk_chunk_size
+            if chunk_size <= 0:
+                raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+            # Validate data and delete all private attributes from a copy, because it is forbidden to modify them
+            private_fields = (AccessDatabase.ID_FIELD, AccessDatabase.TIMESTAMP_FIELD, AccessDatabase.UPDATED_COUNT,
+                              AccessDatabase.DELETED_COUNT, AccessDatabase.MATCHED_COUNT)
+            access_updates = list()
+            for conditions, data in updates:
+                if issubclass(data.__class__, DatabaseObject):
+                    data = data.__dict__
+                elif not isinstance(data, dict):
+                    raise DatabaseObjectException(ErrorMessages.INHERITANCE_ERROR)
+
+                data = {key: value for key, value in data.items() if key not in private_fields}
+                access_updates.append((conditions, data))
+
+            if len(access_updates) == 0:
+                return DatabaseObjectModule._get_data_object_result_from_json(
+                    'update_many_objects',
+                    result=[{AccessDatabase.MATCHED_COUNT: 0, AccessDatabase.UPDATED_COUNT: 0}])
+
+            self._configure_sub_schema(schema, sub_schema)
+            schema_collection = AccessDatabase.get_schema_collection(schema, sub_schema)
+            try:
+                ret = self.access_db.update_many(schema_collection, access_updates, chunk_size, write_concern,
+                                                 ordered)
+            finally:
+                self._invalidate_cache(schema_collection)
+
+            return DatabaseObjectModule._get_data_object_result_from_json('update_many_objects', result=ret)
+
+        except DatabaseObjectException as e:
+
+            # Set false only if socket timeout exception and if another process has not set it to false
+            if str(e) == ErrorMessages.CONNECTION_ERROR and self.is_connected:
+                self.is_connected = False
+                logger.critical('Connection to datastore lost')
+
+            logger.error('Error updating data from datastore', exc_info=True)
+            return DatabaseObjectModule._get_data_object_result_from_json('update_many_objects', exception=e)
+
     @log_function(logger)
     def remove(self, schema: str, sub_schema: str, conditions: list = ((AccessDatabase.ID_FIELD, '!=', None),),
                criteria: str = '',
-               native_criteria: bool = False) -> DatabaseObjectResult:
+               native_criteria: bool = False, write_concern: dict = None) -> DatabaseObjectResult:
         """
         Remove data in object store
 
@@ -300,6 +914,10 @@ class DatabaseObjectModule(InfraModule):
         :param native_criteria: use native criteria from database or not
         :type native_criteria: bool
 
+        :param write_concern: write concern of this call (w, j, wtimeout). If it is None, write concern configured
+                              for the sub_schema is used
+        :type write_concern: dict
+
         :return: data object result wit number of deleted objects
         :rtype: DatabaseObjectResult
         """
@@ -310,8 +928,12 @@ class DatabaseObjectModule(InfraModule):
                 logger.error('Error opening connection to datastore', exc_info=True)
                 raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
 
+            self._configure_sub_schema(schema, sub_schema)
             schema_collection = AccessDatabase.get_schema_collection(schema, sub_schema)
-            ret = self.access_db.remove(schema_collection, conditions, criteria, native_criteria)
+            try:
+                ret = self.access_db.remove(schema_collection, conditions, criteria, native_criteria, write_concern)
+            finally:
+                self._invalidate_cache(schema_collection)
             return DatabaseObjectModule._get_data_object_result_from_json('remove', result=ret)
 
         except DatabaseObjectException as e:
@@ -324,6 +946,99 @@ class DatabaseObjectModule(InfraModule):
             logger.error('Error removing data from datastore', exc_info=True)
             return DatabaseObjectModule._get_data_object_result_from_json('remove', exception=e)
 
+    @log_function(logger)
+    def register_indexes(self, schema: str, sub_schema: str, indexes: list) -> DatabaseObjectResult:
+        """
+        Declare secondary indexes of a sub_schema. They are created with the sub_schema, or reconciled now if it
+        already exists. Usually it is called at startup
+
+        :param schema: connection schema
+        :type schema: str
+
+        :param sub_schema: object type
+        :type sub_schema: str
+
+        :param indexes: list of DatabaseObjectIndex
+        :type indexes: list
+
+        :return: database object result without data
+        :rtype: DatabaseObjectResult
+        """
+
+        try:
+            # Check if database is up
+            if not self.is_connected:
+                logger.error('Error opening connection to datastore', exc_info=True)
+                raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+
+            schema_collection = AccessDatabase.get_schema_collection(schema, sub_schema)
+            self.access_db.ensure_indexes(schema_collection, indexes)
+            self.indexed_collections.add(schema_collection)
+
+            return DatabaseObjectModule._get_data_object_result_from_json('register_indexes', result=list())
+
+        except DatabaseObjectException as e:
+
+            # Set false only if socket timeout exception and if another process has not set it to false
+            if str(e) == ErrorMessages.CONNECTION_ERROR and self.is_connected:
+                self.is_connected = False
+                logger.critical('Connection to datastore lost')
+
+            logger.error('Error creating indexes in datastore', exc_info=True)
+            return DatabaseObjectModule._get_data_object_result_from_json('register_indexes', exception=e)
+
+    def get_cache_stats(self) -> dict:
+        """
+        Get counters of data cache, useful to size it
+
+        :return: hits, misses, evictions, number of entries and size of data cache, empty if cache is not used
+        :rtype: dict
+        """
+
+        return dict() if self.data_cache is None else self.data_cache.get_stats()
+
+    def get_compression_stats(self) -> dict:
+        """
+        Get size savings of compressed fields, written by this process
+
+        :return: number of compressed fields, size before and after compression and saved size of each collection
+        :rtype: dict
+        """
+
+        return self.access_db.get_compression_stats()
+
+    def get_tier_stats(self) -> dict:
+        """
+        Get reads served by hot tier and reads that needed cold tier, useful to size the window of hot tier
+
+        :return: hits, misses, hit rate, number of objects in hot tier and watermark of each collection, empty if
+                 datastore is not tiered
+        :rtype: dict
+        """
+
+        return self.access_db.get_tier_stats()
+
+    def set_index_block_size(self, schema: str, sub_schema: str, block_size: int) -> None:
+        """
+        Set number of identifiers reserved in each write to the index of a sub_schema
+
+        :param schema: connection schema
+        :type schema: str
+
+        :param sub_schema: object type
+        :type sub_schema: str
+
+        :param block_size: number of identifiers reserved in each write
+        :type block_size: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        # Apply configuration before, so it does not overwrite this value later
+        self._configure_sub_schema(schema, sub_schema)
+        self.index_allocator.set_block_size(schema, sub_schema, block_size)
+
     def _get_next_index(self, data: dict, schema: str, sub_schema: str) -> int:
         """
         Check index of data to insert
@@ -333,23 +1048,273 @@ class DatabaseObjectModule(InfraModule):
         :return: next index of the data or exception
         """
 
-        # Recover collection index joining schema and sub_schema
-        schema_collection_index = AccessDatabase.get_schema_collection_index(schema, sub_schema)
-
-        # Check that schema_collections exists, and if not then create in cache_index
-        if schema_collection_index not in self.cache_index.keys():
-            self.cache_index[schema_collection_index] = self.access_db.get_last_index(schema, sub_schema)
-
-        # If not exists _identifier, then create a new _identifier from cache
+        # If not exists _identifier, then create a new _identifier from allocator
         # If exists _identifier, then check that is greather than last inserted _identifier. If not then raise excepcion
         if data[AccessDatabase.ID_FIELD] is None:
-            next_index = self.cache_index[schema_collection_index] + 1
+            return self.index_allocator.get_next_index(schema, sub_schema)
         else:
-            next_index = data[AccessDatabase.ID_FIELD]
-            if next_index <= self.cache_index[schema_collection_index]:
-                raise DatabaseObjectException(ErrorMessages.INDEX_VALUE_ERROR)
+            return self.index_allocator.set_index(schema, sub_schema, data[AccessDatabase.ID_FIELD])
+
+    def _configure_sub_schema(self, schema: str, sub_schema: str) -> None:
+        """
+        Apply specific configuration of a sub_schema the first time that it is used. Specific values are configured
+        with keys like <key>.<schema>.<sub_schema>
+
+        :param schema: connection schema
+        :type schema: str
+
+        :param sub_schema: object type
+        :type sub_schema: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
 
-        return next_index
+        schema_collection = AccessDatabase.get_schema_collection(schema, sub_schema)
+        if schema_collection in self.configured_collections:
+            return
+
+        block_size = self._get_sub_schema_config_value('index_block_size', schema, sub_schema)
+        if block_size is not None:
+            self.index_allocator.set_block_size(schema, sub_schema, int(block_size))
+
+        # Write options of the sub_schema, or default write options
+        write_concern = self._get_sub_schema_config_value('write_concern', schema, sub_schema)
+        write_concern = self.write_concern if write_concern is None else \
+            DatabaseObjectModule._parse_write_concern(write_concern)
+        ordered = self._get_sub_schema_config_value('ordered_writes', schema, sub_schema)
+        ordered = self.ordered_writes if ordered is None else DatabaseObjectModule._parse_ordered(ordered)
+        if write_concern is not None or ordered is not None:
+            self.access_db.set_write_options(schema_collection, write_concern, ordered)
+
+        # Read mode of the sub_schema, or default read mode
+        raw_documents = self._get_sub_schema_config_value('raw_documents', schema, sub_schema)
+        raw_documents = self.raw_documents if raw_documents is None else raw_documents == 'True'
+        if raw_documents:
+            self.access_db.set_read_options(schema_collection, raw_documents)
+
+        # Compression of the sub_schema, or default compression
+        compress_fields = self._get_sub_schema_config_value('compress_fields', schema, sub_schema,
+                                                            self.compress_fields)
+        compress_fields = [field.strip() for field in compress_fields.split(',') if len(field.strip()) > 0]
+        compress_min_size = int(self._get_sub_schema_config_value('compress_min_size', schema, sub_schema,
+                                                                  self.compress_min_size))
+        if len(compress_fields) > 0 or compress_min_size > 0:
+            self.access_db.set_compression_options(schema_collection, compress_fields, compress_min_size)
+
+        # Time buckets of the sub_schema, or default time buckets. Only datastores with buckets, or wrapping them, use
+        # them
+        time_buckets = self._get_sub_schema_config_value('time_buckets', schema, sub_schema, self.time_buckets)
+        if len(time_buckets) > 0:
+            self.access_db.set_time_buckets(schema_collection, time_buckets)
+
+        # Window of hot tier of the sub_schema, or default window. Only tiered datastores, or wrapping them, use it
+        hot_window_documents = int(self._get_sub_schema_config_value('hot_window_documents', schema, sub_schema,
+                                                                     self.hot_window_documents))
+        hot_window_seconds = float(self._get_sub_schema_config_value('hot_window_seconds', schema, sub_schema,
+                                                                     self.hot_window_seconds))
+        self.access_db.set_hot_window(schema_collection, hot_window_documents, hot_window_seconds)
+
+        self.configured_collections.add(schema_collection)
+
+    def _register_class_indexes(self, schema: str, sub_schema: str, cls: type,
+                                from_method: str) -> DatabaseObjectResult:
+        """
+        Declare secondary indexes of a DatabaseObject class the first time that it is stored in a sub_schema
+
+        :param schema: connection schema
+        :type schema: str
+
+        :param sub_schema: object type
+        :type sub_schema: str
+
+        :param cls: class of stored objects
+        :type cls: type
+
+        :param from_method: method which is storing the objects
+        :type from_method: str
+
+        :return: database object result with the error, or None if there is no error
+        :rtype: DatabaseObjectResult
+        """
+
+        schema_collection = AccessDatabase.get_schema_collection(schema, sub_schema)
+        if len(cls.INDEXES) == 0 or schema_collection in self.indexed_collections:
+            return None
+
+        result = self.register_indexes(schema, sub_schema, cls.INDEXES)
+        if result.code == DatabaseObjectResult.CODE_KO:
+            return DatabaseObjectModule._get_data_object_result_from_json(from_method, exception=result.exception)
+
+        return None
+
+    def _invalidate_cache(self, schema_collection: str) -> None:
+        """
+        Remove results of a collection from data cache, because it has been modified
+
+        :param schema_collection: modified collection
+        :type schema_collection: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        if self.data_cache is not None:
+            self.data_cache.invalidate(schema_collection)
+
+    def _get_next_timestamp(self, schema_collection: str, count: int = 1) -> int:
+        """
+        Get first timestamp of a range of unique timestamps for data to insert
+
+        :param schema_collection: collection where data will be inserted
+        :type schema_collection: str
+
+        :param count: number of timestamps to reserve
+        :type count: int
+
+        :return: first timestamp of the range
+        :rtype: int
+        """
+
+        # Timestamp must be greater than last one assigned in this collection, because it has a unique index
+        with self.timestamp_locks.get(schema_collection):
+            next_timestamp = max(int(time.time() * AccessDatabase.TIMESTAMP_UNITS),
+                                 self.cache_timestamp.get(schema_collection, 0) + 1)
+            self.cache_timestamp[schema_collection] = next_timestamp + count - 1
+
+        return next_timestamp
+
+    def _get_config_value(self, key: str, default: object) -> object:
+        """
+        Get optional value from module configuration
+
+        :param key: key of the value
+        :type key: str
+
+        :param default: value returned if key is not configured
+        :type default: object
+
+        :return: configured value or default value
+        :rtype: object
+        """
+
+        try:
+            return self.config_module.get_value(MODULE_NAME, key)
+        except InfraException:
+            return default
+
+    def _get_sub_schema_config_value(self, key: str, schema: str, sub_schema: str, default: object = None) -> object:
+        """
+        Get optional value from module configuration specific for a sub_schema
+
+        :param key: key of the value
+        :type key: str
+
+        :param schema: connection schema
+        :type schema: str
+
+        :param sub_schema: object type
+        :type sub_schema: str
+
+        :param default: value returned if key is not configured for the sub_schema
+        :type default: object
+
+        :return: configured value or default value
+        :rtype: object
+        """
+
+        return self._get_config_value('{}.{}.{}'.format(key, schema, sub_schema), default)
+
+    @staticmethod
+    def _parse_write_concern(value: str) -> dict:
+        """
+        Parse a write concern from configuration, with format like w=majority,j=true,wtimeout=5000
+
+        :param value: configured write concern, empty if it is not configured
+        :type value: str
+
+        :return: write concern (w, j, wtimeout) or None if it is not configured
+        :rtype: dict
+        """
+
+        if len(value.strip()) == 0:
+            return None
+
+        write_concern = dict()
+        try:
+            for option in value.split(','):
+                key, option_value = (item.strip() for item in option.split('='))
+                if key == 'w':
+                    write_concern[key] = int(option_value) if option_value.isdigit() else option_value
+                elif key == 'j':
+                    write_concern[key] = option_value.lower() == 'true'
+                elif key == 'wtimeout':
+                    write_concern[key] = int(option_value)
+                else:
+                    raise ValueError(key)
+        except ValueError:
+            raise DatabaseObjectException(ErrorMessages.CONFIGURATION_ERROR)
+
+        return write_concern
+
+    @staticmethod
+    def _parse_ordered(value: str) -> bool:
+        """
+        Parse ordered mode of batch writes from configuration
+
+        :param value: configured mode (True or False), empty if it is not configured
+        :type value: str
+
+        :return: ordered mode or None if it is not configured
+        :rtype: bool
+        """
+
+        if len(value.strip()) == 0:
+            return None
+
+        return value.strip() == 'True'
+
+    @staticmethod
+    def _encode_token(last_index: int, order: str) -> str:
+        """
+        Create an opaque continuation token with last _identifier of a page
+
+        :param last_index: last _identifier of the page
+        :type last_index: int
+
+        :param order: order of the page
+        :type order: str
+
+        :return: continuation token
+        :rtype: str
+        """
+
+        return base64.urlsafe_b64encode(json.dumps([order, last_index]).encode()).decode()
+
+    @staticmethod
+    def _decode_token(token: str, order: str) -> int:
+        """
+        Recover last _identifier of a page from its continuation token
+
+        :param token: continuation token
+        :type token: str
+
+        :param order: order of the requested page, it must be the same of the token
+        :type order: str
+
+        :return: last _identifier of the page or exception
+        :rtype: int
+        """
+
+        try:
+            token_order, last_index = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.TOKEN_ERROR)
+
+        if token_order != order or not isinstance(last_index, int):
+            raise DatabaseObjectException(ErrorMessages.TOKEN_ERROR)
+
+        return last_index
 
     @staticmethod
     def _validate_data(data: dict) -> None:
@@ -367,12 +1332,14 @@ class DatabaseObjectModule(InfraModule):
             raise DatabaseObjectException(ErrorMessages.INHERITANCE_ERROR)
 
     @staticmethod
-    def _get_data_object_result_from_json(from_method: str, result: list = None,
-                                          exception: Exception = None) -> DatabaseObjectResult:
+    def _get_data_object_result_from_json(from_method: str, result: list = None, exception: Exception = None,
+                                          fields: list = None, next_token: str = None) -> DatabaseObjectResult:
         """
         Convert data from implemented database to data object result
         :param from_method: method which has been executed
         :param result: data returned by method
+        :param fields: fields of data, None if data has all fields
+        :param next_token: continuation token of next page
         :return: database object result with information about output
         """
 
@@ -381,11 +1348,14 @@ class DatabaseObjectModule(InfraModule):
             return DatabaseObjectResult(DatabaseObjectResult.CODE_KO, msg=str(exception),
                                         exception=exception)
 
-        if list is not None:
-            if from_method in ['get', 'remove', 'update', 'put']:
-                return DatabaseObjectResult(DatabaseObjectResult.CODE_OK, data=str(result))
-            else:
-                return DatabaseObjectResult(DatabaseObjectResult.CODE_KO, data='')
+        # Data is returned in native format, without conversion
+        if result is not None:
+            if from_method in ['get', 'iter_get', 'get_page', 'count', 'exists', 'distinct', 'remove', 'update',
+                               'update_many_objects', 'put', 'put_many', 'register_indexes']:
+                return DatabaseObjectResult(DatabaseObjectResult.CODE_OK, data=result, fields=fields,
+                                            next_token=next_token)
+
+        return DatabaseObjectResult(DatabaseObjectResult.CODE_KO)
 
 
 class CheckConnectionThread(TaskThread):
@@ -14,12 +14,34 @@ class AccessDatabase(object):
     # Field _timestamp
     TIMESTAMP_FIELD = '_timestamp'
 
+    # Units of _timestamp in a second
+    TIMESTAMP_UNITS = 10000000
+
     # Field _deleted_count
     DELETED_COUNT = '_deleted_count'
 
-    # Field _deleted_count
+    # Field _updated_count
     UPDATED_COUNT = '_updated_count'
 
+    # Field _inserted_count
+    INSERTED_COUNT = '_inserted_count'
+
+    # Field _matched_count
+    MATCHED_COUNT = '_matched_count'
+
+    # Field _count
+    COUNT_FIELD = '_count'
+
+    # Field _exists
+    EXISTS_FIELD = '_exists'
+
+    # Order of pages
+    ORDER_ASCENDING = 'asc'
+    ORDER_DESCENDING = 'desc'
+
+    # Default sort of results
+    DEFAULT_SORT = ((TIMESTAMP_FIELD, ORDER_ASCENDING),)
+
     # Separator between schema and sub_schema
     SEPARATOR = '_'
 
@@ -41,7 +63,8 @@ class AccessDatabase(object):
         self.connection_url = connection_url
 
     @abc.abstractmethod
-    def get(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+    def get(self, schema: str, conditions: list, criteria: str, native_criteria: bool, fields: list = None,
+            sort: list = DEFAULT_SORT, limit: int = 0) -> list:
         """
         Get the object from the database.
 
@@ -57,6 +80,15 @@ class AccessDatabase(object):
         :param native_criteria: select between native criteria or generic criteria
         :type native_criteria: bool
 
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :param sort: list of tuples (field, direction) with direction asc or desc, or None to not sort
+        :type sort: list
+
+        :param limit: maximum number of objects, 0 to get all objects
+        :type limit: int
+
         :return: list of objects gotten as a dictionary
         :rtype: list of dictionary
 
@@ -64,7 +96,153 @@ class AccessDatabase(object):
         pass
 
     @abc.abstractmethod
-    def put(self, schema: str, data: dict) -> list:
+    def iter_get(self, schema: str, conditions: list, criteria: str, native_criteria: bool, batch_size: int,
+                 limit: int, skip: int, fields: list = None, sort: list = DEFAULT_SORT):
+        """
+        Get the objects from the database one by one, reading them in batches.
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param conditions: conditions to update the object (list of tuples)
+        :type conditions: list
+
+        :param criteria: advanced condition for complex searches, can be native or generic
+        :type criteria: str
+
+        :param native_criteria: select between native criteria or generic criteria
+        :type native_criteria: bool
+
+        :param batch_size: number of objects read from the database in each batch
+        :type batch_size: int
+
+        :param limit: maximum number of objects, 0 if there is no limit
+        :type limit: int
+
+        :param skip: number of objects skipped before the first one
+        :type skip: int
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :param sort: list of tuples (field, direction) with direction asc or desc, or None to not sort
+        :type sort: list
+
+        :return: generator of objects gotten as a dictionary
+        :rtype: generator of dictionary
+        """
+        pass
+
+    @abc.abstractmethod
+    def get_page(self, schema: str, conditions: list, criteria: str, native_criteria: bool, after: int,
+                 page_size: int, order: str, fields: list = None) -> list:
+        """
+        Get a page of objects from the database ordered by _identifier, seeking after the last _identifier of the
+        previous page.
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param conditions: conditions to update the object (list of tuples)
+        :type conditions: list
+
+        :param criteria: advanced condition for complex searches, can be native or generic
+        :type criteria: str
+
+        :param native_criteria: select between native criteria or generic criteria
+        :type native_criteria: bool
+
+        :param after: last _identifier of the previous page, None for the first page
+        :type after: int
+
+        :param page_size: maximum number of objects of the page
+        :type page_size: int
+
+        :param order: order of _identifier, ascending or descending
+        :type order: str
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :return: list of objects gotten as a dictionary
+        :rtype: list of dictionary
+        """
+        pass
+
+    @abc.abstractmethod
+    def count(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Count the objects that match the conditions, without getting them.
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param conditions: conditions to search the objects (list of tuples)
+        :type conditions: list
+
+        :param criteria: advanced condition for complex searches, can be native or generic
+        :type criteria: str
+
+        :param native_criteria: select between native criteria or generic criteria
+        :type native_criteria: bool
+
+        :return: number of objects in a list of dictionary
+        :rtype: list of dictionary
+        """
+
+        pass
+
+    @abc.abstractmethod
+    def exists(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Check if any object matches the conditions, without getting it.
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param conditions: conditions to search the objects (list of tuples)
+        :type conditions: list
+
+        :param criteria: advanced condition for complex searches, can be native or generic
+        :type criteria: str
+
+        :param native_criteria: select between native criteria or generic criteria
+        :type native_criteria: bool
+
+        :return: true if any object matches in a list of dictionary
+        :rtype: list of dictionary
+        """
+
+        pass
+
+    @abc.abstractmethod
+    def distinct(self, schema: str, field: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Get the different values of a field in the objects that match the conditions, without getting them.
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param field: field whose values are recovered
+        :type field: str
+
+        :param conditions: conditions to search the objects (list of tuples)
+        :type conditions: list
+
+        :param criteria: advanced condition for complex searches, can be native or generic
+        :type criteria: str
+
+        :param native_criteria: select between native criteria or generic criteria
+        :type native_criteria: bool
+
+        :return: one dictionary with the field for each different value
+        :rtype: list of dictionary
+        """
+
+        pass
+
+    @abc.abstractmethod
+    def put(self, schema: str, data: dict, write_concern: dict = None) -> list:
         """
         Put the object into the database.
 
@@ -74,6 +252,10 @@ class AccessDatabase(object):
         :param data: dict of objects to put into the database
         :type data: dict
 
+        :param write_concern: write concern of this call (w, j, wtimeout). If it is None, write concern of the
+                              collection is used
+        :type write_concern: dict
+
         :return: list with inserted _id
         :rtype: list of dictionary
         """
@@ -81,7 +263,37 @@ class AccessDatabase(object):
         pass
 
     @abc.abstractmethod
-    def update(self, schema: str, data: dict, conditions: list, criteria: str, native_criteria: bool) -> list:
+    def put_many(self, schema: str, data_list: list, chunk_size: int, write_concern: dict = None,
+                 ordered: bool = None) -> list:
+        """
+        Put a batch of objects into the database, writing them in chunks.
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param data_list: list of dict of objects to put into the database
+        :type data_list: list
+
+        :param chunk_size: maximum number of objects written in each call to the database
+        :type chunk_size: int
+
+        :param write_concern: write concern of this call (w, j, wtimeout). If it is None, write concern of the
+                              collection is used
+        :type write_concern: dict
+
+        :param ordered: stop at first error (True) or write the rest of objects (False). If it is None, mode of the
+                        collection is used
+        :type ordered: bool
+
+        :return: one dictionary per chunk with first inserted _id and number of inserted elements
+        :rtype: list of dictionary
+        """
+
+        pass
+
+    @abc.abstractmethod
+    def update(self, schema: str, data: dict, conditions: list, criteria: str, native_criteria: bool,
+               write_concern: dict = None) -> list:
         """
         Update the object from the database.
 
@@ -100,6 +312,10 @@ class AccessDatabase(object):
         :param native_criteria: select between native criteria or generic criteria
         :type native_criteria: bool
 
+        :param write_concern: write concern of this call (w, j, wtimeout). If it is None, write concern of the
+                              collection is used
+        :type write_concern: dict
+
         :return: number of updated elements in a list of dictionary
         :rtype: list of dictionary
         """
@@ -107,7 +323,38 @@ class AccessDatabase(object):
         pass
 
     @abc.abstractmethod
-    def remove(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+    def update_many(self, schema: str, updates: list, chunk_size: int, write_concern: dict = None,
+                    ordered: bool = None) -> list:
+        """
+        Update different objects with different data in batches, writing them in chunks.
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param updates: list of tuples (conditions, data). Each data is applied to the objects that match its
+                        conditions
+        :type updates: list
+
+        :param chunk_size: maximum number of updates written in each call to the database
+        :type chunk_size: int
+
+        :param write_concern: write concern of this call (w, j, wtimeout). If it is None, write concern of the
+                              collection is used
+        :type write_concern: dict
+
+        :param ordered: stop at first error (True) or write the rest of objects (False). If it is None, mode of the
+                        collection is used
+        :type ordered: bool
+
+        :return: number of matched and updated elements of all updates in a list of dictionary
+        :rtype: list of dictionary
+        """
+
+        pass
+
+    @abc.abstractmethod
+    def remove(self, schema: str, conditions: list, criteria: str, native_criteria: bool,
+               write_concern: dict = None) -> list:
         """
         Remove the objects from the database.
 
@@ -123,6 +370,10 @@ class AccessDatabase(object):
         :param native_criteria: select between native criteria or generic criteria
         :type native_criteria: bool
 
+        :param write_concern: write concern of this call (w, j, wtimeout). If it is None, write concern of the
+                              collection is used
+        :type write_concern: dict
+
         :return: number of removed elements in a list of dictionary
         :rtype: list of dictionary
         """
@@ -170,6 +421,143 @@ class AccessDatabase(object):
 
         pass
 
+    @abc.abstractclassmethod
+    def set_read_options(self, schema: str, raw_documents: bool) -> None:
+        """
+        Set how objects of a collection are read
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param raw_documents: objects are returned as read-only mappings that are decoded when they are accessed,
+                              instead of dict
+        :type raw_documents: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        pass
+
+    @abc.abstractclassmethod
+    def set_compression_options(self, schema: str, fields: list, min_size: int) -> None:
+        """
+        Set fields of a collection that are stored compressed. They are decompressed when they are read
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param fields: fields that are always compressed
+        :type fields: list
+
+        :param min_size: fields bigger than this size in bytes are compressed too, 0 to compress only selected fields
+        :type min_size: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        pass
+
+    @abc.abstractclassmethod
+    def get_compression_stats(self) -> dict:
+        """
+        Get sizes of compressed fields of each collection
+
+        :return: number of compressed fields, and size before and after compression, of each collection
+        :rtype: dict
+        """
+
+        pass
+
+    @abc.abstractclassmethod
+    def set_write_options(self, schema: str, write_concern: dict, ordered: bool) -> None:
+        """
+        Set default write options of a collection
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param write_concern: write concern of writes (w, j, wtimeout), or None to use default of the database
+        :type write_concern: dict
+
+        :param ordered: batches stop at first error (True) or not (False), or None to use default of each method
+        :type ordered: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        pass
+
+    def set_time_buckets(self, schema: str, bucket_size: str) -> None:
+        """
+        Partition a collection by time. Only datastores with buckets, or wrapping them, use it
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param bucket_size: day, week or month
+        :type bucket_size: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        pass
+
+    def set_hot_window(self, schema: str, documents: int, seconds: float) -> None:
+        """
+        Set window of hot tier of a collection. Only tiered datastores, or datastores wrapping them, use it
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param documents: maximum number of recent documents in hot tier, 0 if there is no limit
+        :type documents: int
+
+        :param seconds: maximum age in seconds of documents in hot tier, 0 if there is no limit
+        :type seconds: float
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        pass
+
+    def get_tier_stats(self) -> dict:
+        """
+        Get reads served by hot tier (hits) and reads that needed cold tier (misses) of each collection
+
+        :return: hits, misses, hit rate, number of documents in hot tier and watermark of each collection, empty if
+                 datastore is not tiered
+        :rtype: dict
+        """
+
+        return dict()
+
+    @abc.abstractclassmethod
+    def ensure_indexes(self, schema: str, indexes: list) -> None:
+        """
+        Declare secondary indexes of a schema. They are created with the schema, or now if it already exists
+        :param schema: name of schema of the database
+        :param indexes: list of DatabaseObjectIndex
+        :return: none, exception if error
+        """
+
+        pass
+
+    @abc.abstractclassmethod
+    def reserve_index(self, schema: str, sub_schema: str, block_size: int) -> int:
+        """
+        Reserve atomically a block of identifiers, so several processes can insert at same time without collisions
+        :param schema: schema to reserve
+        :param sub_schema: sub_schema to reserve
+        :param block_size: number of identifiers to reserve
+        :return: last identifier of the reserved block
+        """
+
+        pass
 
     @staticmethod
     def get_schema_collection(schema: str, sub_schema: str) -> str:
@@ -178,3 +566,46 @@ class AccessDatabase(object):
     @staticmethod
     def get_schema_collection_index(schema: str, sub_schema: str) -> str:
         return schema + AccessDatabase.SEPARATOR + sub_schema + AccessDatabase.SEPARATOR + AccessDatabase.INDEX_ATTR
+
+    @staticmethod
+    def get_sort_fields(fields: list, sort: list) -> tuple:
+        """
+        Add fields of a sort to the fields to get, so documents of several datastores can be merged in order
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :param sort: list of tuples (field, direction), or None to not sort
+        :type sort: list
+
+        :return: fields to get with fields of the sort, and fields added
+        :rtype: tuple
+        """
+
+        if fields is None or sort is None:
+            return fields, list()
+
+        added_fields = [field for field, direction in sort if field not in fields and
+                        field not in (AccessDatabase.ID_FIELD, AccessDatabase.TIMESTAMP_FIELD)]
+
+        return list(fields) + added_fields, added_fields
+
+    @staticmethod
+    def remove_fields(documents: list, added_fields: list) -> list:
+        """
+        Remove fields added by get_sort_fields from merged documents
+
+        :param documents: list of documents
+        :type documents: list
+
+        :param added_fields: fields to remove
+        :type added_fields: list
+
+        :return: list of documents
+        :rtype: list
+        """
+
+        if len(added_fields) == 0:
+            return documents
+
+        return [{key: value for key, value in document.items() if key not in added_fields} for document in documents]
@@ -0,0 +1,1116 @@
+import calendar
+import itertools
+import logging
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+
+from common.tools.decorators import log_function
+from database_object_module import MODULE_NAME
+from database_object_module.data_model import DatabaseObjectException, ErrorMessages
+from database_object_module.impl.access_database import AccessDatabase
+from database_object_module.impl.access_database_memory import AccessDatabaseMemory
+from database_object_module.impl.access_database_sharded import AccessDatabaseSharded
+from database_object_module.impl.access_database_tiered import AccessDatabaseTiered
+
+logger = logging.getLogger(MODULE_NAME)
+
+
+class AccessDatabaseBucketed(AccessDatabase):
+    """
+    Class to define the access to a datastore where collections are partitioned by time. Documents of a bucketed
+    collection are stored in collections <schema>_<sub_schema>_<bucket> by _timestamp, with day, week or month
+    buckets. Reads only go to buckets that conditions on _timestamp can reach, and deletes of whole buckets drop their
+    collections. Buckets of each collection are registered in collection <schema>_<sub_schema>_buckets. Collections
+    without buckets are stored as in the datastore
+    """
+
+    # Size of buckets and format of their names
+    BUCKET_DAY = 'day'
+    BUCKET_WEEK = 'week'
+    BUCKET_MONTH = 'month'
+    BUCKET_FORMATS = {BUCKET_DAY: '%Y%m%d', BUCKET_WEEK: '%Gw%V', BUCKET_MONTH: '%Y%m'}
+
+    # Suffix of collection with buckets of a collection
+    CATALOG_ATTR = 'buckets'
+    CATALOG_COLLECTION_FIELD = 'collection'
+
+    # Seconds that buckets of a collection are kept in memory. Buckets created by other processes are seen after them
+    CATALOG_TTL = 10
+
+    # Epoch of _timestamp
+    EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+    def __init__(self, access_db: AccessDatabase) -> None:
+        """
+        Constructor with the datastore where buckets are stored
+
+        :param access_db: datastore
+        :type access_db: AccessDatabase
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        AccessDatabase.__init__(self, access_db.connection_url)
+
+        self.access_db = access_db
+        self.connection = access_db.connection
+
+        # Size of buckets of each bucketed collection
+        self.bucket_sizes = dict()
+
+        # Buckets of each collection: (time when they expire in memory, sorted list of start _timestamp)
+        self.catalogs = dict()
+
+        # Options of each collection, applied to each new bucket: read, compression, write options, indexes and
+        # window of hot tier
+        self.read_options = dict()
+        self.compression_options = dict()
+        self.write_options = dict()
+        self.declared_indexes = dict()
+        self.hot_windows = dict()
+
+        # Collection index of each collection whose counter has been initialized with identifiers of its buckets
+        self.seeded_indexes = set()
+
+        self.lock = threading.RLock()
+
+    @log_function(logger, logging.DEBUG)
+    def get(self, schema: str, conditions: list, criteria: str, native_criteria: bool, fields: list = None,
+            sort: list = AccessDatabase.DEFAULT_SORT, limit: int = 0) -> list:
+        """
+        Get data from buckets that conditions can reach. If sort starts with _timestamp, buckets are read in order
+        until limit is reached
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of the datastore
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of the datastore
+        :type native_criteria: bool
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :param sort: list of tuples (field, direction) with direction asc or desc, or None to not sort
+        :type sort: list
+
+        :param limit: maximum number of elements, 0 to get all elements
+        :type limit: int
+
+        :return: list of dictionary with data
+        :rtype: list
+        """
+
+        if schema not in self.bucket_sizes:
+            return self.access_db.get(schema, conditions, criteria, native_criteria, fields, sort, limit)
+
+        buckets = self._get_buckets(schema, conditions)
+
+        # Buckets are already sorted by _timestamp, so each one is read after the previous one
+        if sort is not None and len(sort) > 0 and sort[0][0] == AccessDatabase.TIMESTAMP_FIELD:
+            if sort[0][1] == AccessDatabase.ORDER_DESCENDING:
+                buckets = buckets[::-1]
+            output_list = list()
+            for bucket in buckets:
+                output_list.extend(self.access_db.get(bucket, conditions, criteria, native_criteria, fields, sort,
+                                                      limit - len(output_list) if limit > 0 else 0))
+                if 0 < limit <= len(output_list):
+                    break
+            return output_list
+
+        # Other sorts merge documents of all buckets, with fields of the sort
+        sort = AccessDatabaseSharded._get_total_sort(sort)
+        merge_fields, added_fields = AccessDatabase.get_sort_fields(fields, sort)
+        results = [self.access_db.get(bucket, conditions, criteria, native_criteria, merge_fields, sort, limit)
+                   for bucket in buckets]
+        output_list = AccessDatabaseSharded._merge(results, sort)
+
+        return AccessDatabase.remove_fields(list(itertools.islice(output_list, limit)) if limit > 0 else
+                                            list(output_list), added_fields)
+
+    @log_function(logger, logging.DEBUG)
+    def iter_get(self, schema: str, conditions: list, criteria: str, native_criteria: bool, batch_size: int,
+                 limit: int, skip: int, fields: list = None, sort: list = AccessDatabase.DEFAULT_SORT):
+        """
+        Get data one by one from buckets that conditions can reach. If sort starts with _timestamp, each bucket is
+        read when previous one has been consumed
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of the datastore
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of the datastore
+        :type native_criteria: bool
+
+        :param batch_size: number of documents read in each batch
+        :type batch_size: int
+
+        :param limit: maximum number of elements, 0 to get all elements
+        :type limit: int
+
+        :param skip: number of elements skipped before the first one
+        :type skip: int
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :param sort: list of tuples (field, direction) with direction asc or desc, or None to not sort
+        :type sort: list
+
+        :return: generator of dictionary with data
+        :rtype: generator
+        """
+
+        if schema not in self.bucket_sizes:
+            return self.access_db.iter_get(schema, conditions, criteria, native_criteria, batch_size, limit, skip,
+                                           fields, sort)
+
+        buckets = self._get_buckets(schema, conditions)
+        bucket_limit = limit + skip if limit > 0 else 0
+
+        if sort is not None and len(sort) > 0 and sort[0][0] == AccessDatabase.TIMESTAMP_FIELD:
+            if sort[0][1] == AccessDatabase.ORDER_DESCENDING:
+                buckets = buckets[::-1]
+            output_iter = itertools.chain.from_iterable(
+                self.access_db.iter_get(bucket, conditions, criteria, native_criteria, batch_size, bucket_limit, 0,
+                                        fields, sort) for bucket in buckets)
+        else:
+            sort = AccessDatabaseSharded._get_total_sort(sort)
+            merge_fields, added_fields = AccessDatabase.get_sort_fields(fields, sort)
+            output_iter = AccessDatabaseSharded._iter_remove_fields(AccessDatabaseSharded._merge(
+                [self.access_db.iter_get(bucket, conditions, criteria, native_criteria, batch_size, bucket_limit, 0,
+                                         merge_fields, sort) for bucket in buckets], sort), added_fields)
+
+        return itertools.islice(output_iter, skip, skip + limit if limit > 0 else None)
+
+    @log_function(logger, logging.DEBUG)
+    def get_page(self, schema: str, conditions: list, criteria: str, native_criteria: bool, after: int,
+                 page_size: int, order: str, fields: list = None) -> list:
+        """
+        Get a page of data from buckets that conditions can reach, merging them in order of _identifier
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of the datastore
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of the datastore
+        :type native_criteria: bool
+
+        :param after: last _identifier of previous page, None for the first page
+        :type after: int
+
+        :param page_size: maximum number of elements of the page
+        :type page_size: int
+
+        :param order: order of _identifier, asc or desc
+        :type order: str
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :return: list of dictionary with the page
+        :rtype: list
+        """
+
+        if schema not in self.bucket_sizes:
+            return self.access_db.get_page(schema, conditions, criteria, native_criteria, after, page_size, order,
+                                           fields)
+
+        results = [self.access_db.get_page(bucket, conditions, criteria, native_criteria, after, page_size, order,
+                                           fields)
+                   for bucket in self._get_buckets(schema, conditions)]
+
+        return list(itertools.islice(AccessDatabaseSharded._merge(results, [(AccessDatabase.ID_FIELD, order)]),
+                                     page_size))
+
+    @log_function(logger, logging.DEBUG)
+    def count(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Count data in buckets that conditions can reach
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of the datastore
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of the datastore
+        :type native_criteria: bool
+
+        :return: list of dictionary with number of elements
+        :rtype: list
+        """
+
+        if schema not in self.bucket_sizes:
+            return self.access_db.count(schema, conditions, criteria, native_criteria)
+
+        results = [self.access_db.count(bucket, conditions, criteria, native_criteria)
+                   for bucket in self._get_buckets(schema, conditions)]
+
+        return [{AccessDatabase.COUNT_FIELD: AccessDatabaseSharded._sum(results, AccessDatabase.COUNT_FIELD)}]
+
+    @log_function(logger, logging.DEBUG)
+    def exists(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Check if any data matches the conditions, from the newest bucket that conditions can reach to the oldest one
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of the datastore
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of the datastore
+        :type native_criteria: bool
+
+        :return: list of dictionary with true if any element matches
+        :rtype: list
+        """
+
+        if schema not in self.bucket_sizes:
+            return self.access_db.exists(schema, conditions, criteria, native_criteria)
+
+        for bucket in reversed(self._get_buckets(schema, conditions)):
+            if self.access_db.exists(bucket, conditions, criteria, native_criteria)[0][AccessDatabase.EXISTS_FIELD]:
+                return [{AccessDatabase.EXISTS_FIELD: True}]
+
+        return [{AccessDatabase.EXISTS_FIELD: False}]
+
+    @log_function(logger, logging.DEBUG)
+    def distinct(self, schema: str, field: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Get different values of a field from buckets that conditions can reach, without repeated values
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param field: field whose values are recovered
+        :type field: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of the datastore
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of the datastore
+        :type native_criteria: bool
+
+        :return: list of dictionary with the field for each different value
+        :rtype: list
+        """
+
+        if schema not in self.bucket_sizes:
+            return self.access_db.distinct(schema, field, conditions, criteria, native_criteria)
+
+        output_list = list()
+        values = set()
+        for bucket in self._get_buckets(schema, conditions):
+            for element in self.access_db.distinct(bucket, field, conditions, criteria, native_criteria):
+                value = AccessDatabaseMemory._get_hashable(element[field])
+                if value not in values:
+                    values.add(value)
+                    output_list.append(element)
+
+        return output_list
+
+    @log_function(logger, logging.DEBUG)
+    def put(self, schema: str, data: dict, write_concern: dict = None) -> list:
+        """
+        Insert data in the bucket of its _timestamp
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param data: data to store in dictionary format
+        :type data: dict
+
+        :param write_concern: write concern of the datastore
+        :type write_concern: dict
+
+        :return: list of dictionary with inserted _id
+        :rtype: list
+        """
+
+        if schema not in self.bucket_sizes:
+            return self.access_db.put(schema, data, write_concern)
+
+        bucket = self._add_bucket(schema, data[AccessDatabase.TIMESTAMP_FIELD])
+
+        return self.access_db.put(bucket, data, write_concern)
+
+    @log_function(logger, logging.DEBUG)
+    def put_many(self, schema: str, data_list: list, chunk_size: int, write_concern: dict = None,
+                 ordered: bool = None) -> list:
+        """
+        Insert a batch of data, sending to each bucket the data of its _timestamp
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param data_list: list of data to store in dictionary format
+        :type data_list: list
+
+        :param chunk_size: number of documents of each chunk
+        :type chunk_size: int
+
+        :param write_concern: write concern of the datastore
+        :type write_concern: dict
+
+        :param ordered: stop at first error or insert the rest of documents
+        :type ordered: bool
+
+        :return: list of dictionary with first inserted _id and number of inserted elements of each chunk
+        :rtype: list
+        """
+
+        if schema not in self.bucket_sizes:
+            return self.access_db.put_many(schema, data_list, chunk_size, write_concern, ordered)
+
+        # Data of each bucket, in the same order. Buckets are written in order of _timestamp
+        bucket_data = dict()
+        for data in data_list:
+            bucket_data.setdefault(self._add_bucket(schema, data[AccessDatabase.TIMESTAMP_FIELD]), list()).append(data)
+        for bucket, bucket_data_list in bucket_data.items():
+            self.access_db.put_many(bucket, bucket_data_list, chunk_size, write_concern, ordered)
+
+        # Result has chunks of the whole batch, as one collection returns them
+        return [{AccessDatabase.ID_FIELD: data_list[start][AccessDatabase.ID_FIELD],
+                 AccessDatabase.INSERTED_COUNT: len(data_list[start:start + chunk_size])}
+                for start in range(0, len(data_list), chunk_size)]
+
+    @log_function(logger, logging.DEBUG)
+    def update(self, schema: str, data: dict, conditions: list, criteria: str, native_criteria: bool,
+               write_concern: dict = None) -> list:
+        """
+        Update data in buckets that conditions can reach. _timestamp can not be updated, because it would move data to
+        other bucket
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param data: data to store in dictionary format
+        :type data: dict
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of the datastore
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of the datastore
+        :type native_criteria: bool
+
+        :param write_concern: write concern of the datastore
+        :type write_concern: dict
+
+        :return: list of dictionary with number of updated elements
+        :rtype: list
+        """
+
+        if schema not in self.bucket_sizes:
+            return self.access_db.update(schema, data, conditions, criteria, native_criteria, write_concern)
+
+        if AccessDatabase.TIMESTAMP_FIELD in data:
+            raise DatabaseObjectException(ErrorMessages.DATA_ERROR)
+
+        results = [self.access_db.update(bucket, data, conditions, criteria, native_criteria, write_concern)
+                   for bucket in self._get_buckets(schema, conditions)]
+
+        return [{AccessDatabase.UPDATED_COUNT: AccessDatabaseSharded._sum(results, AccessDatabase.UPDATED_COUNT)}]
+
+    @log_function(logger, logging.DEBUG)
+    def update_many(self, schema: str, updates: list, chunk_size: int, write_concern: dict = None,
+                    ordered: bool = None) -> list:
+        """
+        Update different data, sending to each bucket the updates that can reach it
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param updates: list of tuples (conditions, data)
+        :type updates: list
+
+        :param chunk_size: number of updates sent to the datastore in each batch
+        :type chunk_size: int
+
+        :param write_concern: write concern of the datastore
+        :type write_concern: dict
+
+        :param ordered: stop at first error or apply the rest of updates
+        :type ordered: bool
+
+        :return: list of dictionary with number of matched and updated elements
+        :rtype: list
+        """
+
+        if schema not in self.bucket_sizes:
+            return self.access_db.update_many(schema, updates, chunk_size, write_concern, ordered)
+
+        # Updates of each bucket, in the same order
+        bucket_updates = dict()
+        for conditions, data in updates:
+            if AccessDatabase.TIMESTAMP_FIELD in data:
+                raise DatabaseObjectException(ErrorMessages.DATA_ERROR)
+            for bucket in self._get_buckets(schema, conditions):
+                bucket_updates.setdefault(bucket, list()).append((conditions, data))
+
+        results = [self.access_db.update_many(bucket, bucket_update_list, chunk_size, write_concern, ordered)
+                   for bucket, bucket_update_list in bucket_updates.items()]
+
+        return [{AccessDatabase.MATCHED_COUNT: AccessDatabaseSharded._sum(results, AccessDatabase.MATCHED_COUNT),
+                 AccessDatabase.UPDATED_COUNT: AccessDatabaseSharded._sum(results, AccessDatabase.UPDATED_COUNT)}]
+
+    @log_function(logger, logging.DEBUG)
+    def remove(self, schema: str, conditions: list, criteria: str, native_criteria: bool,
+               write_concern: dict = None) -> list:
+        """
+        Delete elements from buckets that conditions can reach. If conditions are only on _timestamp, buckets whose
+        whole range matches are dropped, so retention does not scan documents
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of the datastore
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of the datastore
+        :type native_criteria: bool
+
+        :param write_concern: write concern of the datastore
+        :type write_concern: dict
+
+        :return: list of dictionary with number of deleted elements
+        :rtype: list
+        """
+
+        if schema not in self.bucket_sizes:
+            return self.access_db.remove(schema, conditions, criteria, native_criteria, write_concern)
+
+        # Buckets can be dropped if conditions are only ranges of _timestamp
+        lower, upper = AccessDatabaseBucketed._get_bounds(conditions)
+        drop = not native_criteria and all(field == AccessDatabase.TIMESTAMP_FIELD and
+                                           operator_condition in ('>', '>=', '<', '<=')
+                                           for field, operator_condition, value in conditions)
+
+        results = list()
+        for start in self._get_bucket_starts(schema, conditions):
+            bucket = self._get_bucket(schema, start)
+            if drop and (lower is None or lower <= start) and \
+                    (upper is None or self._get_next_start(schema, start) - 1 <= upper):
+                count = self.access_db.count(bucket, [], '', False)[0][AccessDatabase.COUNT_FIELD]
+                self._remove_bucket(schema, start)
+                results.append([{AccessDatabase.DELETED_COUNT: count}])
+            else:
+                results.append(self.access_db.remove(bucket, conditions, criteria, native_criteria, write_concern))
+
+        return [{AccessDatabase.DELETED_COUNT: AccessDatabaseSharded._sum(results, AccessDatabase.DELETED_COUNT)}]
+
+    def open_connection(self) -> None:
+        """
+        Open connection of the datastore
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self.access_db.open_connection()
+        self.connection = self.access_db.connection
+
+    def close_connection(self) -> None:
+        """
+        Close connection of the datastore. Buckets are read again from the datastore when they are used
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self.access_db.close_connection()
+        with self.lock:
+            self.catalogs.clear()
+
+    def check_connection(self) -> bool:
+        """
+        Check connection of the datastore
+
+        :return: true if connection is alive
+        :rtype: bool
+        """
+
+        return self.access_db.check_connection()
+
+    def get_last_index(self, schema: str, sub_schema: str) -> int:
+        """
+        Recover last index of a collection, from its collection index and its newest bucket
+
+        :param schema: schema to search
+        :type schema: str
+
+        :param sub_schema: sub_schema to search
+        :type sub_schema: str
+
+        :return: last inserted index of schema_collection
+        :rtype: int
+        """
+
+        last_index = self.access_db.get_last_index(schema, sub_schema)
+
+        schema_collection = self.get_schema_collection(schema, sub_schema)
+        if schema_collection in self.bucket_sizes:
+            buckets = self._get_buckets(schema_collection, [])
+            if len(buckets) > 0:
+                data_list = self.access_db.get(buckets[-1], [], '', False, sort=[(AccessDatabase.ID_FIELD,
+                                                                                  AccessDatabase.ORDER_DESCENDING)],
+                                               limit=1)
+                if len(data_list) > 0:
+                    last_index = max(last_index, data_list[0][AccessDatabase.ID_FIELD])
+
+        return last_index
+
+    def update_index(self, schema_collection_index: str, value: int) -> None:
+        """
+        Update index of a collection in the datastore
+
+        :param schema_collection_index: collection index
+        :type schema_collection_index: str
+
+        :param value: value of index
+        :type value: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self.access_db.update_index(schema_collection_index, value)
+
+    def reserve_index(self, schema: str, sub_schema: str, block_size: int) -> int:
+        """
+        Reserve atomically a block of identifiers in the datastore. The first time, counter of a bucketed collection
+        is initialized with last identifier of its buckets
+
+        :param schema: schema to reserve
+        :type schema: str
+
+        :param sub_schema: sub_schema to reserve
+        :type sub_schema: str
+
+        :param block_size: number of identifiers to reserve
+        :type block_size: int
+
+        :return: last identifier of the reserved block
+        :rtype: int
+        """
+
+        schema_collection_index = self.get_schema_collection_index(schema, sub_schema)
+
+        with self.lock:
+            if self.get_schema_collection(schema, sub_schema) in self.bucket_sizes and \
+                    schema_collection_index not in self.seeded_indexes:
+                self.update_index(schema_collection_index, self.get_last_index(schema, sub_schema))
+                self.seeded_indexes.add(schema_collection_index)
+
+        return self.access_db.reserve_index(schema, sub_schema, block_size)
+
+    def set_read_options(self, schema: str, raw_documents: bool) -> None:
+        """
+        Set how objects of a collection, and of its buckets, are read
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param raw_documents: objects are returned as read-only mappings instead of dict
+        :type raw_documents: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        with self.lock:
+            self.read_options[schema] = raw_documents
+            for bucket in self._get_known_buckets(schema):
+                self.access_db.set_read_options(bucket, raw_documents)
+        self.access_db.set_read_options(schema, raw_documents)
+
+    def set_compression_options(self, schema: str, fields: list, min_size: int) -> None:
+        """
+        Set fields of a collection, and of its buckets, that are stored compressed
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param fields: fields that are always compressed
+        :type fields: list
+
+        :param min_size: fields bigger than this size in bytes are compressed too, 0 to compress only selected fields
+        :type min_size: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        with self.lock:
+            self.compression_options[schema] = (fields, min_size)
+            for bucket in self._get_known_buckets(schema):
+                self.access_db.set_compression_options(bucket, fields, min_size)
+        self.access_db.set_compression_options(schema, fields, min_size)
+
+    def get_compression_stats(self) -> dict:
+        """
+        Get sizes of compressed fields of each collection, adding sizes of its buckets
+
+        :return: number of compressed fields, and size before and after compression, of each collection
+        :rtype: dict
+        """
+
+        # Name of collection of each known bucket
+        with self.lock:
+            schemas = {bucket: schema for schema in self.catalogs for bucket in self._get_known_buckets(schema)}
+
+        stats = dict()
+        for bucket, bucket_stats in self.access_db.get_compression_stats().items():
+            schema_stats = stats.setdefault(schemas.get(bucket, bucket), dict())
+            for key, value in bucket_stats.items():
+                schema_stats[key] = schema_stats.get(key, 0) + value
+
+        return stats
+
+    def set_write_options(self, schema: str, write_concern: dict, ordered: bool) -> None:
+        """
+        Set default write options of a collection and of its buckets
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param write_concern: write concern of writes (w, j, wtimeout), or None to use default of the database
+        :type write_concern: dict
+
+        :param ordered: batches stop at first error (True) or not (False), or None to use default of each method
+        :type ordered: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        with self.lock:
+            self.write_options[schema] = (write_concern, ordered)
+            for bucket in self._get_known_buckets(schema):
+                self.access_db.set_write_options(bucket, write_concern, ordered)
+        self.access_db.set_write_options(schema, write_concern, ordered)
+
+    def ensure_indexes(self, schema: str, indexes: list) -> None:
+        """
+        Create indexes of a collection and of its buckets
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param indexes: list of DatabaseObjectIndex
+        :type indexes: list
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        with self.lock:
+            self.declared_indexes[schema] = indexes
+            for bucket in self._get_known_buckets(schema):
+                self.access_db.ensure_indexes(bucket, indexes)
+        self.access_db.ensure_indexes(schema, indexes)
+
+    def set_hot_window(self, schema: str, documents: int, seconds: float) -> None:
+        """
+        Set window of hot tier of a collection and of each of its buckets
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param documents: maximum number of recent documents in hot tier of each bucket, 0 if there is no limit
+        :type documents: int
+
+        :param seconds: maximum age in seconds of documents in hot tier, 0 if there is no limit
+        :type seconds: float
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        with self.lock:
+            self.hot_windows[schema] = (documents, seconds)
+            for bucket in self._get_known_buckets(schema):
+                self.access_db.set_hot_window(bucket, documents, seconds)
+        self.access_db.set_hot_window(schema, documents, seconds)
+
+    def get_tier_stats(self) -> dict:
+        """
+        Get reads served by hot tier (hits) and reads that needed cold tier (misses) of each collection, adding reads
+        of its buckets
+
+        :return: hits, misses, hit rate, number of documents in hot tier and watermark of each collection
+        :rtype: dict
+        """
+
+        # Name of collection of each known bucket
+        with self.lock:
+            schemas = {bucket: schema for schema in self.catalogs for bucket in self._get_known_buckets(schema)}
+
+        stats = dict()
+        for bucket, bucket_stats in self.access_db.get_tier_stats().items():
+            AccessDatabaseTiered._add_tier_stats(stats, schemas.get(bucket, bucket), bucket_stats)
+
+        return stats
+
+    def set_time_buckets(self, schema: str, bucket_size: str) -> None:
+        """
+        Partition a collection by time. Documents already stored in the collection are not moved to buckets
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param bucket_size: day, week or month
+        :type bucket_size: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        if bucket_size not in AccessDatabaseBucketed.BUCKET_FORMATS:
+            raise DatabaseObjectException(ErrorMessages.CONFIGURATION_ERROR)
+
+        with self.lock:
+            self.bucket_sizes[schema] = bucket_size
+            self.catalogs.pop(schema, None)
+
+    def _drop_collection(self, schema: str) -> None:
+        """
+        Drop collection, its buckets and its catalog of buckets
+
+        :param schema: name of collection
+        :type schema: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        with self.lock:
+            if schema in self.bucket_sizes:
+                for bucket in self._get_buckets(schema, []):
+                    self.access_db._drop_collection(bucket)
+                self.access_db._drop_collection(AccessDatabaseBucketed._get_catalog(schema))
+                self.catalogs.pop(schema, None)
+
+        self.access_db._drop_collection(schema)
+
+    @staticmethod
+    def _get_catalog(schema: str) -> str:
+        """
+        Get name of collection with buckets of a collection
+
+        :param schema: name of collection
+        :type schema: str
+
+        :return: name of catalog
+        :rtype: str
+        """
+
+        return schema + AccessDatabase.SEPARATOR + AccessDatabaseBucketed.CATALOG_ATTR
+
+    def _get_starts(self, schema: str) -> list:
+        """
+        Get start _timestamp of buckets of a collection, reading them from the datastore when they expire in memory
+
+        :param schema: name of collection
+        :type schema: str
+
+        :return: sorted list of start _timestamp
+        :rtype: list
+        """
+
+        with self.lock:
+            expiration, starts = self.catalogs.get(schema, (0, None))
+            if starts is None or expiration < time.monotonic():
+                catalog = AccessDatabaseBucketed._get_catalog(schema)
+                data_list = list()
+                if self.access_db.count(catalog, [], '', False)[0][AccessDatabase.COUNT_FIELD] > 0:
+                    data_list = self.access_db.get(catalog, [], '', False,
+                                                   fields=[AccessDatabaseBucketed.CATALOG_COLLECTION_FIELD])
+                known_starts = set(starts or list())
+                starts = sorted(data[AccessDatabase.TIMESTAMP_FIELD] for data in data_list)
+                self.catalogs[schema] = (time.monotonic() + AccessDatabaseBucketed.CATALOG_TTL, starts)
+
+                # Buckets created by other processes get options of the collection the first time they are seen
+                for start in starts:
+                    if start not in known_starts:
+                        self._apply_options(schema, self._get_bucket(schema, start))
+
+            return starts
+
+    def _apply_options(self, schema: str, bucket: str) -> None:
+        """
+        Apply options of a collection to one of its buckets. Lock must be acquired
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param bucket: name of the collection of the bucket
+        :type bucket: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        if schema in self.read_options:
+            self.access_db.set_read_options(bucket, self.read_options[schema])
+        if schema in self.compression_options:
+            self.access_db.set_compression_options(bucket, *self.compression_options[schema])
+        if schema in self.write_options:
+            self.access_db.set_write_options(bucket, *self.write_options[schema])
+        if schema in self.declared_indexes:
+            self.access_db.ensure_indexes(bucket, self.declared_indexes[schema])
+        if schema in self.hot_windows:
+            self.access_db.set_hot_window(bucket, *self.hot_windows[schema])
+
+    def _get_known_buckets(self, schema: str) -> list:
+        """
+        Get buckets of a collection that are in memory, without reading the datastore. Lock must be acquired
+
+        :param schema: name of collection
+        :type schema: str
+
+        :return: list of names of buckets
+        :rtype: list
+        """
+
+        expiration, starts = self.catalogs.get(schema, (0, None))
+
+        return [self._get_bucket(schema, start) for start in starts or list()]
+
+    def _get_buckets(self, schema: str, conditions: list) -> list:
+        """
+        Get buckets that conditions on _timestamp can reach, sorted by _timestamp
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param conditions: list of tuple of conditions
+        :type conditions: list
+
+        :return: list of names of buckets
+        :rtype: list
+        """
+
+        return [self._get_bucket(schema, start) for start in self._get_bucket_starts(schema, conditions)]
+
+    def _get_bucket_starts(self, schema: str, conditions: list) -> list:
+        """
+        Get start _timestamp of buckets that conditions on _timestamp can reach, sorted
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param conditions: list of tuple of conditions
+        :type conditions: list
+
+        :return: list of start _timestamp
+        :rtype: list
+        """
+
+        starts = self._get_starts(schema)
+        lower, upper = AccessDatabaseBucketed._get_bounds(conditions)
+
+        # Values of conditions on equal _timestamp, that can reach only their buckets
+        values = None
+        for field, operator_condition, value in conditions:
+            if field == AccessDatabase.TIMESTAMP_FIELD and operator_condition in ('=', 'in'):
+                value = {value} if operator_condition == '=' else set(value)
+                values = value if values is None else values & value
+
+        bucket_starts = list()
+        first = 0 if lower is None else max(bisect_right(starts, lower) - 1, 0)
+        for start in starts[first:]:
+            if upper is not None and start > upper:
+                break
+            end = self._get_next_start(schema, start) - 1
+            if (lower is None or end >= lower) and \
+                    (values is None or any(isinstance(value, int) and start <= value <= end for value in values)):
+                bucket_starts.append(start)
+
+        return bucket_starts
+
+    @staticmethod
+    def _get_bounds(conditions: list) -> tuple:
+        """
+        Get minimum and maximum _timestamp that conditions can reach
+
+        :param conditions: list of tuple of conditions
+        :type conditions: list
+
+        :return: tuple (lower, upper) with None if there is no bound
+        :rtype: tuple
+        """
+
+        lower, upper = None, None
+        for field, operator_condition, value in conditions:
+            if field != AccessDatabase.TIMESTAMP_FIELD or isinstance(value, bool):
+                continue
+            if operator_condition in ('>', '>=', '=') and isinstance(value, (int, float)):
+                value = value + 1 if operator_condition == '>' and isinstance(value, int) else value
+                lower = value if lower is None else max(lower, value)
+            if operator_condition in ('<', '<=', '=') and isinstance(value, (int, float)):
+                value = value - 1 if operator_condition == '<' and isinstance(value, int) else value
+                upper = value if upper is None else min(upper, value)
+
+        return lower, upper
+
+    def _get_start(self, schema: str, timestamp: int) -> int:
+        """
+        Get start _timestamp of the bucket of a _timestamp, in UTC
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param timestamp: _timestamp of a document
+        :type timestamp: int
+
+        :return: start _timestamp of the bucket
+        :rtype: int
+        """
+
+        date = (AccessDatabaseBucketed.EPOCH + timedelta(
+            seconds=timestamp // AccessDatabase.TIMESTAMP_UNITS)).date()
+        if self.bucket_sizes[schema] == AccessDatabaseBucketed.BUCKET_WEEK:
+            date = date - timedelta(days=date.weekday())
+        elif self.bucket_sizes[schema] == AccessDatabaseBucketed.BUCKET_MONTH:
+            date = date.replace(day=1)
+
+        return calendar.timegm(date.timetuple()) * AccessDatabase.TIMESTAMP_UNITS
+
+    def _get_next_start(self, schema: str, start: int) -> int:
+        """
+        Get start _timestamp of the bucket after a bucket
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param start: start _timestamp of the bucket
+        :type start: int
+
+        :return: start _timestamp of next bucket
+        :rtype: int
+        """
+
+        days = {AccessDatabaseBucketed.BUCKET_DAY: 1, AccessDatabaseBucketed.BUCKET_WEEK: 7,
+                AccessDatabaseBucketed.BUCKET_MONTH: 31}[self.bucket_sizes[schema]]
+
+        # A month has at most 31 days, so the start of the month after them is next bucket
+        return self._get_start(schema, start + days * 86400 * AccessDatabase.TIMESTAMP_UNITS)
+
+    def _get_bucket(self, schema: str, start: int) -> str:
+        """
+        Get name of the bucket of a start _timestamp
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param start: start _timestamp of the bucket
+        :type start: int
+
+        :return: name of the collection of the bucket
+        :rtype: str
+        """
+
+        date = AccessDatabaseBucketed.EPOCH + timedelta(seconds=start // AccessDatabase.TIMESTAMP_UNITS)
+
+        return schema + AccessDatabase.SEPARATOR + \
+            date.strftime(AccessDatabaseBucketed.BUCKET_FORMATS[self.bucket_sizes[schema]])
+
+    def _add_bucket(self, schema: str, timestamp: int) -> str:
+        """
+        Get bucket of a _timestamp, registering it and applying options of the collection the first time
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param timestamp: _timestamp of a document
+        :type timestamp: int
+
+        :return: name of the collection of the bucket
+        :rtype: str
+        """
+
+        start = self._get_start(schema, timestamp)
+        bucket = self._get_bucket(schema, start)
+
+        with self.lock:
+            starts = self._get_starts(schema)
+            if start in starts:
+                return bucket
+
+            # Options are applied before the first document is stored in the bucket
+            self._apply_options(schema, bucket)
+
+            # Another process may have registered the bucket
+            catalog = AccessDatabaseBucketed._get_catalog(schema)
+            try:
+                self.access_db.put(catalog, {AccessDatabase.ID_FIELD: start, AccessDatabase.TIMESTAMP_FIELD: start,
+                                             AccessDatabaseBucketed.CATALOG_COLLECTION_FIELD: bucket})
+            except DatabaseObjectException:
+                if not self.access_db.exists(catalog, [(AccessDatabase.ID_FIELD, '=', start)], '',
+                                             False)[0][AccessDatabase.EXISTS_FIELD]:
+                    raise
+
+            starts.insert(bisect_right(starts, start), start)
+            logger.info('Bucket %s created', bucket)
+
+        return bucket
+
+    def _remove_bucket(self, schema: str, start: int) -> None:
+        """
+        Drop a bucket and remove it from the catalog
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param start: start _timestamp of the bucket
+        :type start: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        bucket = self._get_bucket(schema, start)
+
+        with self.lock:
+            self.access_db.remove(AccessDatabaseBucketed._get_catalog(schema), [(AccessDatabase.ID_FIELD, '=', start)],
+                                  '', False)
+            self.access_db._drop_collection(bucket)
+            starts = self._get_starts(schema)
+            if start in starts:
+                starts.remove(start)
+            logger.info('Bucket %s dropped', bucket)
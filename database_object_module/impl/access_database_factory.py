@@ -1,6 +1,12 @@
 from database_object_module.data_model import DatabaseObjectException, ErrorMessages
 from database_object_module.impl.access_database import AccessDatabase
+from database_object_module.impl.access_database_bucketed import AccessDatabaseBucketed
+from database_object_module.impl.access_database_memory import AccessDatabaseMemory
 from database_object_module.impl.access_database_mongodb import AccessDatabaseMongoDB
+from database_object_module.impl.access_database_segment import AccessDatabaseSegment
+from database_object_module.impl.access_database_sharded import AccessDatabaseSharded
+from database_object_module.impl.access_database_sqlite import AccessDatabaseSQLite
+from database_object_module.impl.access_database_tiered import AccessDatabaseTiered
 
 
 class AccessDatabaseFactory(object):
@@ -48,5 +54,24 @@ class AccessDatabaseFactory(object):
 
         if name_database == 'mongodb':
             return AccessDatabaseMongoDB(connection_database)
+        elif name_database == 'memory':
+            return AccessDatabaseMemory(connection_database)
+        elif name_database == 'sqlite':
+            return AccessDatabaseSQLite(connection_database)
+        elif name_database == 'segment':
+            return AccessDatabaseSegment(connection_database)
+        elif name_database.startswith('bucketed:'):
+            # Collections partitioned by time over any other datastore
+            return AccessDatabaseBucketed(
+                AccessDatabaseFactory._implement_database(name_database[len('bucketed:'):], connection_database))
+        elif name_database.startswith('sharded:'):
+            # One datastore for each url of the connection, separated by spaces
+            return AccessDatabaseSharded(
+                [AccessDatabaseFactory._implement_database(name_database[len('sharded:'):], connection_shard)
+                 for connection_shard in connection_database.split()])
+        elif name_database.startswith('tiered:'):
+            # Hot tier in memory over any other datastore as cold tier
+            return AccessDatabaseTiered(
+                AccessDatabaseFactory._implement_database(name_database[len('tiered:'):], connection_database))
         else:
             raise DatabaseObjectException(ErrorMessages.CONFIGURATION_ERROR)
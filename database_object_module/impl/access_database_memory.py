@@ -0,0 +1,1302 @@
+import itertools
+import logging
+import operator
+import threading
+from bisect import bisect_left, bisect_right
+
+import bson
+from bson.raw_bson import RawBSONDocument
+
+from common.tools.decorators import log_function
+from database_object_module import MODULE_NAME
+from database_object_module.data_model import DatabaseObjectException, DatabaseObjectIndex, ErrorMessages
+from database_object_module.impl.access_database import AccessDatabase
+
+logger = logging.getLogger(MODULE_NAME)
+
+
+def _equals(value: object, value_compare: object) -> bool:
+    """
+    Compare two values as the datastore does, so True and 1 are different values
+
+    :param value: value of the document
+    :type value: object
+
+    :param value_compare: value of the condition
+    :type value_compare: object
+
+    :return: true if both values are equal
+    :rtype: bool
+    """
+
+    return value == value_compare and isinstance(value, bool) == isinstance(value_compare, bool)
+
+
+def _compare(function):
+    """
+    Create a comparison that is false when values can not be compared, as the datastore does
+
+    :param function: comparison function
+    :type function: function
+
+    :return: comparison function
+    :rtype: function
+    """
+
+    def compare(value: object, value_compare: object) -> bool:
+        # None is only equal to None, so it matches with >= and <=, as null and missing fields in the datastore
+        if value_compare is None:
+            return value is None and function in (operator.ge, operator.le)
+        if value is None or isinstance(value, bool) != isinstance(value_compare, bool):
+            return False
+        try:
+            return function(value, value_compare)
+        except TypeError:
+            return False
+
+    return compare
+
+
+def _contains(value: object, value_compare: list) -> bool:
+    """
+    Check if a value is equal to any value of a list
+
+    :param value: value of the document
+    :type value: object
+
+    :param value_compare: values of the condition
+    :type value_compare: list
+
+    :return: true if value is in the list
+    :rtype: bool
+    """
+
+    return any(_equals(value, item) for item in value_compare)
+
+
+def _array(function):
+    """
+    Create a comparison that also matches when any element of a list of the document matches, as the datastore does
+
+    :param function: comparison function
+    :type function: function
+
+    :return: comparison function
+    :rtype: function
+    """
+
+    def compare(value: object, value_compare: object) -> bool:
+        return function(value, value_compare) or \
+            (isinstance(value, list) and any(function(item, value_compare) for item in value))
+
+    return compare
+
+
+class _MemoryCollection(object):
+    """
+    Documents of a collection with a hash index on _identifier, a sorted index on _timestamp and hash indexes of
+    secondary indexes
+    """
+
+    def __init__(self) -> None:
+        # Documents by _identifier. Each one is stored decoded, to evaluate conditions, and encoded, to return copies
+        self.documents = dict()
+
+        # Timestamps in order and _identifier of each one
+        self.timestamps = list()
+        self.timestamp_ids = list()
+
+        # Secondary indexes by name. Value is (DatabaseObjectIndex, predicates of partial filter, key -> identifiers)
+        self.secondary_indexes = dict()
+
+
+class AccessDatabaseMemory(AccessDatabase):
+    """
+    Class to define the access to a datastore in memory of the process. It implements the same behaviour as MongoDB
+    and data is lost when the process finishes. Native criteria is a function that receives a document and returns
+    true if it matches
+    """
+
+    # Operators
+    MEMORY_OPERATORS = {
+        '=': _array(_equals),
+        '!=': lambda value, value_compare: not AccessDatabaseMemory.MEMORY_OPERATORS['='](value, value_compare),
+        '>': _array(_compare(operator.gt)),
+        '>=': _array(_compare(operator.ge)),
+        '<': _array(_compare(operator.lt)),
+        '<=': _array(_compare(operator.le)),
+        'in': _array(_contains),
+        'out': lambda value, value_compare: not AccessDatabaseMemory.MEMORY_OPERATORS['in'](value, value_compare)
+    }
+
+    # Order of types when documents are sorted, as in MongoDB
+    SORT_TYPE_ORDER = {type(None): 0, int: 1, float: 1, str: 2, dict: 3, list: 4, bytes: 5, bool: 6}
+
+    def __init__(self, connection_url: str) -> None:
+        """
+        Constructor with empty datastore
+
+        :param connection_url: not used
+        :type connection_url: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        AccessDatabase.__init__(self, connection_url)
+
+        # Collections by name and counters of collection indexes by name
+        self.collections = dict()
+        self.indexes = dict()
+        self.seeded_indexes = set()
+
+        # Secondary indexes declared for each collection and collections read as raw documents
+        self.declared_indexes = dict()
+        self.raw_collections = set()
+
+        # Only one operation at a time. Documents of results are decoded out of the lock
+        self.lock = threading.RLock()
+
+        self.open_connection()
+
+    @log_function(logger, logging.DEBUG)
+    def get(self, schema: str, conditions: list, criteria: str, native_criteria: bool, fields: list = None,
+            sort: list = AccessDatabase.DEFAULT_SORT, limit: int = 0) -> list:
+        """
+        Get data from memory
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :param sort: list of tuples (field, direction) with direction asc or desc, or None to not sort
+        :type sort: list
+
+        :param limit: maximum number of elements, 0 to get all elements
+        :type limit: int
+
+        :return: list of dictionary with data
+        :rtype: list
+        """
+
+        try:
+            with self.lock:
+                memory_collect = self._get_collection(schema)
+                identifiers = self._find(memory_collect, conditions, criteria, native_criteria, sort)
+                if limit > 0:
+                    identifiers = identifiers[:limit]
+                encoded_documents = [memory_collect.documents[identifier][1] for identifier in identifiers]
+
+            return [self._decode_document(schema, encoded_document, fields) for encoded_document in encoded_documents]
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def iter_get(self, schema: str, conditions: list, criteria: str, native_criteria: bool, batch_size: int,
+                 limit: int, skip: int, fields: list = None, sort: list = AccessDatabase.DEFAULT_SORT):
+        """
+        Get data from memory one by one. Matching documents are searched at once, and they are decoded when they are
+        generated
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :param batch_size: not used, documents are already in memory
+        :type batch_size: int
+
+        :param limit: maximum number of elements, 0 to get all elements
+        :type limit: int
+
+        :param skip: number of elements skipped before the first one
+        :type skip: int
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :param sort: list of tuples (field, direction) with direction asc or desc, or None to not sort
+        :type sort: list
+
+        :return: generator of dictionary with data
+        :rtype: generator
+        """
+
+        try:
+            with self.lock:
+                memory_collect = self._get_collection(schema)
+                identifiers = self._find(memory_collect, conditions, criteria, native_criteria, sort)
+                identifiers = identifiers[skip:skip + limit] if limit > 0 else identifiers[skip:]
+                encoded_documents = [memory_collect.documents[identifier][1] for identifier in identifiers]
+
+            return (self._decode_document(schema, encoded_document, fields) for encoded_document in encoded_documents)
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def get_page(self, schema: str, conditions: list, criteria: str, native_criteria: bool, after: int,
+                 page_size: int, order: str, fields: list = None) -> list:
+        """
+        Get a page of data from memory, after _identifier of previous page
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :param after: last _identifier of previous page, None for the first page
+        :type after: int
+
+        :param page_size: maximum number of elements of the page
+        :type page_size: int
+
+        :param order: order of _identifier, asc or desc
+        :type order: str
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :return: list of dictionary with the page
+        :rtype: list
+        """
+
+        try:
+            # Seek condition is added if it is not the first page
+            seek_operator = '>' if order == AccessDatabase.ORDER_ASCENDING else '<'
+            if after is not None:
+                conditions = list(conditions) + [(AccessDatabase.ID_FIELD, seek_operator, after)]
+
+            with self.lock:
+                memory_collect = self._get_collection(schema)
+                identifiers = self._find(memory_collect, conditions, criteria, native_criteria, None)
+                identifiers.sort(reverse=order == AccessDatabase.ORDER_DESCENDING)
+                encoded_documents = [memory_collect.documents[identifier][1]
+                                     for identifier in identifiers[:page_size]]
+
+            return [self._decode_document(schema, encoded_document, fields) for encoded_document in encoded_documents]
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def count(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Count data in memory
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :return: list of dictionary with number of elements
+        :rtype: list
+        """
+
+        try:
+            with self.lock:
+                memory_collect = self._get_collection(schema)
+                count = len(self._find(memory_collect, conditions, criteria, native_criteria, None))
+
+            return [{AccessDatabase.COUNT_FIELD: count}]
+
+        except Exception as e:
+            # If there is SCHEMA_ERROR, this is not an error because schema does not exist. Only log warning
+            if str(e) == ErrorMessages.SCHEMA_ERROR:
+                logger.warning('Schema or subschema does not exist')
+                return [{AccessDatabase.COUNT_FIELD: 0}]
+            else:
+                raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def exists(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Check if any data in memory matches the conditions
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :return: list of dictionary with true if any element matches
+        :rtype: list
+        """
+
+        try:
+            with self.lock:
+                memory_collect = self._get_collection(schema)
+                exists = len(self._find(memory_collect, conditions, criteria, native_criteria, None, 1)) > 0
+
+            return [{AccessDatabase.EXISTS_FIELD: exists}]
+
+        except Exception as e:
+            # If there is SCHEMA_ERROR, this is not an error because schema does not exist. Only log warning
+            if str(e) == ErrorMessages.SCHEMA_ERROR:
+                logger.warning('Schema or subschema does not exist')
+                return [{AccessDatabase.EXISTS_FIELD: False}]
+            else:
+                raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def distinct(self, schema: str, field: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Get different values of a field in memory
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param field: field whose values are recovered
+        :type field: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :return: list of dictionary with the field for each different value
+        :rtype: list
+        """
+
+        try:
+            with self.lock:
+                memory_collect = self._get_collection(schema)
+                identifiers = self._find(memory_collect, conditions, criteria, native_criteria, None)
+
+                # Values are compared by their hashable form, because they can be lists or dictionaries
+                values = dict()
+                for identifier in identifiers:
+                    document = memory_collect.documents[identifier][0]
+                    if field in document:
+                        values.setdefault(AccessDatabaseMemory._get_hashable(document[field]), document[field])
+
+                encoded_values = bson.encode({field: list(values.values())})
+
+            return [{field: value} for value in bson.decode(encoded_values)[field]]
+
+        except Exception as e:
+            # If there is SCHEMA_ERROR, this is not an error because schema does not exist. Only log warning
+            if str(e) == ErrorMessages.SCHEMA_ERROR:
+                logger.warning('Schema or subschema does not exist')
+                return list()
+            else:
+                raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def put(self, schema: str, data: dict, write_concern: dict = None) -> list:
+        """
+        Insert data in memory
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param data: data to store in dictionary format
+        :type data: dict
+
+        :param write_concern: not used, writes in memory are always acknowledged
+        :type write_concern: dict
+
+        :return: list of dictionary with inserted _id
+        :rtype: list
+        """
+
+        try:
+            with self.lock:
+                memory_collect = self._get_collection(schema, create_collection=True)
+                self._insert_document(memory_collect, data)
+
+            return [{AccessDatabase.ID_FIELD: data[AccessDatabase.ID_FIELD]}]
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def put_many(self, schema: str, data_list: list, chunk_size: int, write_concern: dict = None,
+                 ordered: bool = None) -> list:
+        """
+        Insert a batch of data in memory. Result is returned in chunks, as other datastores do
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param data_list: list of data to store in dictionary format
+        :type data_list: list
+
+        :param chunk_size: number of documents of each chunk of the result
+        :type chunk_size: int
+
+        :param write_concern: not used, writes in memory are always acknowledged
+        :type write_concern: dict
+
+        :param ordered: stop at first error (True, by default) or insert the rest of documents (False)
+        :type ordered: bool
+
+        :return: list of dictionary with first inserted _id and number of inserted elements of each chunk
+        :rtype: list
+        """
+
+        try:
+            error = None
+            with self.lock:
+                memory_collect = self._get_collection(schema, create_collection=True)
+                for data in data_list:
+                    try:
+                        self._insert_document(memory_collect, data)
+                    except Exception as e:
+                        error = e
+                        if ordered is None or ordered:
+                            break
+
+            if error is not None:
+                raise error
+
+            return [{AccessDatabase.ID_FIELD: data_list[start][AccessDatabase.ID_FIELD],
+                     AccessDatabase.INSERTED_COUNT: len(data_list[start:start + chunk_size])}
+                    for start in range(0, len(data_list), chunk_size)]
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def update(self, schema: str, data: dict, conditions: list, criteria: str, native_criteria: bool,
+               write_concern: dict = None) -> list:
+        """
+        Update data in memory
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param data: data to store in dictionary format
+        :type data: dict
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :param write_concern: not used, writes in memory are always acknowledged
+        :type write_concern: dict
+
+        :return: list of dictionary with number of updated elements
+        :rtype: list
+        """
+
+        try:
+            with self.lock:
+                memory_collect = self._get_collection(schema)
+                modified_count = self._update_documents(memory_collect, data, conditions, criteria,
+                                                        native_criteria)[1]
+
+            return [{AccessDatabase.UPDATED_COUNT: modified_count}]
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def update_many(self, schema: str, updates: list, chunk_size: int, write_concern: dict = None,
+                    ordered: bool = None) -> list:
+        """
+        Update different data in memory
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param updates: list of tuples (conditions, data)
+        :type updates: list
+
+        :param chunk_size: not used, all updates are applied at once
+        :type chunk_size: int
+
+        :param write_concern: not used, writes in memory are always acknowledged
+        :type write_concern: dict
+
+        :param ordered: stop at first error (True) or apply the rest of updates (False, by default)
+        :type ordered: bool
+
+        :return: list of dictionary with number of matched and updated elements
+        :rtype: list
+        """
+
+        try:
+            matched_count = 0
+            modified_count = 0
+            error = None
+            with self.lock:
+                memory_collect = self._get_collection(schema)
+                for conditions, data in updates:
+                    try:
+                        counts = self._update_documents(memory_collect, data, conditions, '', False)
+                        matched_count += counts[0]
+                        modified_count += counts[1]
+                    except Exception as e:
+                        error = e
+                        if ordered:
+                            break
+
+            if error is not None:
+                raise error
+
+            return [{AccessDatabase.MATCHED_COUNT: matched_count, AccessDatabase.UPDATED_COUNT: modified_count}]
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def remove(self, schema: str, conditions: list, criteria: str, native_criteria: bool,
+               write_concern: dict = None) -> list:
+        """
+        Delete elements from memory
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :param write_concern: not used, writes in memory are always acknowledged
+        :type write_concern: dict
+
+        :return: list of dictionary with number of deleted elements
+        :rtype: list
+        """
+
+        try:
+            with self.lock:
+                memory_collect = self._get_collection(schema)
+                identifiers = self._find(memory_collect, conditions, criteria, native_criteria, None)
+                for identifier in identifiers:
+                    self._delete_document(memory_collect, identifier)
+
+            return [{AccessDatabase.DELETED_COUNT: len(identifiers)}]
+
+        except Exception as e:
+            # If there is SCHEMA_ERROR, this is not an error because schema does not exist. Only log warning
+            if str(e) == ErrorMessages.SCHEMA_ERROR:
+                logger.warning('Schema or subschema does not exist')
+                return [{AccessDatabase.DELETED_COUNT: 0}]
+            else:
+                raise DatabaseObjectException(ErrorMessages.REMOVE_ERROR)
+
+    def open_connection(self) -> None:
+        """
+        Datastore in memory is always connected. Data is kept between connections
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self.connection = self.collections
+
+    def close_connection(self) -> None:
+        pass
+
+    def check_connection(self) -> bool:
+        """
+        Datastore in memory is always connected
+
+        :return: always true
+        :rtype: bool
+        """
+
+        return True
+
+    def get_last_index(self, schema: str, sub_schema: str) -> int:
+        """
+        Recover last index of a collection, from its documents and from its collection index
+
+        :param schema: schema to search
+        :type schema: str
+
+        :param sub_schema: sub_schema to search
+        :type sub_schema: str
+
+        :return: last inserted index of schema_collection
+        :rtype: int
+        """
+
+        schema_collection = self.get_schema_collection(schema, sub_schema)
+        schema_collection_index = self.get_schema_collection_index(schema, sub_schema)
+
+        with self.lock:
+            memory_collect = self.collections.get(schema_collection)
+            identifier_collection = max(memory_collect.documents) if memory_collect is not None and \
+                len(memory_collect.documents) > 0 else 0
+
+            return max(identifier_collection, self.indexes.get(schema_collection_index, 0))
+
+    def update_index(self, schema_collection_index: str, value: int) -> None:
+        """
+        Update index of a collection. Index never goes backwards
+
+        :param schema_collection_index: collection index
+        :type schema_collection_index: str
+
+        :param value: value of index
+        :type value: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        with self.lock:
+            self.indexes[schema_collection_index] = max(self.indexes.get(schema_collection_index, 0), value)
+
+    def reserve_index(self, schema: str, sub_schema: str, block_size: int) -> int:
+        """
+        Reserve atomically a block of identifiers incrementing index of the collection
+
+        :param schema: schema to reserve
+        :type schema: str
+
+        :param sub_schema: sub_schema to reserve
+        :type sub_schema: str
+
+        :param block_size: number of identifiers to reserve
+        :type block_size: int
+
+        :return: last identifier of the reserved block
+        :rtype: int
+        """
+
+        schema_collection_index = self.get_schema_collection_index(schema, sub_schema)
+
+        with self.lock:
+            # The first time, index must be at least the last identifier stored
+            if schema_collection_index not in self.seeded_indexes:
+                self.update_index(schema_collection_index, self.get_last_index(schema, sub_schema))
+                self.seeded_indexes.add(schema_collection_index)
+
+            self.indexes[schema_collection_index] += block_size
+            return self.indexes[schema_collection_index]
+
+    def set_read_options(self, schema: str, raw_documents: bool) -> None:
+        """
+        Set how documents of a collection are read
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param raw_documents: read documents as RawBSONDocument, decoded when they are accessed
+        :type raw_documents: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        if raw_documents:
+            self.raw_collections.add(schema)
+        else:
+            self.raw_collections.discard(schema)
+
+    def set_compression_options(self, schema: str, fields: list, min_size: int) -> None:
+        """
+        Documents in memory are never compressed, so compression options are ignored
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param fields: not used
+        :type fields: list
+
+        :param min_size: not used
+        :type min_size: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        pass
+
+    def get_compression_stats(self) -> dict:
+        """
+        Documents in memory are never compressed
+
+        :return: empty dictionary
+        :rtype: dict
+        """
+
+        return dict()
+
+    def set_write_options(self, schema: str, write_concern: dict, ordered: bool) -> None:
+        """
+        Writes in memory are always acknowledged and batches use the default mode of each method, so write options
+        are ignored
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param write_concern: not used
+        :type write_concern: dict
+
+        :param ordered: not used
+        :type ordered: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        pass
+
+    def ensure_indexes(self, schema: str, indexes: list) -> None:
+        """
+        Declare secondary indexes of a collection. If the collection exists, its indexes are rebuilt now
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param indexes: list of DatabaseObjectIndex
+        :type indexes: list
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        try:
+            with self.lock:
+                self.declared_indexes[schema] = list(indexes)
+
+                memory_collect = self.collections.get(schema)
+                if memory_collect is not None:
+                    AccessDatabaseMemory._create_indexes(memory_collect, indexes)
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.INDEX_ERROR)
+
+    def _get_collection(self, schema: str, create_collection: bool = False) -> _MemoryCollection:
+        """
+        Get collection from memory. Lock must be acquired
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param create_collection: create collection or not
+        :type create_collection: bool
+
+        :return: collection
+        :rtype: _MemoryCollection
+        """
+
+        memory_collect = self.collections.get(schema)
+
+        if memory_collect is None:
+            if not create_collection:
+                raise DatabaseObjectException(ErrorMessages.SCHEMA_ERROR)
+
+            memory_collect = _MemoryCollection()
+            AccessDatabaseMemory._create_indexes(memory_collect, self.declared_indexes.get(schema, ()))
+            self.collections[schema] = memory_collect
+
+        return memory_collect
+
+    def _drop_collection(self, schema: str) -> None:
+        """
+        Drop collection from memory
+
+        :param schema: name of collection
+        :type schema: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        with self.lock:
+            self.collections.pop(schema, None)
+
+    def _decode_document(self, schema: str, encoded_document: bytes, fields: list) -> dict:
+        """
+        Get a copy of a stored document, only with requested fields
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param encoded_document: stored document encoded with bson
+        :type encoded_document: bytes
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :return: document
+        :rtype: dict
+        """
+
+        if schema in self.raw_collections and fields is None:
+            return RawBSONDocument(encoded_document)
+
+        document = bson.decode(encoded_document)
+        if fields is not None:
+            fields = set(fields) | {AccessDatabase.ID_FIELD, AccessDatabase.TIMESTAMP_FIELD}
+            document = {field: value for field, value in document.items() if field in fields}
+            if schema in self.raw_collections:
+                return RawBSONDocument(bson.encode(document))
+
+        return document
+
+    def _find(self, memory_collect: _MemoryCollection, conditions: list, criteria: str, native_criteria: bool,
+              sort: list, limit: int = 0) -> list:
+        """
+        Get _identifier of documents that match the conditions, in sort order. Lock must be acquired
+
+        :param memory_collect: collection
+        :type memory_collect: _MemoryCollection
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :param sort: list of tuples (field, direction), or None to not sort
+        :type sort: list
+
+        :param limit: stop when this number of documents match, 0 to get all documents. Only used without sort
+        :type limit: int
+
+        :return: list of _identifier
+        :rtype: list
+        """
+
+        predicates = AccessDatabaseMemory._create_predicates(conditions)
+        if native_criteria and criteria is not None and not isinstance(criteria, str):
+            predicates.append((None, criteria, None))
+        elif native_criteria and len(criteria) > 0:
+            raise DatabaseObjectException(ErrorMessages.CRITERIA_ERROR)
+
+        # Candidates are searched in indexes, and they are in order of _timestamp only if all of them are walked
+        candidates, timestamp_order = AccessDatabaseMemory._get_candidates(memory_collect, predicates)
+
+        identifiers = list()
+        for identifier in candidates:
+            entry = memory_collect.documents.get(identifier)
+            if entry is not None and AccessDatabaseMemory._match(entry[0], predicates):
+                identifiers.append(identifier)
+                if len(identifiers) == limit and sort is None:
+                    break
+
+        if sort is None or len(sort) == 0:
+            return identifiers
+
+        if list(sort) == list(AccessDatabase.DEFAULT_SORT) and timestamp_order:
+            return identifiers
+
+        # Sort by each field, from last to first, because sort is stable
+        for field, direction in reversed(sort):
+            if direction not in (AccessDatabase.ORDER_ASCENDING, AccessDatabase.ORDER_DESCENDING):
+                raise DatabaseObjectException(ErrorMessages.CRITERIA_ERROR)
+            identifiers.sort(key=lambda item: AccessDatabaseMemory._get_sort_key(
+                memory_collect.documents[item][0].get(field)), reverse=direction == AccessDatabase.ORDER_DESCENDING)
+
+        return identifiers
+
+    @staticmethod
+    def _create_predicates(conditions: list) -> list:
+        """
+        Create predicates from conditions. Conditions of _identifier that recover all elements are skipped
+
+        :param conditions: list of tuple of conditions
+        :type conditions: list
+
+        :return: list of tuples (field, comparison function, value)
+        :rtype: list
+        """
+
+        predicates = list()
+        for field, operator_condition, value in conditions:
+            if field == AccessDatabase.ID_FIELD and not isinstance(value, (list, tuple)) and \
+                    (value is None or value <= 0):
+                continue
+
+            predicates.append((field, AccessDatabaseMemory.MEMORY_OPERATORS[operator_condition], value))
+
+        return predicates
+
+    @staticmethod
+    def _match(document: dict, predicates: list) -> bool:
+        """
+        Check if a document matches all predicates
+
+        :param document: document
+        :type document: dict
+
+        :param predicates: list of tuples (field, comparison function, value). If field is None, function is native
+                           criteria
+        :type predicates: list
+
+        :return: true if document matches
+        :rtype: bool
+        """
+
+        for field, function, value in predicates:
+            if field is None:
+                if not function(document):
+                    return False
+            elif not function(document.get(field), value):
+                return False
+
+        return True
+
+    @staticmethod
+    def _get_candidates(memory_collect: _MemoryCollection, predicates: list) -> tuple:
+        """
+        Get _identifier of documents that can match the predicates, using the most selective index
+
+        :param memory_collect: collection
+        :type memory_collect: _MemoryCollection
+
+        :param predicates: list of tuples (field, comparison function, value)
+        :type predicates: list
+
+        :return: iterable of _identifier, and true if they are in order of _timestamp
+        :rtype: tuple
+        """
+
+        equals = AccessDatabaseMemory.MEMORY_OPERATORS['=']
+        operator_in = AccessDatabaseMemory.MEMORY_OPERATORS['in']
+
+        # Hash index of _identifier
+        for field, function, value in predicates:
+            if field == AccessDatabase.ID_FIELD and function is equals:
+                return [value], False
+            if field == AccessDatabase.ID_FIELD and function is operator_in:
+                # Each document is a candidate once, although its _identifier is repeated
+                return list(dict.fromkeys(value)), False
+
+        # Hash index of secondary indexes, if there are equality conditions for all their fields
+        equal_values = {field: value for field, function, value in predicates if function is equals}
+        for index, partial_predicates, keys in memory_collect.secondary_indexes.values():
+            if len(partial_predicates) == 0 and all(field in equal_values for field, _ in index.fields):
+                key = tuple(AccessDatabaseMemory._get_hashable(equal_values[field]) for field, _ in index.fields)
+                return list(keys.get(key, ())), False
+
+        # Sorted index of _timestamp, walking only the range of the conditions
+        start = 0
+        end = len(memory_collect.timestamps)
+        for field, function, value in predicates:
+            if field != AccessDatabase.TIMESTAMP_FIELD or not isinstance(value, int):
+                continue
+            if function is equals:
+                start = max(start, bisect_left(memory_collect.timestamps, value))
+                end = min(end, bisect_right(memory_collect.timestamps, value))
+            elif function is AccessDatabaseMemory.MEMORY_OPERATORS['>']:
+                start = max(start, bisect_right(memory_collect.timestamps, value))
+            elif function is AccessDatabaseMemory.MEMORY_OPERATORS['>=']:
+                start = max(start, bisect_left(memory_collect.timestamps, value))
+            elif function is AccessDatabaseMemory.MEMORY_OPERATORS['<']:
+                end = min(end, bisect_left(memory_collect.timestamps, value))
+            elif function is AccessDatabaseMemory.MEMORY_OPERATORS['<=']:
+                end = min(end, bisect_right(memory_collect.timestamps, value))
+
+        return memory_collect.timestamp_ids[start:end], True
+
+    def _insert_document(self, memory_collect: _MemoryCollection, data: dict) -> None:
+        """
+        Insert a document checking unique indexes. Lock must be acquired
+
+        :param memory_collect: collection
+        :type memory_collect: _MemoryCollection
+
+        :param data: data to store
+        :type data: dict
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        # Stored document is a copy with same types as other datastores (for example, tuples are stored as lists)
+        encoded_document = bson.encode(data)
+        document = bson.decode(encoded_document)
+
+        identifier = document[AccessDatabase.ID_FIELD]
+        timestamp = document[AccessDatabase.TIMESTAMP_FIELD]
+        if identifier in memory_collect.documents:
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+        # Timestamps are unique and usually inserted in order, so they are appended
+        position = len(memory_collect.timestamps)
+        if position > 0 and timestamp <= memory_collect.timestamps[-1]:
+            position = bisect_left(memory_collect.timestamps, timestamp)
+            if memory_collect.timestamps[position] == timestamp:
+                raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+        AccessDatabaseMemory._add_to_indexes(memory_collect, identifier, document)
+        memory_collect.documents[identifier] = (document, encoded_document)
+
+        if position == len(memory_collect.timestamps):
+            memory_collect.timestamps.append(timestamp)
+            memory_collect.timestamp_ids.append(identifier)
+        else:
+            memory_collect.timestamps.insert(position, timestamp)
+            memory_collect.timestamp_ids.insert(position, identifier)
+
+    def _delete_document(self, memory_collect: _MemoryCollection, identifier: int) -> dict:
+        """
+        Delete a document and remove it from indexes. Lock must be acquired
+
+        :param memory_collect: collection
+        :type memory_collect: _MemoryCollection
+
+        :param identifier: _identifier of the document
+        :type identifier: int
+
+        :return: deleted document
+        :rtype: dict
+        """
+
+        document = memory_collect.documents.pop(identifier)[0]
+        AccessDatabaseMemory._remove_from_indexes(memory_collect, identifier, document)
+
+        position = bisect_left(memory_collect.timestamps, document[AccessDatabase.TIMESTAMP_FIELD])
+        del memory_collect.timestamps[position]
+        del memory_collect.timestamp_ids[position]
+
+        return document
+
+    def _update_documents(self, memory_collect: _MemoryCollection, data: dict, conditions: list, criteria: str,
+                          native_criteria: bool) -> tuple:
+        """
+        Set fields of documents that match the conditions. Lock must be acquired
+
+        :param memory_collect: collection
+        :type memory_collect: _MemoryCollection
+
+        :param data: fields to set
+        :type data: dict
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :return: number of matched documents and number of modified documents
+        :rtype: tuple
+        """
+
+        identifiers = self._find(memory_collect, conditions, criteria, native_criteria, None)
+
+        modified_count = 0
+        for identifier in identifiers:
+            document = memory_collect.documents[identifier][0]
+            updated_document = dict(document)
+            updated_document.update(data)
+            updated_document = bson.decode(bson.encode(updated_document))
+            if updated_document == document:
+                continue
+
+            # Document is inserted again, and old document is restored if new one breaks a unique index
+            self._delete_document(memory_collect, identifier)
+            try:
+                self._insert_document(memory_collect, updated_document)
+            except Exception:
+                self._insert_document(memory_collect, document)
+                raise
+
+            modified_count += 1
+
+        return len(identifiers), modified_count
+
+    @staticmethod
+    def _create_indexes(memory_collect: _MemoryCollection, indexes: list) -> None:
+        """
+        Create secondary indexes of a collection with its documents
+
+        :param memory_collect: collection
+        :type memory_collect: _MemoryCollection
+
+        :param indexes: list of DatabaseObjectIndex
+        :type indexes: list
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        secondary_indexes = memory_collect.secondary_indexes
+        memory_collect.secondary_indexes = {
+            index.name: (index, AccessDatabaseMemory._create_predicates(index.partial or ()), dict())
+            for index in indexes
+        }
+
+        try:
+            for identifier, (document, _) in memory_collect.documents.items():
+                AccessDatabaseMemory._add_to_indexes(memory_collect, identifier, document)
+        except Exception:
+            memory_collect.secondary_indexes = secondary_indexes
+            raise
+
+    @staticmethod
+    def _add_to_indexes(memory_collect: _MemoryCollection, identifier: int, document: dict) -> None:
+        """
+        Add a document to secondary indexes, checking unique indexes before adding it to any of them
+
+        :param memory_collect: collection
+        :type memory_collect: _MemoryCollection
+
+        :param identifier: _identifier of the document
+        :type identifier: int
+
+        :param document: document
+        :type document: dict
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        index_keys = list()
+        for index, partial_predicates, keys in memory_collect.secondary_indexes.values():
+            if not AccessDatabaseMemory._match(document, partial_predicates):
+                continue
+
+            for key in AccessDatabaseMemory._get_index_keys(index, document):
+                if index.unique and len(keys.get(key, ())) > 0:
+                    raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+                index_keys.append((keys, key))
+
+        for keys, key in index_keys:
+            keys.setdefault(key, set()).add(identifier)
+
+    @staticmethod
+    def _remove_from_indexes(memory_collect: _MemoryCollection, identifier: int, document: dict) -> None:
+        """
+        Remove a document from secondary indexes
+
+        :param memory_collect: collection
+        :type memory_collect: _MemoryCollection
+
+        :param identifier: _identifier of the document
+        :type identifier: int
+
+        :param document: document
+        :type document: dict
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        for index, partial_predicates, keys in memory_collect.secondary_indexes.values():
+            for key in AccessDatabaseMemory._get_index_keys(index, document):
+                identifiers = keys.get(key)
+                if identifiers is not None:
+                    identifiers.discard(identifier)
+                    if len(identifiers) == 0:
+                        del keys[key]
+
+    @staticmethod
+    def _get_index_keys(index: DatabaseObjectIndex, document: dict) -> set:
+        """
+        Get keys of a document in a secondary index. A list is indexed as a whole and by each of its elements, so
+        equality conditions with any of them can use the index
+
+        :param index: secondary index
+        :type index: DatabaseObjectIndex
+
+        :param document: document
+        :type document: dict
+
+        :return: set of keys
+        :rtype: set
+        """
+
+        field_keys = list()
+        for field, _ in index.fields:
+            value = document.get(field)
+            keys = {AccessDatabaseMemory._get_hashable(value)}
+            if isinstance(value, list):
+                keys.update(AccessDatabaseMemory._get_hashable(item) for item in value)
+            field_keys.append(keys)
+
+        return set(itertools.product(*field_keys))
+
+    @staticmethod
+    def _get_hashable(value: object) -> object:
+        """
+        Convert a value to a hashable value, keeping its type
+
+        :param value: value of a document
+        :type value: object
+
+        :return: hashable value
+        :rtype: object
+        """
+
+        if isinstance(value, (list, tuple)):
+            return list.__name__, tuple(AccessDatabaseMemory._get_hashable(item) for item in value)
+        elif isinstance(value, dict):
+            return dict.__name__, tuple((key, AccessDatabaseMemory._get_hashable(item)) for key, item in value.items())
+
+        return value.__class__.__name__, value
+
+    @staticmethod
+    def _get_sort_key(value: object) -> tuple:
+        """
+        Get sort key of a value. Values of different types are sorted by type, as in MongoDB
+
+        :param value: value of a document
+        :type value: object
+
+        :return: sort key
+        :rtype: tuple
+        """
+
+        type_order = AccessDatabaseMemory.SORT_TYPE_ORDER.get(type(value), len(AccessDatabaseMemory.SORT_TYPE_ORDER))
+        if value is None or isinstance(value, (dict, list)):
+            return type_order, repr(value)
+
+        return type_order, value
@@ -1,7 +1,18 @@
 import logging
+import threading
+import time
+import zlib
+from collections.abc import Mapping
 
-from pymongo import MongoClient, collection, errors, ASCENDING
-from pymongo.errors import ServerSelectionTimeoutError
+import bson
+
+from bson.binary import Binary
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymongo import MongoClient, collection, cursor, errors, ASCENDING, DESCENDING, ReturnDocument, IndexModel, \
+    UpdateOne, UpdateMany
+from pymongo.errors import ServerSelectionTimeoutError, DuplicateKeyError, CollectionInvalid
+from pymongo.write_concern import WriteConcern
 
 from common.tools.decorators import log_function
 from database_object_module import MODULE_NAME
@@ -26,10 +37,35 @@ class AccessDatabaseMongoDB(AccessDatabase):
 
     # Mongo update operators
     MONGO_UPDATE_OPERATOR = '$set'
+    MONGO_MAX_OPERATOR = '$max'
+    MONGO_INC_OPERATOR = '$inc'
+
+    # Mongo operators and directions used to seek pages
+    MONGO_PAGE_OPERATORS = {
+        AccessDatabase.ORDER_ASCENDING: ('$gt', ASCENDING), AccessDatabase.ORDER_DESCENDING: ('$lt', DESCENDING)
+    }
+
+    # Mongo directions of sort
+    MONGO_SORT_DIRECTIONS = {AccessDatabase.ORDER_ASCENDING: ASCENDING, AccessDatabase.ORDER_DESCENDING: DESCENDING}
+
+    # Codec of collections read as raw documents. Documents are decoded when they are accessed, and embedded documents
+    # are kept encoded until they are accessed too
+    MONGO_RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+    # Field of the document that replaces a compressed field, and field of the value inside compressed data
+    COMPRESSED_FIELD = '_zlib'
+    COMPRESSED_VALUE = 'v'
 
     # Mongo ObjectId field
     OBJECT_ID_FIELD = '_id'
 
+    # Seconds that a collection that does not exist is not searched again in mongodb
+    MISSING_COLLECTION_TTL = 5.0
+
+    # Compiled conditions of each shape of conditions, shared by all connections, and maximum number of shapes
+    cache_compiled_criteria = dict()
+    MAX_COMPILED_CRITERIA = 1024
+
     def __init__(self, connection_url: str) -> None:
         """
         Constructor with url connection
@@ -44,23 +80,43 @@ class AccessDatabaseMongoDB(AccessDatabase):
         # Init the father class
         AccessDatabase.__init__(self, connection_url)
 
+        # Initialize caches. Catalog has names of all collections in mongodb, and missing collections have the time
+        # until they are not searched again in mongodb
+        self.db = None
+        self.cache_collections = dict()
+        self.cache_collection_names = set()
+        self.cache_missing_collections = dict()
+        self.cache_seeded_indexes = set()
+
+        # Secondary indexes declared for each collection
+        self.declared_indexes = dict()
+
+        # Default write concern and ordered mode of each collection
+        self.write_options = dict()
+
+        # Collections read as raw documents
+        self.raw_collections = set()
+
+        # Compressed fields and minimum size of compressed fields of each collection, and sizes of compressed fields
+        self.compression_options = dict()
+        self.compression_stats = dict()
+        self.compression_lock = threading.Lock()
+
+        # Lock to create collections, so two threads do not create the same collection
+        self.create_collection_lock = threading.Lock()
+
         try:
             # Connect with mongodb
             self.open_connection()
 
-            # Get database from URL connection
-            self.db = self.connection.get_database()
-
-            # Initialize caches
-            self.cache_collections = dict()
-
         except errors.ConfigurationError:
             raise DatabaseObjectException(ErrorMessages.CONFIGURATION_ERROR)
         except DatabaseObjectException as e:
             raise e
 
     @log_function(logger, logging.DEBUG)
-    def get(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+    def get(self, schema: str, conditions: list, criteria: str, native_criteria: bool, fields: list = None,
+            sort: list = AccessDatabase.DEFAULT_SORT, limit: int = 0) -> list:
         """
         Get data from mongodb
 
@@ -76,6 +132,15 @@ class AccessDatabaseMongoDB(AccessDatabase):
         :param native_criteria: boolean for search by native criteria from mongodb
         :type native_criteria: bool
 
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :param sort: list of tuples (field, direction) with direction asc or desc, or None to not sort
+        :type sort: list
+
+        :param limit: maximum number of elements, 0 to get all elements
+        :type limit: int
+
         :return: list of dictionary with data
         :rtype: list
         """
@@ -85,18 +150,23 @@ class AccessDatabaseMongoDB(AccessDatabase):
 
         try:
             # Get collection
-            mongo_collect = self._get_collection(schema)
+            mongo_collect = self._get_read_collection(schema)
 
             # Get criteria in mongodb language
             mongo_criteria = AccessDatabaseMongoDB._create_mongo_criteria(conditions, criteria, native_criteria)
 
-            # Find data with criteria
-            mongo_result = mongo_collect.find(mongo_criteria).sort(AccessDatabase.TIMESTAMP_FIELD)
+            # Find data with criteria, without _id and only with requested fields. Without sort, data are returned in
+            # natural order and the server does not sort them
+            mongo_projection = AccessDatabaseMongoDB._create_mongo_projection(fields)
+            mongo_result = mongo_collect.find(mongo_criteria, mongo_projection, limit=limit)
+            mongo_sort = AccessDatabaseMongoDB._create_mongo_sort(sort)
+            if mongo_sort is not None:
+                mongo_result = mongo_result.sort(mongo_sort)
 
-            # For each data: recover _id, set to data and add to output list
+            # For each data: add to output list, decompressing its compressed fields. Data may have been compressed
+            # with options that the collection does not have now
             for element in mongo_result:
-                del element[AccessDatabaseMongoDB.OBJECT_ID_FIELD]
-                output_list.append(element)
+                output_list.append(AccessDatabaseMongoDB._decompress_document(element))
 
             # Return the list with the updated elements
             return output_list
@@ -107,52 +177,73 @@ class AccessDatabaseMongoDB(AccessDatabase):
             raise DatabaseObjectException(ErrorMessages.GET_ERROR)
 
     @log_function(logger, logging.DEBUG)
-    def put(self, schema: str, data: dict) -> list:
+    def iter_get(self, schema: str, conditions: list, criteria: str, native_criteria: bool, batch_size: int,
+                 limit: int, skip: int, fields: list = None, sort: list = AccessDatabase.DEFAULT_SORT):
         """
-        Insert data to mongodb
+        Get data from mongodb one by one, reading them from the cursor in batches
 
         :param schema: schema (name of collection in mongodb)
         :type schema: str
 
-        :param data: data to store in dictionary format
-        :type data: dict
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
 
-        :return: list of dictionary with inserted _id
-        :rtype: list
-        """
+        :param criteria: criteria from mongodb
+        :type criteria: str
 
-        # Create the output list
-        output_list = list()
+        :param native_criteria: boolean for search by native criteria from mongodb
+        :type native_criteria: bool
+
+        :param batch_size: number of documents read from mongodb in each batch
+        :type batch_size: int
+
+        :param limit: maximum number of documents, 0 if there is no limit
+        :type limit: int
+
+        :param skip: number of documents skipped before the first one
+        :type skip: int
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :param sort: list of tuples (field, direction) with direction asc or desc, or None to not sort
+        :type sort: list
+
+        :return: generator of dictionary with data
+        :rtype: generator
+        """
 
         try:
-            # Get collection creating it if not exists
-            mongo_collect = self._get_collection(schema, create_collection=True)
+            # Get collection
+            mongo_collect = self._get_read_collection(schema)
 
-            # Insert data and recover _id
-            mongo_collect.insert_one(data)
+            # Get criteria in mongodb language
+            mongo_criteria = AccessDatabaseMongoDB._create_mongo_criteria(conditions, criteria, native_criteria)
 
-            output_list.append({AccessDatabase.ID_FIELD: data[AccessDatabase.ID_FIELD]})
+            # Create the cursor with criteria and projection. Documents are not read until the generator is iterated
+            mongo_projection = AccessDatabaseMongoDB._create_mongo_projection(fields)
+            mongo_result = mongo_collect.find(mongo_criteria, mongo_projection, batch_size=batch_size, limit=limit,
+                                              skip=skip)
+            mongo_sort = AccessDatabaseMongoDB._create_mongo_sort(sort)
+            if mongo_sort is not None:
+                mongo_result = mongo_result.sort(mongo_sort)
 
-            # Return the list with the updated elements
-            return output_list
+            return AccessDatabaseMongoDB._iter_cursor(mongo_result)
 
         except ServerSelectionTimeoutError:
             raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
         except Exception:
-            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+            raise DatabaseObjectException(ErrorMessages.GET_ERROR)
 
     @log_function(logger, logging.DEBUG)
-    def update(self, schema: str, data: dict, conditions: list, criteria: str,
-               native_criteria: bool) -> list:
+    def get_page(self, schema: str, conditions: list, criteria: str, native_criteria: bool, after: int,
+                 page_size: int, order: str, fields: list = None) -> list:
         """
-        Update data in mongodb
+        Get a page of data from mongodb using the unique index of _identifier to seek after previous page
 
         :param schema: schema (name of collection in mongodb)
         :type schema: str
 
-        :param data: data to store in dictionary format
-        :type data: dict
-
         :param conditions: conditions to search (list of tuple)
         :type conditions: list
 
@@ -162,42 +253,74 @@ class AccessDatabaseMongoDB(AccessDatabase):
         :param native_criteria: boolean for search by native criteria from mongodb
         :type native_criteria: bool
 
-        :return: list of dictionary with number of updated elements
+        :param after: last _identifier of the previous page, None for the first page
+        :type after: int
+
+        :param page_size: maximum number of documents of the page
+        :type page_size: int
+
+        :param order: order of _identifier, ascending or descending
+        :type order: str
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :return: list of dictionary with data
         :rtype: list
         """
 
-        # Create the output list
-        output_list = list()
-
         try:
-            # Get collection from mongodb
-            mongo_collect = self._get_collection(schema)
-
-            # Define data to update
-            mongo_data_update = {AccessDatabaseMongoDB.MONGO_UPDATE_OPERATOR: data}
+            # Get collection
+            mongo_collect = self._get_read_collection(schema)
 
-            # Get criteria in mongodb language
+            # Get criteria in mongodb language, adding the seek condition if it is not the first page
+            mongo_operator, mongo_direction = AccessDatabaseMongoDB.MONGO_PAGE_OPERATORS[order]
             mongo_criteria = AccessDatabaseMongoDB._create_mongo_criteria(conditions, criteria, native_criteria)
+            if after is not None:
+                mongo_criteria = {AccessDatabaseMongoDB.MONGO_JOIN_CONDITION: [
+                    mongo_criteria, {AccessDatabase.ID_FIELD: {mongo_operator: after}}
+                ]}
 
-            # Update elements and recover number of updated elements and number of matched elements
-            mongo_result = mongo_collect.update_many(mongo_criteria, mongo_data_update)
-            modified_count = mongo_result.modified_count
+            # Find data with criteria walking the index of _identifier, so cost does not depend on page depth
+            mongo_projection = AccessDatabaseMongoDB._create_mongo_projection(fields)
+            mongo_result = mongo_collect.find(mongo_criteria, mongo_projection).sort(
+                AccessDatabase.ID_FIELD, mongo_direction).limit(page_size)
 
-            # Add number of updated elements
-            output_list.append({AccessDatabase.UPDATED_COUNT: modified_count})
+            # Return the list with the page, decompressing compressed fields
+            return [AccessDatabaseMongoDB._decompress_document(element) for element in mongo_result]
 
-            # Return the list with the updated elements
-            return output_list
+        except ServerSelectionTimeoutError:
+            raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @staticmethod
+    def _iter_cursor(mongo_result: cursor.Cursor):
+        """
+        Generate documents of a cursor, decompressing their compressed fields
+
+        :param mongo_result: cursor of mongodb
+        :type mongo_result: cursor.Cursor
+
+        :return: generator of dictionary with data
+        :rtype: generator
+        """
+
+        try:
+            for element in mongo_result:
+                yield AccessDatabaseMongoDB._decompress_document(element)
 
         except ServerSelectionTimeoutError:
             raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
         except Exception:
-            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+            raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+        finally:
+            mongo_result.close()
 
     @log_function(logger, logging.DEBUG)
-    def remove(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+    def count(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
         """
-        Delete elements from mongodb
+        Count data in mongodb with count_documents, without transferring them
 
         :param schema: schema (name of collection in mongodb)
         :type schema: str
@@ -211,29 +334,19 @@ class AccessDatabaseMongoDB(AccessDatabase):
         :param native_criteria: boolean for search by native criteria from mongodb
         :type native_criteria: bool
 
-        :return: list of dictionary with number of deleted elements
+        :return: list of dictionary with number of elements
         :rtype: list
         """
 
-        # Create the output list
-        output_list = list()
-
         try:
-            # Get collection from mongodb
+            # Get collection
             mongo_collect = self._get_collection(schema)
 
-            # Get criteria in mongodb language
+            # Count data with criteria in the server
             mongo_criteria = AccessDatabaseMongoDB._create_mongo_criteria(conditions, criteria, native_criteria)
+            count = mongo_collect.count_documents(mongo_criteria)
 
-            # Delete elements with criteria and recover number of deleted elements
-            mongo_result = mongo_collect.delete_many(mongo_criteria)
-            deleted_count = mongo_result.deleted_count
-
-            # Add number of deleted elements
-            output_list.append({AccessDatabase.DELETED_COUNT: deleted_count})
-
-            # Return the list with removed elements.
-            return output_list
+            return [{AccessDatabase.COUNT_FIELD: count}]
 
         except ServerSelectionTimeoutError:
             raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
@@ -241,204 +354,1045 @@ class AccessDatabaseMongoDB(AccessDatabase):
             # If there is SCHEMA_ERROR, this is not an error because schema does not exist. Only log warning
             if str(e) == ErrorMessages.SCHEMA_ERROR:
                 logger.warning('Schema or subschema does not exist')
-                output_list.append({AccessDatabase.DELETED_COUNT: 0})
-                return output_list
+                return [{AccessDatabase.COUNT_FIELD: 0}]
             else:
-                raise DatabaseObjectException(ErrorMessages.REMOVE_ERROR)
+                raise DatabaseObjectException(ErrorMessages.GET_ERROR)
 
-    def _get_collection(self, schema: str, create_collection: bool = False, create_index: bool = True) \
-            -> collection.Collection:
+    @log_function(logger, logging.DEBUG)
+    def exists(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
         """
-        Get collection from database
+        Check if any data in mongodb matches the criteria, transferring only the _id of one of them
 
-        :param schema: collection of mongodb
+        :param schema: schema (name of collection in mongodb)
         :type schema: str
 
-        :param create_collection: create collection or not
-        :type create_collection: bool
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
 
-        :return: collection from mongodb
-        :rtype: collection
-        """
+        :param criteria: criteria from mongodb
+        :type criteria: str
 
-        # If collection exists, get it.
-        if schema in self.cache_collections.keys():
-            mongo_collect = self.cache_collections[schema]
+        :param native_criteria: boolean for search by native criteria from mongodb
+        :type native_criteria: bool
 
-        # If not, if collection is in mongodb, get and cache
-        elif schema in self.db.collection_names():
-            mongo_collect = self.db[schema]
-            self.cache_collections[schema] = mongo_collect
+        :return: list of dictionary with true if any element matches
+        :rtype: list
+        """
 
-        # If not, if the function can create it, create it
-        elif create_collection:
-            mongo_collect = self.db.create_collection(schema)
-            if create_index:
-                mongo_collect.create_index([(AccessDatabase.TIMESTAMP_FIELD, ASCENDING)],
-                                           name=AccessDatabase.TIMESTAMP_FIELD, unique=True)
-                mongo_collect.create_index([(AccessDatabase.ID_FIELD, ASCENDING)],
-                                           name=AccessDatabase.ID_FIELD, unique=True)
-            self.cache_collections[schema] = mongo_collect
+        try:
+            # Get collection
+            mongo_collect = self._get_collection(schema)
 
-        # In other case, throw the exception
-        else:
-            logger.warning('Mongodb schema {} can not be recovered'.format(schema))
-            raise DatabaseObjectException(ErrorMessages.SCHEMA_ERROR)
+            # Find only one element with criteria, and only its _id
+            mongo_criteria = AccessDatabaseMongoDB._create_mongo_criteria(conditions, criteria, native_criteria)
+            mongo_result = mongo_collect.find_one(mongo_criteria, {AccessDatabaseMongoDB.OBJECT_ID_FIELD: True})
 
-        # Return the mongo collection
-        return mongo_collect
+            return [{AccessDatabase.EXISTS_FIELD: mongo_result is not None}]
 
-    def open_connection(self) -> None:
-        """
-        Get the connection whith mongodb and check that it is successful.
+        except ServerSelectionTimeoutError:
+            raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+        except Exception as e:
+            # If there is SCHEMA_ERROR, this is not an error because schema does not exist. Only log warning
+            if str(e) == ErrorMessages.SCHEMA_ERROR:
+                logger.warning('Schema or subschema does not exist')
+                return [{AccessDatabase.EXISTS_FIELD: False}]
+            else:
+                raise DatabaseObjectException(ErrorMessages.GET_ERROR)
 
-        :return: object that represents the connection
-        :rtype: object
+    @log_function(logger, logging.DEBUG)
+    def distinct(self, schema: str, field: str, conditions: list, criteria: str, native_criteria: bool) -> list:
         """
+        Get different values of a field in mongodb with distinct, computed in the server
 
-        try:
-            self.connection = MongoClient(self.connection_url)
-            self.connection.is_mongos
+        :param schema: schema (name of collection in mongodb)
+        :type schema: str
 
-        except (errors.ConnectionFailure, errors.ServerSelectionTimeoutError):
-            raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+        :param field: field whose values are recovered
+        :type field: str
 
-    def close_connection(self) -> None:
-        self.connection.close()
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
 
-    def check_connection(self) -> bool:
-        """
-        Check that the connection with mongodb is alive, try to connect if not.
+        :param criteria: criteria from mongodb
+        :type criteria: str
 
-        :return: true if the connection is alive, false if not
-        :rtype: bool
+        :param native_criteria: boolean for search by native criteria from mongodb
+        :type native_criteria: bool
+
+        :return: list of dictionary with the field for each different value
+        :rtype: list
         """
 
         try:
-            # Check the connection by checking the databases
-            self.connection.list_database_names()
+            # Get collection
+            mongo_collect = self._get_collection(schema)
 
-            # Return true, the connection is alive
-            return True
+            # Get different values with criteria in the server
+            mongo_criteria = AccessDatabaseMongoDB._create_mongo_criteria(conditions, criteria, native_criteria)
+            values = mongo_collect.distinct(field, mongo_criteria)
 
-        except errors.ConnectionFailure:
-            # Return false, the connection is dead
-            logger.debug('Mongodb connection is dead', exc_info=True)
-            return False
+            return [{field: value} for value in values]
 
-    def get_last_index(self, schema: str, sub_schema: str) -> int:
+        except ServerSelectionTimeoutError:
+            raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+        except Exception as e:
+            # If there is SCHEMA_ERROR, this is not an error because schema does not exist. Only log warning
+            if str(e) == ErrorMessages.SCHEMA_ERROR:
+                logger.warning('Schema or subschema does not exist')
+                return list()
+            else:
+                raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def put(self, schema: str, data: dict, write_concern: dict = None) -> list:
         """
-        Recover last index from all collections
-        :param schema: schema to search
-        :param sub_schema: sub_schema to search
-        :return: last inserted index of schema_collection
+        Insert data to mongodb
+
+        :param schema: schema (name of collection in mongodb)
+        :type schema: str
+
+        :param data: data to store in dictionary format
+        :type data: dict
+
+        :param write_concern: write concern of this call, or None to use write concern of the collection
+        :type write_concern: dict
+
+        :return: list of dictionary with inserted _id
+        :rtype: list
         """
 
-        schema_collection = self.get_schema_collection(schema, sub_schema)
-        schema_collection_index = self.get_schema_collection_index(schema, sub_schema)
+        # Create the output list
+        output_list = list()
 
         try:
-            # Recover collections. Add collection to cache if not exists
-            collection_index = self._get_collection(schema_collection_index, create_collection=True, create_index=False)
-            collection_data = self._get_collection(schema_collection, create_collection=True)
+            # Get collection creating it if not exists
+            mongo_collect = self._get_write_collection(schema, write_concern, create_collection=True)
 
-            # Find last data inserted from data collection
-            sort_filter = '{' + AccessDatabaseMongoDB.OBJECT_ID_FIELD + ':-1}'
-            mongo_result = collection_data.find({}).sort(sort_filter).limit(1)
-            result = [element[AccessDatabase.ID_FIELD] for element in mongo_result]
-            identifier_collection = 0 if len(result) == 0 else result[0]
+            # Insert data and recover _id
+            mongo_collect.insert_one(self._compress_document(schema, data))
 
-            # Find last index inserted from index collection
-            mongo_result = collection_index.find({})
-            result = [element[AccessDatabase.ID_FIELD] for element in mongo_result]
-            identifier_collection_index = 0 if len(result) == 0 else result[0]
+            output_list.append({AccessDatabase.ID_FIELD: data[AccessDatabase.ID_FIELD]})
 
-            return max(identifier_collection, identifier_collection_index)
+            # Return the list with the updated elements
+            return output_list
 
         except ServerSelectionTimeoutError:
             raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
         except Exception:
-            raise DatabaseObjectException(ErrorMessages.GET_INDEX_ERROR)
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
 
-    def update_index(self, schema_collection_index: str, value: int) -> None:
+    @log_function(logger, logging.DEBUG)
+    def put_many(self, schema: str, data_list: list, chunk_size: int, write_concern: dict = None,
+                 ordered: bool = None) -> list:
+        """
+        Insert a batch of data to mongodb using insert_many in chunks
 
-        try:
-            # Get collection from mongodb
-            mongo_collect = self._get_collection(schema_collection_index, create_collection=True, create_index=False)
+        :param schema: schema (name of collection in mongodb)
+        :type schema: str
 
-            # Define data to update
-            mongo_data = {AccessDatabase.ID_FIELD: value}
-            mongo_data_update = {AccessDatabaseMongoDB.MONGO_UPDATE_OPERATOR: mongo_data}
+        :param data_list: list of data to store in dictionary format
+        :type data_list: list
 
-            # Update all elements of collection index
-            mongo_collect.update_many({}, mongo_data_update, upsert=True)
+        :param chunk_size: maximum number of documents sent in each insert_many
+        :type chunk_size: int
 
-        except ServerSelectionTimeoutError:
-            raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
-        except Exception:
-            raise DatabaseObjectException(ErrorMessages.UPDATE_INDEX_ERROR)
+        :param write_concern: write concern of this call, or None to use write concern of the collection
+        :type write_concern: dict
 
-    @staticmethod
-    def _create_mongo_criteria(conditions: list, criteria: str, native_criteria: bool) -> dict:
-        """
-        Create criteria native of mongodb
+        :param ordered: stop at first error or not, or None to use mode of the collection
+        :type ordered: bool
 
-        :param conditions: list of tuple of conditions
+        :return: list of dictionary with first inserted _id and number of inserted elements of each chunk
+        :rtype: list
+        """
+
+        # Create the output list
+        output_list = list()
+
+        try:
+            # Get collection creating it if not exists. Batches of inserts are ordered by default
+            mongo_collect = self._get_write_collection(schema, write_concern, create_collection=True)
+            ordered = self._get_ordered(schema, ordered, True)
+
+            # Insert data chunk by chunk. Only the first _id of each chunk is returned because they are contiguous
+            for start in range(0, len(data_list), chunk_size):
+                chunk = data_list[start:start + chunk_size]
+                mongo_collect.insert_many([self._compress_document(schema, data) for data in chunk], ordered=ordered)
+
+                output_list.append({AccessDatabase.ID_FIELD: chunk[0][AccessDatabase.ID_FIELD],
+                                    AccessDatabase.INSERTED_COUNT: len(chunk)})
+
+            # Return the list with the inserted chunks
+            return output_list
+
+        except ServerSelectionTimeoutError:
+            raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def update(self, schema: str, data: dict, conditions: list, criteria: str,
+               native_criteria: bool, write_concern: dict = None) -> list:
+        """
+        Update data in mongodb
+
+        :param schema: schema (name of collection in mongodb)
+        :type schema: str
+
+        :param data: data to store in dictionary format
+        :type data: dict
+
+        :param conditions: conditions to search (list of tuple)
         :type conditions: list
 
-        :param criteria: native criteria language from mongodb
+        :param criteria: criteria from mongodb
         :type criteria: str
 
-        :param native_criteria: bool for use native criteria or not
+        :param native_criteria: boolean for search by native criteria from mongodb
         :type native_criteria: bool
 
-        :return: filter
-        :rtype: dict
+        :param write_concern: write concern of this call, or None to use write concern of the collection
+        :type write_concern: dict
+
+        :return: list of dictionary with number of updated elements
+        :rtype: list
         """
 
-        # Create a filter with list of empty conditions
-        mongo_criteria = {AccessDatabaseMongoDB.MONGO_JOIN_CONDITION: list()}
+        # Create the output list
+        output_list = list()
 
         try:
-            # Iterate all conditions to create native mongodb filter
-            for condition in conditions:
+            # Get collection from mongodb
+            mongo_collect = self._get_write_collection(schema, write_concern)
+
+            # Define data to update
+            mongo_data_update = {AccessDatabaseMongoDB.MONGO_UPDATE_OPERATOR: self._compress_document(schema, data)}
+
+            # Get criteria in mongodb language
+            mongo_criteria = AccessDatabaseMongoDB._create_mongo_criteria(conditions, criteria, native_criteria)
+
+            # Update elements and recover number of updated elements. Unacknowledged writes have no counters
+            mongo_result = mongo_collect.update_many(mongo_criteria, mongo_data_update)
+            modified_count = mongo_result.modified_count if mongo_result.acknowledged else None
+
+            # Add number of updated elements
+            output_list.append({AccessDatabase.UPDATED_COUNT: modified_count})
+
+            # Return the list with the updated elements
+            return output_list
+
+        except ServerSelectionTimeoutError:
+            raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def update_many(self, schema: str, updates: list, chunk_size: int, write_concern: dict = None,
+                    ordered: bool = None) -> list:
+        """
+        Update different data in mongodb using unordered bulk_write in chunks
+
+        :param schema: schema (name of collection in mongodb)
+        :type schema: str
+
+        :param updates: list of tuples (conditions, data)
+        :type updates: list
+
+        :param chunk_size: maximum number of operations sent in each bulk_write
+        :type chunk_size: int
 
-                # Special case if the variable is the ID
-                if condition[0] == AccessDatabase.ID_FIELD:
+        :param write_concern: write concern of this call, or None to use write concern of the collection
+        :type write_concern: dict
 
-                    # If the value to compare is a list, one list of ObjectId must be generated
-                    if isinstance(condition[2], (list, tuple)):
-                        filter_condition = {
-                            condition[0]: {AccessDatabaseMongoDB.MONGO_OPERATORS[condition[1]]: conditions[2]}
-                        }
+        :param ordered: stop at first error or not, or None to use mode of the collection
+        :type ordered: bool
 
-                    # If the value is zero, negative or None, all elements must be recovered
-                    elif condition[2] is None or condition[2] <= 0:
-                        filter_condition = {}
+        :return: list of dictionary with number of matched and updated elements
+        :rtype: list
+        """
 
-                    # Else the ObjectId  must be generated
-                    else:
-                        filter_condition = {
-                            condition[0]: {AccessDatabaseMongoDB.MONGO_OPERATORS[condition[1]]: condition[2]}
-                        }
+        matched_count = 0
+        modified_count = 0
 
-                # The rest of the variables do not have special cases
+        try:
+            # Get collection from mongodb. Batches of updates are unordered by default
+            mongo_collect = self._get_write_collection(schema, write_concern)
+            ordered = self._get_ordered(schema, ordered, False)
+
+            # Create one operation for each update. Conditions with only an identifier match one element at most
+            mongo_operations = list()
+            for conditions, data in updates:
+                mongo_criteria = AccessDatabaseMongoDB._create_mongo_criteria(conditions, '', False)
+                mongo_data_update = {AccessDatabaseMongoDB.MONGO_UPDATE_OPERATOR: self._compress_document(schema, data)}
+                if len(conditions) == 1 and conditions[0][0] == AccessDatabase.ID_FIELD and conditions[0][1] == '=':
+                    mongo_operations.append(UpdateOne(mongo_criteria, mongo_data_update))
                 else:
-                    value_compare = condition[2]
-                    filter_condition = {
-                        condition[0]: {AccessDatabaseMongoDB.MONGO_OPERATORS[condition[1]]: value_compare}
-                    }
+                    mongo_operations.append(UpdateMany(mongo_criteria, mongo_data_update))
+
+            # Send operations chunk by chunk, adding counters of all chunks
+            acknowledged = True
+            for start in range(0, len(mongo_operations), chunk_size):
+                mongo_result = mongo_collect.bulk_write(mongo_operations[start:start + chunk_size], ordered=ordered)
+                acknowledged = mongo_result.acknowledged
+                if acknowledged:
+                    matched_count += mongo_result.matched_count
+                    modified_count += mongo_result.modified_count
+
+            # Unacknowledged writes have no counters
+            if not acknowledged:
+                matched_count = modified_count = None
+
+            # Return the list with the updated elements
+            return [{AccessDatabase.MATCHED_COUNT: matched_count, AccessDatabase.UPDATED_COUNT: modified_count}]
+
+        except ServerSelectionTimeoutError:
+            raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def remove(self, schema: str, conditions: list, criteria: str, native_criteria: bool,
+               write_concern: dict = None) -> list:
+        """
+        Delete elements from mongodb
+
+        :param schema: schema (name of collection in mongodb)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: criteria from mongodb
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria from mongodb
+        :type native_criteria: bool
+
+        :param write_concern: write concern of this call, or None to use write concern of the collection
+        :type write_concern: dict
+
+        :return: list of dictionary with number of deleted elements
+        :rtype: list
+        """
+
+        # Create the output list
+        output_list = list()
+
+        try:
+            # Get collection from mongodb
+            mongo_collect = self._get_write_collection(schema, write_concern)
+
+            # Get criteria in mongodb language
+            mongo_criteria = AccessDatabaseMongoDB._create_mongo_criteria(conditions, criteria, native_criteria)
+
+            # Delete elements with criteria and recover number of deleted elements. Unacknowledged writes have no
+            # counters
+            mongo_result = mongo_collect.delete_many(mongo_criteria)
+            deleted_count = mongo_result.deleted_count if mongo_result.acknowledged else None
+
+            # Add number of deleted elements
+            output_list.append({AccessDatabase.DELETED_COUNT: deleted_count})
+
+            # Return the list with removed elements.
+            return output_list
+
+        except ServerSelectionTimeoutError:
+            raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+        except Exception as e:
+            # If there is SCHEMA_ERROR, this is not an error because schema does not exist. Only log warning
+            if str(e) == ErrorMessages.SCHEMA_ERROR:
+                logger.warning('Schema or subschema does not exist')
+                output_list.append({AccessDatabase.DELETED_COUNT: 0})
+                return output_list
+            else:
+                raise DatabaseObjectException(ErrorMessages.REMOVE_ERROR)
+
+    def set_write_options(self, schema: str, write_concern: dict, ordered: bool) -> None:
+        """
+        Set default write concern and ordered mode of a collection
+
+        :param schema: schema (name of collection in mongodb)
+        :type schema: str
+
+        :param write_concern: write concern (w, j, wtimeout), or None to use write concern of the client
+        :type write_concern: dict
+
+        :param ordered: batches stop at first error or not, or None to use default of each method
+        :type ordered: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        try:
+            write_concern = WriteConcern(**write_concern) if write_concern is not None else None
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.CONFIGURATION_ERROR)
+
+        self.write_options[schema] = (write_concern, ordered)
+
+    def set_read_options(self, schema: str, raw_documents: bool) -> None:
+        """
+        Set how documents of a collection are read
+
+        :param schema: schema (name of collection in mongodb)
+        :type schema: str
+
+        :param raw_documents: read documents as RawBSONDocument, decoded when they are accessed
+        :type raw_documents: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        if raw_documents:
+            self.raw_collections.add(schema)
+        else:
+            self.raw_collections.discard(schema)
+
+    def set_compression_options(self, schema: str, fields: list, min_size: int) -> None:
+        """
+        Set fields of a collection that are compressed with zlib. Compressed fields can not be used in conditions
+
+        :param schema: schema (name of collection in mongodb)
+        :type schema: str
+
+        :param fields: fields that are always compressed
+        :type fields: list
+
+        :param min_size: fields whose encoded size is at least this size are compressed too, 0 to compress only
+                         selected fields
+        :type min_size: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        if len(fields) == 0 and min_size <= 0:
+            self.compression_options.pop(schema, None)
+        else:
+            self.compression_options[schema] = (frozenset(fields), min_size)
+
+    def get_compression_stats(self) -> dict:
+        """
+        Get sizes of compressed fields of each collection
+
+        :return: number of compressed fields, and size before and after compression, of each collection
+        :rtype: dict
+        """
+
+        with self.compression_lock:
+            return {schema: dict(stats, saved_bytes=stats['raw_bytes'] - stats['compressed_bytes'])
+                    for schema, stats in self.compression_stats.items()}
+
+    def _compress_document(self, schema: str, data: dict) -> dict:
+        """
+        Compress fields of a document, according to compression options of its collection. Data is not modified
+
+        :param schema: collection of mongodb
+        :type schema: str
+
+        :param data: document
+        :type data: dict
+
+        :return: document with compressed fields
+        :rtype: dict
+        """
+
+        options = self.compression_options.get(schema)
+        if options is None:
+            return data
+
+        fields, min_size = options
+        compressed_data = None
+        for field, value in data.items():
+
+            # Private fields are used in conditions, and only big values are checked
+            if field in (AccessDatabase.ID_FIELD, AccessDatabase.TIMESTAMP_FIELD) or value is None:
+                continue
+            if field not in fields and (min_size <= 0 or not isinstance(value, (str, bytes, dict, list, tuple))):
+                continue
+
+            # Value is encoded with bson, so its type is recovered when it is decompressed
+            encoded_value = bson.encode({AccessDatabaseMongoDB.COMPRESSED_VALUE: value})
+            if field not in fields and len(encoded_value) < min_size:
+                continue
+
+            # Value is stored as is if compression does not reduce it
+            compressed_value = zlib.compress(encoded_value)
+            if len(compressed_value) >= len(encoded_value):
+                continue
+
+            if compressed_data is None:
+                compressed_data = dict(data)
+            compressed_data[field] = {AccessDatabaseMongoDB.COMPRESSED_FIELD: Binary(compressed_value)}
 
-                # Add condition translated to mongodb filter language
-                mongo_criteria[AccessDatabaseMongoDB.MONGO_JOIN_CONDITION].append(filter_condition)
+            with self.compression_lock:
+                stats = self.compression_stats.setdefault(schema, {'fields': 0, 'raw_bytes': 0, 'compressed_bytes': 0})
+                stats['fields'] += 1
+                stats['raw_bytes'] += len(encoded_value)
+                stats['compressed_bytes'] += len(compressed_value)
+
+        return data if compressed_data is None else compressed_data
+
+    @staticmethod
+    def _decompress_document(document: dict) -> dict:
+        """
+        Decompress compressed fields of a document
+
+        :param document: document read from mongodb
+        :type document: dict
+
+        :return: document with original fields
+        :rtype: dict
+        """
+
+        decompressed_document = None
+        for field, value in document.items():
+            if isinstance(value, Mapping) and len(value) == 1 and AccessDatabaseMongoDB.COMPRESSED_FIELD in value:
+                if decompressed_document is None:
+                    decompressed_document = dict(document)
+                decompressed_document[field] = bson.decode(zlib.decompress(
+                    value[AccessDatabaseMongoDB.COMPRESSED_FIELD]))[AccessDatabaseMongoDB.COMPRESSED_VALUE]
+
+        return document if decompressed_document is None else decompressed_document
+
+    def _get_read_collection(self, schema: str) -> collection.Collection:
+        """
+        Get collection from database with the codec of its reads
+
+        :param schema: collection of mongodb
+        :type schema: str
+
+        :return: collection from mongodb
+        :rtype: collection
+        """
+
+        mongo_collect = self._get_collection(schema)
+
+        if schema in self.raw_collections:
+            mongo_collect = mongo_collect.with_options(codec_options=AccessDatabaseMongoDB.MONGO_RAW_CODEC_OPTIONS)
+
+        return mongo_collect
+
+    def _get_write_collection(self, schema: str, write_concern: dict, create_collection: bool = False) \
+            -> collection.Collection:
+        """
+        Get collection from database with the write concern of a write
+
+        :param schema: collection of mongodb
+        :type schema: str
+
+        :param write_concern: write concern of the write, or None to use write concern of the collection
+        :type write_concern: dict
+
+        :param create_collection: create collection or not
+        :type create_collection: bool
+
+        :return: collection from mongodb
+        :rtype: collection
+        """
+
+        mongo_collect = self._get_collection(schema, create_collection=create_collection)
+
+        mongo_write_concern = WriteConcern(**write_concern) if write_concern is not None else \
+            self.write_options.get(schema, (None, None))[0]
+        if mongo_write_concern is not None:
+            mongo_collect = mongo_collect.with_options(write_concern=mongo_write_concern)
+
+        return mongo_collect
+
+    def _get_ordered(self, schema: str, ordered: bool, default: bool) -> bool:
+        """
+        Get ordered mode of a batch write
+
+        :param schema: collection of mongodb
+        :type schema: str
+
+        :param ordered: ordered mode of the write, or None to use mode of the collection
+        :type ordered: bool
+
+        :param default: mode used if neither the write nor the collection have mode
+        :type default: bool
+
+        :return: batch stops at first error or not
+        :rtype: bool
+        """
+
+        if ordered is None:
+            ordered = self.write_options.get(schema, (None, None))[1]
+
+        return default if ordered is None else ordered
+
+    def _get_collection(self, schema: str, create_collection: bool = False, create_index: bool = True) \
+            -> collection.Collection:
+        """
+        Get collection from database
+
+        :param schema: collection of mongodb
+        :type schema: str
+
+        :param create_collection: create collection or not
+        :type create_collection: bool
+
+        :return: collection from mongodb
+        :rtype: collection
+        """
+
+        # If collection exists, get it.
+        if schema in self.cache_collections.keys():
+            mongo_collect = self.cache_collections[schema]
+
+        # If not, if collection is in catalog or in mongodb (created by another process), get and cache
+        elif schema in self.cache_collection_names or self._find_collection_name(schema):
+            mongo_collect = self.db[schema]
+            self.cache_collections[schema] = mongo_collect
+
+        # If not, if the function can create it, create it. Check again with the lock, another thread could create it
+        elif create_collection:
+            with self.create_collection_lock:
+                if schema in self.cache_collections.keys():
+                    return self.cache_collections[schema]
+
+                # If another process has created it, it is used as is. All indexes are created in only one request
+                try:
+                    mongo_collect = self.db.create_collection(schema)
+                    if create_index:
+                        mongo_indexes = [
+                            IndexModel([(AccessDatabase.TIMESTAMP_FIELD, ASCENDING)],
+                                       name=AccessDatabase.TIMESTAMP_FIELD, unique=True),
+                            IndexModel([(AccessDatabase.ID_FIELD, ASCENDING)],
+                                       name=AccessDatabase.ID_FIELD, unique=True)
+                        ]
+                        mongo_indexes.extend(AccessDatabaseMongoDB._create_mongo_index(index)
+                                             for index in self.declared_indexes.get(schema, ()))
+                        mongo_collect.create_indexes(mongo_indexes)
+                except CollectionInvalid:
+                    mongo_collect = self.db[schema]
+
+                self.cache_collections[schema] = mongo_collect
+                self.cache_collection_names.add(schema)
+                self.cache_missing_collections.pop(schema, None)
+
+        # In other case, throw the exception
+        else:
+            logger.warning('Mongodb schema {} can not be recovered'.format(schema))
+            raise DatabaseObjectException(ErrorMessages.SCHEMA_ERROR)
+
+        # Return the mongo collection
+        return mongo_collect
+
+    def _find_collection_name(self, schema: str) -> bool:
+        """
+        Search a collection that is not in catalog in mongodb. If it does not exist, it is not searched again until
+        MISSING_COLLECTION_TTL seconds later
+
+        :param schema: collection of mongodb
+        :type schema: str
+
+        :return: true if the collection exists
+        :rtype: bool
+        """
+
+        missing_until = self.cache_missing_collections.get(schema)
+        if missing_until is not None and missing_until > time.monotonic():
+            return False
+
+        if schema in self.db.list_collection_names(filter={'name': schema}):
+            self.cache_collection_names.add(schema)
+            self.cache_missing_collections.pop(schema, None)
+            return True
+
+        self.cache_missing_collections[schema] = time.monotonic() + AccessDatabaseMongoDB.MISSING_COLLECTION_TTL
+        return False
+
+    def _drop_collection(self, schema: str) -> None:
+        """
+        Drop collection from database and from caches
+
+        :param schema: collection of mongodb
+        :type schema: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self.db.drop_collection(schema)
+        self.cache_collections.pop(schema, None)
+        self.cache_collection_names.discard(schema)
+        self.cache_missing_collections[schema] = time.monotonic() + AccessDatabaseMongoDB.MISSING_COLLECTION_TTL
+
+    def open_connection(self) -> None:
+        """
+        Get the connection whith mongodb and check that it is successful. Catalog of collections is loaded with only
+        one request, and collections cached from a previous connection are discarded
+
+        :return: object that represents the connection
+        :rtype: object
+        """
+
+        try:
+            self.connection = MongoClient(self.connection_url)
+            self.connection.is_mongos
+
+            # Get database from URL connection
+            self.db = self.connection.get_database()
+
+            self.cache_collections = dict()
+            self.cache_collection_names = set(self.db.list_collection_names())
+            self.cache_missing_collections = dict()
+
+        except (errors.ConnectionFailure, errors.ServerSelectionTimeoutError):
+            raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+
+    def close_connection(self) -> None:
+        self.connection.close()
+
+    def check_connection(self) -> bool:
+        """
+        Check that the connection with mongodb is alive, try to connect if not.
+
+        :return: true if the connection is alive, false if not
+        :rtype: bool
+        """
+
+        try:
+            # Check the connection by checking the databases
+            self.connection.list_database_names()
+
+            # Return true, the connection is alive
+            return True
+
+        except errors.ConnectionFailure:
+            # Return false, the connection is dead
+            logger.debug('Mongodb connection is dead', exc_info=True)
+            return False
+
+    def get_last_index(self, schema: str, sub_schema: str) -> int:
+        """
+        Recover last index from all collections
+        :param schema: schema to search
+        :param sub_schema: sub_schema to search
+        :return: last inserted index of schema_collection
+        """
+
+        schema_collection = self.get_schema_collection(schema, sub_schema)
+        schema_collection_index = self.get_schema_collection_index(schema, sub_schema)
+
+        try:
+            # Recover collections. Add collection to cache if not exists
+            collection_index = self._get_collection(schema_collection_index, create_collection=True, create_index=False)
+            collection_data = self._get_collection(schema_collection, create_collection=True)
+
+            # Find last data inserted from data collection
+            mongo_result = collection_data.find({}).sort(AccessDatabase.ID_FIELD, DESCENDING).limit(1)
+            result = [element[AccessDatabase.ID_FIELD] for element in mongo_result]
+            identifier_collection = 0 if len(result) == 0 else result[0]
+
+            # Find last index inserted from index collection
+            mongo_result = collection_index.find({})
+            result = [element[AccessDatabase.ID_FIELD] for element in mongo_result]
+            identifier_collection_index = 0 if len(result) == 0 else max(result)
+
+            return max(identifier_collection, identifier_collection_index)
+
+        except ServerSelectionTimeoutError:
+            raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.GET_INDEX_ERROR)
+
+    def update_index(self, schema_collection_index: str, value: int) -> None:
+
+        try:
+            # Get collection from mongodb
+            mongo_collect = self._get_collection(schema_collection_index, create_collection=True, create_index=False)
+
+            # Define data to update. Index never goes backwards, even if another process has reserved more
+            mongo_data = {AccessDatabase.ID_FIELD: value}
+            mongo_data_update = {AccessDatabaseMongoDB.MONGO_MAX_OPERATOR: mongo_data}
+
+            # Update the counter document of collection index
+            AccessDatabaseMongoDB._upsert_index(mongo_collect, schema_collection_index, mongo_data_update)
+
+        except ServerSelectionTimeoutError:
+            raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.UPDATE_INDEX_ERROR)
+
+    def ensure_indexes(self, schema: str, indexes: list) -> None:
+        """
+        Declare secondary indexes of a collection. If the collection exists, indexes are reconciled now: missing
+        indexes are created and indexes with same name but different definition are rebuilt
+
+        :param schema: schema (name of collection in mongodb)
+        :type schema: str
+
+        :param indexes: list of DatabaseObjectIndex
+        :type indexes: list
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        try:
+            mongo_indexes = [AccessDatabaseMongoDB._create_mongo_index(index) for index in indexes]
+            self.declared_indexes[schema] = list(indexes)
+
+            # If collection does not exist, indexes will be created with it
+            try:
+                mongo_collect = self._get_collection(schema)
+            except DatabaseObjectException:
+                return
+
+            # Compare with existing indexes by name
+            existing_indexes = mongo_collect.index_information()
+            new_indexes = list()
+            for mongo_index in mongo_indexes:
+                document = mongo_index.document
+                existing_index = existing_indexes.get(document['name'])
+                if existing_index is not None and AccessDatabaseMongoDB._is_same_index(document, existing_index):
+                    continue
+
+                if existing_index is not None:
+                    logger.warning('Rebuilding index {} of {}'.format(document['name'], schema))
+                    mongo_collect.drop_index(document['name'])
+                new_indexes.append(mongo_index)
+
+            if len(new_indexes) > 0:
+                mongo_collect.create_indexes(new_indexes)
+
+        except ServerSelectionTimeoutError:
+            raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.INDEX_ERROR)
+
+    @staticmethod
+    def _create_mongo_index(index) -> IndexModel:
+        """
+        Create index native of mongodb
+
+        :param index: definition of the index
+        :type index: DatabaseObjectIndex
+
+        :return: index of mongodb
+        :rtype: IndexModel
+        """
+
+        options = {'name': index.name}
+        if index.unique:
+            options['unique'] = True
+        if index.partial is not None:
+            options['partialFilterExpression'] = AccessDatabaseMongoDB._create_mongo_criteria(index.partial, '', False)
+
+        return IndexModel(index.fields, **options)
+
+    @staticmethod
+    def _is_same_index(document: dict, existing_index: dict) -> bool:
+        """
+        Check if an existing index has the definition of an index document
+
+        :param document: document of the index to create
+        :type document: dict
+
+        :param existing_index: information of the existing index
+        :type existing_index: dict
+
+        :return: true if both indexes are the same
+        :rtype: bool
+        """
+
+        return list(document['key'].items()) == [tuple(field) for field in existing_index['key']] and \
+            document.get('unique', False) == existing_index.get('unique', False) and \
+            document.get('partialFilterExpression') == existing_index.get('partialFilterExpression')
+
+    def reserve_index(self, schema: str, sub_schema: str, block_size: int) -> int:
+        """
+        Reserve atomically a block of identifiers incrementing the counter of collection index
+
+        :param schema: schema to reserve
+        :type schema: str
+
+        :param sub_schema: sub_schema to reserve
+        :type sub_schema: str
+
+        :param block_size: number of identifiers to reserve
+        :type block_size: int
+
+        :return: last identifier of the reserved block
+        :rtype: int
+        """
+
+        schema_collection_index = self.get_schema_collection_index(schema, sub_schema)
+
+        try:
+            # Get collection from mongodb
+            mongo_collect = self._get_collection(schema_collection_index, create_collection=True, create_index=False)
+
+            # The first time, counter must be at least the last identifier stored (data stored without counter)
+            if schema_collection_index not in self.cache_seeded_indexes:
+                self.update_index(schema_collection_index, self.get_last_index(schema, sub_schema))
+                self.cache_seeded_indexes.add(schema_collection_index)
+
+            # Increment counter and recover its new value in one atomic operation
+            mongo_data_update = {AccessDatabaseMongoDB.MONGO_INC_OPERATOR: {AccessDatabase.ID_FIELD: block_size}}
+            mongo_result = AccessDatabaseMongoDB._upsert_index(mongo_collect, schema_collection_index,
+                                                               mongo_data_update)
+
+            return mongo_result[AccessDatabase.ID_FIELD]
+
+        except ServerSelectionTimeoutError:
+            raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+        except DatabaseObjectException as e:
+            raise e
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.UPDATE_INDEX_ERROR)
+
+    @staticmethod
+    def _upsert_index(mongo_collect: collection.Collection, schema_collection_index: str,
+                      mongo_data_update: dict) -> dict:
+        """
+        Update counter document of collection index, creating it if not exists
+
+        :param mongo_collect: collection index
+        :type mongo_collect: collection.Collection
+
+        :param schema_collection_index: name of collection index, used as _id of counter document
+        :type schema_collection_index: str
+
+        :param mongo_data_update: update to apply
+        :type mongo_data_update: dict
+
+        :return: counter document after update
+        :rtype: dict
+        """
+
+        mongo_filter = {AccessDatabaseMongoDB.OBJECT_ID_FIELD: schema_collection_index}
+
+        # If two processes create the counter document at same time, one of them fails. Then it already exists
+        try:
+            return mongo_collect.find_one_and_update(mongo_filter, mongo_data_update, upsert=True,
+                                                     return_document=ReturnDocument.AFTER)
+        except DuplicateKeyError:
+            return mongo_collect.find_one_and_update(mongo_filter, mongo_data_update,
+                                                     return_document=ReturnDocument.AFTER)
+
+    @staticmethod
+    def _create_mongo_projection(fields: list) -> dict:
+        """
+        Create projection native of mongodb. _id is never returned, and _identifier and _timestamp are always returned
+
+        :param fields: fields to get. None to get all fields
+        :type fields: list
+
+        :return: projection
+        :rtype: dict
+        """
+
+        if fields is None:
+            return {AccessDatabaseMongoDB.OBJECT_ID_FIELD: False}
+
+        mongo_projection = {field: True for field in fields}
+        mongo_projection[AccessDatabase.ID_FIELD] = True
+        mongo_projection[AccessDatabase.TIMESTAMP_FIELD] = True
+        mongo_projection[AccessDatabaseMongoDB.OBJECT_ID_FIELD] = False
+
+        return mongo_projection
+
+    @staticmethod
+    def _create_mongo_sort(sort: list) -> list:
+        """
+        Create sort native of mongodb
+
+        :param sort: list of tuples (field, direction), or None to not sort
+        :type sort: list
+
+        :return: list of tuples (field, direction of mongodb), or None to not sort
+        :rtype: list
+        """
+
+        if sort is None or len(sort) == 0:
+            return None
+
+        return [(field, AccessDatabaseMongoDB.MONGO_SORT_DIRECTIONS[direction]) for field, direction in sort]
+
+    @staticmethod
+    def _create_mongo_criteria(conditions: list, criteria: str, native_criteria: bool) -> dict:
+        """
+        Create criteria native of mongodb. Conditions are compiled once for each shape (fields and operators) and
+        only values are bound in each call
+
+        :param conditions: list of tuple of conditions
+        :type conditions: list
+
+        :param criteria: native criteria language from mongodb
+        :type criteria: str
+
+        :param native_criteria: bool for use native criteria or not
+        :type native_criteria: bool
+
+        :return: filter
+        :rtype: dict
+        """
+
+        try:
+            compiled_conditions = AccessDatabaseMongoDB._compile_mongo_criteria(conditions)
+
+            # Bind value of each condition
+            filter_conditions = list()
+            for (field, mongo_operator, is_id), condition in zip(compiled_conditions, conditions):
+                value = condition[2]
+
+                # Special case if the variable is the ID. If the value is zero, negative or None, all elements must
+                # be recovered, so the condition is skipped
+                if is_id and not isinstance(value, (list, tuple)) and (value is None or value <= 0):
+                    continue
+
+                filter_conditions.append({field: {mongo_operator: value}})
 
             # Only if native criteria is active, add native from user
             if native_criteria and len(criteria) > 0:
-                mongo_criteria[AccessDatabaseMongoDB.MONGO_JOIN_CONDITION].append(dict(criteria))
+                filter_conditions.append(dict(criteria))
+
+            # Join conditions only if there are several of them
+            if len(filter_conditions) == 0:
+                mongo_criteria = {}
+            elif len(filter_conditions) == 1:
+                mongo_criteria = filter_conditions[0]
+            else:
+                mongo_criteria = {AccessDatabaseMongoDB.MONGO_JOIN_CONDITION: filter_conditions}
 
             # Return the mongo criteria
-            logger.debug('Mongo criteria {}'.format(mongo_criteria))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('Mongo criteria {}'.format(mongo_criteria))
             return mongo_criteria
 
         except Exception:
             raise DatabaseObjectException(ErrorMessages.CRITERIA_ERROR)
+
+    @staticmethod
+    def _compile_mongo_criteria(conditions: list) -> tuple:
+        """
+        Get compiled conditions from cache or compile them. Compiled conditions only depend on fields and operators
+
+        :param conditions: list of tuple of conditions
+        :type conditions: list
+
+        :return: tuple of (field, mongodb operator, field is the ID) for each condition
+        :rtype: tuple
+        """
+
+        shape = tuple((condition[0], condition[1]) for condition in conditions)
+        compiled_conditions = AccessDatabaseMongoDB.cache_compiled_criteria.get(shape)
+
+        if compiled_conditions is None:
+            compiled_conditions = tuple(
+                (field, AccessDatabaseMongoDB.MONGO_OPERATORS[operator], field == AccessDatabase.ID_FIELD)
+                for field, operator in shape
+            )
+
+            # Cache is emptied when it is full, because usually only a few shapes are used
+            if len(AccessDatabaseMongoDB.cache_compiled_criteria) >= AccessDatabaseMongoDB.MAX_COMPILED_CRITERIA:
+                AccessDatabaseMongoDB.cache_compiled_criteria.clear()
+            AccessDatabaseMongoDB.cache_compiled_criteria[shape] = compiled_conditions
+
+        return compiled_conditions
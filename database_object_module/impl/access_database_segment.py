@@ -0,0 +1,1548 @@
+import logging
+import mmap
+import os
+import shutil
+import struct
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+import bson
+from bson.raw_bson import RawBSONDocument
+
+from common.tools.decorators import log_function
+from common.tools.task_thread import TaskThread
+from database_object_module import MODULE_NAME
+from database_object_module.data_model import DatabaseObjectException, ErrorMessages
+from database_object_module.impl.access_database import AccessDatabase
+from database_object_module.impl.access_database_memory import AccessDatabaseMemory
+
+logger = logging.getLogger(MODULE_NAME)
+
+
+class _SegmentCollection(object):
+    """
+    Segment files of a collection and index of the last version of each document
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.lock = threading.RLock()
+
+        # Size of each segment by number, and the segment where documents are appended
+        self.segments = dict()
+        self.active_segment = 0
+        self.active_file = None
+
+        # Read only maps of segments by number
+        self.maps = dict()
+
+        # Location of each document by _identifier: (segment, offset, length, _timestamp). Sorted list of
+        # _identifier, to get ranges, and _identifier by _timestamp, to check that _timestamp is unique
+        self.index = dict()
+        self.identifiers = list()
+        self.timestamps = dict()
+
+        # Bytes of last versions of documents and bytes of old versions and deletions
+        self.live_bytes = 0
+        self.garbage_bytes = 0
+
+
+class AccessDatabaseSegment(AccessDatabase):
+    """
+    Class to define the access to a local log structured datastore. Documents of each collection are appended to
+    segment files, prefixed by their length, and read through memory maps of the files. Updates and deletions append
+    new records, and segments are compacted in background when most of their bytes are old records. Native criteria is
+    a function that receives a document and returns true if it matches. Secondary indexes are not kept, so conditions
+    other than _identifier and _timestamp read the documents
+    """
+
+    # Prefix of connection url. Path of the directory of the datastore follows it
+    SEGMENT_URL_PREFIX = 'segment://'
+
+    # Files of segments and indexes
+    SEGMENT_EXTENSION = '.seg'
+    INDEX_EXTENSION = '.idx'
+    TEMPORARY_EXTENSION = '.tmp'
+
+    # Header of each record: length of document and kind of record
+    RECORD_HEADER = struct.Struct('<IB')
+    RECORD_DOCUMENT = 0
+    RECORD_DELETION = 1
+
+    # Maximum size of a segment before a new one is started
+    SEGMENT_MAX_SIZE = 64 * 1024 * 1024
+
+    # Collections are compacted when old records are more than a ratio of their bytes, and at least a minimum size
+    COMPACTION_INTERVAL = 60.0
+    COMPACTION_RATIO = 0.5
+    COMPACTION_MIN_BYTES = 1024 * 1024
+
+    def __init__(self, connection_url: str) -> None:
+        """
+        Constructor with the directory of the datastore
+
+        :param connection_url: segment:// followed by the path of the directory
+        :type connection_url: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        AccessDatabase.__init__(self, connection_url)
+
+        # Collections loaded from disk by name
+        self.collections = dict()
+        self.lock = threading.RLock()
+
+        # Directory of the datastore
+        self.directory = connection_url[len(AccessDatabaseSegment.SEGMENT_URL_PREFIX):] \
+            if connection_url.startswith(AccessDatabaseSegment.SEGMENT_URL_PREFIX) else connection_url
+
+        # Collections read as raw documents and collections whose writes are synced to disk
+        self.raw_collections = set()
+        self.sync_collections = set()
+
+        self.compaction_thread = None
+
+        self.open_connection()
+
+    @log_function(logger, logging.DEBUG)
+    def get(self, schema: str, conditions: list, criteria: str, native_criteria: bool, fields: list = None,
+            sort: list = AccessDatabase.DEFAULT_SORT, limit: int = 0) -> list:
+        """
+        Get data from segments
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :param sort: list of tuples (field, direction) with direction asc or desc, or None to not sort
+        :type sort: list
+
+        :param limit: maximum number of elements, 0 to get all elements
+        :type limit: int
+
+        :return: list of dictionary with data
+        :rtype: list
+        """
+
+        try:
+            segment_collect = self._get_collection(schema)
+            with segment_collect.lock:
+                found = self._find(segment_collect, conditions, criteria, native_criteria, sort)
+                if limit > 0:
+                    found = found[:limit]
+
+                return [self._get_document(segment_collect, schema, identifier, document, fields)
+                        for identifier, document in found]
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def iter_get(self, schema: str, conditions: list, criteria: str, native_criteria: bool, batch_size: int,
+                 limit: int, skip: int, fields: list = None, sort: list = AccessDatabase.DEFAULT_SORT):
+        """
+        Get data from segments one by one. Matching documents are searched at once, and they are read when they are
+        generated, unless they have been removed
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :param batch_size: not used, documents are read from memory maps
+        :type batch_size: int
+
+        :param limit: maximum number of elements, 0 to get all elements
+        :type limit: int
+
+        :param skip: number of elements skipped before the first one
+        :type skip: int
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :param sort: list of tuples (field, direction) with direction asc or desc, or None to not sort
+        :type sort: list
+
+        :return: generator of dictionary with data
+        :rtype: generator
+        """
+
+        try:
+            segment_collect = self._get_collection(schema)
+            with segment_collect.lock:
+                found = self._find(segment_collect, conditions, criteria, native_criteria, sort)
+                found = found[skip:skip + limit] if limit > 0 else found[skip:]
+
+            return self._iter_documents(segment_collect, schema, [identifier for identifier, _ in found], fields)
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def get_page(self, schema: str, conditions: list, criteria: str, native_criteria: bool, after: int,
+                 page_size: int, order: str, fields: list = None) -> list:
+        """
+        Get a page of data from segments, seeking in the sorted index of _identifier after previous page
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :param after: last _identifier of previous page, None for the first page
+        :type after: int
+
+        :param page_size: maximum number of elements of the page
+        :type page_size: int
+
+        :param order: order of _identifier, asc or desc
+        :type order: str
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :return: list of dictionary with the page
+        :rtype: list
+        """
+
+        try:
+            # Seek condition is added if it is not the first page
+            seek_operator = '>' if order == AccessDatabase.ORDER_ASCENDING else '<'
+            if after is not None:
+                conditions = list(conditions) + [(AccessDatabase.ID_FIELD, seek_operator, after)]
+
+            segment_collect = self._get_collection(schema)
+            with segment_collect.lock:
+                found = self._find(segment_collect, conditions, criteria, native_criteria,
+                                   [(AccessDatabase.ID_FIELD, order)])
+
+                return [self._get_document(segment_collect, schema, identifier, document, fields)
+                        for identifier, document in found[:page_size]]
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def count(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Count data in segments. Documents are only read if there are conditions over other fields
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :return: list of dictionary with number of elements
+        :rtype: list
+        """
+
+        try:
+            segment_collect = self._get_collection(schema)
+            with segment_collect.lock:
+                count = len(self._find(segment_collect, conditions, criteria, native_criteria, None))
+
+            return [{AccessDatabase.COUNT_FIELD: count}]
+
+        except Exception as e:
+            # If there is SCHEMA_ERROR, this is not an error because schema does not exist. Only log warning
+            if str(e) == ErrorMessages.SCHEMA_ERROR:
+                logger.warning('Schema or subschema does not exist')
+                return [{AccessDatabase.COUNT_FIELD: 0}]
+            else:
+                raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def exists(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Check if any data in segments matches the conditions
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :return: list of dictionary with true if any element matches
+        :rtype: list
+        """
+
+        try:
+            segment_collect = self._get_collection(schema)
+            with segment_collect.lock:
+                exists = len(self._find(segment_collect, conditions, criteria, native_criteria, None, 1)) > 0
+
+            return [{AccessDatabase.EXISTS_FIELD: exists}]
+
+        except Exception as e:
+            # If there is SCHEMA_ERROR, this is not an error because schema does not exist. Only log warning
+            if str(e) == ErrorMessages.SCHEMA_ERROR:
+                logger.warning('Schema or subschema does not exist')
+                return [{AccessDatabase.EXISTS_FIELD: False}]
+            else:
+                raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def distinct(self, schema: str, field: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Get different values of a field in segments
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param field: field whose values are recovered
+        :type field: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :return: list of dictionary with the field for each different value
+        :rtype: list
+        """
+
+        try:
+            segment_collect = self._get_collection(schema)
+            with segment_collect.lock:
+                found = self._find(segment_collect, conditions, criteria, native_criteria, None)
+
+                # Values are compared by their hashable form, because they can be lists or dictionaries
+                values = dict()
+                for identifier, document in found:
+                    if document is None:
+                        document = self._read_document(segment_collect, identifier)
+                    if field in document:
+                        values.setdefault(AccessDatabaseMemory._get_hashable(document[field]), document[field])
+
+            return [{field: value} for value in values.values()]
+
+        except Exception as e:
+            # If there is SCHEMA_ERROR, this is not an error because schema does not exist. Only log warning
+            if str(e) == ErrorMessages.SCHEMA_ERROR:
+                logger.warning('Schema or subschema does not exist')
+                return list()
+            else:
+                raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def put(self, schema: str, data: dict, write_concern: dict = None) -> list:
+        """
+        Append data to the active segment
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param data: data to store in dictionary format
+        :type data: dict
+
+        :param write_concern: with j true, the segment is synced to disk before returning
+        :type write_concern: dict
+
+        :return: list of dictionary with inserted _id
+        :rtype: list
+        """
+
+        try:
+            segment_collect = self._get_collection(schema, create_collection=True)
+            with segment_collect.lock:
+                self._insert_document(segment_collect, data)
+                self._flush(segment_collect, self._get_sync(schema, write_concern))
+
+            return [{AccessDatabase.ID_FIELD: data[AccessDatabase.ID_FIELD]}]
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def put_many(self, schema: str, data_list: list, chunk_size: int, write_concern: dict = None,
+                 ordered: bool = None) -> list:
+        """
+        Append a batch of data to the active segment, flushing it once
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param data_list: list of data to store in dictionary format
+        :type data_list: list
+
+        :param chunk_size: number of documents of each chunk of the result
+        :type chunk_size: int
+
+        :param write_concern: with j true, the segment is synced to disk before returning
+        :type write_concern: dict
+
+        :param ordered: stop at first error (True, by default) or insert the rest of documents (False)
+        :type ordered: bool
+
+        :return: list of dictionary with first inserted _id and number of inserted elements of each chunk
+        :rtype: list
+        """
+
+        try:
+            error = None
+            segment_collect = self._get_collection(schema, create_collection=True)
+            with segment_collect.lock:
+                try:
+                    for data in data_list:
+                        try:
+                            self._insert_document(segment_collect, data)
+                        except DatabaseObjectException as e:
+                            error = e
+                            if ordered is None or ordered:
+                                break
+                finally:
+                    self._flush(segment_collect, self._get_sync(schema, write_concern))
+
+            if error is not None:
+                raise error
+
+            return [{AccessDatabase.ID_FIELD: data_list[start][AccessDatabase.ID_FIELD],
+                     AccessDatabase.INSERTED_COUNT: len(data_list[start:start + chunk_size])}
+                    for start in range(0, len(data_list), chunk_size)]
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def update(self, schema: str, data: dict, conditions: list, criteria: str, native_criteria: bool,
+               write_concern: dict = None) -> list:
+        """
+        Update data appending new versions of documents
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param data: data to store in dictionary format
+        :type data: dict
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :param write_concern: with j true, the segment is synced to disk before returning
+        :type write_concern: dict
+
+        :return: list of dictionary with number of updated elements
+        :rtype: list
+        """
+
+        try:
+            segment_collect = self._get_collection(schema)
+            with segment_collect.lock:
+                try:
+                    modified_count = self._update_documents(segment_collect, data, conditions, criteria,
+                                                            native_criteria)[1]
+                finally:
+                    self._flush(segment_collect, self._get_sync(schema, write_concern))
+
+            return [{AccessDatabase.UPDATED_COUNT: modified_count}]
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def update_many(self, schema: str, updates: list, chunk_size: int, write_concern: dict = None,
+                    ordered: bool = None) -> list:
+        """
+        Update different data appending new versions of documents
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param updates: list of tuples (conditions, data)
+        :type updates: list
+
+        :param chunk_size: not used, segment is flushed once
+        :type chunk_size: int
+
+        :param write_concern: with j true, the segment is synced to disk before returning
+        :type write_concern: dict
+
+        :param ordered: stop at first error (True) or apply the rest of updates (False, by default)
+        :type ordered: bool
+
+        :return: list of dictionary with number of matched and updated elements
+        :rtype: list
+        """
+
+        try:
+            matched_count = 0
+            modified_count = 0
+            error = None
+
+            segment_collect = self._get_collection(schema)
+            with segment_collect.lock:
+                try:
+                    for conditions, data in updates:
+                        try:
+                            counts = self._update_documents(segment_collect, data, conditions, '', False)
+                            matched_count += counts[0]
+                            modified_count += counts[1]
+                        except DatabaseObjectException as e:
+                            error = e
+                            if ordered:
+                                break
+                finally:
+                    self._flush(segment_collect, self._get_sync(schema, write_concern))
+
+            if error is not None:
+                raise error
+
+            return [{AccessDatabase.MATCHED_COUNT: matched_count, AccessDatabase.UPDATED_COUNT: modified_count}]
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def remove(self, schema: str, conditions: list, criteria: str, native_criteria: bool,
+               write_concern: dict = None) -> list:
+        """
+        Delete elements appending deletion records
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :param write_concern: with j true, the segment is synced to disk before returning
+        :type write_concern: dict
+
+        :return: list of dictionary with number of deleted elements
+        :rtype: list
+        """
+
+        try:
+            segment_collect = self._get_collection(schema)
+            with segment_collect.lock:
+                found = self._find(segment_collect, conditions, criteria, native_criteria, None)
+                try:
+                    for identifier, _ in found:
+                        self._delete_document(segment_collect, identifier)
+                finally:
+                    self._flush(segment_collect, self._get_sync(schema, write_concern))
+
+            return [{AccessDatabase.DELETED_COUNT: len(found)}]
+
+        except Exception as e:
+            # If there is SCHEMA_ERROR, this is not an error because schema does not exist. Only log warning
+            if str(e) == ErrorMessages.SCHEMA_ERROR:
+                logger.warning('Schema or subschema does not exist')
+                return [{AccessDatabase.DELETED_COUNT: 0}]
+            else:
+                raise DatabaseObjectException(ErrorMessages.REMOVE_ERROR)
+
+    def open_connection(self) -> None:
+        """
+        Create the directory of the datastore and start compaction in background. Collections are loaded from their
+        segments the first time they are used
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self.connection = self.directory
+
+            if self.compaction_thread is None:
+                self.compaction_thread = CompactionThread(self)
+                self.compaction_thread.setInterval(AccessDatabaseSegment.COMPACTION_INTERVAL)
+                self.compaction_thread.daemon = True
+                self.compaction_thread.start()
+
+        except OSError:
+            raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+
+    def close_connection(self) -> None:
+        """
+        Stop compaction and close files of all collections, that are loaded again when they are used
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        if self.compaction_thread is not None:
+            self.compaction_thread.shutdown()
+            self.compaction_thread = None
+
+        with self.lock:
+            for segment_collect in self.collections.values():
+                with segment_collect.lock:
+                    AccessDatabaseSegment._close_collection(segment_collect)
+            self.collections.clear()
+
+    def check_connection(self) -> bool:
+        """
+        Check if the directory of the datastore exists
+
+        :return: true if the datastore is accessible
+        :rtype: bool
+        """
+
+        return os.path.isdir(self.directory)
+
+    def get_last_index(self, schema: str, sub_schema: str) -> int:
+        """
+        Recover last index from the index of _identifier and from the index file of the collection
+
+        :param schema: schema to search
+        :type schema: str
+
+        :param sub_schema: sub_schema to search
+        :type sub_schema: str
+
+        :return: last inserted index of schema_collection
+        :rtype: int
+        """
+
+        schema_collection = self.get_schema_collection(schema, sub_schema)
+        schema_collection_index = self.get_schema_collection_index(schema, sub_schema)
+
+        try:
+            segment_collect = self._get_collection(schema_collection, create_collection=True)
+            with segment_collect.lock:
+                identifier_collection = segment_collect.identifiers[-1] if segment_collect.identifiers else 0
+
+            with self.lock:
+                return max(identifier_collection, self._read_index(schema_collection_index))
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.GET_INDEX_ERROR)
+
+    def update_index(self, schema_collection_index: str, value: int) -> None:
+        """
+        Update index of a collection. Index never goes backwards
+
+        :param schema_collection_index: collection index
+        :type schema_collection_index: str
+
+        :param value: value of index
+        :type value: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        try:
+            with self.lock:
+                if value > self._read_index(schema_collection_index):
+                    self._write_index(schema_collection_index, value)
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.UPDATE_INDEX_ERROR)
+
+    def reserve_index(self, schema: str, sub_schema: str, block_size: int) -> int:
+        """
+        Reserve atomically a block of identifiers incrementing index of the collection
+
+        :param schema: schema to reserve
+        :type schema: str
+
+        :param sub_schema: sub_schema to reserve
+        :type sub_schema: str
+
+        :param block_size: number of identifiers to reserve
+        :type block_size: int
+
+        :return: last identifier of the reserved block
+        :rtype: int
+        """
+
+        schema_collection_index = self.get_schema_collection_index(schema, sub_schema)
+
+        try:
+            with self.lock:
+                last_index = self.get_last_index(schema, sub_schema) + block_size
+                self._write_index(schema_collection_index, last_index)
+                return last_index
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.UPDATE_INDEX_ERROR)
+
+    def set_read_options(self, schema: str, raw_documents: bool) -> None:
+        """
+        Set how documents of a collection are read
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param raw_documents: read documents as RawBSONDocument, decoded when they are accessed
+        :type raw_documents: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        if raw_documents:
+            self.raw_collections.add(schema)
+        else:
+            self.raw_collections.discard(schema)
+
+    def set_compression_options(self, schema: str, fields: list, min_size: int) -> None:
+        """
+        Records are read through memory maps without copies, so compression options are ignored
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param fields: not used
+        :type fields: list
+
+        :param min_size: not used
+        :type min_size: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        pass
+
+    def get_compression_stats(self) -> dict:
+        """
+        Documents are never compressed
+
+        :return: empty dictionary
+        :rtype: dict
+        """
+
+        return dict()
+
+    def set_write_options(self, schema: str, write_concern: dict, ordered: bool) -> None:
+        """
+        Set if writes of a collection are synced to disk. Only j of write concern is used, and batches use the default
+        mode of each method
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param write_concern: with j true, segments are synced to disk after each write
+        :type write_concern: dict
+
+        :param ordered: not used
+        :type ordered: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        if write_concern is not None and write_concern.get('j', False):
+            self.sync_collections.add(schema)
+        else:
+            self.sync_collections.discard(schema)
+
+    def ensure_indexes(self, schema: str, indexes: list) -> None:
+        """
+        Secondary indexes are not kept, so declared indexes are ignored
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param indexes: not used
+        :type indexes: list
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        pass
+
+    def compact(self) -> None:
+        """
+        Compact collections whose old records are more than the compaction ratio of their bytes
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        with self.lock:
+            collections = list(self.collections.items())
+
+        for schema, segment_collect in collections:
+            total_bytes = segment_collect.live_bytes + segment_collect.garbage_bytes
+            if segment_collect.garbage_bytes >= AccessDatabaseSegment.COMPACTION_MIN_BYTES and \
+                    segment_collect.garbage_bytes > total_bytes * AccessDatabaseSegment.COMPACTION_RATIO:
+                try:
+                    self._compact_collection(schema, segment_collect)
+                except Exception:
+                    logger.error('Collection %s can not be compacted', schema, exc_info=True)
+
+    def _get_collection(self, schema: str, create_collection: bool = False) -> _SegmentCollection:
+        """
+        Get a collection, loading its segments the first time
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param create_collection: create collection or not
+        :type create_collection: bool
+
+        :return: collection
+        :rtype: _SegmentCollection
+        """
+
+        with self.lock:
+            segment_collect = self.collections.get(schema)
+
+            if segment_collect is None:
+                directory = os.path.join(self.directory, schema)
+                if not os.path.isdir(directory):
+                    if not create_collection:
+                        raise DatabaseObjectException(ErrorMessages.SCHEMA_ERROR)
+                    os.makedirs(directory)
+
+                segment_collect = _SegmentCollection(directory)
+                AccessDatabaseSegment._load_collection(segment_collect)
+                self.collections[schema] = segment_collect
+
+            return segment_collect
+
+    def _drop_collection(self, schema: str) -> None:
+        """
+        Drop collection and its segments
+
+        :param schema: name of collection
+        :type schema: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        with self.lock:
+            segment_collect = self.collections.pop(schema, None)
+            if segment_collect is not None:
+                with segment_collect.lock:
+                    AccessDatabaseSegment._close_collection(segment_collect)
+
+            shutil.rmtree(os.path.join(self.directory, schema), ignore_errors=True)
+
+    def _get_sync(self, schema: str, write_concern: dict) -> bool:
+        """
+        Check if a write must be synced to disk
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param write_concern: write concern of the call, None to use the one of the collection
+        :type write_concern: dict
+
+        :return: true if segment must be synced
+        :rtype: bool
+        """
+
+        if write_concern is not None:
+            return bool(write_concern.get('j', False))
+
+        return schema in self.sync_collections
+
+    def _read_index(self, schema_collection_index: str) -> int:
+        """
+        Read index file of a collection. Lock must be acquired
+
+        :param schema_collection_index: collection index
+        :type schema_collection_index: str
+
+        :return: value of index, 0 if it does not exist
+        :rtype: int
+        """
+
+        path = os.path.join(self.directory, schema_collection_index + AccessDatabaseSegment.INDEX_EXTENSION)
+        if not os.path.exists(path):
+            return 0
+
+        with open(path) as index_file:
+            return int(index_file.read())
+
+    def _write_index(self, schema_collection_index: str, value: int) -> None:
+        """
+        Write index file of a collection, replacing it atomically. Lock must be acquired
+
+        :param schema_collection_index: collection index
+        :type schema_collection_index: str
+
+        :param value: value of index
+        :type value: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        path = os.path.join(self.directory, schema_collection_index + AccessDatabaseSegment.INDEX_EXTENSION)
+        with open(path + AccessDatabaseSegment.TEMPORARY_EXTENSION, 'w') as index_file:
+            index_file.write(str(value))
+            index_file.flush()
+            os.fsync(index_file.fileno())
+        os.replace(path + AccessDatabaseSegment.TEMPORARY_EXTENSION, path)
+
+    def _find(self, segment_collect: _SegmentCollection, conditions: list, criteria: str, native_criteria: bool,
+              sort: list, limit: int = 0) -> list:
+        """
+        Get documents that match the conditions, in sort order. Conditions of _identifier and _timestamp are checked
+        with the index, and documents are only read if there are other conditions or they are sorted by other fields.
+        Lock of collection must be acquired
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :param sort: list of tuples (field, direction), or None to not sort
+        :type sort: list
+
+        :param limit: stop when this number of documents match, 0 to get all documents. Only used without sort
+        :type limit: int
+
+        :return: list of tuples (_identifier, document), with document None if it has not been read
+        :rtype: list
+        """
+
+        # Predicates of _identifier and _timestamp are checked with the index, the rest with documents
+        index_predicates = list()
+        document_predicates = list()
+        for predicate in AccessDatabaseMemory._create_predicates(conditions):
+            if predicate[0] in (AccessDatabase.ID_FIELD, AccessDatabase.TIMESTAMP_FIELD):
+                index_predicates.append(predicate)
+            else:
+                document_predicates.append(predicate)
+
+        if native_criteria and criteria is not None and not isinstance(criteria, str):
+            document_predicates.append((None, criteria, None))
+        elif native_criteria and len(criteria) > 0:
+            raise DatabaseObjectException(ErrorMessages.CRITERIA_ERROR)
+
+        sort = list(sort) if sort is not None else list()
+        for _, direction in sort:
+            if direction not in (AccessDatabase.ORDER_ASCENDING, AccessDatabase.ORDER_DESCENDING):
+                raise DatabaseObjectException(ErrorMessages.CRITERIA_ERROR)
+        read_documents = len(document_predicates) > 0 or \
+            any(field not in (AccessDatabase.ID_FIELD, AccessDatabase.TIMESTAMP_FIELD) for field, _ in sort)
+
+        found = list()
+        for identifier in AccessDatabaseSegment._get_candidates(segment_collect, index_predicates):
+            entry = segment_collect.index.get(identifier)
+            if entry is None:
+                continue
+
+            index_document = {AccessDatabase.ID_FIELD: identifier, AccessDatabase.TIMESTAMP_FIELD: entry[3]}
+            if not AccessDatabaseMemory._match(index_document, index_predicates):
+                continue
+
+            document = self._read_document(segment_collect, identifier) if read_documents else None
+            if document is not None and not AccessDatabaseMemory._match(document, document_predicates):
+                continue
+
+            found.append((identifier, document))
+            if len(found) == limit and len(sort) == 0:
+                break
+
+        # Sort by each field, from last to first, because sort is stable
+        for field, direction in reversed(sort):
+            if field == AccessDatabase.ID_FIELD:
+                sort_key = lambda item: item[0]
+            elif field == AccessDatabase.TIMESTAMP_FIELD:
+                sort_key = lambda item: segment_collect.index[item[0]][3]
+            else:
+                sort_key = lambda item: AccessDatabaseMemory._get_sort_key(item[1].get(field))
+            found.sort(key=sort_key, reverse=direction == AccessDatabase.ORDER_DESCENDING)
+
+        return found
+
+    @staticmethod
+    def _get_candidates(segment_collect: _SegmentCollection, predicates: list) -> list:
+        """
+        Get _identifier of documents that can match the predicates, using the sorted index of _identifier
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :param predicates: list of tuples (field, comparison function, value) of _identifier and _timestamp
+        :type predicates: list
+
+        :return: list of _identifier
+        :rtype: list
+        """
+
+        operators = AccessDatabaseMemory.MEMORY_OPERATORS
+
+        start = 0
+        end = len(segment_collect.identifiers)
+        for field, function, value in predicates:
+            if field != AccessDatabase.ID_FIELD:
+                continue
+            if function is operators['=']:
+                return [value]
+            elif function is operators['in']:
+                # Each document is a candidate once, although its _identifier is repeated
+                return list(dict.fromkeys(value))
+            elif function is operators['>']:
+                start = max(start, bisect_right(segment_collect.identifiers, value))
+            elif function is operators['>=']:
+                start = max(start, bisect_left(segment_collect.identifiers, value))
+            elif function is operators['<']:
+                end = min(end, bisect_left(segment_collect.identifiers, value))
+            elif function is operators['<=']:
+                end = min(end, bisect_right(segment_collect.identifiers, value))
+
+        return segment_collect.identifiers[start:end]
+
+    def _get_document(self, segment_collect: _SegmentCollection, schema: str, identifier: int, document: dict,
+                      fields: list) -> dict:
+        """
+        Get a document, only with requested fields. Lock of collection must be acquired
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param identifier: _identifier of the document
+        :type identifier: int
+
+        :param document: document if it has been read, or None
+        :type document: dict
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :return: document
+        :rtype: dict
+        """
+
+        if schema in self.raw_collections and fields is None:
+            segment, offset, length, _ = segment_collect.index[identifier]
+            with memoryview(self._get_map(segment_collect, segment, offset + length)) as view:
+                with view[offset:offset + length] as record:
+                    return RawBSONDocument(record.tobytes())
+
+        if document is None:
+            document = self._read_document(segment_collect, identifier)
+
+        if fields is not None:
+            fields = set(fields) | {AccessDatabase.ID_FIELD, AccessDatabase.TIMESTAMP_FIELD}
+            document = {field: value for field, value in document.items() if field in fields}
+            if schema in self.raw_collections:
+                return RawBSONDocument(bson.encode(document))
+
+        return document
+
+    def _iter_documents(self, segment_collect: _SegmentCollection, schema: str, identifiers: list, fields: list):
+        """
+        Generate documents reading them when they are requested. Documents removed meanwhile are skipped
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param identifiers: list of _identifier
+        :type identifiers: list
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :return: generator of documents
+        :rtype: generator
+        """
+
+        for identifier in identifiers:
+            with segment_collect.lock:
+                if identifier not in segment_collect.index:
+                    continue
+                document = self._get_document(segment_collect, schema, identifier, None, fields)
+            yield document
+
+    def _read_document(self, segment_collect: _SegmentCollection, identifier: int) -> dict:
+        """
+        Read last version of a document, decoding it from the memory map of its segment without copies. Lock of
+        collection must be acquired
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :param identifier: _identifier of the document
+        :type identifier: int
+
+        :return: document
+        :rtype: dict
+        """
+
+        segment, offset, length, _ = segment_collect.index[identifier]
+        with memoryview(self._get_map(segment_collect, segment, offset + length)) as view:
+            with view[offset:offset + length] as record:
+                return bson.decode(record)
+
+    @staticmethod
+    def _get_map(segment_collect: _SegmentCollection, segment: int, size: int) -> mmap.mmap:
+        """
+        Get the memory map of a segment with at least a size. Active segment grows, so it is flushed and mapped again
+        when it is smaller than the size. Lock of collection must be acquired
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :param segment: number of segment
+        :type segment: int
+
+        :param size: minimum size of the map
+        :type size: int
+
+        :return: memory map
+        :rtype: mmap.mmap
+        """
+
+        segment_map = segment_collect.maps.get(segment)
+        if segment_map is None or len(segment_map) < size:
+            if segment_map is not None:
+                segment_map.close()
+            if segment == segment_collect.active_segment and segment_collect.active_file is not None:
+                segment_collect.active_file.flush()
+
+            with open(AccessDatabaseSegment._get_segment_path(segment_collect, segment), 'rb') as segment_file:
+                segment_map = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+            segment_collect.maps[segment] = segment_map
+
+        return segment_map
+
+    def _append(self, segment_collect: _SegmentCollection, kind: int, payload: bytes) -> tuple:
+        """
+        Append a record to the active segment, starting a new segment if it is full. Lock of collection must be
+        acquired
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :param kind: kind of record
+        :type kind: int
+
+        :param payload: document encoded with bson
+        :type payload: bytes
+
+        :return: number of segment and offset of the document
+        :rtype: tuple
+        """
+
+        size = segment_collect.segments.get(segment_collect.active_segment, 0)
+        if segment_collect.active_file is None or size >= AccessDatabaseSegment.SEGMENT_MAX_SIZE:
+            AccessDatabaseSegment._open_segment(segment_collect, segment_collect.active_segment + 1)
+            size = 0
+
+        segment_collect.active_file.write(AccessDatabaseSegment.RECORD_HEADER.pack(len(payload), kind))
+        segment_collect.active_file.write(payload)
+        segment_collect.segments[segment_collect.active_segment] = size + AccessDatabaseSegment.RECORD_HEADER.size + \
+            len(payload)
+
+        return segment_collect.active_segment, size + AccessDatabaseSegment.RECORD_HEADER.size
+
+    @staticmethod
+    def _flush(segment_collect: _SegmentCollection, sync: bool) -> None:
+        """
+        Flush the active segment, so its records can be read, and sync it to disk if it is requested. Lock of
+        collection must be acquired
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :param sync: sync segment to disk
+        :type sync: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        if segment_collect.active_file is not None:
+            segment_collect.active_file.flush()
+            if sync:
+                os.fsync(segment_collect.active_file.fileno())
+
+    def _insert_document(self, segment_collect: _SegmentCollection, data: dict) -> None:
+        """
+        Append a new document checking that _identifier and _timestamp are unique. Lock of collection must be acquired
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :param data: data to store
+        :type data: dict
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        identifier = data[AccessDatabase.ID_FIELD]
+        timestamp = data[AccessDatabase.TIMESTAMP_FIELD]
+        if identifier in segment_collect.index or timestamp in segment_collect.timestamps:
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+        payload = bson.encode(data)
+        segment, offset = self._append(segment_collect, AccessDatabaseSegment.RECORD_DOCUMENT, payload)
+        AccessDatabaseSegment._add_to_index(segment_collect, identifier, (segment, offset, len(payload), timestamp))
+
+    def _delete_document(self, segment_collect: _SegmentCollection, identifier: int) -> None:
+        """
+        Append a deletion record of a document. Lock of collection must be acquired
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :param identifier: _identifier of the document
+        :type identifier: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        payload = bson.encode({AccessDatabase.ID_FIELD: identifier})
+        self._append(segment_collect, AccessDatabaseSegment.RECORD_DELETION, payload)
+        AccessDatabaseSegment._remove_from_index(segment_collect, identifier)
+        segment_collect.garbage_bytes += AccessDatabaseSegment.RECORD_HEADER.size + len(payload)
+
+    def _update_documents(self, segment_collect: _SegmentCollection, data: dict, conditions: list, criteria: str,
+                          native_criteria: bool) -> tuple:
+        """
+        Append new versions of documents that match the conditions. Lock of collection must be acquired
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :param data: fields to set
+        :type data: dict
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: function that receives a document and returns true if it matches
+        :type criteria: function
+
+        :param native_criteria: boolean for search by native criteria
+        :type native_criteria: bool
+
+        :return: number of matched documents and number of modified documents
+        :rtype: tuple
+        """
+
+        found = self._find(segment_collect, conditions, criteria, native_criteria, None)
+
+        modified_count = 0
+        for identifier, document in found:
+            if document is None:
+                document = self._read_document(segment_collect, identifier)
+
+            updated_document = dict(document)
+            updated_document.update(data)
+            payload = bson.encode(updated_document)
+            updated_document = bson.decode(payload)
+            if updated_document == document:
+                continue
+
+            # New _identifier and _timestamp must be unique too
+            updated_identifier = updated_document[AccessDatabase.ID_FIELD]
+            updated_timestamp = updated_document[AccessDatabase.TIMESTAMP_FIELD]
+            if (updated_identifier != identifier and updated_identifier in segment_collect.index) or \
+                    (updated_timestamp in segment_collect.timestamps and
+                     segment_collect.timestamps[updated_timestamp] != identifier):
+                raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+            if updated_identifier != identifier:
+                self._delete_document(segment_collect, identifier)
+            else:
+                AccessDatabaseSegment._remove_from_index(segment_collect, identifier)
+
+            segment, offset = self._append(segment_collect, AccessDatabaseSegment.RECORD_DOCUMENT, payload)
+            AccessDatabaseSegment._add_to_index(segment_collect, updated_identifier,
+                                                (segment, offset, len(payload), updated_timestamp))
+            modified_count += 1
+
+        return len(found), modified_count
+
+    @staticmethod
+    def _add_to_index(segment_collect: _SegmentCollection, identifier: int, entry: tuple) -> None:
+        """
+        Add last version of a document to the index. Lock of collection must be acquired
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :param identifier: _identifier of the document
+        :type identifier: int
+
+        :param entry: location of the document (segment, offset, length, _timestamp)
+        :type entry: tuple
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        segment_collect.index[identifier] = entry
+        segment_collect.timestamps[entry[3]] = identifier
+        segment_collect.live_bytes += AccessDatabaseSegment.RECORD_HEADER.size + entry[2]
+
+        # _identifier are usually appended in order
+        if len(segment_collect.identifiers) == 0 or identifier > segment_collect.identifiers[-1]:
+            segment_collect.identifiers.append(identifier)
+        else:
+            insort(segment_collect.identifiers, identifier)
+
+    @staticmethod
+    def _remove_from_index(segment_collect: _SegmentCollection, identifier: int) -> None:
+        """
+        Remove a document from the index. Its record becomes an old record. Lock of collection must be acquired
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :param identifier: _identifier of the document
+        :type identifier: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        entry = segment_collect.index.pop(identifier)
+        del segment_collect.timestamps[entry[3]]
+        del segment_collect.identifiers[bisect_left(segment_collect.identifiers, identifier)]
+
+        record_bytes = AccessDatabaseSegment.RECORD_HEADER.size + entry[2]
+        segment_collect.live_bytes -= record_bytes
+        segment_collect.garbage_bytes += record_bytes
+
+    @staticmethod
+    def _get_segment_path(segment_collect: _SegmentCollection, segment: int) -> str:
+        """
+        Get path of a segment file
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :param segment: number of segment
+        :type segment: int
+
+        :return: path
+        :rtype: str
+        """
+
+        return os.path.join(segment_collect.directory, '{:010d}{}'.format(segment,
+                                                                         AccessDatabaseSegment.SEGMENT_EXTENSION))
+
+    @staticmethod
+    def _open_segment(segment_collect: _SegmentCollection, segment: int) -> None:
+        """
+        Open a segment to append records. Lock of collection must be acquired
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :param segment: number of segment
+        :type segment: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        if segment_collect.active_file is not None:
+            segment_collect.active_file.close()
+
+        segment_collect.active_file = open(AccessDatabaseSegment._get_segment_path(segment_collect, segment), 'ab')
+        segment_collect.active_segment = segment
+        segment_collect.segments.setdefault(segment, 0)
+
+    @staticmethod
+    def _load_collection(segment_collect: _SegmentCollection) -> None:
+        """
+        Load index of a collection reading all its segments in order. Records written partially by a crash are
+        truncated
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        segments = sorted(int(name[:-len(AccessDatabaseSegment.SEGMENT_EXTENSION)])
+                          for name in os.listdir(segment_collect.directory)
+                          if name.endswith(AccessDatabaseSegment.SEGMENT_EXTENSION))
+
+        for segment in segments:
+            path = AccessDatabaseSegment._get_segment_path(segment_collect, segment)
+            size = os.path.getsize(path)
+            offset = 0
+
+            if size > 0:
+                segment_map = AccessDatabaseSegment._get_map(segment_collect, segment, size)
+                with memoryview(segment_map) as view:
+                    while offset + AccessDatabaseSegment.RECORD_HEADER.size <= size:
+                        length, kind = AccessDatabaseSegment.RECORD_HEADER.unpack_from(view, offset)
+                        start = offset + AccessDatabaseSegment.RECORD_HEADER.size
+                        if start + length > size:
+                            break
+
+                        with view[start:start + length] as record:
+                            document = bson.decode(record)
+                        identifier = document[AccessDatabase.ID_FIELD]
+
+                        # Previous version of the document is an old record, as the deletion record
+                        if identifier in segment_collect.index:
+                            AccessDatabaseSegment._remove_from_index(segment_collect, identifier)
+                        if kind == AccessDatabaseSegment.RECORD_DOCUMENT:
+                            AccessDatabaseSegment._add_to_index(segment_collect, identifier, (
+                                segment, start, length, document[AccessDatabase.TIMESTAMP_FIELD]))
+                        else:
+                            segment_collect.garbage_bytes += AccessDatabaseSegment.RECORD_HEADER.size + length
+
+                        offset = start + length
+
+            if offset < size:
+                logger.warning('Segment %s is truncated from %s to %s bytes', path, size, offset)
+                segment_map = segment_collect.maps.pop(segment, None)
+                if segment_map is not None:
+                    segment_map.close()
+                os.truncate(path, offset)
+
+            segment_collect.segments[segment] = offset
+            segment_collect.active_segment = segment
+
+    @staticmethod
+    def _close_collection(segment_collect: _SegmentCollection) -> None:
+        """
+        Close files and memory maps of a collection. Lock of collection must be acquired
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        if segment_collect.active_file is not None:
+            segment_collect.active_file.close()
+            segment_collect.active_file = None
+
+        for segment_map in segment_collect.maps.values():
+            segment_map.close()
+        segment_collect.maps.clear()
+
+    def _compact_collection(self, schema: str, segment_collect: _SegmentCollection) -> None:
+        """
+        Copy last versions of documents to a new segment and delete previous segments. The new segment is written as a
+        temporary file and renamed when it is complete, so a crash never loses records
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param segment_collect: collection
+        :type segment_collect: _SegmentCollection
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        with segment_collect.lock:
+            AccessDatabaseSegment._flush(segment_collect, False)
+            old_segments = sorted(segment_collect.segments)
+            segment = segment_collect.active_segment + 1
+            path = AccessDatabaseSegment._get_segment_path(segment_collect, segment)
+
+            # Records are copied from memory maps in the order they were written
+            index = dict()
+            offset = 0
+            with open(path + AccessDatabaseSegment.TEMPORARY_EXTENSION, 'wb') as segment_file:
+                for identifier, entry in sorted(segment_collect.index.items(), key=lambda item: item[1][:2]):
+                    old_segment, old_offset, length, timestamp = entry
+                    start = old_offset - AccessDatabaseSegment.RECORD_HEADER.size
+                    segment_map = AccessDatabaseSegment._get_map(segment_collect, old_segment, old_offset + length)
+                    with memoryview(segment_map) as view:
+                        with view[start:old_offset + length] as record:
+                            segment_file.write(record)
+                    index[identifier] = (segment, offset + AccessDatabaseSegment.RECORD_HEADER.size, length, timestamp)
+                    offset += AccessDatabaseSegment.RECORD_HEADER.size + length
+
+                segment_file.flush()
+                os.fsync(segment_file.fileno())
+            os.replace(path + AccessDatabaseSegment.TEMPORARY_EXTENSION, path)
+
+            # Previous segments are not needed anymore
+            AccessDatabaseSegment._close_collection(segment_collect)
+            for old_segment in old_segments:
+                os.remove(AccessDatabaseSegment._get_segment_path(segment_collect, old_segment))
+
+            segment_collect.segments = {segment: offset}
+            segment_collect.index = index
+            segment_collect.garbage_bytes = 0
+            AccessDatabaseSegment._open_segment(segment_collect, segment)
+
+            logger.info('Collection %s compacted from %s segments to %s bytes', schema, len(old_segments), offset)
+
+
+class CompactionThread(TaskThread):
+
+    def __init__(self, access_db: AccessDatabaseSegment) -> None:
+        TaskThread.__init__(self)
+        self.access_db = access_db
+
+    def task(self) -> None:
+        self.access_db.compact()
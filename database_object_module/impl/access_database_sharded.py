@@ -0,0 +1,995 @@
+import functools
+import hashlib
+import heapq
+import itertools
+import logging
+import threading
+from bisect import bisect
+from concurrent.futures import ThreadPoolExecutor
+
+from common.tools.decorators import log_function
+from database_object_module import MODULE_NAME
+from database_object_module.data_model import DatabaseObjectException, ErrorMessages
+from database_object_module.impl.access_database import AccessDatabase
+from database_object_module.impl.access_database_memory import AccessDatabaseMemory
+from database_object_module.impl.access_database_tiered import AccessDatabaseTiered
+
+logger = logging.getLogger(MODULE_NAME)
+
+
+class AccessDatabaseSharded(AccessDatabase):
+    """
+    Class to define the access to several datastores (shards) as one. Each range of _identifier of a collection is
+    stored in a shard chosen with consistent hashing, so adding a shard only moves a small part of ranges. Reads,
+    updates and deletes are sent in parallel to the shards that conditions on _identifier can reach, and results are
+    merged in the requested order. Collection indexes are stored in one shard
+    """
+
+    # Default number of consecutive identifiers stored in the same shard. 0 stores each collection in one shard
+    DEFAULT_RANGE_SIZE = 1000
+
+    # Points of each shard in the hash ring. More points distribute ranges more evenly
+    VIRTUAL_NODES = 128
+
+    # Maximum number of ranges of a condition on _identifier that are routed one by one instead of to all shards
+    MAX_ROUTED_RANGES = 64
+
+    def __init__(self, shards: list, range_size: int = DEFAULT_RANGE_SIZE) -> None:
+        """
+        Constructor with the shards. Position of each shard in the hash ring depends on its url, so the same shards
+        always store the same ranges, in any order
+
+        :param shards: list of AccessDatabase, one for each shard
+        :type shards: list
+
+        :param range_size: number of consecutive identifiers stored in the same shard, 0 to store each collection in
+                           one shard
+        :type range_size: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        if len(shards) == 0 or range_size < 0:
+            raise DatabaseObjectException(ErrorMessages.CONFIGURATION_ERROR)
+
+        AccessDatabase.__init__(self, ' '.join(shard.connection_url for shard in shards))
+
+        self.shards = list(shards)
+        self.range_size = range_size
+        self.connection = [shard.connection for shard in self.shards]
+
+        # Hash ring. Each shard has several points, sorted by hash
+        ring = sorted((AccessDatabaseSharded._hash('{}#{}'.format(shard.connection_url, node)), position)
+                      for position, shard in enumerate(self.shards) for node in range(self.VIRTUAL_NODES))
+        self.ring_hashes = [ring_hash for ring_hash, position in ring]
+        self.ring_shards = [position for ring_hash, position in ring]
+
+        # Collection indexes whose counter has been initialized with identifiers of all shards
+        self.seeded_indexes = set()
+        self.seeded_lock = threading.Lock()
+
+        # Shards where each collection has documents. Reads and updates fail in shards without the collection
+        self.collection_shards = dict()
+        self.collection_lock = threading.Lock()
+
+        # Threads to send requests to shards in parallel
+        self.executor = ThreadPoolExecutor(max_workers=len(self.shards), thread_name_prefix=MODULE_NAME + '_shard')
+
+    @log_function(logger, logging.DEBUG)
+    def get(self, schema: str, conditions: list, criteria: str, native_criteria: bool, fields: list = None,
+            sort: list = AccessDatabase.DEFAULT_SORT, limit: int = 0) -> list:
+        """
+        Get data from shards in parallel and merge them in the requested order
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of the shards
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of the shards
+        :type native_criteria: bool
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :param sort: list of tuples (field, direction) with direction asc or desc, or None to not sort
+        :type sort: list
+
+        :param limit: maximum number of elements, 0 to get all elements
+        :type limit: int
+
+        :return: list of dictionary with data
+        :rtype: list
+        """
+
+        # Each shard returns its documents sorted, with fields of the sort, so they only have to be merged
+        sort = AccessDatabaseSharded._get_total_sort(sort)
+        merge_fields, added_fields = AccessDatabase.get_sort_fields(fields, sort)
+        results = self._fan_out(self._get_collection_shards(schema, conditions, native_criteria), 'get', schema,
+                                conditions, criteria, native_criteria, merge_fields, sort, limit)
+        output_list = AccessDatabaseSharded._merge(results, sort)
+
+        return AccessDatabase.remove_fields(list(itertools.islice(output_list, limit)) if limit > 0 else
+                                            list(output_list), added_fields)
+
+    @log_function(logger, logging.DEBUG)
+    def iter_get(self, schema: str, conditions: list, criteria: str, native_criteria: bool, batch_size: int,
+                 limit: int, skip: int, fields: list = None, sort: list = AccessDatabase.DEFAULT_SORT):
+        """
+        Get data one by one from shards, merging their cursors in the requested order
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of the shards
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of the shards
+        :type native_criteria: bool
+
+        :param batch_size: number of documents read from each shard in each batch
+        :type batch_size: int
+
+        :param limit: maximum number of elements, 0 to get all elements
+        :type limit: int
+
+        :param skip: number of elements skipped before the first one
+        :type skip: int
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :param sort: list of tuples (field, direction) with direction asc or desc, or None to not sort
+        :type sort: list
+
+        :return: generator of dictionary with data
+        :rtype: generator
+        """
+
+        # Skipped elements can be in any shard, so each shard returns them too
+        sort = AccessDatabaseSharded._get_total_sort(sort)
+        merge_fields, added_fields = AccessDatabase.get_sort_fields(fields, sort)
+        shard_limit = limit + skip if limit > 0 else 0
+        results = [shard.iter_get(schema, conditions, criteria, native_criteria, batch_size, shard_limit, 0,
+                                  merge_fields, sort)
+                   for shard in self._get_collection_shards(schema, conditions, native_criteria)]
+
+        return AccessDatabaseSharded._iter_remove_fields(
+            itertools.islice(AccessDatabaseSharded._merge(results, sort), skip, skip + limit if limit > 0 else None),
+            added_fields)
+
+    @log_function(logger, logging.DEBUG)
+    def get_page(self, schema: str, conditions: list, criteria: str, native_criteria: bool, after: int,
+                 page_size: int, order: str, fields: list = None) -> list:
+        """
+        Get a page of data from shards in parallel, merging them in order of _identifier
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of the shards
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of the shards
+        :type native_criteria: bool
+
+        :param after: last _identifier of previous page, None for the first page
+        :type after: int
+
+        :param page_size: maximum number of elements of the page
+        :type page_size: int
+
+        :param order: order of _identifier, asc or desc
+        :type order: str
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :return: list of dictionary with the page
+        :rtype: list
+        """
+
+        results = self._fan_out(self._get_collection_shards(schema, conditions, native_criteria), 'get_page', schema,
+                                conditions, criteria, native_criteria, after, page_size, order, fields)
+
+        return list(itertools.islice(AccessDatabaseSharded._merge(results, [(AccessDatabase.ID_FIELD, order)]),
+                                     page_size))
+
+    @log_function(logger, logging.DEBUG)
+    def count(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Count data in shards in parallel
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of the shards
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of the shards
+        :type native_criteria: bool
+
+        :return: list of dictionary with number of elements
+        :rtype: list
+        """
+
+        results = self._fan_out(self._get_shards(schema, conditions, native_criteria), 'count', schema, conditions,
+                                criteria, native_criteria)
+
+        return [{AccessDatabase.COUNT_FIELD: AccessDatabaseSharded._sum(results, AccessDatabase.COUNT_FIELD)}]
+
+    @log_function(logger, logging.DEBUG)
+    def exists(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Check in shards in parallel if any data matches the conditions
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of the shards
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of the shards
+        :type native_criteria: bool
+
+        :return: list of dictionary with true if any element matches
+        :rtype: list
+        """
+
+        results = self._fan_out(self._get_shards(schema, conditions, native_criteria), 'exists', schema, conditions,
+                                criteria, native_criteria)
+
+        return [{AccessDatabase.EXISTS_FIELD: any(result[0][AccessDatabase.EXISTS_FIELD] for result in results)}]
+
+    @log_function(logger, logging.DEBUG)
+    def distinct(self, schema: str, field: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Get different values of a field from shards in parallel, without repeated values
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param field: field whose values are recovered
+        :type field: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of the shards
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of the shards
+        :type native_criteria: bool
+
+        :return: list of dictionary with the field for each different value
+        :rtype: list
+        """
+
+        results = self._fan_out(self._get_shards(schema, conditions, native_criteria), 'distinct', schema, field,
+                                conditions, criteria, native_criteria)
+
+        output_list = list()
+        values = set()
+        for element in itertools.chain.from_iterable(results):
+            value = AccessDatabaseMemory._get_hashable(element[field])
+            if value not in values:
+                values.add(value)
+                output_list.append(element)
+
+        return output_list
+
+    @log_function(logger, logging.DEBUG)
+    def put(self, schema: str, data: dict, write_concern: dict = None) -> list:
+        """
+        Insert data in the shard of its _identifier
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param data: data to store in dictionary format
+        :type data: dict
+
+        :param write_concern: write concern of the shard
+        :type write_concern: dict
+
+        :return: list of dictionary with inserted _id
+        :rtype: list
+        """
+
+        return self._get_shard(schema, data[AccessDatabase.ID_FIELD]).put(schema, data, write_concern)
+
+    @log_function(logger, logging.DEBUG)
+    def put_many(self, schema: str, data_list: list, chunk_size: int, write_concern: dict = None,
+                 ordered: bool = None) -> list:
+        """
+        Insert a batch of data, sending to each shard in parallel the data of its identifiers. With ordered mode,
+        each shard stops at its first error, but other shards insert all their data
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param data_list: list of data to store in dictionary format
+        :type data_list: list
+
+        :param chunk_size: number of documents of each chunk
+        :type chunk_size: int
+
+        :param write_concern: write concern of the shards
+        :type write_concern: dict
+
+        :param ordered: stop at first error or insert the rest of documents
+        :type ordered: bool
+
+        :return: list of dictionary with first inserted _id and number of inserted elements of each chunk
+        :rtype: list
+        """
+
+        # Data of each shard, in the same order
+        shard_data = dict()
+        for data in data_list:
+            shard_data.setdefault(self._get_shard(schema, data[AccessDatabase.ID_FIELD]), list()).append(data)
+
+        self._fan_out_calls([(shard, 'put_many', (schema, shard_data_list, chunk_size, write_concern, ordered))
+                             for shard, shard_data_list in shard_data.items()])
+
+        # Result has chunks of the whole batch, as one datastore returns them
+        return [{AccessDatabase.ID_FIELD: data_list[start][AccessDatabase.ID_FIELD],
+                 AccessDatabase.INSERTED_COUNT: len(data_list[start:start + chunk_size])}
+                for start in range(0, len(data_list), chunk_size)]
+
+    @log_function(logger, logging.DEBUG)
+    def update(self, schema: str, data: dict, conditions: list, criteria: str, native_criteria: bool,
+               write_concern: dict = None) -> list:
+        """
+        Update data in shards in parallel. _identifier can not be updated, because it would move data to other shard
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param data: data to store in dictionary format
+        :type data: dict
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of the shards
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of the shards
+        :type native_criteria: bool
+
+        :param write_concern: write concern of the shards
+        :type write_concern: dict
+
+        :return: list of dictionary with number of updated elements
+        :rtype: list
+        """
+
+        if AccessDatabase.ID_FIELD in data:
+            raise DatabaseObjectException(ErrorMessages.DATA_ERROR)
+
+        # Shards without the collection are discarded before writing, so the update is not applied only in some shards
+        results = self._fan_out(self._get_collection_shards(schema, conditions, native_criteria), 'update', schema,
+                                data, conditions, criteria, native_criteria, write_concern)
+
+        return [{AccessDatabase.UPDATED_COUNT: AccessDatabaseSharded._sum(results, AccessDatabase.UPDATED_COUNT)}]
+
+    @log_function(logger, logging.DEBUG)
+    def update_many(self, schema: str, updates: list, chunk_size: int, write_concern: dict = None,
+                    ordered: bool = None) -> list:
+        """
+        Update different data, sending to each shard in parallel the updates that can reach it
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param updates: list of tuples (conditions, data)
+        :type updates: list
+
+        :param chunk_size: number of updates sent to a shard in each batch
+        :type chunk_size: int
+
+        :param write_concern: write concern of the shards
+        :type write_concern: dict
+
+        :param ordered: stop at first error or apply the rest of updates
+        :type ordered: bool
+
+        :return: list of dictionary with number of matched and updated elements
+        :rtype: list
+        """
+
+        # Updates of each shard with the collection, in the same order
+        shard_updates = dict()
+        for conditions, data in updates:
+            if AccessDatabase.ID_FIELD in data:
+                raise DatabaseObjectException(ErrorMessages.DATA_ERROR)
+            for shard in self._get_shards(schema, conditions, False):
+                shard_updates.setdefault(shard, list()).append((conditions, data))
+        collection_shards = self._filter_collection_shards(schema, list(shard_updates))
+
+        results = self._fan_out_calls([(shard, 'update_many', (schema, shard_update_list, chunk_size, write_concern,
+                                                               ordered))
+                                       for shard, shard_update_list in shard_updates.items()
+                                       if shard in collection_shards])
+
+        return [{AccessDatabase.MATCHED_COUNT: AccessDatabaseSharded._sum(results, AccessDatabase.MATCHED_COUNT),
+                 AccessDatabase.UPDATED_COUNT: AccessDatabaseSharded._sum(results, AccessDatabase.UPDATED_COUNT)}]
+
+    @log_function(logger, logging.DEBUG)
+    def remove(self, schema: str, conditions: list, criteria: str, native_criteria: bool,
+               write_concern: dict = None) -> list:
+        """
+        Delete elements from shards in parallel
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of the shards
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of the shards
+        :type native_criteria: bool
+
+        :param write_concern: write concern of the shards
+        :type write_concern: dict
+
+        :return: list of dictionary with number of deleted elements
+        :rtype: list
+        """
+
+        results = self._fan_out(self._get_shards(schema, conditions, native_criteria), 'remove', schema, conditions,
+                                criteria, native_criteria, write_concern)
+
+        return [{AccessDatabase.DELETED_COUNT: AccessDatabaseSharded._sum(results, AccessDatabase.DELETED_COUNT)}]
+
+    def open_connection(self) -> None:
+        """
+        Open connection of all shards
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        for shard in self.shards:
+            shard.open_connection()
+        self.connection = [shard.connection for shard in self.shards]
+
+        # Threads are stopped when connection is closed, so they are created again
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=len(self.shards),
+                                               thread_name_prefix=MODULE_NAME + '_shard')
+
+    def close_connection(self) -> None:
+        """
+        Close connection of all shards and stop threads that send requests to them
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        for shard in self.shards:
+            shard.close_connection()
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def check_connection(self) -> bool:
+        """
+        Check connection of all shards
+
+        :return: true if connection of all shards is alive
+        :rtype: bool
+        """
+
+        return all(self._fan_out(self.shards, 'check_connection'))
+
+    def get_last_index(self, schema: str, sub_schema: str) -> int:
+        """
+        Recover last index of a collection, from all shards
+
+        :param schema: schema to search
+        :type schema: str
+
+        :param sub_schema: sub_schema to search
+        :type sub_schema: str
+
+        :return: last inserted index of schema_collection
+        :rtype: int
+        """
+
+        return max(self._fan_out(self.shards, 'get_last_index', schema, sub_schema))
+
+    def update_index(self, schema_collection_index: str, value: int) -> None:
+        """
+        Update index of a collection in its shard
+
+        :param schema_collection_index: collection index
+        :type schema_collection_index: str
+
+        :param value: value of index
+        :type value: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self._get_shard(schema_collection_index, None).update_index(schema_collection_index, value)
+
+    def reserve_index(self, schema: str, sub_schema: str, block_size: int) -> int:
+        """
+        Reserve atomically a block of identifiers in the shard of the collection index. The first time, counter is
+        initialized with last identifier of all shards
+
+        :param schema: schema to reserve
+        :type schema: str
+
+        :param sub_schema: sub_schema to reserve
+        :type sub_schema: str
+
+        :param block_size: number of identifiers to reserve
+        :type block_size: int
+
+        :return: last identifier of the reserved block
+        :rtype: int
+        """
+
+        schema_collection_index = self.get_schema_collection_index(schema, sub_schema)
+
+        with self.seeded_lock:
+            if schema_collection_index not in self.seeded_indexes:
+                self.update_index(schema_collection_index, self.get_last_index(schema, sub_schema))
+                self.seeded_indexes.add(schema_collection_index)
+
+        return self._get_shard(schema_collection_index, None).reserve_index(schema, sub_schema, block_size)
+
+    def set_read_options(self, schema: str, raw_documents: bool) -> None:
+        """
+        Set how objects of a collection are read from all shards
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param raw_documents: objects are returned as read-only mappings instead of dict
+        :type raw_documents: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        for shard in self.shards:
+            shard.set_read_options(schema, raw_documents)
+
+    def set_compression_options(self, schema: str, fields: list, min_size: int) -> None:
+        """
+        Set fields of a collection that are stored compressed in all shards
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param fields: fields that are always compressed
+        :type fields: list
+
+        :param min_size: fields bigger than this size in bytes are compressed too, 0 to compress only selected fields
+        :type min_size: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        for shard in self.shards:
+            shard.set_compression_options(schema, fields, min_size)
+
+    def get_compression_stats(self) -> dict:
+        """
+        Get sizes of compressed fields of each collection, added from all shards
+
+        :return: number of compressed fields, and size before and after compression, of each collection
+        :rtype: dict
+        """
+
+        stats = dict()
+        for shard in self.shards:
+            for schema, shard_stats in shard.get_compression_stats().items():
+                schema_stats = stats.setdefault(schema, dict())
+                for key, value in shard_stats.items():
+                    schema_stats[key] = schema_stats.get(key, 0) + value
+
+        return stats
+
+    def set_write_options(self, schema: str, write_concern: dict, ordered: bool) -> None:
+        """
+        Set default write options of a collection in all shards
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param write_concern: write concern of writes (w, j, wtimeout), or None to use default of the database
+        :type write_concern: dict
+
+        :param ordered: batches stop at first error (True) or not (False), or None to use default of each method
+        :type ordered: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        for shard in self.shards:
+            shard.set_write_options(schema, write_concern, ordered)
+
+    def set_time_buckets(self, schema: str, bucket_size: str) -> None:
+        """
+        Partition a collection by time in all shards
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param bucket_size: day, week or month
+        :type bucket_size: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        for shard in self.shards:
+            shard.set_time_buckets(schema, bucket_size)
+
+    def set_hot_window(self, schema: str, documents: int, seconds: float) -> None:
+        """
+        Set window of hot tier of a collection in all shards. Each shard keeps its own window of documents
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param documents: maximum number of recent documents in hot tier of each shard, 0 if there is no limit
+        :type documents: int
+
+        :param seconds: maximum age in seconds of documents in hot tier, 0 if there is no limit
+        :type seconds: float
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        for shard in self.shards:
+            shard.set_hot_window(schema, documents, seconds)
+
+    def get_tier_stats(self) -> dict:
+        """
+        Get reads served by hot tier (hits) and reads that needed cold tier (misses) of each collection, added from
+        all shards
+
+        :return: hits, misses, hit rate, number of documents in hot tier and watermark of each collection
+        :rtype: dict
+        """
+
+        stats = dict()
+        for shard in self.shards:
+            for schema, shard_stats in shard.get_tier_stats().items():
+                AccessDatabaseTiered._add_tier_stats(stats, schema, shard_stats)
+
+        return stats
+
+    def ensure_indexes(self, schema: str, indexes: list) -> None:
+        """
+        Create indexes of a collection in all shards. Unique indexes are only unique in each shard
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param indexes: list of DatabaseObjectIndex
+        :type indexes: list
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self._fan_out(self.shards, 'ensure_indexes', schema, indexes)
+
+    def _drop_collection(self, schema: str) -> None:
+        """
+        Drop collection from all shards
+
+        :param schema: name of collection
+        :type schema: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        for shard in self.shards:
+            shard._drop_collection(schema)
+        with self.collection_lock:
+            self.collection_shards.pop(schema, None)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        """
+        Get position of a key in the hash ring. It is the same in all processes
+
+        :param key: key to hash
+        :type key: str
+
+        :return: position in the hash ring
+        :rtype: int
+        """
+
+        return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+    def _get_shard(self, schema: str, identifier: int) -> AccessDatabase:
+        """
+        Get shard of an identifier of a collection, the first point of the hash ring after the range of identifier
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param identifier: identifier, or None to get shard of the collection
+        :type identifier: int
+
+        :return: shard
+        :rtype: AccessDatabase
+        """
+
+        key = schema if identifier is None or self.range_size == 0 else \
+            '{}#{}'.format(schema, identifier // self.range_size)
+        position = bisect(self.ring_hashes, AccessDatabaseSharded._hash(key)) % len(self.ring_hashes)
+
+        return self.shards[self.ring_shards[position]]
+
+    def _get_shards(self, schema: str, conditions: list, native_criteria: bool) -> list:
+        """
+        Get shards that conditions on _identifier can reach
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param conditions: list of tuple of conditions
+        :type conditions: list
+
+        :param native_criteria: boolean for search by native criteria. Native criteria reaches all shards
+        :type native_criteria: bool
+
+        :return: list of shards
+        :rtype: list
+        """
+
+        if self.range_size == 0:
+            return [self._get_shard(schema, None)]
+        if native_criteria:
+            return self.shards
+
+        # Identifiers, or bounds of identifiers, of the conditions
+        identifiers = None
+        lower = upper = None
+        for field, operator_condition, value in conditions:
+            if field != AccessDatabase.ID_FIELD or not isinstance(value, (int, list, tuple)) or \
+                    isinstance(value, bool):
+                continue
+
+            # Datastores ignore a zero or negative _identifier, so the condition matches all identifiers
+            if isinstance(value, int) and value <= 0:
+                continue
+            if operator_condition == '=':
+                identifiers = {value}
+            elif operator_condition == 'in' and identifiers is None:
+                identifiers = set(value)
+            elif operator_condition in ('>', '>='):
+                lower = max(lower, value) if lower is not None else value
+            elif operator_condition in ('<', '<='):
+                upper = min(upper, value) if upper is not None else value
+
+        if identifiers is None and lower is not None and upper is not None and \
+                upper // self.range_size - lower // self.range_size < self.MAX_ROUTED_RANGES:
+            identifiers = range(lower // self.range_size * self.range_size, upper + 1, self.range_size)
+        if identifiers is None:
+            return self.shards
+
+        # Shards in the same order as in the list of shards
+        shards = {self._get_shard(schema, identifier) for identifier in identifiers
+                  if isinstance(identifier, int) and not isinstance(identifier, bool)}
+        return [shard for shard in self.shards if shard in shards]
+
+    def _get_collection_shards(self, schema: str, conditions: list, native_criteria: bool) -> list:
+        """
+        Get shards that conditions on _identifier can reach and have documents of the collection
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param conditions: list of tuple of conditions
+        :type conditions: list
+
+        :param native_criteria: boolean for search by native criteria. Native criteria reaches all shards
+        :type native_criteria: bool
+
+        :return: list of shards
+        :rtype: list
+        """
+
+        return self._filter_collection_shards(schema, self._get_shards(schema, conditions, native_criteria))
+
+    def _filter_collection_shards(self, schema: str, shards: list) -> list:
+        """
+        Discard shards without documents of a collection. Shards with documents are remembered, and the rest are
+        checked again in each call, because other processes can insert documents in them
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param shards: list of shards
+        :type shards: list
+
+        :return: list of shards with documents of the collection, in the same order
+        :rtype: list
+        """
+
+        with self.collection_lock:
+            known_shards = set(self.collection_shards.get(schema, set()))
+        unknown_shards = [shard for shard in shards if shard not in known_shards]
+
+        # A shard without the collection has no documents
+        if len(unknown_shards) > 0:
+            results = self._fan_out(unknown_shards, 'exists', schema, [], '', False)
+            new_shards = {shard for shard, result in zip(unknown_shards, results)
+                          if result[0][AccessDatabase.EXISTS_FIELD]}
+            with self.collection_lock:
+                self.collection_shards.setdefault(schema, set()).update(new_shards)
+            known_shards |= new_shards
+
+        return [shard for shard in shards if shard in known_shards]
+
+    def _fan_out(self, shards: list, function_name: str, *args) -> list:
+        """
+        Call the same function of several shards in parallel
+
+        :param shards: list of shards
+        :type shards: list
+
+        :param function_name: name of the function of AccessDatabase
+        :type function_name: str
+
+        :param args: arguments of the function
+        :type args: tuple
+
+        :return: result of each shard, in the same order
+        :rtype: list
+        """
+
+        return self._fan_out_calls([(shard, function_name, args) for shard in shards])
+
+    def _fan_out_calls(self, calls: list) -> list:
+        """
+        Call functions of shards in parallel. If any call fails, the exception is raised after all calls finish
+
+        :param calls: list of tuples (shard, name of the function, arguments)
+        :type calls: list
+
+        :return: result of each call, in the same order
+        :rtype: list
+        """
+
+        # A single call does not need another thread
+        if len(calls) == 1:
+            shard, function_name, args = calls[0]
+            return [getattr(shard, function_name)(*args)]
+
+        futures = [self.executor.submit(getattr(shard, function_name), *args) for shard, function_name, args in calls]
+        results = list()
+        exception = None
+        for future in futures:
+            try:
+                results.append(future.result())
+            except DatabaseObjectException as e:
+                exception = e if exception is None else exception
+
+        if exception is not None:
+            raise exception
+
+        return results
+
+    @staticmethod
+    def _sum(results: list, field: str) -> int:
+        """
+        Add a counter of results of shards
+
+        :param results: list of results, each one a list with a dictionary
+        :type results: list
+
+        :param field: name of the counter
+        :type field: str
+
+        :return: sum of counters, None if any shard has not returned it (unacknowledged writes)
+        :rtype: int
+        """
+
+        values = [result[0][field] for result in results]
+
+        return None if None in values else sum(values)
+
+    @staticmethod
+    def _get_total_sort(sort: list) -> list:
+        """
+        Add _timestamp to a sort, so documents with equal fields are in the same order in all shards and they can be
+        merged
+
+        :param sort: list of tuples (field, direction), or None to not sort
+        :type sort: list
+
+        :return: list of tuples (field, direction), or None to not sort
+        :rtype: list
+        """
+
+        if sort is None or AccessDatabase.TIMESTAMP_FIELD in (field for field, direction in sort):
+            return sort
+
+        return list(sort) + [(AccessDatabase.TIMESTAMP_FIELD, AccessDatabase.ORDER_ASCENDING)]
+
+    @staticmethod
+    def _iter_remove_fields(documents, added_fields: list):
+        """
+        Remove fields added to merge documents, one by one
+
+        :param documents: iterator of documents
+        :type documents: iterator
+
+        :param added_fields: fields to remove
+        :type added_fields: list
+
+        :return: iterator of documents
+        :rtype: iterator
+        """
+
+        if len(added_fields) == 0:
+            return documents
+
+        return (AccessDatabase.remove_fields([document], added_fields)[0] for document in documents)
+
+    @staticmethod
+    def _merge(results: list, sort: list):
+        """
+        Merge documents of shards, each one sorted, in the same order
+
+        :param results: list of iterables of documents
+        :type results: list
+
+        :param sort: list of tuples (field, direction), or None to not sort
+        :type sort: list
+
+        :return: iterator of documents
+        :rtype: iterator
+        """
+
+        if sort is None or len(results) == 1:
+            return itertools.chain.from_iterable(results)
+
+        def compare(document: dict, document_compare: dict) -> int:
+            for field, direction in sort:
+                key = AccessDatabaseMemory._get_sort_key(document.get(field))
+                key_compare = AccessDatabaseMemory._get_sort_key(document_compare.get(field))
+                if key != key_compare:
+                    less = key < key_compare
+                    return -1 if less == (direction != AccessDatabase.ORDER_DESCENDING) else 1
+            return 0
+
+        return heapq.merge(*results, key=functools.cmp_to_key(compare))
@@ -0,0 +1,1392 @@
+import json
+import logging
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from common.tools.decorators import log_function
+from database_object_module import MODULE_NAME
+from database_object_module.data_model import DatabaseObjectException, DatabaseObjectIndex, ErrorMessages
+from database_object_module.impl.access_database import AccessDatabase
+
+logger = logging.getLogger(MODULE_NAME)
+
+
+class AccessDatabaseSQLite(AccessDatabase):
+    """
+    Class to define the access to an embedded SQLite datastore. Each collection is a table with _identifier and
+    _timestamp columns and the rest of the document in a JSON column, searched with JSON1 functions. Native criteria
+    is a SQL expression over these columns
+    """
+
+    # Prefix of connection url. Path of the file follows it, or nothing to keep data in memory
+    SQLITE_URL_PREFIX = 'sqlite:///'
+    SQLITE_MEMORY = ':memory:'
+
+    # Column with the document and table with the index of each collection
+    DOCUMENT_COLUMN = 'document'
+    INDEX_TABLE = '_collection_index'
+
+    # Operators of conditions over _identifier and _timestamp columns
+    SQLITE_OPERATORS = {'=': '=', '>': '>', '>=': '>=', '<': '<', '<=': '<=', '!=': '!='}
+
+    # Types of JSON1 that are compared with each type of value
+    SQLITE_JSON_TYPES = {bool: ('true', 'false'), int: ('integer', 'real'), float: ('integer', 'real'),
+                         str: ('text',)}
+
+    # Order of JSON1 types when documents are sorted, as in MongoDB
+    SQLITE_SORT_TYPE_ORDER = (('integer', 1), ('real', 1), ('text', 2), ('object', 3), ('array', 4), ('true', 6),
+                              ('false', 6))
+
+    # Valid names of fields without quotes in JSON paths
+    SQLITE_PATH_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+    def __init__(self, connection_url: str) -> None:
+        """
+        Constructor with the file of the datastore
+
+        :param connection_url: sqlite:///relative/path, sqlite:////absolute/path or sqlite:/// to keep data in memory
+        :type connection_url: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        AccessDatabase.__init__(self, connection_url)
+
+        # Tables that exist in the datastore
+        self.tables = set()
+
+        # Secondary indexes declared for each collection
+        self.declared_indexes = dict()
+
+        # Connection is shared by all threads, so only one operation is executed at a time
+        self.lock = threading.RLock()
+
+        self.open_connection()
+
+    @log_function(logger, logging.DEBUG)
+    def get(self, schema: str, conditions: list, criteria: str, native_criteria: bool, fields: list = None,
+            sort: list = AccessDatabase.DEFAULT_SORT, limit: int = 0) -> list:
+        """
+        Get data from sqlite
+
+        :param schema: schema (name of table in sqlite)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: SQL expression over columns _identifier, _timestamp and document
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria from sqlite
+        :type native_criteria: bool
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :param sort: list of tuples (field, direction) with direction asc or desc, or None to not sort
+        :type sort: list
+
+        :param limit: maximum number of elements, 0 to get all elements
+        :type limit: int
+
+        :return: list of dictionary with data
+        :rtype: list
+        """
+
+        try:
+            rows = self._select(schema, conditions, criteria, native_criteria, sort, limit, 0)
+
+            return [AccessDatabaseSQLite._create_document(row, fields) for row in rows]
+
+        except sqlite3.DatabaseError as e:
+            raise AccessDatabaseSQLite._create_exception(e, ErrorMessages.GET_ERROR)
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def iter_get(self, schema: str, conditions: list, criteria: str, native_criteria: bool, batch_size: int,
+                 limit: int, skip: int, fields: list = None, sort: list = AccessDatabase.DEFAULT_SORT):
+        """
+        Get data from sqlite one by one. Rows are read at once, because the connection is shared, and documents are
+        decoded when they are generated
+
+        :param schema: schema (name of table in sqlite)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: SQL expression over columns _identifier, _timestamp and document
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria from sqlite
+        :type native_criteria: bool
+
+        :param batch_size: not used, rows are read at once
+        :type batch_size: int
+
+        :param limit: maximum number of documents, 0 if there is no limit
+        :type limit: int
+
+        :param skip: number of documents skipped before the first one
+        :type skip: int
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :param sort: list of tuples (field, direction) with direction asc or desc, or None to not sort
+        :type sort: list
+
+        :return: generator of dictionary with data
+        :rtype: generator
+        """
+
+        try:
+            rows = self._select(schema, conditions, criteria, native_criteria, sort, limit, skip)
+
+            return (AccessDatabaseSQLite._create_document(row, fields) for row in rows)
+
+        except sqlite3.DatabaseError as e:
+            raise AccessDatabaseSQLite._create_exception(e, ErrorMessages.GET_ERROR)
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def get_page(self, schema: str, conditions: list, criteria: str, native_criteria: bool, after: int,
+                 page_size: int, order: str, fields: list = None) -> list:
+        """
+        Get a page of data from sqlite using the primary key of _identifier to seek after previous page
+
+        :param schema: schema (name of table in sqlite)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: SQL expression over columns _identifier, _timestamp and document
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria from sqlite
+        :type native_criteria: bool
+
+        :param after: last _identifier of previous page, None for the first page
+        :type after: int
+
+        :param page_size: maximum number of elements of the page
+        :type page_size: int
+
+        :param order: order of _identifier, asc or desc
+        :type order: str
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :return: list of dictionary with the page
+        :rtype: list
+        """
+
+        try:
+            # Seek condition is added if it is not the first page
+            seek_operator = '>' if order == AccessDatabase.ORDER_ASCENDING else '<'
+            if after is not None:
+                conditions = list(conditions) + [(AccessDatabase.ID_FIELD, seek_operator, after)]
+
+            rows = self._select(schema, conditions, criteria, native_criteria, [(AccessDatabase.ID_FIELD, order)],
+                                page_size, 0)
+
+            return [AccessDatabaseSQLite._create_document(row, fields) for row in rows]
+
+        except sqlite3.DatabaseError as e:
+            raise AccessDatabaseSQLite._create_exception(e, ErrorMessages.GET_ERROR)
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def count(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Count data in sqlite
+
+        :param schema: schema (name of table in sqlite)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: SQL expression over columns _identifier, _timestamp and document
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria from sqlite
+        :type native_criteria: bool
+
+        :return: list of dictionary with number of elements
+        :rtype: list
+        """
+
+        try:
+            with self.lock:
+                table = self._get_table(schema)
+                sqlite_where, parameters = AccessDatabaseSQLite._create_sqlite_criteria(conditions, criteria,
+                                                                                        native_criteria)
+                sqlite_query = 'SELECT COUNT(*) FROM {} WHERE {}'.format(table, sqlite_where)
+                count = self.connection.execute(sqlite_query, parameters).fetchone()[0]
+
+            return [{AccessDatabase.COUNT_FIELD: count}]
+
+        except sqlite3.DatabaseError as e:
+            raise AccessDatabaseSQLite._create_exception(e, ErrorMessages.GET_ERROR)
+        except Exception as e:
+            # If there is SCHEMA_ERROR, this is not an error because schema does not exist. Only log warning
+            if str(e) == ErrorMessages.SCHEMA_ERROR:
+                logger.warning('Schema or subschema does not exist')
+                return [{AccessDatabase.COUNT_FIELD: 0}]
+            else:
+                raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def exists(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Check if any data in sqlite matches the conditions, stopping at the first one
+
+        :param schema: schema (name of table in sqlite)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: SQL expression over columns _identifier, _timestamp and document
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria from sqlite
+        :type native_criteria: bool
+
+        :return: list of dictionary with true if any element matches
+        :rtype: list
+        """
+
+        try:
+            with self.lock:
+                table = self._get_table(schema)
+                sqlite_where, parameters = AccessDatabaseSQLite._create_sqlite_criteria(conditions, criteria,
+                                                                                        native_criteria)
+                sqlite_query = 'SELECT 1 FROM {} WHERE {} LIMIT 1'.format(table, sqlite_where)
+                exists = self.connection.execute(sqlite_query, parameters).fetchone() is not None
+
+            return [{AccessDatabase.EXISTS_FIELD: exists}]
+
+        except sqlite3.DatabaseError as e:
+            raise AccessDatabaseSQLite._create_exception(e, ErrorMessages.GET_ERROR)
+        except Exception as e:
+            # If there is SCHEMA_ERROR, this is not an error because schema does not exist. Only log warning
+            if str(e) == ErrorMessages.SCHEMA_ERROR:
+                logger.warning('Schema or subschema does not exist')
+                return [{AccessDatabase.EXISTS_FIELD: False}]
+            else:
+                raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def distinct(self, schema: str, field: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Get different values of a field in sqlite
+
+        :param schema: schema (name of table in sqlite)
+        :type schema: str
+
+        :param field: field whose values are recovered
+        :type field: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: SQL expression over columns _identifier, _timestamp and document
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria from sqlite
+        :type native_criteria: bool
+
+        :return: list of dictionary with the field for each different value
+        :rtype: list
+        """
+
+        try:
+            with self.lock:
+                table = self._get_table(schema)
+                sqlite_where, parameters = AccessDatabaseSQLite._create_sqlite_criteria(conditions, criteria,
+                                                                                        native_criteria)
+
+                # Values are selected with their type, so booleans, lists and dictionaries can be recovered
+                sqlite_value = AccessDatabaseSQLite._create_sqlite_field(field)
+                sqlite_type = AccessDatabaseSQLite._create_sqlite_type(field)
+                sqlite_query = 'SELECT DISTINCT {}, {} FROM {} WHERE {} AND {} IS NOT NULL'.format(
+                    sqlite_value, sqlite_type, table, sqlite_where, sqlite_type)
+                rows = self.connection.execute(sqlite_query, parameters).fetchall()
+
+            return [{field: AccessDatabaseSQLite._load_value(value, value_type)} for value, value_type in rows]
+
+        except sqlite3.DatabaseError as e:
+            raise AccessDatabaseSQLite._create_exception(e, ErrorMessages.GET_ERROR)
+        except Exception as e:
+            # If there is SCHEMA_ERROR, this is not an error because schema does not exist. Only log warning
+            if str(e) == ErrorMessages.SCHEMA_ERROR:
+                logger.warning('Schema or subschema does not exist')
+                return list()
+            else:
+                raise DatabaseObjectException(ErrorMessages.GET_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def put(self, schema: str, data: dict, write_concern: dict = None) -> list:
+        """
+        Insert data in sqlite
+
+        :param schema: schema (name of table in sqlite)
+        :type schema: str
+
+        :param data: data to store in dictionary format
+        :type data: dict
+
+        :param write_concern: not used, writes are always committed
+        :type write_concern: dict
+
+        :return: list of dictionary with inserted _id
+        :rtype: list
+        """
+
+        try:
+            with self.lock:
+                table = self._get_table(schema, create_table=True)
+                with self._transaction():
+                    self.connection.execute(AccessDatabaseSQLite._create_sqlite_insert(table),
+                                            AccessDatabaseSQLite._create_row(data))
+
+            return [{AccessDatabase.ID_FIELD: data[AccessDatabase.ID_FIELD]}]
+
+        except sqlite3.DatabaseError as e:
+            raise AccessDatabaseSQLite._create_exception(e, ErrorMessages.PUT_ERROR)
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def put_many(self, schema: str, data_list: list, chunk_size: int, write_concern: dict = None,
+                 ordered: bool = None) -> list:
+        """
+        Insert a batch of data in sqlite, with one transaction for each chunk
+
+        :param schema: schema (name of table in sqlite)
+        :type schema: str
+
+        :param data_list: list of data to store in dictionary format
+        :type data_list: list
+
+        :param chunk_size: number of documents of each transaction
+        :type chunk_size: int
+
+        :param write_concern: not used, writes are always committed
+        :type write_concern: dict
+
+        :param ordered: stop at first error (True, by default) or insert the rest of documents (False)
+        :type ordered: bool
+
+        :return: list of dictionary with first inserted _id and number of inserted elements of each chunk
+        :rtype: list
+        """
+
+        output_list = list()
+
+        try:
+            ordered = True if ordered is None else ordered
+            error = None
+
+            with self.lock:
+                table = self._get_table(schema, create_table=True)
+                sqlite_insert = AccessDatabaseSQLite._create_sqlite_insert(table)
+
+                for start in range(0, len(data_list), chunk_size):
+                    rows = [AccessDatabaseSQLite._create_row(data) for data in data_list[start:start + chunk_size]]
+
+                    # Chunk is inserted at once. If any row fails, chunk is inserted again row by row, so the rest of
+                    # rows are inserted as mongodb does
+                    try:
+                        with self._transaction():
+                            self.connection.executemany(sqlite_insert, rows)
+                    except sqlite3.IntegrityError as e:
+                        error = e
+                        with self._transaction():
+                            for row in rows:
+                                try:
+                                    self.connection.execute(sqlite_insert, row)
+                                except sqlite3.IntegrityError:
+                                    if ordered:
+                                        break
+
+                    output_list.append({AccessDatabase.ID_FIELD: data_list[start][AccessDatabase.ID_FIELD],
+                                        AccessDatabase.INSERTED_COUNT: len(rows)})
+
+                    if error is not None and ordered:
+                        break
+
+            if error is not None:
+                raise error
+
+            return output_list
+
+        except sqlite3.DatabaseError as e:
+            raise AccessDatabaseSQLite._create_exception(e, ErrorMessages.PUT_ERROR)
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def update(self, schema: str, data: dict, conditions: list, criteria: str, native_criteria: bool,
+               write_concern: dict = None) -> list:
+        """
+        Update data in sqlite
+
+        :param schema: schema (name of table in sqlite)
+        :type schema: str
+
+        :param data: data to store in dictionary format
+        :type data: dict
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: SQL expression over columns _identifier, _timestamp and document
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria from sqlite
+        :type native_criteria: bool
+
+        :param write_concern: not used, writes are always committed
+        :type write_concern: dict
+
+        :return: list of dictionary with number of updated elements
+        :rtype: list
+        """
+
+        try:
+            with self.lock:
+                table = self._get_table(schema)
+                with self._transaction():
+                    modified_count = self._update_rows(table, data, conditions, criteria, native_criteria)[1]
+
+            return [{AccessDatabase.UPDATED_COUNT: modified_count}]
+
+        except sqlite3.DatabaseError as e:
+            raise AccessDatabaseSQLite._create_exception(e, ErrorMessages.PUT_ERROR)
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def update_many(self, schema: str, updates: list, chunk_size: int, write_concern: dict = None,
+                    ordered: bool = None) -> list:
+        """
+        Update different data in sqlite, with one transaction for each chunk of updates
+
+        :param schema: schema (name of table in sqlite)
+        :type schema: str
+
+        :param updates: list of tuples (conditions, data)
+        :type updates: list
+
+        :param chunk_size: number of updates of each transaction
+        :type chunk_size: int
+
+        :param write_concern: not used, writes are always committed
+        :type write_concern: dict
+
+        :param ordered: stop at first error (True) or apply the rest of updates (False, by default)
+        :type ordered: bool
+
+        :return: list of dictionary with number of matched and updated elements
+        :rtype: list
+        """
+
+        try:
+            matched_count = 0
+            modified_count = 0
+            error = None
+
+            with self.lock:
+                table = self._get_table(schema)
+
+                for start in range(0, len(updates), chunk_size):
+                    with self._transaction():
+                        for conditions, data in updates[start:start + chunk_size]:
+                            try:
+                                counts = self._update_rows(table, data, conditions, '', False)
+                                matched_count += counts[0]
+                                modified_count += counts[1]
+                            except sqlite3.IntegrityError as e:
+                                error = e
+                                if ordered:
+                                    break
+
+                    if error is not None and ordered:
+                        break
+
+            if error is not None:
+                raise error
+
+            return [{AccessDatabase.MATCHED_COUNT: matched_count, AccessDatabase.UPDATED_COUNT: modified_count}]
+
+        except sqlite3.DatabaseError as e:
+            raise AccessDatabaseSQLite._create_exception(e, ErrorMessages.PUT_ERROR)
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.PUT_ERROR)
+
+    @log_function(logger, logging.DEBUG)
+    def remove(self, schema: str, conditions: list, criteria: str, native_criteria: bool,
+               write_concern: dict = None) -> list:
+        """
+        Delete elements from sqlite
+
+        :param schema: schema (name of table in sqlite)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: SQL expression over columns _identifier, _timestamp and document
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria from sqlite
+        :type native_criteria: bool
+
+        :param write_concern: not used, writes are always committed
+        :type write_concern: dict
+
+        :return: list of dictionary with number of deleted elements
+        :rtype: list
+        """
+
+        try:
+            with self.lock:
+                table = self._get_table(schema)
+                sqlite_where, parameters = AccessDatabaseSQLite._create_sqlite_criteria(conditions, criteria,
+                                                                                        native_criteria)
+                with self._transaction():
+                    sqlite_result = self.connection.execute('DELETE FROM {} WHERE {}'.format(table, sqlite_where),
+                                                            parameters)
+
+            return [{AccessDatabase.DELETED_COUNT: sqlite_result.rowcount}]
+
+        except sqlite3.DatabaseError as e:
+            raise AccessDatabaseSQLite._create_exception(e, ErrorMessages.REMOVE_ERROR)
+        except Exception as e:
+            # If there is SCHEMA_ERROR, this is not an error because schema does not exist. Only log warning
+            if str(e) == ErrorMessages.SCHEMA_ERROR:
+                logger.warning('Schema or subschema does not exist')
+                return [{AccessDatabase.DELETED_COUNT: 0}]
+            else:
+                raise DatabaseObjectException(ErrorMessages.REMOVE_ERROR)
+
+    def open_connection(self) -> None:
+        """
+        Open the file of the datastore in WAL mode, so readers of other processes do not block writers
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        try:
+            with self.lock:
+                connection_url = self.connection_url if self.connection_url is not None else ''
+                path = connection_url[len(AccessDatabaseSQLite.SQLITE_URL_PREFIX):] \
+                    if connection_url.startswith(AccessDatabaseSQLite.SQLITE_URL_PREFIX) else connection_url
+
+                # Transactions are opened explicitly, so the connection is in autocommit mode
+                self.connection = sqlite3.connect(path or AccessDatabaseSQLite.SQLITE_MEMORY, isolation_level=None,
+                                                  check_same_thread=False)
+                self.connection.execute('PRAGMA journal_mode = WAL')
+                self.connection.execute('PRAGMA synchronous = NORMAL')
+                self.connection.execute('CREATE TABLE IF NOT EXISTS {} (name TEXT PRIMARY KEY, {} INTEGER NOT NULL)'
+                                        .format(AccessDatabaseSQLite.INDEX_TABLE, AccessDatabase.ID_FIELD))
+
+                rows = self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+                self.tables = {AccessDatabaseSQLite._quote(name) for name, in rows}
+
+        except sqlite3.Error:
+            raise DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+
+    def close_connection(self) -> None:
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+    def check_connection(self) -> bool:
+        """
+        Check if the datastore can be read
+
+        :return: true if the datastore is connected
+        :rtype: bool
+        """
+
+        try:
+            with self.lock:
+                self.connection.execute('SELECT 1')
+            return True
+
+        except Exception:
+            return False
+
+    def get_last_index(self, schema: str, sub_schema: str) -> int:
+        """
+        Recover last index from the table and from the index of the collection
+
+        :param schema: schema to search
+        :type schema: str
+
+        :param sub_schema: sub_schema to search
+        :type sub_schema: str
+
+        :return: last inserted index of schema_collection
+        :rtype: int
+        """
+
+        schema_collection = self.get_schema_collection(schema, sub_schema)
+        schema_collection_index = self.get_schema_collection_index(schema, sub_schema)
+
+        try:
+            with self.lock:
+                table = self._get_table(schema_collection, create_table=True)
+                return self._get_last_index(table, schema_collection_index)
+
+        except sqlite3.DatabaseError as e:
+            raise AccessDatabaseSQLite._create_exception(e, ErrorMessages.GET_INDEX_ERROR)
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.GET_INDEX_ERROR)
+
+    def update_index(self, schema_collection_index: str, value: int) -> None:
+        """
+        Update index of a collection. Index never goes backwards, even if another process has reserved more
+
+        :param schema_collection_index: collection index
+        :type schema_collection_index: str
+
+        :param value: value of index
+        :type value: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        try:
+            with self.lock:
+                with self._transaction():
+                    self.connection.execute('INSERT INTO {0} (name, {1}) VALUES (?, ?) ON CONFLICT (name) DO UPDATE '
+                                            'SET {1} = MAX({1}, excluded.{1})'
+                                            .format(AccessDatabaseSQLite.INDEX_TABLE, AccessDatabase.ID_FIELD),
+                                            (schema_collection_index, value))
+
+        except sqlite3.DatabaseError as e:
+            raise AccessDatabaseSQLite._create_exception(e, ErrorMessages.UPDATE_INDEX_ERROR)
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.UPDATE_INDEX_ERROR)
+
+    def reserve_index(self, schema: str, sub_schema: str, block_size: int) -> int:
+        """
+        Reserve atomically a block of identifiers incrementing index of the collection. The transaction locks the
+        datastore, so other processes can not reserve the same block
+
+        :param schema: schema to reserve
+        :type schema: str
+
+        :param sub_schema: sub_schema to reserve
+        :type sub_schema: str
+
+        :param block_size: number of identifiers to reserve
+        :type block_size: int
+
+        :return: last identifier of the reserved block
+        :rtype: int
+        """
+
+        schema_collection = self.get_schema_collection(schema, sub_schema)
+        schema_collection_index = self.get_schema_collection_index(schema, sub_schema)
+
+        try:
+            with self.lock:
+                table = self._get_table(schema_collection, create_table=True)
+                with self._transaction():
+                    last_index = self._get_last_index(table, schema_collection_index) + block_size
+                    self.connection.execute('INSERT OR REPLACE INTO {} (name, {}) VALUES (?, ?)'
+                                            .format(AccessDatabaseSQLite.INDEX_TABLE, AccessDatabase.ID_FIELD),
+                                            (schema_collection_index, last_index))
+
+            return last_index
+
+        except sqlite3.DatabaseError as e:
+            raise AccessDatabaseSQLite._create_exception(e, ErrorMessages.UPDATE_INDEX_ERROR)
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.UPDATE_INDEX_ERROR)
+
+    def set_read_options(self, schema: str, raw_documents: bool) -> None:
+        """
+        Documents are always decoded from JSON, so read options are ignored
+
+        :param schema: schema (name of table in sqlite)
+        :type schema: str
+
+        :param raw_documents: not used
+        :type raw_documents: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        pass
+
+    def set_compression_options(self, schema: str, fields: list, min_size: int) -> None:
+        """
+        Documents are stored as JSON text, so compression options are ignored
+
+        :param schema: schema (name of table in sqlite)
+        :type schema: str
+
+        :param fields: not used
+        :type fields: list
+
+        :param min_size: not used
+        :type min_size: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        pass
+
+    def get_compression_stats(self) -> dict:
+        """
+        Documents are never compressed
+
+        :return: empty dictionary
+        :rtype: dict
+        """
+
+        return dict()
+
+    def set_write_options(self, schema: str, write_concern: dict, ordered: bool) -> None:
+        """
+        Writes are always committed and batches use the default mode of each method, so write options are ignored
+
+        :param schema: schema (name of table in sqlite)
+        :type schema: str
+
+        :param write_concern: not used
+        :type write_concern: dict
+
+        :param ordered: not used
+        :type ordered: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        pass
+
+    def ensure_indexes(self, schema: str, indexes: list) -> None:
+        """
+        Declare secondary indexes of a collection. If the table exists, indexes are reconciled now: missing indexes
+        are created and indexes with same name but different definition are rebuilt
+
+        :param schema: schema (name of table in sqlite)
+        :type schema: str
+
+        :param indexes: list of DatabaseObjectIndex
+        :type indexes: list
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        try:
+            with self.lock:
+                self.declared_indexes[schema] = list(indexes)
+
+                # If table does not exist, indexes will be created with it
+                table = AccessDatabaseSQLite._quote(schema)
+                if table in self.tables:
+                    with self._transaction():
+                        self._create_indexes(schema, table)
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.INDEX_ERROR)
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Execute statements in a transaction, that is committed at the end or rolled back if there is an error. Lock
+        must be acquired
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.connection.execute('COMMIT')
+
+    def _get_table(self, schema: str, create_table: bool = False) -> str:
+        """
+        Get the quoted name of the table of a collection. Lock must be acquired
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param create_table: create table, with its indexes, or not
+        :type create_table: bool
+
+        :return: name of the table
+        :rtype: str
+        """
+
+        table = AccessDatabaseSQLite._quote(schema)
+
+        if table not in self.tables:
+            if not create_table:
+                raise DatabaseObjectException(ErrorMessages.SCHEMA_ERROR)
+
+            with self._transaction():
+                self.connection.execute('CREATE TABLE IF NOT EXISTS {} ({} INTEGER PRIMARY KEY, {} INTEGER NOT NULL '
+                                        'UNIQUE, {} TEXT NOT NULL)'.format(table, AccessDatabase.ID_FIELD,
+                                                                           AccessDatabase.TIMESTAMP_FIELD,
+                                                                           AccessDatabaseSQLite.DOCUMENT_COLUMN))
+                self._create_indexes(schema, table)
+            self.tables.add(table)
+
+        return table
+
+    def _drop_collection(self, schema: str) -> None:
+        """
+        Drop table of a collection
+
+        :param schema: name of collection
+        :type schema: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        with self.lock:
+            table = AccessDatabaseSQLite._quote(schema)
+            self.connection.execute('DROP TABLE IF EXISTS {}'.format(table))
+            self.tables.discard(table)
+
+    def _create_indexes(self, schema: str, table: str) -> None:
+        """
+        Create declared indexes of a table, rebuilding indexes whose definition has changed. Lock must be acquired
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param table: quoted name of the table
+        :type table: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        rows = self.connection.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ?",
+                                       (schema,)).fetchall()
+        existing_indexes = dict(rows)
+
+        for index in self.declared_indexes.get(schema, ()):
+            for name, sqlite_index in AccessDatabaseSQLite._create_sqlite_index(schema, table, index):
+                if existing_indexes.get(name) == sqlite_index:
+                    continue
+
+                logger.info('Index %s of table %s is created', name, schema)
+                if name in existing_indexes:
+                    self.connection.execute('DROP INDEX {}'.format(AccessDatabaseSQLite._quote(name)))
+                self.connection.execute(sqlite_index)
+
+    def _get_last_index(self, table: str, schema_collection_index: str) -> int:
+        """
+        Get the maximum of last _identifier of a table and index of the collection. Lock must be acquired
+
+        :param table: quoted name of the table
+        :type table: str
+
+        :param schema_collection_index: collection index
+        :type schema_collection_index: str
+
+        :return: last index
+        :rtype: int
+        """
+
+        identifier_collection = self.connection.execute('SELECT MAX({}) FROM {}'.format(
+            AccessDatabase.ID_FIELD, table)).fetchone()[0]
+        identifier_collection_index = self.connection.execute('SELECT {} FROM {} WHERE name = ?'.format(
+            AccessDatabase.ID_FIELD, AccessDatabaseSQLite.INDEX_TABLE), (schema_collection_index,)).fetchone()
+
+        return max(identifier_collection or 0, identifier_collection_index[0] if identifier_collection_index else 0)
+
+    def _select(self, schema: str, conditions: list, criteria: str, native_criteria: bool, sort: list, limit: int,
+                skip: int) -> list:
+        """
+        Select rows of a table
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: SQL expression over columns _identifier, _timestamp and document
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria from sqlite
+        :type native_criteria: bool
+
+        :param sort: list of tuples (field, direction), or None to not sort
+        :type sort: list
+
+        :param limit: maximum number of rows, 0 to get all rows
+        :type limit: int
+
+        :param skip: number of rows skipped before the first one
+        :type skip: int
+
+        :return: list of rows (_identifier, _timestamp, document)
+        :rtype: list
+        """
+
+        with self.lock:
+            table = self._get_table(schema)
+            sqlite_where, parameters = AccessDatabaseSQLite._create_sqlite_criteria(conditions, criteria,
+                                                                                    native_criteria)
+            sqlite_query = 'SELECT {}, {}, {} FROM {} WHERE {}{} LIMIT ? OFFSET ?'.format(
+                AccessDatabase.ID_FIELD, AccessDatabase.TIMESTAMP_FIELD, AccessDatabaseSQLite.DOCUMENT_COLUMN, table,
+                sqlite_where, AccessDatabaseSQLite._create_sqlite_sort(sort))
+
+            return self.connection.execute(sqlite_query, parameters + [limit if limit > 0 else -1, skip]).fetchall()
+
+    def _update_rows(self, table: str, data: dict, conditions: list, criteria: str, native_criteria: bool) -> tuple:
+        """
+        Set fields of documents that match the conditions. Lock must be acquired and transaction must be opened
+
+        :param table: quoted name of the table
+        :type table: str
+
+        :param data: fields to set
+        :type data: dict
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: SQL expression over columns _identifier, _timestamp and document
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria from sqlite
+        :type native_criteria: bool
+
+        :return: number of matched rows and number of modified rows
+        :rtype: tuple
+        """
+
+        sqlite_where, parameters = AccessDatabaseSQLite._create_sqlite_criteria(conditions, criteria, native_criteria)
+        matched_count = self.connection.execute('SELECT COUNT(*) FROM {} WHERE {}'.format(table, sqlite_where),
+                                                parameters).fetchone()[0]
+
+        # Columns are set directly and fields of the document with json_set. Rows that do not change are not updated
+        sqlite_set = list()
+        sqlite_changed = list()
+        set_parameters = list()
+        document_parameters = list()
+        for field in (AccessDatabase.ID_FIELD, AccessDatabase.TIMESTAMP_FIELD):
+            if field in data:
+                sqlite_set.append('{} = ?'.format(field))
+                sqlite_changed.append('{} IS NOT ?'.format(field))
+                set_parameters.append(data[field])
+
+        fields = [field for field in data if field not in (AccessDatabase.ID_FIELD, AccessDatabase.TIMESTAMP_FIELD)]
+        if len(fields) > 0:
+            sqlite_document = 'json_set({}, {})'.format(AccessDatabaseSQLite.DOCUMENT_COLUMN, ', '.join(
+                '{}, json(?)'.format(AccessDatabaseSQLite._create_sqlite_path(field)) for field in fields))
+            sqlite_set.append('{} = {}'.format(AccessDatabaseSQLite.DOCUMENT_COLUMN, sqlite_document))
+            sqlite_changed.append('{} IS NOT {}'.format(AccessDatabaseSQLite.DOCUMENT_COLUMN, sqlite_document))
+            document_parameters = [json.dumps(data[field], separators=(',', ':')) for field in fields]
+
+        if len(sqlite_set) == 0:
+            return matched_count, 0
+
+        sqlite_update = 'UPDATE {} SET {} WHERE ({}) AND ({})'.format(table, ', '.join(sqlite_set), sqlite_where,
+                                                                      ' OR '.join(sqlite_changed))
+        sqlite_result = self.connection.execute(sqlite_update, set_parameters + document_parameters + parameters +
+                                                set_parameters + document_parameters)
+
+        return matched_count, sqlite_result.rowcount
+
+    @staticmethod
+    def _create_exception(exception: sqlite3.DatabaseError, error_message: str) -> DatabaseObjectException:
+        """
+        Get the exception of an error of sqlite
+
+        :param exception: error of sqlite
+        :type exception: sqlite3.DatabaseError
+
+        :param error_message: message if the error is not an error of the connection
+        :type error_message: str
+
+        :return: exception
+        :rtype: DatabaseObjectException
+        """
+
+        if isinstance(exception, sqlite3.ProgrammingError) and 'closed' in str(exception):
+            return DatabaseObjectException(ErrorMessages.CONNECTION_ERROR)
+
+        return DatabaseObjectException(error_message)
+
+    @staticmethod
+    def _quote(name: str) -> str:
+        """
+        Quote a name of table or index
+
+        :param name: name
+        :type name: str
+
+        :return: quoted name
+        :rtype: str
+        """
+
+        return '"{}"'.format(name.replace('"', '""'))
+
+    @staticmethod
+    def _create_sqlite_path(field: str) -> str:
+        """
+        Create the JSON path of a field as a SQL literal. Dots are nested fields, as in mongodb. The path is not a
+        parameter, so expressions of conditions are the same as expressions of indexes
+
+        :param field: name of field
+        :type field: str
+
+        :return: SQL literal
+        :rtype: str
+        """
+
+        path = '$'
+        for name in field.split('.'):
+            if AccessDatabaseSQLite.SQLITE_PATH_NAME.match(name):
+                path += '.' + name
+            else:
+                path += '."{}"'.format(name.replace('"', '\\"'))
+
+        return "'{}'".format(path.replace("'", "''"))
+
+    @staticmethod
+    def _create_sqlite_field(field: str) -> str:
+        """
+        Create the SQL expression of the value of a field of the document
+
+        :param field: name of field
+        :type field: str
+
+        :return: SQL expression
+        :rtype: str
+        """
+
+        return 'json_extract({}, {})'.format(AccessDatabaseSQLite.DOCUMENT_COLUMN,
+                                             AccessDatabaseSQLite._create_sqlite_path(field))
+
+    @staticmethod
+    def _create_sqlite_type(field: str) -> str:
+        """
+        Create the SQL expression of the JSON type of a field of the document. It is null if the field does not exist
+
+        :param field: name of field
+        :type field: str
+
+        :return: SQL expression
+        :rtype: str
+        """
+
+        return 'json_type({}, {})'.format(AccessDatabaseSQLite.DOCUMENT_COLUMN,
+                                          AccessDatabaseSQLite._create_sqlite_path(field))
+
+    @staticmethod
+    def _create_sqlite_criteria(conditions: list, criteria: str, native_criteria: bool) -> tuple:
+        """
+        Create WHERE clause of sqlite with its parameters
+
+        :param conditions: list of tuple of conditions
+        :type conditions: list
+
+        :param criteria: SQL expression over columns _identifier, _timestamp and document
+        :type criteria: str
+
+        :param native_criteria: bool for use native criteria or not
+        :type native_criteria: bool
+
+        :return: WHERE clause and list of parameters
+        :rtype: tuple
+        """
+
+        try:
+            sqlite_conditions = list()
+            parameters = list()
+
+            for field, operator_condition, value in conditions:
+                # Conditions of _identifier that recover all elements are skipped
+                if field == AccessDatabase.ID_FIELD and not isinstance(value, (list, tuple)) and \
+                        (value is None or value <= 0):
+                    continue
+
+                sqlite_condition, condition_parameters = AccessDatabaseSQLite._create_sqlite_condition(
+                    field, operator_condition, value)
+                sqlite_conditions.append(sqlite_condition)
+                parameters.extend(condition_parameters)
+
+            # Only if native criteria is active, add native from user
+            if native_criteria and len(criteria) > 0:
+                sqlite_conditions.append('({})'.format(criteria))
+
+            return ' AND '.join(sqlite_conditions) if len(sqlite_conditions) > 0 else '1', parameters
+
+        except Exception:
+            raise DatabaseObjectException(ErrorMessages.CRITERIA_ERROR)
+
+    @staticmethod
+    def _create_sqlite_condition(field: str, operator_condition: str, value: object) -> tuple:
+        """
+        Create SQL expression of a condition, with same semantics as mongodb: values of different types are not
+        equal, elements of lists are compared and missing fields are not equal to anything but null
+
+        :param field: name of field
+        :type field: str
+
+        :param operator_condition: operator
+        :type operator_condition: str
+
+        :param value: value to compare
+        :type value: object
+
+        :return: SQL expression and list of parameters
+        :rtype: tuple
+        """
+
+        # Columns are compared directly, so the primary key and the index of _timestamp are used
+        if field in (AccessDatabase.ID_FIELD, AccessDatabase.TIMESTAMP_FIELD):
+            # Columns are never null, so null is only different from them. SQL comparisons with null match nothing
+            if value is None:
+                return '1' if operator_condition == '!=' else '0', list()
+
+            if operator_condition in ('in', 'out'):
+                value = [item for item in value if item is not None]
+                if len(value) == 0:
+                    return '0' if operator_condition == 'in' else '1', list()
+                return '{} {} ({})'.format(field, 'IN' if operator_condition == 'in' else 'NOT IN',
+                                           ', '.join('?' * len(value))), list(value)
+
+            return '{} {} ?'.format(field, AccessDatabaseSQLite.SQLITE_OPERATORS[operator_condition]), [value]
+
+        # Negative operators match documents where the positive operator does not match, even without the field
+        if operator_condition in ('!=', 'out'):
+            sqlite_condition, parameters = AccessDatabaseSQLite._create_sqlite_condition(
+                field, '=' if operator_condition == '!=' else 'in', value)
+            return 'NOT IFNULL({}, 0)'.format(sqlite_condition), parameters
+
+        if operator_condition == 'in':
+            sqlite_conditions = list()
+            parameters = list()
+            for item in value:
+                sqlite_condition, condition_parameters = AccessDatabaseSQLite._create_sqlite_condition(field, '=',
+                                                                                                       item)
+                sqlite_conditions.append(sqlite_condition)
+                parameters.extend(condition_parameters)
+            return '({})'.format(' OR '.join(sqlite_conditions)) if len(sqlite_conditions) > 0 else '0', parameters
+
+        sqlite_operator = AccessDatabaseSQLite.SQLITE_OPERATORS[operator_condition]
+        sqlite_value = AccessDatabaseSQLite._create_sqlite_field(field)
+        sqlite_type = AccessDatabaseSQLite._create_sqlite_type(field)
+        sqlite_element = 'EXISTS (SELECT 1 FROM json_each({}, {}) WHERE {{}})'.format(
+            AccessDatabaseSQLite.DOCUMENT_COLUMN, AccessDatabaseSQLite._create_sqlite_path(field))
+
+        # Null is equal to null and to missing fields
+        if value is None:
+            if operator_condition in ('=', '>=', '<='):
+                return '({0} IS NULL OR {0} = \'null\')'.format(sqlite_type), list()
+            return '0', list()
+
+        # Lists and dictionaries are compared as a whole
+        if isinstance(value, (list, tuple, dict)):
+            if operator_condition != '=':
+                raise DatabaseObjectException(ErrorMessages.CRITERIA_ERROR)
+            return '({} = json(?) AND {} IN (\'array\', \'object\'))'.format(sqlite_value, sqlite_type), \
+                [json.dumps(value, separators=(',', ':'))]
+
+        # Scalars are compared with the value and, if the field is a list, with its elements. Value is compared
+        # first, so indexes of the field can be used
+        json_types = ', '.join("'{}'".format(json_type) for json_type in
+                               AccessDatabaseSQLite.SQLITE_JSON_TYPES[type(value)])
+        sqlite_condition = '(({0} {1} ? AND {2} IN ({3})) OR ({2} = \'array\' AND {4}))'.format(
+            sqlite_value, sqlite_operator, sqlite_type, json_types,
+            sqlite_element.format('type IN ({}) AND value {} ?'.format(json_types, sqlite_operator)))
+
+        return sqlite_condition, [value, value]
+
+    @staticmethod
+    def _create_sqlite_sort(sort: list) -> str:
+        """
+        Create ORDER BY clause of sqlite. Values of different types are sorted by type, as in mongodb
+
+        :param sort: list of tuples (field, direction), or None to not sort
+        :type sort: list
+
+        :return: ORDER BY clause, empty if there is no sort
+        :rtype: str
+        """
+
+        if sort is None or len(sort) == 0:
+            return ''
+
+        sqlite_sort = list()
+        for field, direction in sort:
+            if direction not in (AccessDatabase.ORDER_ASCENDING, AccessDatabase.ORDER_DESCENDING):
+                raise DatabaseObjectException(ErrorMessages.CRITERIA_ERROR)
+            sqlite_direction = 'ASC' if direction == AccessDatabase.ORDER_ASCENDING else 'DESC'
+
+            if field in (AccessDatabase.ID_FIELD, AccessDatabase.TIMESTAMP_FIELD):
+                sqlite_sort.append('{} {}'.format(field, sqlite_direction))
+            else:
+                sqlite_type_order = 'CASE {} {} ELSE 0 END'.format(
+                    AccessDatabaseSQLite._create_sqlite_type(field),
+                    ' '.join("WHEN '{}' THEN {}".format(*type_order)
+                             for type_order in AccessDatabaseSQLite.SQLITE_SORT_TYPE_ORDER))
+                sqlite_sort.append('{} {}'.format(sqlite_type_order, sqlite_direction))
+                sqlite_sort.append('{} {}'.format(AccessDatabaseSQLite._create_sqlite_field(field), sqlite_direction))
+
+        return ' ORDER BY ' + ', '.join(sqlite_sort)
+
+    @staticmethod
+    def _create_sqlite_index(schema: str, table: str, index: DatabaseObjectIndex) -> list:
+        """
+        Create statements of a secondary index. Index is created over expressions of fields, and another index over
+        documents where the first field is a list lets conditions use the index when they also compare elements
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param table: quoted name of the table
+        :type table: str
+
+        :param index: secondary index
+        :type index: DatabaseObjectIndex
+
+        :return: list of tuples (name, statement)
+        :rtype: list
+        """
+
+        name = schema + AccessDatabase.SEPARATOR + index.name
+        type_name = name + AccessDatabase.SEPARATOR + 'type'
+
+        sqlite_fields = ', '.join('{} {}'.format(AccessDatabaseSQLite._create_sqlite_field(field),
+                                                 'ASC' if direction == DatabaseObjectIndex.ASCENDING else 'DESC')
+                                  for field, direction in index.fields)
+        sqlite_index = 'CREATE {}INDEX {} ON {} ({})'.format('UNIQUE ' if index.unique else '',
+                                                             AccessDatabaseSQLite._quote(name), table, sqlite_fields)
+
+        # Partial filter can not have parameters, so values are written as literals
+        if index.partial:
+            sqlite_partial = list()
+            for field, operator_condition, value in index.partial:
+                if operator_condition not in AccessDatabaseSQLite.SQLITE_OPERATORS or \
+                        type(value) not in AccessDatabaseSQLite.SQLITE_JSON_TYPES:
+                    raise DatabaseObjectException(ErrorMessages.INDEX_ERROR)
+                sqlite_literal = "'{}'".format(value.replace("'", "''")) if isinstance(value, str) else \
+                    str(int(value) if isinstance(value, bool) else value)
+                sqlite_partial.append('{} {} {}'.format(AccessDatabaseSQLite._create_sqlite_field(field),
+                                                        AccessDatabaseSQLite.SQLITE_OPERATORS[operator_condition],
+                                                        sqlite_literal))
+            sqlite_index += ' WHERE ' + ' AND '.join(sqlite_partial)
+
+        sqlite_type = AccessDatabaseSQLite._create_sqlite_type(index.fields[0][0])
+        sqlite_type_index = "CREATE INDEX {} ON {} ({}) WHERE {} = 'array'".format(
+            AccessDatabaseSQLite._quote(type_name), table, sqlite_type, sqlite_type)
+
+        return [(name, sqlite_index), (type_name, sqlite_type_index)]
+
+    @staticmethod
+    def _create_sqlite_insert(table: str) -> str:
+        """
+        Create INSERT statement of a table
+
+        :param table: quoted name of the table
+        :type table: str
+
+        :return: statement
+        :rtype: str
+        """
+
+        return 'INSERT INTO {} ({}, {}, {}) VALUES (?, ?, ?)'.format(table, AccessDatabase.ID_FIELD,
+                                                                     AccessDatabase.TIMESTAMP_FIELD,
+                                                                     AccessDatabaseSQLite.DOCUMENT_COLUMN)
+
+    @staticmethod
+    def _create_row(data: dict) -> tuple:
+        """
+        Create the row of a document, with _identifier and _timestamp in their columns and the rest of fields as JSON
+
+        :param data: document
+        :type data: dict
+
+        :return: row (_identifier, _timestamp, document)
+        :rtype: tuple
+        """
+
+        document = {field: value for field, value in data.items()
+                    if field not in (AccessDatabase.ID_FIELD, AccessDatabase.TIMESTAMP_FIELD)}
+
+        return data[AccessDatabase.ID_FIELD], data[AccessDatabase.TIMESTAMP_FIELD], \
+            json.dumps(document, separators=(',', ':'))
+
+    @staticmethod
+    def _create_document(row: tuple, fields: list) -> dict:
+        """
+        Create a document from its row, only with requested fields
+
+        :param row: row (_identifier, _timestamp, document)
+        :type row: tuple
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :return: document
+        :rtype: dict
+        """
+
+        document = {AccessDatabase.ID_FIELD: row[0], AccessDatabase.TIMESTAMP_FIELD: row[1]}
+        if fields is None:
+            document.update(json.loads(row[2]))
+        else:
+            document.update((field, value) for field, value in json.loads(row[2]).items() if field in fields)
+
+        return document
+
+    @staticmethod
+    def _load_value(value: object, value_type: str) -> object:
+        """
+        Get the value of a field from its value and its JSON type in sqlite
+
+        :param value: value from json_extract
+        :type value: object
+
+        :param value_type: type from json_type
+        :type value_type: str
+
+        :return: value
+        :rtype: object
+        """
+
+        if value_type in ('true', 'false'):
+            return value_type == 'true'
+        elif value_type in ('array', 'object'):
+            return json.loads(value)
+
+        return value
@@ -0,0 +1,977 @@
+import logging
+import threading
+import time
+
+from common.tools.decorators import log_function
+from database_object_module import MODULE_NAME
+from database_object_module.data_model import DatabaseObjectException
+from database_object_module.impl.access_database import AccessDatabase
+from database_object_module.impl.access_database_memory import AccessDatabaseMemory
+
+logger = logging.getLogger(MODULE_NAME)
+
+
+class AccessDatabaseTiered(AccessDatabase):
+    """
+    Class to define the access to a datastore with two tiers. The cold tier is any datastore and has all documents.
+    The hot tier is in memory and has the most recent documents of each collection: all documents whose _timestamp is
+    greater or equal than a watermark. Writes go to both tiers, and reads are served from the hot tier when they only
+    reach documents after the watermark. Other reads get older documents from the cold tier and merge them with the
+    hot ones. Hot tier only knows writes of this process, so each collection must have only one writer
+    """
+
+    def __init__(self, cold_db: AccessDatabase, documents: int = 0, seconds: float = 0) -> None:
+        """
+        Constructor with the cold tier and default window of the hot tier
+
+        :param cold_db: datastore with all documents
+        :type cold_db: AccessDatabase
+
+        :param documents: maximum number of recent documents of each collection in hot tier, 0 if there is no limit
+        :type documents: int
+
+        :param seconds: maximum age in seconds of documents in hot tier, 0 if there is no limit
+        :type seconds: float
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        AccessDatabase.__init__(self, cold_db.connection_url)
+
+        self.cold_db = cold_db
+        self.hot_db = AccessDatabaseMemory(None)
+        self.connection = cold_db.connection
+
+        # Window of hot tier of each collection, and default window
+        self.windows = dict()
+        self.default_window = (documents, seconds)
+
+        # Watermark of each loaded collection. Hot tier has all documents with greater or equal _timestamp
+        self.watermarks = dict()
+
+        # Reads served only by hot tier and reads that needed cold tier, of each collection
+        self.tier_stats = dict()
+
+        self.lock = threading.RLock()
+
+    @log_function(logger, logging.DEBUG)
+    def get(self, schema: str, conditions: list, criteria: str, native_criteria: bool, fields: list = None,
+            sort: list = AccessDatabase.DEFAULT_SORT, limit: int = 0) -> list:
+        """
+        Get data from hot tier if conditions are after the watermark, or merge documents of both tiers
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of cold tier. Reads with native criteria are served by cold tier
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of cold tier
+        :type native_criteria: bool
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :param sort: list of tuples (field, direction) with direction asc or desc, or None to not sort
+        :type sort: list
+
+        :param limit: maximum number of elements, 0 to get all elements
+        :type limit: int
+
+        :return: list of dictionary with data
+        :rtype: list
+        """
+
+        # Documents of both tiers are merged with fields of the sort, that are removed after merging them
+        merge_fields, added_fields = AccessDatabase.get_sort_fields(fields, sort)
+
+        with self.lock:
+            watermark = self._get_watermark(schema, conditions, native_criteria)
+            if watermark is None:
+                return self.hot_db.get(schema, conditions, criteria, native_criteria, fields, sort, limit)
+            elif watermark is False:
+                hot_list = list()
+            else:
+                hot_list = self.hot_db.get(schema, conditions, criteria, native_criteria, merge_fields, sort, limit)
+
+        # Older documents are recovered from cold tier
+        cold_conditions = list(conditions)
+        if watermark is not False:
+            cold_conditions.append((AccessDatabase.TIMESTAMP_FIELD, '<', watermark))
+        cold_list = self.cold_db.get(schema, cold_conditions, criteria, native_criteria, merge_fields, sort, limit)
+
+        return AccessDatabase.remove_fields(AccessDatabaseTiered._merge(cold_list, hot_list, sort, limit),
+                                            added_fields)
+
+    @log_function(logger, logging.DEBUG)
+    def iter_get(self, schema: str, conditions: list, criteria: str, native_criteria: bool, batch_size: int,
+                 limit: int, skip: int, fields: list = None, sort: list = AccessDatabase.DEFAULT_SORT):
+        """
+        Get data one by one from hot tier if conditions are after the watermark, or from cold tier
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of cold tier. Reads with native criteria are served by cold tier
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of cold tier
+        :type native_criteria: bool
+
+        :param batch_size: number of documents read from cold tier in each batch
+        :type batch_size: int
+
+        :param limit: maximum number of elements, 0 to get all elements
+        :type limit: int
+
+        :param skip: number of elements skipped before the first one
+        :type skip: int
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :param sort: list of tuples (field, direction) with direction asc or desc, or None to not sort
+        :type sort: list
+
+        :return: generator of dictionary with data
+        :rtype: generator
+        """
+
+        with self.lock:
+            if self._get_watermark(schema, conditions, native_criteria) is None:
+                return self.hot_db.iter_get(schema, conditions, criteria, native_criteria, batch_size, limit, skip,
+                                            fields, sort)
+
+        return self.cold_db.iter_get(schema, conditions, criteria, native_criteria, batch_size, limit, skip, fields,
+                                     sort)
+
+    @log_function(logger, logging.DEBUG)
+    def get_page(self, schema: str, conditions: list, criteria: str, native_criteria: bool, after: int,
+                 page_size: int, order: str, fields: list = None) -> list:
+        """
+        Get a page of data from hot tier if conditions are after the watermark, or from cold tier
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of cold tier. Reads with native criteria are served by cold tier
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of cold tier
+        :type native_criteria: bool
+
+        :param after: last _identifier of previous page, None for the first page
+        :type after: int
+
+        :param page_size: maximum number of elements of the page
+        :type page_size: int
+
+        :param order: order of _identifier, asc or desc
+        :type order: str
+
+        :param fields: fields to get, besides _identifier and _timestamp. None to get all fields
+        :type fields: list
+
+        :return: list of dictionary with the page
+        :rtype: list
+        """
+
+        with self.lock:
+            if self._get_watermark(schema, conditions, native_criteria) is None:
+                return self.hot_db.get_page(schema, conditions, criteria, native_criteria, after, page_size, order,
+                                            fields)
+
+        return self.cold_db.get_page(schema, conditions, criteria, native_criteria, after, page_size, order, fields)
+
+    @log_function(logger, logging.DEBUG)
+    def count(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Count data in hot tier if conditions are after the watermark, or in cold tier
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of cold tier. Reads with native criteria are served by cold tier
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of cold tier
+        :type native_criteria: bool
+
+        :return: list of dictionary with number of elements
+        :rtype: list
+        """
+
+        with self.lock:
+            if self._get_watermark(schema, conditions, native_criteria) is None:
+                return self.hot_db.count(schema, conditions, criteria, native_criteria)
+
+        return self.cold_db.count(schema, conditions, criteria, native_criteria)
+
+    @log_function(logger, logging.DEBUG)
+    def exists(self, schema: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Check if any data matches the conditions. Hot tier is checked first, because its documents are in cold tier
+        too
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of cold tier. Reads with native criteria are served by cold tier
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of cold tier
+        :type native_criteria: bool
+
+        :return: list of dictionary with true if any element matches
+        :rtype: list
+        """
+
+        with self.lock:
+            watermark = self._get_watermark(schema, conditions, native_criteria, count=False)
+            if watermark is not False:
+                result = self.hot_db.exists(schema, conditions, criteria, native_criteria)
+                if watermark is None or result[0][AccessDatabase.EXISTS_FIELD]:
+                    self._count_read(schema, True)
+                    return result
+
+            self._count_read(schema, False)
+
+        return self.cold_db.exists(schema, conditions, criteria, native_criteria)
+
+    @log_function(logger, logging.DEBUG)
+    def distinct(self, schema: str, field: str, conditions: list, criteria: str, native_criteria: bool) -> list:
+        """
+        Get different values of a field from hot tier if conditions are after the watermark, or from cold tier
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param field: field whose values are recovered
+        :type field: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of cold tier. Reads with native criteria are served by cold tier
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of cold tier
+        :type native_criteria: bool
+
+        :return: list of dictionary with the field for each different value
+        :rtype: list
+        """
+
+        with self.lock:
+            if self._get_watermark(schema, conditions, native_criteria) is None:
+                return self.hot_db.distinct(schema, field, conditions, criteria, native_criteria)
+
+        return self.cold_db.distinct(schema, field, conditions, criteria, native_criteria)
+
+    @log_function(logger, logging.DEBUG)
+    def put(self, schema: str, data: dict, write_concern: dict = None) -> list:
+        """
+        Insert data in cold tier and, if it is after the watermark, in hot tier
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param data: data to store in dictionary format
+        :type data: dict
+
+        :param write_concern: write concern of cold tier
+        :type write_concern: dict
+
+        :return: list of dictionary with inserted _id
+        :rtype: list
+        """
+
+        # Cold tier may add its own fields to data, so hot tier stores a copy
+        hot_data = dict(data)
+        result = self.cold_db.put(schema, data, write_concern)
+        self._write_hot(schema, self.hot_db.put_many, [hot_data], 1)
+
+        return result
+
+    @log_function(logger, logging.DEBUG)
+    def put_many(self, schema: str, data_list: list, chunk_size: int, write_concern: dict = None,
+                 ordered: bool = None) -> list:
+        """
+        Insert a batch of data in cold tier and, the data after the watermark, in hot tier. If cold tier fails, hot
+        tier of the collection is loaded again, because some documents may have been inserted
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param data_list: list of data to store in dictionary format
+        :type data_list: list
+
+        :param chunk_size: number of documents of each chunk
+        :type chunk_size: int
+
+        :param write_concern: write concern of cold tier
+        :type write_concern: dict
+
+        :param ordered: stop at first error or insert the rest of documents in cold tier
+        :type ordered: bool
+
+        :return: list of dictionary with first inserted _id and number of inserted elements of each chunk
+        :rtype: list
+        """
+
+        hot_data_list = [dict(data) for data in data_list] if schema in self.watermarks else list()
+        try:
+            result = self.cold_db.put_many(schema, data_list, chunk_size, write_concern, ordered)
+        except DatabaseObjectException:
+            self._unload(schema)
+            raise
+
+        self._write_hot(schema, self.hot_db.put_many, hot_data_list, chunk_size)
+
+        return result
+
+    @log_function(logger, logging.DEBUG)
+    def update(self, schema: str, data: dict, conditions: list, criteria: str, native_criteria: bool,
+               write_concern: dict = None) -> list:
+        """
+        Update data in both tiers. With native criteria, hot tier of the collection is loaded again
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param data: data to store in dictionary format
+        :type data: dict
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of cold tier
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of cold tier
+        :type native_criteria: bool
+
+        :param write_concern: write concern of cold tier
+        :type write_concern: dict
+
+        :return: list of dictionary with number of updated elements
+        :rtype: list
+        """
+
+        try:
+            result = self.cold_db.update(schema, data, conditions, criteria, native_criteria, write_concern)
+        except DatabaseObjectException:
+            self._unload(schema)
+            raise
+
+        if native_criteria:
+            self._unload(schema)
+        else:
+            self._write_hot(schema, self.hot_db.update, data, conditions, criteria, native_criteria)
+
+        return result
+
+    @log_function(logger, logging.DEBUG)
+    def update_many(self, schema: str, updates: list, chunk_size: int, write_concern: dict = None,
+                    ordered: bool = None) -> list:
+        """
+        Update different data in both tiers
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param updates: list of tuples (conditions, data)
+        :type updates: list
+
+        :param chunk_size: number of updates sent to cold tier in each batch
+        :type chunk_size: int
+
+        :param write_concern: write concern of cold tier
+        :type write_concern: dict
+
+        :param ordered: stop at first error or apply the rest of updates in cold tier
+        :type ordered: bool
+
+        :return: list of dictionary with number of matched and updated elements
+        :rtype: list
+        """
+
+        try:
+            result = self.cold_db.update_many(schema, updates, chunk_size, write_concern, ordered)
+        except DatabaseObjectException:
+            self._unload(schema)
+            raise
+
+        self._write_hot(schema, self.hot_db.update_many, updates, chunk_size)
+
+        return result
+
+    @log_function(logger, logging.DEBUG)
+    def remove(self, schema: str, conditions: list, criteria: str, native_criteria: bool,
+               write_concern: dict = None) -> list:
+        """
+        Delete elements from both tiers. With native criteria, hot tier of the collection is loaded again
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param conditions: conditions to search (list of tuple)
+        :type conditions: list
+
+        :param criteria: native criteria of cold tier
+        :type criteria: str
+
+        :param native_criteria: boolean for search by native criteria of cold tier
+        :type native_criteria: bool
+
+        :param write_concern: write concern of cold tier
+        :type write_concern: dict
+
+        :return: list of dictionary with number of deleted elements
+        :rtype: list
+        """
+
+        try:
+            result = self.cold_db.remove(schema, conditions, criteria, native_criteria, write_concern)
+        except DatabaseObjectException:
+            self._unload(schema)
+            raise
+
+        if native_criteria:
+            self._unload(schema)
+        else:
+            self._write_hot(schema, self.hot_db.remove, conditions, criteria, native_criteria)
+
+        return result
+
+    def open_connection(self) -> None:
+        """
+        Open connection of cold tier
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self.cold_db.open_connection()
+        self.connection = self.cold_db.connection
+
+    def close_connection(self) -> None:
+        """
+        Close connection of cold tier. Hot tiers are loaded again when they are used
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self.cold_db.close_connection()
+        with self.lock:
+            for schema in list(self.watermarks):
+                self._unload(schema)
+
+    def check_connection(self) -> bool:
+        """
+        Check connection of cold tier
+
+        :return: true if connection is alive
+        :rtype: bool
+        """
+
+        return self.cold_db.check_connection()
+
+    def get_last_index(self, schema: str, sub_schema: str) -> int:
+        """
+        Recover last index of a collection from cold tier
+
+        :param schema: schema to search
+        :type schema: str
+
+        :param sub_schema: sub_schema to search
+        :type sub_schema: str
+
+        :return: last inserted index of schema_collection
+        :rtype: int
+        """
+
+        return self.cold_db.get_last_index(schema, sub_schema)
+
+    def update_index(self, schema_collection_index: str, value: int) -> None:
+        """
+        Update index of a collection in cold tier
+
+        :param schema_collection_index: collection index
+        :type schema_collection_index: str
+
+        :param value: value of index
+        :type value: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self.cold_db.update_index(schema_collection_index, value)
+
+    def reserve_index(self, schema: str, sub_schema: str, block_size: int) -> int:
+        """
+        Reserve atomically a block of identifiers in cold tier
+
+        :param schema: schema to reserve
+        :type schema: str
+
+        :param sub_schema: sub_schema to reserve
+        :type sub_schema: str
+
+        :param block_size: number of identifiers to reserve
+        :type block_size: int
+
+        :return: last identifier of the reserved block
+        :rtype: int
+        """
+
+        return self.cold_db.reserve_index(schema, sub_schema, block_size)
+
+    def set_read_options(self, schema: str, raw_documents: bool) -> None:
+        """
+        Set how objects of a collection are read from both tiers
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param raw_documents: objects are returned as read-only mappings instead of dict
+        :type raw_documents: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self.cold_db.set_read_options(schema, raw_documents)
+        self.hot_db.set_read_options(schema, raw_documents)
+
+    def set_compression_options(self, schema: str, fields: list, min_size: int) -> None:
+        """
+        Set fields of a collection that are stored compressed in cold tier. Hot tier stores them decompressed
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param fields: fields that are always compressed
+        :type fields: list
+
+        :param min_size: fields bigger than this size in bytes are compressed too, 0 to compress only selected fields
+        :type min_size: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self.cold_db.set_compression_options(schema, fields, min_size)
+
+    def get_compression_stats(self) -> dict:
+        """
+        Get sizes of compressed fields of each collection in cold tier
+
+        :return: number of compressed fields, and size before and after compression, of each collection
+        :rtype: dict
+        """
+
+        return self.cold_db.get_compression_stats()
+
+    def set_write_options(self, schema: str, write_concern: dict, ordered: bool) -> None:
+        """
+        Set default write options of a collection in cold tier
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param write_concern: write concern of writes (w, j, wtimeout), or None to use default of the database
+        :type write_concern: dict
+
+        :param ordered: batches stop at first error (True) or not (False), or None to use default of each method
+        :type ordered: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self.cold_db.set_write_options(schema, write_concern, ordered)
+
+    def ensure_indexes(self, schema: str, indexes: list) -> None:
+        """
+        Create indexes of a collection in both tiers
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param indexes: list of DatabaseObjectIndex
+        :type indexes: list
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self.cold_db.ensure_indexes(schema, indexes)
+        self.hot_db.ensure_indexes(schema, indexes)
+
+    def set_time_buckets(self, schema: str, bucket_size: str) -> None:
+        """
+        Partition a collection of cold tier by time. Hot tier is not partitioned
+
+        :param schema: name of schema of the database
+        :type schema: str
+
+        :param bucket_size: day, week or month
+        :type bucket_size: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self.cold_db.set_time_buckets(schema, bucket_size)
+
+    def set_hot_window(self, schema: str, documents: int, seconds: float) -> None:
+        """
+        Set window of hot tier of a collection. Hot tier is loaded again with the new window when it is used
+
+        :param schema: schema (name of collection)
+        :type schema: str
+
+        :param documents: maximum number of recent documents in hot tier, 0 if there is no limit
+        :type documents: int
+
+        :param seconds: maximum age in seconds of documents in hot tier, 0 if there is no limit
+        :type seconds: float
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        with self.lock:
+            self.windows[schema] = (documents, seconds)
+            self._unload(schema)
+
+    def get_tier_stats(self) -> dict:
+        """
+        Get reads served by hot tier (hits) and reads that needed cold tier (misses) of each collection
+
+        :return: hits, misses, hit rate, number of documents in hot tier and watermark of each collection
+        :rtype: dict
+        """
+
+        with self.lock:
+            stats = dict()
+            for schema, (hits, misses) in self.tier_stats.items():
+                memory_collect = self.hot_db.collections.get(schema)
+                stats[schema] = {
+                    'hits': hits,
+                    'misses': misses,
+                    'hit_rate': hits / (hits + misses) if hits + misses > 0 else 0.0,
+                    'documents': len(memory_collect.documents) if memory_collect is not None else 0,
+                    'watermark': self.watermarks.get(schema)
+                }
+
+            return stats
+
+    def _drop_collection(self, schema: str) -> None:
+        """
+        Drop collection from both tiers
+
+        :param schema: name of collection
+        :type schema: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        self.cold_db._drop_collection(schema)
+        with self.lock:
+            self._unload(schema)
+
+    def _get_watermark(self, schema: str, conditions: list, native_criteria: bool, count: bool = True) -> object:
+        """
+        Get watermark of hot tier of a collection for a read, loading it the first time. Lock must be acquired
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param conditions: conditions of the read
+        :type conditions: list
+
+        :param native_criteria: boolean for search by native criteria of cold tier
+        :type native_criteria: bool
+
+        :param count: count read as hit or miss
+        :type count: bool
+
+        :return: None if hot tier has all matching documents, False if hot tier can not be used, or the watermark
+        :rtype: object
+        """
+
+        watermark = False
+        if not native_criteria:
+            watermark = self._load(schema)
+
+            if watermark is not False and AccessDatabaseTiered._is_after(conditions, watermark):
+                watermark = None
+
+            # A document with the same _identifier is unique, so if it is in hot tier, the read only reaches it
+            elif watermark is not False:
+                identifiers = [value for field, operator_condition, value in conditions
+                               if field == AccessDatabase.ID_FIELD and operator_condition == '=' and
+                               isinstance(value, int) and not isinstance(value, bool) and value > 0]
+                if len(identifiers) > 0 and \
+                        self.hot_db.exists(schema, [(AccessDatabase.ID_FIELD, '=', identifiers[0])], '',
+                                           False)[0][AccessDatabase.EXISTS_FIELD]:
+                    watermark = None
+
+        if count:
+            self._count_read(schema, watermark is None)
+
+        return watermark
+
+    @staticmethod
+    def _add_tier_stats(stats: dict, schema: str, tier_stats: dict) -> None:
+        """
+        Add stats of hot tier of a collection to stats of other hot tiers, for datastores that wrap several of them
+
+        :param stats: stats of each collection, updated with the new stats
+        :type stats: dict
+
+        :param schema: name of collection where stats are added
+        :type schema: str
+
+        :param tier_stats: hits, misses, hit rate, number of documents in hot tier and watermark
+        :type tier_stats: dict
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        schema_stats = stats.setdefault(schema, {'hits': 0, 'misses': 0, 'hit_rate': 0.0, 'documents': 0,
+                                                 'watermark': None})
+        for key in ('hits', 'misses', 'documents'):
+            schema_stats[key] += tier_stats[key]
+        reads = schema_stats['hits'] + schema_stats['misses']
+        schema_stats['hit_rate'] = schema_stats['hits'] / reads if reads > 0 else 0.0
+
+        # Reads are only served by all hot tiers after the greatest watermark
+        watermarks = [watermark for watermark in (schema_stats['watermark'], tier_stats['watermark'])
+                      if watermark is not None and watermark is not False]
+        schema_stats['watermark'] = max(watermarks) if len(watermarks) > 0 else None
+
+    @staticmethod
+    def _is_after(conditions: list, watermark: float) -> bool:
+        """
+        Check if conditions only match documents with _timestamp greater or equal than the watermark
+
+        :param conditions: list of tuple of conditions
+        :type conditions: list
+
+        :param watermark: watermark of hot tier
+        :type watermark: float
+
+        :return: true if all matching documents are after the watermark
+        :rtype: bool
+        """
+
+        for field, operator_condition, value in conditions:
+            if field != AccessDatabase.TIMESTAMP_FIELD:
+                continue
+            if operator_condition in ('=', '>=', '>') and isinstance(value, (int, float)) and \
+                    not isinstance(value, bool) and value >= watermark:
+                return True
+            if operator_condition == 'in' and len(value) > 0 and \
+                    all(isinstance(item, (int, float)) and not isinstance(item, bool) for item in value) and \
+                    min(value) >= watermark:
+                return True
+
+        return watermark == float('-inf')
+
+    def _count_read(self, schema: str, hit: bool) -> None:
+        """
+        Count a read of a collection. Lock must be acquired
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param hit: true if read is served by hot tier
+        :type hit: bool
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        hits, misses = self.tier_stats.get(schema, (0, 0))
+        self.tier_stats[schema] = (hits + 1, misses) if hit else (hits, misses + 1)
+
+    def _load(self, schema: str) -> object:
+        """
+        Load the window of hot tier of a collection from cold tier, the first time it is used, and evict documents
+        out of the window. Lock must be acquired
+
+        :param schema: name of collection
+        :type schema: str
+
+        :return: watermark, or False if the collection has no hot tier
+        :rtype: object
+        """
+
+        documents, seconds = self.windows.get(schema, self.default_window)
+        if documents <= 0 and seconds <= 0:
+            return False
+
+        if schema not in self.watermarks:
+            try:
+                conditions = list()
+                watermark = float('-inf')
+                if seconds > 0:
+                    watermark = int((time.time() - seconds) * AccessDatabase.TIMESTAMP_UNITS)
+                    conditions.append((AccessDatabase.TIMESTAMP_FIELD, '>=', watermark))
+
+                # Most recent documents are loaded. If there are as many as the window, older ones are not loaded
+                data_list = list()
+                if self.cold_db.count(schema, conditions, '', False)[0][AccessDatabase.COUNT_FIELD] > 0:
+                    data_list = self.cold_db.get(schema, conditions, '', False,
+                                                 sort=[(AccessDatabase.TIMESTAMP_FIELD,
+                                                        AccessDatabase.ORDER_DESCENDING)], limit=documents)
+                if 0 < documents == len(data_list):
+                    watermark = max(watermark, data_list[-1][AccessDatabase.TIMESTAMP_FIELD])
+
+                self.hot_db._drop_collection(schema)
+                self.hot_db.put_many(schema, data_list[::-1], max(len(data_list), 1))
+                self.watermarks[schema] = watermark
+                logger.info('Hot tier of %s loaded with %s documents', schema, len(data_list))
+
+            except DatabaseObjectException:
+                logger.warning('Hot tier of %s can not be loaded', schema, exc_info=True)
+                self._unload(schema)
+                return False
+
+        self._evict(schema, documents, seconds)
+
+        return self.watermarks[schema]
+
+    def _unload(self, schema: str) -> None:
+        """
+        Drop hot tier of a collection, so it is loaded again when it is used
+
+        :param schema: name of collection
+        :type schema: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        with self.lock:
+            self.watermarks.pop(schema, None)
+            self.hot_db._drop_collection(schema)
+
+    def _evict(self, schema: str, documents: int, seconds: float) -> None:
+        """
+        Remove documents out of the window of hot tier and raise the watermark. Lock must be acquired
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param documents: maximum number of recent documents in hot tier, 0 if there is no limit
+        :type documents: int
+
+        :param seconds: maximum age in seconds of documents in hot tier, 0 if there is no limit
+        :type seconds: float
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        watermark = self.watermarks[schema]
+        if seconds > 0:
+            watermark = max(watermark, int((time.time() - seconds) * AccessDatabase.TIMESTAMP_UNITS))
+
+        memory_collect = self.hot_db.collections.get(schema)
+        if documents > 0 and memory_collect is not None and len(memory_collect.timestamps) > documents:
+            watermark = max(watermark, memory_collect.timestamps[-documents])
+
+        if watermark > self.watermarks[schema]:
+            self.hot_db.remove(schema, [(AccessDatabase.TIMESTAMP_FIELD, '<', watermark)], '', False)
+            self.watermarks[schema] = watermark
+
+    def _write_hot(self, schema: str, function, *args) -> None:
+        """
+        Apply a write to hot tier of a collection, if it is loaded. Documents inserted before the watermark are not
+        stored. If the write fails, hot tier is loaded again when it is used
+
+        :param schema: name of collection
+        :type schema: str
+
+        :param function: write function of hot tier
+        :type function: function
+
+        :param args: arguments of the function after the schema
+        :type args: tuple
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        with self.lock:
+            watermark = self.watermarks.get(schema)
+            if watermark is None:
+                return
+
+            try:
+                if function == self.hot_db.put_many:
+                    data_list = [data for data in args[0] if data[AccessDatabase.TIMESTAMP_FIELD] >= watermark]
+                    if len(data_list) == 0:
+                        return
+                    args = (data_list,) + args[1:]
+
+                function(schema, *args)
+                self._evict(schema, *self.windows.get(schema, self.default_window))
+
+            except DatabaseObjectException:
+                logger.warning('Hot tier of %s is not updated', schema, exc_info=True)
+                self._unload(schema)
+
+    @staticmethod
+    def _merge(cold_list: list, hot_list: list, sort: list, limit: int) -> list:
+        """
+        Merge documents of both tiers. Documents of cold tier are before documents of hot tier in _timestamp order
+
+        :param cold_list: documents of cold tier
+        :type cold_list: list
+
+        :param hot_list: documents of hot tier
+        :type hot_list: list
+
+        :param sort: list of tuples (field, direction), or None to not sort
+        :type sort: list
+
+        :param limit: maximum number of elements, 0 to get all elements
+        :type limit: int
+
+        :return: list of documents
+        :rtype: list
+        """
+
+        # Sort by each field, from last to first, because sort is stable
+        output_list = cold_list + hot_list
+        if sort is not None and list(sort) != list(AccessDatabase.DEFAULT_SORT):
+            for field, direction in reversed(sort):
+                output_list.sort(key=lambda document: AccessDatabaseMemory._get_sort_key(document.get(field)),
+                                 reverse=direction == AccessDatabase.ORDER_DESCENDING)
+
+        return output_list[:limit] if limit > 0 else output_list
@@ -0,0 +1,226 @@
+from common.tools.keyed_lock import KeyedLock
+from database_object_module.data_model import DatabaseObjectException, ErrorMessages
+from database_object_module.impl.access_database import AccessDatabase
+
+
+class IndexAllocator(object):
+    """
+    Hi/lo allocator of identifiers. It reserves blocks of identifiers in the datastore with only one write and hands
+    them out from memory. Identifiers reserved but not used (for example, after a crash) are simply skipped.
+    It is thread safe with one lock for each collection, so different collections are allocated in parallel
+    """
+
+    # Allocation modes
+    MODE_BLOCK = 'block'
+    MODE_ATOMIC = 'atomic'
+
+    def __init__(self, access_db: AccessDatabase, default_block_size: int, mode: str = MODE_BLOCK) -> None:
+        """
+        Constructor with access to datastore and default size of reserved blocks
+
+        :param access_db: access to datastore where index is stored
+        :type access_db: AccessDatabase
+
+        :param default_block_size: number of identifiers reserved in each write when collection has no block size
+        :type default_block_size: int
+
+        :param mode: block mode writes next reserved block in the index, and it is only safe with one writer
+                     process. Atomic mode increments the index atomically, so several processes can insert at same
+                     time
+        :type mode: str
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        if default_block_size <= 0 or mode not in (IndexAllocator.MODE_BLOCK, IndexAllocator.MODE_ATOMIC):
+            raise DatabaseObjectException(ErrorMessages.CONFIGURATION_ERROR)
+
+        self.access_db = access_db
+        self.default_block_size = default_block_size
+        self.mode = mode
+
+        # Block size of each collection index, if it is different from default block size
+        self.block_sizes = dict()
+
+        # Last identifier handed out (lo) and last identifier reserved in datastore (hi) of each collection index
+        self.cache_index = dict()
+        self.cache_reserved = dict()
+
+        # Lock of each collection index
+        self.locks = KeyedLock()
+
+    def set_block_size(self, schema: str, sub_schema: str, block_size: int) -> None:
+        """
+        Set number of identifiers reserved in each write for a sub_schema
+
+        :param schema: schema of the collection
+        :type schema: str
+
+        :param sub_schema: sub_schema of the collection
+        :type sub_schema: str
+
+        :param block_size: number of identifiers reserved in each write
+        :type block_size: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        if block_size <= 0:
+            raise DatabaseObjectException(ErrorMessages.CONFIGURATION_ERROR)
+
+        schema_collection_index = AccessDatabase.get_schema_collection_index(schema, sub_schema)
+        self.block_sizes[schema_collection_index] = block_size
+
+    def get_next_index(self, schema: str, sub_schema: str, count: int = 1) -> int:
+        """
+        Get a contiguous range of new identifiers
+
+        :param schema: schema of the collection
+        :type schema: str
+
+        :param sub_schema: sub_schema of the collection
+        :type sub_schema: str
+
+        :param count: number of identifiers to get
+        :type count: int
+
+        :return: first identifier of the range
+        :rtype: int
+        """
+
+        with self.locks.get(AccessDatabase.get_schema_collection_index(schema, sub_schema)):
+            return self._get_next_index(schema, sub_schema, count)
+
+    def set_index(self, schema: str, sub_schema: str, value: int) -> int:
+        """
+        Check and use an identifier set by user. It must be greater than last identifier handed out
+
+        :param schema: schema of the collection
+        :type schema: str
+
+        :param sub_schema: sub_schema of the collection
+        :type sub_schema: str
+
+        :param value: identifier set by user
+        :type value: int
+
+        :return: identifier set by user or exception
+        :rtype: int
+        """
+
+        with self.locks.get(AccessDatabase.get_schema_collection_index(schema, sub_schema)):
+            return self._set_index(schema, sub_schema, value)
+
+    def _get_next_index(self, schema: str, sub_schema: str, count: int) -> int:
+        """
+        Get a contiguous range of new identifiers. Lock of the collection must be acquired
+
+        :param schema: schema of the collection
+        :type schema: str
+
+        :param sub_schema: sub_schema of the collection
+        :type sub_schema: str
+
+        :param count: number of identifiers to get
+        :type count: int
+
+        :return: first identifier of the range
+        :rtype: int
+        """
+
+        schema_collection_index = self._load_index(schema, sub_schema)
+
+        # In atomic mode a new block is not contiguous with current one, so identifiers left in current block are
+        # skipped if they are not enough for the whole range
+        next_index = self.cache_index[schema_collection_index] + 1
+        last_index = next_index + count - 1
+        if self.mode == IndexAllocator.MODE_ATOMIC and last_index > self.cache_reserved[schema_collection_index]:
+            block_size = max(self.block_sizes.get(schema_collection_index, self.default_block_size), count)
+            reserved = self.access_db.reserve_index(schema, sub_schema, block_size)
+            self.cache_reserved[schema_collection_index] = reserved
+            next_index = reserved - block_size + 1
+            last_index = next_index + count - 1
+
+        self._reserve(schema_collection_index, last_index)
+
+        return next_index
+
+    def _set_index(self, schema: str, sub_schema: str, value: int) -> int:
+        """
+        Check and use an identifier set by user. Lock of the collection must be acquired
+
+        :param schema: schema of the collection
+        :type schema: str
+
+        :param sub_schema: sub_schema of the collection
+        :type sub_schema: str
+
+        :param value: identifier set by user
+        :type value: int
+
+        :return: identifier set by user or exception
+        :rtype: int
+        """
+
+        schema_collection_index = self._load_index(schema, sub_schema)
+
+        if value <= self.cache_index[schema_collection_index]:
+            raise DatabaseObjectException(ErrorMessages.INDEX_VALUE_ERROR)
+
+        # In atomic mode, an identifier out of current block is only written in the index and current block is
+        # discarded. User must avoid identifiers that could be already reserved by other processes
+        if self.mode == IndexAllocator.MODE_ATOMIC and value > self.cache_reserved[schema_collection_index]:
+            self.access_db.update_index(schema_collection_index, value)
+            self.cache_reserved[schema_collection_index] = value
+
+        self._reserve(schema_collection_index, value)
+
+        return value
+
+    def _load_index(self, schema: str, sub_schema: str) -> str:
+        """
+        Recover last identifier from datastore the first time that a collection is used
+
+        :param schema: schema of the collection
+        :type schema: str
+
+        :param sub_schema: sub_schema of the collection
+        :type sub_schema: str
+
+        :return: collection index
+        :rtype: str
+        """
+
+        schema_collection_index = AccessDatabase.get_schema_collection_index(schema, sub_schema)
+
+        # Everything above last identifier stored can be used, because blocks are always reserved before use
+        if schema_collection_index not in self.cache_index.keys():
+            last_index = self.access_db.get_last_index(schema, sub_schema)
+            self.cache_index[schema_collection_index] = last_index
+            self.cache_reserved[schema_collection_index] = last_index
+
+        return schema_collection_index
+
+    def _reserve(self, schema_collection_index: str, last_index: int) -> None:
+        """
+        Hand out identifiers up to last_index, reserving a new block in datastore if current one is exhausted
+
+        :param schema_collection_index: collection index
+        :type schema_collection_index: str
+
+        :param last_index: last identifier to hand out
+        :type last_index: int
+
+        :return: This function return nothing
+        :rtype: None
+        """
+
+        if last_index > self.cache_reserved[schema_collection_index]:
+            block_size = self.block_sizes.get(schema_collection_index, self.default_block_size)
+            reserved = last_index + block_size - 1
+            self.access_db.update_index(schema_collection_index, reserved)
+            self.cache_reserved[schema_collection_index] = reserved
+
+        self.cache_index[schema_collection_index] = last_index
@@ -1,12 +1,26 @@
+import asyncio
+import os
+import tempfile
 import time
+from threading import Thread
 
 from nose.tools import assert_equal, assert_true
 
 # import common.infra_manager as InfraManager
 from common import config
-from database_object_module.data_model import DatabaseObject, DatabaseObjectResult
+from database_object_module.async_database_object_module import AsyncDatabaseObjectModule
+from database_object_module.data_model import DatabaseObject, DatabaseObjectException, DatabaseObjectIndex, \
+    DatabaseObjectResult
 from database_object_module.database_object_module import DatabaseObjectModule
 from database_object_module.impl.access_database import AccessDatabase
+from database_object_module.impl.access_database_bucketed import AccessDatabaseBucketed
+from database_object_module.impl.access_database_memory import AccessDatabaseMemory
+from database_object_module.impl.access_database_mongodb import AccessDatabaseMongoDB
+from database_object_module.impl.access_database_segment import AccessDatabaseSegment
+from database_object_module.impl.access_database_sharded import AccessDatabaseSharded
+from database_object_module.impl.access_database_sqlite import AccessDatabaseSQLite
+from database_object_module.impl.access_database_tiered import AccessDatabaseTiered
+from database_object_module.index_allocator import IndexAllocator
 
 
 class DatabaseObjectTest1(DatabaseObject):
@@ -81,6 +95,28 @@ class DatabaseObjectTest4(DatabaseObject):
         return str(self.__dict__)
 
 
+class DatabaseObjectTest5(DatabaseObject):
+
+    INDEXES = (
+        DatabaseObjectIndex(['user_arg']),
+        DatabaseObjectIndex([('str_arg', DatabaseObjectIndex.ASCENDING), ('int_arg', DatabaseObjectIndex.DESCENDING)]),
+        DatabaseObjectIndex(['code'], unique=True, partial=[('code', '>', 0)]),
+    )
+
+    def __init__(self, user_arg=0, code=0) -> None:
+        DatabaseObject.__init__(self)
+        self.user_arg = user_arg
+        self.code = code
+        self.int_arg = int(5)
+        self.str_arg = str('cadena de texto')
+
+    def __repr__(self):
+        return str(self.__dict__)
+
+    def __str__(self):
+        return str(self.__dict__)
+
+
 class DatabaseObjectTestError(object):
 
     def __init__(self) -> None:
@@ -545,3 +581,1067 @@ class TestDatabaseObjectModule(object):
         result_update = self.module.update_object(schema, object_name, inst_get)
 
         assert_true(result_update.code == DatabaseObjectResult.CODE_OK)
+
+    def test_21_put_many(self) -> None:
+        """
+        Insercion de muchos objetos en lote y recuperacion de todos
+        """
+
+        max_iteration = 25
+        chunk_size = 10
+
+        schema = 'TEST'
+        object_name = DatabaseObjectTest2.__name__
+        data_list = [DatabaseObjectTest2(i).__dict__ for i in range(max_iteration)]
+
+        start = time.perf_counter()
+        result_put = self.module.put_many(schema, object_name, data_list, chunk_size)
+        elapsed_time = round((time.perf_counter() - start) * 1000, 2)
+        print("Batch insertion of {} objects in {} ms.".format(max_iteration, elapsed_time))
+
+        assert_equal(result_put.code, DatabaseObjectResult.CODE_OK)
+
+        # One result for each chunk, with contiguous identifiers
+        inst_put = result_put.get_object_from_data()
+        assert_equal(len(inst_put), 3)
+        assert_equal(sum(getattr(inst, AccessDatabase.INSERTED_COUNT) for inst in inst_put), max_iteration)
+        assert_equal(inst_put[1].get_identifier(), inst_put[0].get_identifier() + chunk_size)
+
+        result_get = self.module.get(schema, object_name)
+        inst_get = result_get.get_object_from_data(DatabaseObjectTest2())
+
+        assert_equal(len(inst_get), max_iteration)
+        assert_equal([inst.user_arg for inst in inst_get], list(range(max_iteration)))
+
+    def test_22_put_objects(self) -> None:
+        """
+        Insercion de objetos en lote y fallo si alguno no hereda de DatabaseObject
+        """
+
+        schema = 'TEST'
+        object_name = DatabaseObjectTest2.__name__
+
+        result_put = self.module.put_objects(schema, object_name, [DatabaseObjectTest2(), DatabaseObjectTestError()])
+        assert_equal(result_put.code, DatabaseObjectResult.CODE_KO)
+
+        data_list = [DatabaseObjectTest2(), DatabaseObjectTest2()]
+        result_put = self.module.put_objects(schema, object_name, data_list)
+        assert_equal(result_put.code, DatabaseObjectResult.CODE_OK)
+
+        result_put = self.module.put_object(schema, object_name, DatabaseObjectTest2())
+        id_put = result_put.get_object_from_data()[0].get_identifier()
+
+        assert_equal(id_put, data_list[1].get_identifier() + 1)
+
+    def test_23_index_block(self) -> None:
+        """
+        Reserva de bloques de identificadores y salto de los no usados tras reiniciar
+        """
+
+        block_size = 5
+
+        schema = 'TEST'
+        object_name = DatabaseObjectTest2.__name__
+        self.module.set_index_block_size(schema, object_name, block_size)
+
+        id_list = list()
+        for i in range(3):
+            result_put = self.module.put_object(schema, object_name, DatabaseObjectTest2())
+            id_list.append(result_put.get_object_from_data()[0].get_identifier())
+
+        assert_equal(id_list, list(range(id_list[0], id_list[0] + 3)))
+
+        # Whole block is reserved in datastore, so a new allocator (as after a crash) skips unused identifiers
+        last_reserved = self.module.access_db.get_last_index(schema, object_name)
+        assert_true(last_reserved > id_list[-1])
+
+        allocator = IndexAllocator(self.module.access_db, block_size)
+        assert_equal(allocator.get_next_index(schema, object_name), last_reserved + 1)
+
+    def test_24_index_atomic(self) -> None:
+        """
+        Reserva atomica de identificadores desde varios procesos sin colisiones
+        """
+
+        max_iteration = 20
+
+        schema = 'TEST'
+        object_name = DatabaseObjectTest2.__name__
+
+        # Each allocator simulates a different writer process
+        allocators = [IndexAllocator(self.module.access_db, 3, IndexAllocator.MODE_ATOMIC) for _ in range(3)]
+
+        id_list = list()
+        for i in range(max_iteration):
+            allocator = allocators[i % len(allocators)]
+            id_list.append(allocator.get_next_index(schema, object_name, 1 + i % 4))
+
+        # A range bigger than the block is contiguous too
+        first_index = allocators[0].get_next_index(schema, object_name, 10)
+        id_list.append(first_index)
+
+        assert_equal(len(set(id_list)), len(id_list))
+        assert_true(self.module.access_db.get_last_index(schema, object_name) >= first_index + 9)
+
+    def test_25_cache(self) -> None:
+        """
+        Recuperacion desde cache e invalidacion al insertar, modificar y borrar
+        """
+
+        schema = 'TEST'
+        object_name = DatabaseObjectTest2.__name__
+        self.module.put_object(schema, object_name, DatabaseObjectTest2(1))
+
+        if not self.module.use_cache:
+            return
+
+        stats = self.module.get_cache_stats()
+        self.module.get(schema, object_name, [('user_arg', '=', 1)])
+        result_get = self.module.get(schema, object_name, [('user_arg', '=', 1)])
+        assert_equal(len(result_get.get_object_from_data()), 1)
+        assert_equal(self.module.get_cache_stats()['hits'], stats['hits'] + 1)
+        assert_equal(self.module.get_cache_stats()['misses'], stats['misses'] + 1)
+
+        # Same value with other type is other query
+        self.module.get(schema, object_name, [('user_arg', '=', True)])
+        assert_equal(self.module.get_cache_stats()['misses'], stats['misses'] + 2)
+
+        self.module.put_object(schema, object_name, DatabaseObjectTest2(1))
+        result_get = self.module.get(schema, object_name, [('user_arg', '=', 1)])
+        assert_equal(len(result_get.get_object_from_data()), 2)
+
+        self.module.update(schema, object_name, DatabaseObjectTest2(2).__dict__, [('user_arg', '=', 1)])
+        result_get = self.module.get(schema, object_name, [('user_arg', '=', 1)])
+        assert_equal(len(result_get.get_object_from_data()), 0)
+
+        self.module.remove(schema, object_name)
+        result_get = self.module.get(schema, object_name, [('user_arg', '=', 2)])
+        assert_equal(len(result_get.get_object_from_data()), 0)
+
+    def test_26_native_data(self) -> None:
+        """
+        Recuperacion de datos nativos sin conversion a cadena, y vista en formato cadena
+        """
+
+        data = DatabaseObjectTest2()
+        schema = 'TEST'
+        object_name = data.__class__.__name__
+
+        self.module.put_object(schema, object_name, data)
+
+        result_get = self.module.get(schema, object_name)
+        assert_true(isinstance(result_get.data, list))
+        assert_equal(result_get.data[0]['dict_arg'], data.dict_arg)
+
+        # Legacy results in string format are still supported
+        result_legacy = DatabaseObjectResult(DatabaseObjectResult.CODE_OK, data=result_get.get_legacy_data())
+        inst_get = result_legacy.get_object_from_data(DatabaseObjectTest2())
+        assert_equal(inst_get[0].get_identifier(), data.get_identifier())
+
+    def test_27_iter_get(self) -> None:
+        """
+        Recuperacion de objetos en streaming con tamano de lote, limite y salto
+        """
+
+        max_iteration = 10
+
+        schema = 'TEST'
+        object_name = DatabaseObjectTest2.__name__
+        self.module.put_many(schema, object_name, [DatabaseObjectTest2(i).__dict__ for i in range(max_iteration)])
+
+        result_get = self.module.iter_get(schema, object_name, batch_size=3)
+        assert_equal(result_get.code, DatabaseObjectResult.CODE_OK)
+        assert_equal([inst.user_arg for inst in result_get.iter_object_from_data(DatabaseObjectTest2())],
+                     list(range(max_iteration)))
+
+        result_get = self.module.iter_get(schema, object_name, [('user_arg', '>=', 2)], batch_size=2, limit=4, skip=1)
+        assert_equal([data['user_arg'] for data in result_get.data], [3, 4, 5, 6])
+
+        result_get = self.module.iter_get(schema, object_name, batch_size=0)
+        assert_equal(result_get.code, DatabaseObjectResult.CODE_KO)
+
+    def test_28_get_fields(self) -> None:
+        """
+        Recuperacion de solo algunos atributos de los objetos
+        """
+
+        data = DatabaseObjectTest2(3)
+        schema = 'TEST'
+        object_name = data.__class__.__name__
+
+        self.module.put_object(schema, object_name, data)
+
+        result_get = self.module.get(schema, object_name, fields=['user_arg'])
+        assert_equal(set(result_get.data[0]), {'user_arg', AccessDatabase.ID_FIELD, AccessDatabase.TIMESTAMP_FIELD})
+
+        inst_get = result_get.get_object_from_data(DatabaseObjectTest2())
+        assert_equal(inst_get[0].get_identifier(), data.get_identifier())
+        assert_equal(inst_get[0].user_arg, 3)
+
+        result_get = self.module.iter_get(schema, object_name, fields=['str_arg', 'int_arg'])
+        inst_get = list(result_get.iter_object_from_data(DatabaseObjectTest2()))
+        assert_equal(inst_get[0].str_arg, data.str_arg)
+
+    def test_29_get_page(self) -> None:
+        """
+        Recuperacion paginada en orden ascendente y descendente con token de continuacion
+        """
+
+        max_iteration = 10
+        page_size = 4
+
+        schema = 'TEST'
+        object_name = DatabaseObjectTest2.__name__
+        self.module.put_many(schema, object_name, [DatabaseObjectTest2(i).__dict__ for i in range(max_iteration)])
+
+        for order, expected in (('asc', list(range(max_iteration))), ('desc', list(reversed(range(max_iteration))))):
+            user_args = list()
+            pages = 0
+            token = None
+            while True:
+                result_page = self.module.get_page(schema, object_name, after=token, page_size=page_size, order=order)
+                assert_equal(result_page.code, DatabaseObjectResult.CODE_OK)
+                user_args.extend(inst.user_arg for inst in result_page.get_object_from_data(DatabaseObjectTest2()))
+                pages += 1
+                token = result_page.next_token
+                if token is None:
+                    break
+
+            assert_equal(user_args, expected)
+            assert_equal(pages, 3)
+
+        # Token of other order is rejected
+        result_page = self.module.get_page(schema, object_name, page_size=page_size)
+        result_page = self.module.get_page(schema, object_name, after=result_page.next_token, order='desc')
+        assert_equal(result_page.code, DatabaseObjectResult.CODE_KO)
+
+    def test_30_async(self) -> None:
+        """
+        Insercion y recuperacion concurrente desde asyncio
+        """
+
+        max_iteration = 20
+
+        schema = 'TEST'
+        object_name = DatabaseObjectTest2.__name__
+        async_module = AsyncDatabaseObjectModule(None, self.module, max_workers=4)
+
+        async def run() -> list:
+            results_put = await asyncio.gather(*[async_module.put_object(schema, object_name, DatabaseObjectTest2(i))
+                                                 for i in range(max_iteration)])
+            results_get = await asyncio.gather(*[async_module.get(schema, object_name, [('user_arg', '=', i)])
+                                                 for i in range(max_iteration)])
+            return results_put + results_get
+
+        start = time.perf_counter()
+        results = asyncio.run(run())
+        elapsed_time = round((time.perf_counter() - start) * 1000, 2)
+        print("Async operations {} in {} ms.".format(len(results), elapsed_time))
+
+        assert_true(all(result.code == DatabaseObjectResult.CODE_OK for result in results))
+        assert_equal([result.get_object_from_data(DatabaseObjectTest2())[0].user_arg
+                      for result in results[max_iteration:]], list(range(max_iteration)))
+
+        # Module passed to the facade is not closed with it
+        async_module.exit()
+        assert_true(not self.module.daemon._finished.is_set())
+
+    def test_31_concurrent_put(self) -> None:
+        """
+        Insercion concurrente desde varios hilos en el mismo y en distintos sub_schemas sin identificadores repetidos
+        """
+
+        max_iteration = 50
+        max_threads = 4
+
+        schema = 'TEST'
+        object_names = ['{}_{}'.format(DatabaseObjectTest2.__name__, i) for i in range(max_threads)]
+
+        def insert(object_name: str, id_list: list) -> None:
+            for i in range(max_iteration):
+                result_put = self.module.put_object(schema, object_name, DatabaseObjectTest2(i))
+                id_list.append(result_put.get_object_from_data()[0].get_identifier())
+
+        for target_names in ([object_names[0]] * max_threads, object_names):
+            for object_name in object_names:
+                self.module.remove(schema, object_name)
+
+            id_lists = [list() for _ in range(max_threads)]
+            threads = [Thread(target=insert, args=(target_names[i], id_lists[i])) for i in range(max_threads)]
+
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed_time = time.perf_counter() - start
+            print("Concurrent insertion in {} sub_schemas: {} objects/s.".format(
+                len(set(target_names)), round(max_iteration * max_threads / elapsed_time, 2)))
+
+            # All identifiers of a sub_schema are different
+            for object_name in set(target_names):
+                ids = [index for i in range(max_threads) if target_names[i] == object_name for index in id_lists[i]]
+                assert_equal(len(set(ids)), len(ids))
+
+                result_get = self.module.get(schema, object_name)
+                assert_equal(len(result_get.get_object_from_data()), len(ids))
+
+        for object_name in object_names:
+            self.module.remove(schema, object_name)
+
+    def test_32_collection_catalog(self) -> None:
+        """
+        Catalogo de colecciones y cache de colecciones inexistentes
+        """
+
+        schema = 'TEST'
+        object_name = 'NonExistentObject'
+        schema_collection = AccessDatabase.get_schema_collection(schema, object_name)
+
+        result_get = self.module.get(schema, object_name)
+        assert_equal(result_get.code, DatabaseObjectResult.CODE_KO)
+        assert_true(schema_collection in self.module.access_db.cache_missing_collections)
+
+        result_remove = self.module.remove(schema, object_name)
+        assert_equal(result_remove.code, DatabaseObjectResult.CODE_OK)
+
+        # Creation refreshes the catalog
+        self.module.put_object(schema, object_name, DatabaseObjectTest2())
+        assert_true(schema_collection in self.module.access_db.cache_collection_names)
+        assert_true(schema_collection not in self.module.access_db.cache_missing_collections)
+
+        self.module.access_db._drop_collection(schema_collection)
+        assert_true(schema_collection not in self.module.access_db.cache_collection_names)
+        result_get = self.module.get(schema, object_name)
+        assert_equal(result_get.code, DatabaseObjectResult.CODE_KO)
+
+    def test_33_indexes(self) -> None:
+        """
+        Creacion de indices secundarios declarados en la clase y reconciliacion de indices registrados
+        """
+
+        schema = 'TEST'
+        object_name = DatabaseObjectTest5.__name__
+        schema_collection = AccessDatabase.get_schema_collection(schema, object_name)
+        self.module.access_db._drop_collection(schema_collection)
+
+        result_put = self.module.put_object(schema, object_name, DatabaseObjectTest5(1, 1))
+        assert_equal(result_put.code, DatabaseObjectResult.CODE_OK)
+
+        mongo_collect = self.module.access_db.db[schema_collection]
+        index_names = set(mongo_collect.index_information())
+        assert_true(all(index.name in index_names for index in DatabaseObjectTest5.INDEXES))
+
+        # Unique index only applies to objects that match partial filter
+        result_put = self.module.put_object(schema, object_name, DatabaseObjectTest5(2, 1))
+        assert_equal(result_put.code, DatabaseObjectResult.CODE_KO)
+
+        # Index with same name and different definition is rebuilt
+        result_index = self.module.register_indexes(schema, object_name,
+                                                    [DatabaseObjectIndex(['user_arg'], unique=True, name='user_arg_1')])
+        assert_equal(result_index.code, DatabaseObjectResult.CODE_OK)
+        assert_true(mongo_collect.index_information()['user_arg_1'].get('unique', False))
+
+        self.module.access_db._drop_collection(schema_collection)
+
+    def test_34_criteria(self) -> None:
+        """
+        Tiempo de construccion de criterios con condiciones compiladas
+        """
+
+        max_iteration = 100000
+
+        # Only one condition is not joined, and conditions that recover all elements are skipped
+        assert_equal(AccessDatabaseMongoDB._create_mongo_criteria([('user_arg', '=', 1)], '', False),
+                     {'user_arg': {'$eq': 1}})
+        assert_equal(AccessDatabaseMongoDB._create_mongo_criteria([(AccessDatabase.ID_FIELD, '!=', None)], '', False),
+                     {})
+        assert_equal(AccessDatabaseMongoDB._create_mongo_criteria([(AccessDatabase.ID_FIELD, 'in', [1, 2]),
+                                                                   ('user_arg', '>', 3)], '', False),
+                     {'$and': [{AccessDatabase.ID_FIELD: {'$in': [1, 2]}}, {'user_arg': {'$gt': 3}}]})
+
+        start = time.perf_counter()
+        for i in range(max_iteration):
+            AccessDatabaseMongoDB._create_mongo_criteria([(AccessDatabase.ID_FIELD, '>', i), ('user_arg', '=', i),
+                                                          ('str_arg', 'in', ['a', 'b'])], '', False)
+        elapsed_time = round((time.perf_counter() - start) * 1e6 / max_iteration, 3)
+        print("Criteria built {} times in {} us per query.".format(max_iteration, elapsed_time))
+
+    def test_35_update_many_objects(self) -> None:
+        """
+        Actualizacion en lote de objetos distintos con datos distintos
+        """
+
+        max_iteration = 1000
+
+        schema = 'TEST'
+        object_name = DatabaseObjectTest2.__name__
+        self.module.remove(schema, object_name)
+
+        data_list = [DatabaseObjectTest2(i) for i in range(max_iteration)]
+        result_put = self.module.put_objects(schema, object_name, data_list)
+        assert_equal(result_put.code, DatabaseObjectResult.CODE_OK)
+
+        # Each object gets its own value, and all objects with user_arg 0 are updated by only one operation
+        updates = [([(AccessDatabase.ID_FIELD, '=', data.get_identifier())], {'int_arg': data.user_arg * 2})
+                   for data in data_list[1:]]
+        updates.append(([('user_arg', '=', 0)], {'str_arg': 'actualizado'}))
+
+        start = time.perf_counter()
+        result_update = self.module.update_many_objects(schema, object_name, updates, chunk_size=100)
+        elapsed_time = round((time.perf_counter() - start) * 1000, 2)
+        print("Total updates {} in {} ms.".format(len(updates), elapsed_time))
+
+        assert_equal(result_update.code, DatabaseObjectResult.CODE_OK)
+        assert_equal(result_update.data[0][AccessDatabase.MATCHED_COUNT], max_iteration)
+        assert_equal(result_update.data[0][AccessDatabase.UPDATED_COUNT], max_iteration)
+
+        result_get = self.module.get(schema, object_name, [('user_arg', '=', 10)])
+        assert_equal(result_get.get_object_from_data(DatabaseObjectTest2())[0].int_arg, 20)
+        result_get = self.module.get(schema, object_name, [('user_arg', '=', 0)])
+        assert_equal(result_get.get_object_from_data(DatabaseObjectTest2())[0].str_arg, 'actualizado')
+
+    def test_36_write_concern(self) -> None:
+        """
+        Configuracion de write concern por sub_schema y por llamada
+        """
+
+        schema = 'TEST'
+        object_name = DatabaseObjectTest2.__name__
+        schema_collection = AccessDatabase.get_schema_collection(schema, object_name)
+
+        write_concern = DatabaseObjectModule._parse_write_concern('w=majority, j=true, wtimeout=5000')
+        assert_equal(write_concern, {'w': 'majority', 'j': True, 'wtimeout': 5000})
+
+        # Write concern of the sub_schema is used by default
+        self.module.access_db.set_write_options(schema_collection, {'w': 1, 'j': True}, False)
+        result_put = self.module.put_objects(schema, object_name, [DatabaseObjectTest2(), DatabaseObjectTest2()])
+        assert_equal(result_put.code, DatabaseObjectResult.CODE_OK)
+
+        mongo_collect = self.module.access_db._get_write_collection(schema_collection, None)
+        assert_equal(mongo_collect.write_concern.document, {'w': 1, 'j': True})
+
+        # Write concern of a call is used instead of write concern of the sub_schema
+        result_put = self.module.put_object(schema, object_name, DatabaseObjectTest2(1), write_concern={'w': 1})
+        assert_equal(result_put.code, DatabaseObjectResult.CODE_OK)
+
+        result_update = self.module.update_object(schema, object_name, DatabaseObjectTest2(1), [('user_arg', '=', 1)],
+                                                  write_concern={'w': 1, 'wtimeout': 1000})
+        assert_equal(result_update.code, DatabaseObjectResult.CODE_OK)
+
+        result_put = self.module.put_object(schema, object_name, DatabaseObjectTest2(), write_concern={'w': -1})
+        assert_equal(result_put.code, DatabaseObjectResult.CODE_KO)
+
+        self.module.access_db.set_write_options(schema_collection, None, None)
+
+    def test_37_count_exists_distinct(self) -> None:
+        """
+        Conteo, existencia y valores distintos sin recuperar objetos
+        """
+
+        schema = 'TEST'
+        object_name = DatabaseObjectTest2.__name__
+        self.module.remove(schema, object_name)
+
+        result_put = self.module.put_objects(schema, object_name, [DatabaseObjectTest2(i % 3) for i in range(10)])
+        assert_equal(result_put.code, DatabaseObjectResult.CODE_OK)
+
+        result_count = self.module.count(schema, object_name)
+        assert_equal(result_count.data[0][AccessDatabase.COUNT_FIELD], 10)
+        result_count = self.module.count(schema, object_name, [('user_arg', '=', 1)])
+        assert_equal(result_count.data[0][AccessDatabase.COUNT_FIELD], 3)
+
+        result_exists = self.module.exists(schema, object_name, [('user_arg', '=', 2)])
+        assert_equal(result_exists.data[0][AccessDatabase.EXISTS_FIELD], True)
+        result_exists = self.module.exists(schema, object_name, [('user_arg', '=', 3)])
+        assert_equal(result_exists.data[0][AccessDatabase.EXISTS_FIELD], False)
+
+        result_distinct = self.module.distinct(schema, object_name, 'user_arg', [('user_arg', '>', 0)])
+        assert_equal(sorted(data['user_arg'] for data in result_distinct.data), [1, 2])
+
+        # Sub_schema that does not exist has no objects
+        result_count = self.module.count(schema, 'DatabaseObjectTestNotExists')
+        assert_equal(result_count.data[0][AccessDatabase.COUNT_FIELD], 0)
+
+    def test_38_sort_limit(self) -> None:
+        """
+        Recuperacion de los ultimos objetos con orden y limite, y sin orden
+        """
+
+        schema = 'TEST'
+        object_name = DatabaseObjectTest2.__name__
+        self.module.remove(schema, object_name)
+
+        result_put = self.module.put_objects(schema, object_name, [DatabaseObjectTest2(i) for i in range(10)])
+        assert_equal(result_put.code, DatabaseObjectResult.CODE_OK)
+
+        result_get = self.module.get(schema, object_name,
+                                     sort=[(AccessDatabase.TIMESTAMP_FIELD, AccessDatabase.ORDER_DESCENDING)], limit=3)
+        assert_equal([data['user_arg'] for data in result_get.data], [9, 8, 7])
+
+        result_get = self.module.get(schema, object_name, limit=3)
+        assert_equal([data['user_arg'] for data in result_get.data], [0, 1, 2])
+
+        result_get = self.module.get(schema, object_name, sort=None)
+        assert_equal(sorted(data['user_arg'] for data in result_get.data), list(range(10)))
+
+        result_get = self.module.get(schema, object_name, limit=-1)
+        assert_equal(result_get.code, DatabaseObjectResult.CODE_KO)
+
+    def test_39_raw_documents(self) -> None:
+        """
+        Lectura de documentos sin decodificar hasta que se accede a ellos
+        """
+
+        max_iteration = 1000
+
+        schema = 'TEST'
+        object_name = DatabaseObjectTest2.__name__
+        schema_collection = AccessDatabase.get_schema_collection(schema, object_name)
+        self.module.remove(schema, object_name)
+
+        result_put = self.module.put_objects(schema, object_name, [DatabaseObjectTest2(i) for i in range(max_iteration)])
+        assert_equal(result_put.code, DatabaseObjectResult.CODE_OK)
+
+        self.module.access_db.set_read_options(schema_collection, True)
+
+        start = time.perf_counter()
+        result_get = self.module.get(schema, object_name)
+        elapsed_time = round((time.perf_counter() - start) * 1000, 2)
+        print("Total raw results obtained {} in {} ms.".format(max_iteration, elapsed_time))
+
+        assert_true(not isinstance(result_get.data[0], dict))
+        assert_equal(result_get.data[10]['user_arg'], 10)
+
+        inst_get = result_get.get_object_from_data(DatabaseObjectTest2())
+        assert_equal(inst_get[10].user_arg, 10)
+        assert_equal(inst_get[10].dict_arg['key1'], 'value1')
+        assert_true(result_get.get_legacy_data().startswith('[{'))
+
+        self.module.access_db.set_read_options(schema_collection, False)
+
+    def test_40_compression(self) -> None:
+        """
+        Compresion transparente de atributos seleccionados y de atributos grandes
+        """
+
+        schema = 'TEST'
+        object_name = DatabaseObjectTest2.__name__
+        schema_collection = AccessDatabase.get_schema_collection(schema, object_name)
+        self.module.remove(schema, object_name)
+
+        self.module.access_db.set_compression_options(schema_collection, ['dict_arg'], 1000)
+
+        data_list = [DatabaseObjectTest2(i) for i in range(10)]
+        for data in data_list:
+            data.list_arg = ['one thing'] * 1000
+        result_put = self.module.put_objects(schema, object_name, data_list)
+        assert_equal(result_put.code, DatabaseObjectResult.CODE_OK)
+
+        # Selected and big attributes are stored compressed, the rest are stored as is
+        mongo_document = self.module.access_db.db[schema_collection].find_one()
+        assert_true(AccessDatabaseMongoDB.COMPRESSED_FIELD in mongo_document['dict_arg'])
+        assert_true(AccessDatabaseMongoDB.COMPRESSED_FIELD in mongo_document['list_arg'])
+        assert_equal(mongo_document['str_arg'], 'cadena de texto')
+
+        result_get = self.module.get(schema, object_name, [('user_arg', '=', 3)])
+        inst_get = result_get.get_object_from_data(DatabaseObjectTest2())
+        assert_equal(inst_get[0].list_arg, ['one thing'] * 1000)
+        assert_equal(inst_get[0].dict_arg, {'key1': 'value1', 'key2': 'value2'})
+
+        stats = self.module.get_compression_stats()[schema_collection]
+        print("Compression stats {}".format(stats))
+        assert_true(stats['saved_bytes'] > 0)
+
+        # Objects stored compressed are read decompressed after compression is disabled
+        self.module.access_db.set_compression_options(schema_collection, [], 0)
+        result_get = self.module.get(schema, object_name, [('user_arg', '=', 3)])
+        inst_get = result_get.get_object_from_data(DatabaseObjectTest2())
+        assert_equal(inst_get[0].dict_arg, {'key1': 'value1', 'key2': 'value2'})
+        result_page = self.module.get_page(schema, object_name, [('user_arg', '=', 4)], page_size=5)
+        assert_equal(result_page.data[0]['list_arg'], ['one thing'] * 1000)
+        result_iter = self.module.iter_get(schema, object_name, [('user_arg', '=', 5)])
+        assert_equal([data['list_arg'] for data in result_iter.data], [['one thing'] * 1000])
+
+    def test_41_memory_database(self) -> None:
+        """
+        Base de datos en memoria con los mismos resultados que mongodb y tiempos de ambas
+        """
+
+        max_iteration = 1000
+
+        schema_collection = AccessDatabase.get_schema_collection('TEST', DatabaseObjectTest5.__name__)
+        memory_db = AccessDatabaseMemory(None)
+        memory_db.ensure_indexes(schema_collection, DatabaseObjectTest5.INDEXES)
+        self.module.access_db.ensure_indexes(schema_collection, DatabaseObjectTest5.INDEXES)
+        self.module.access_db.remove(schema_collection, [], '', False)
+
+        data_list = [{AccessDatabase.ID_FIELD: i + 1, AccessDatabase.TIMESTAMP_FIELD: i + 1, 'user_arg': i % 10,
+                      'code': i + 1, 'str_arg': 'cadena {}'.format(i), 'list_arg': [i % 3, 'one thing'], 'bool_arg': i % 2 == 0,
+                      'opt_arg': None if i % 4 == 0 else i % 4}
+                     for i in range(max_iteration)]
+        queries = [[('user_arg', '=', 3)], [('user_arg', '!=', 3), (AccessDatabase.TIMESTAMP_FIELD, '<=', 100)],
+                   [(AccessDatabase.TIMESTAMP_FIELD, '>', 500), (AccessDatabase.TIMESTAMP_FIELD, '<', 510)],
+                   [(AccessDatabase.ID_FIELD, 'in', [5, 6, 7])], [(AccessDatabase.ID_FIELD, 'in', [7, 5, 5, 7])],
+                   [('user_arg', 'out', [1, 2, 3])], [('list_arg', '=', 2)],
+                   [('bool_arg', '=', True), ('user_arg', '>=', 8)], [('opt_arg', '>=', None)],
+                   [('opt_arg', '<=', None)], [('opt_arg', '>', None)], [('opt_arg', '<', None)]]
+
+        for access_db in (memory_db, self.module.access_db):
+            start = time.perf_counter()
+            access_db.put_many(schema_collection, data_list, 100)
+            elapsed_put = round((time.perf_counter() - start) * 1000, 2)
+
+            start = time.perf_counter()
+            for i in range(max_iteration):
+                access_db.get(schema_collection, [(AccessDatabase.ID_FIELD, '=', i + 1)], '', False)
+            elapsed_get = round((time.perf_counter() - start) * 1000, 2)
+            print("{}: {} puts in {} ms, {} gets by id in {} ms.".format(access_db.__class__.__name__, max_iteration,
+                                                                        elapsed_put, max_iteration, elapsed_get))
+
+        # Both datastores get same documents in same order
+        sort = [('user_arg', AccessDatabase.ORDER_DESCENDING), (AccessDatabase.TIMESTAMP_FIELD,
+                                                                AccessDatabase.ORDER_ASCENDING)]
+        for conditions in queries:
+            assert_equal(memory_db.get(schema_collection, conditions, '', False, sort=sort),
+                         self.module.access_db.get(schema_collection, conditions, '', False, sort=sort))
+            assert_equal(memory_db.count(schema_collection, conditions, '', False),
+                         self.module.access_db.count(schema_collection, conditions, '', False))
+
+        # Booleans are not equal to numbers
+        assert_equal(memory_db.get(schema_collection, [('bool_arg', '=', 1)], '', False), [])
+
+        # Unique index is checked, and updated documents are found by their new values
+        assert_equal(memory_db.update(schema_collection, {'user_arg': 20}, [('user_arg', '=', 3)], '', False),
+                     [{AccessDatabase.UPDATED_COUNT: max_iteration // 10}])
+        assert_equal(memory_db.count(schema_collection, [('user_arg', '=', 20)], '', False)[0]
+                     [AccessDatabase.COUNT_FIELD], max_iteration // 10)
+        try:
+            memory_db.put(schema_collection, dict(data_list[0], **{AccessDatabase.ID_FIELD: max_iteration + 1,
+                                                                   AccessDatabase.TIMESTAMP_FIELD: 0}))
+            assert_true(False)
+        except DatabaseObjectException:
+            pass
+
+        # Repeated identifiers delete each document once
+        for access_db in (memory_db, self.module.access_db):
+            assert_equal(access_db.remove(schema_collection, [(AccessDatabase.ID_FIELD, 'in', [3, 3])], '', False),
+                         [{AccessDatabase.DELETED_COUNT: 1}])
+
+        assert_equal(memory_db.remove(schema_collection, [], '', False),
+                     [{AccessDatabase.DELETED_COUNT: max_iteration - 1}])
+        self.module.access_db.remove(schema_collection, [], '', False)
+
+    def test_42_sqlite_database(self) -> None:
+        """
+        Base de datos sqlite con los mismos resultados que mongodb, indices de atributos y tiempos de ambas
+        """
+
+        max_iteration = 1000
+
+        schema_collection = AccessDatabase.get_schema_collection('TEST', DatabaseObjectTest5.__name__)
+        directory = tempfile.TemporaryDirectory()
+        sqlite_db = AccessDatabaseSQLite('sqlite:///' + os.path.join(directory.name, 'database.db'))
+        sqlite_db.ensure_indexes(schema_collection, DatabaseObjectTest5.INDEXES)
+        self.module.access_db.ensure_indexes(schema_collection, DatabaseObjectTest5.INDEXES)
+        self.module.access_db.remove(schema_collection, [], '', False)
+
+        data_list = [{AccessDatabase.ID_FIELD: i + 1, AccessDatabase.TIMESTAMP_FIELD: i + 1, 'user_arg': i % 10,
+                      'code': i + 1, 'str_arg': 'cadena {}'.format(i), 'list_arg': [i % 3, 'one thing'],
+                      'bool_arg': i % 2 == 0, 'dict_arg': {'key1': i % 4}}
+                     for i in range(max_iteration)]
+        queries = [[('user_arg', '=', 3)], [('user_arg', '!=', 3), (AccessDatabase.TIMESTAMP_FIELD, '<=', 100)],
+                   [(AccessDatabase.TIMESTAMP_FIELD, '>', 500), (AccessDatabase.TIMESTAMP_FIELD, '<', 510)],
+                   [(AccessDatabase.ID_FIELD, 'in', [5, 6, 7])], [('user_arg', 'out', [1, 2, 3])],
+                   [('list_arg', '=', 2)], [('bool_arg', '=', True), ('user_arg', '>=', 8)],
+                   [('str_arg', 'in', ['cadena 1', 'cadena 20'])], [('dict_arg', '=', {'key1': 3})],
+                   [('missing_arg', '!=', 3), ('user_arg', '<', 1)],
+                   [(AccessDatabase.TIMESTAMP_FIELD, '!=', None), ('user_arg', '=', 2)],
+                   [(AccessDatabase.TIMESTAMP_FIELD, 'out', [None, 1]), (AccessDatabase.ID_FIELD, '<=', 20)],
+                   [(AccessDatabase.ID_FIELD, 'out', [2, None]), (AccessDatabase.ID_FIELD, '<=', 20)],
+                   [(AccessDatabase.TIMESTAMP_FIELD, 'in', [None, 3])], [(AccessDatabase.TIMESTAMP_FIELD, '=', None)]]
+
+        for access_db in (sqlite_db, self.module.access_db):
+            start = time.perf_counter()
+            access_db.put_many(schema_collection, data_list, 100)
+            elapsed_put = round((time.perf_counter() - start) * 1000, 2)
+
+            start = time.perf_counter()
+            for i in range(max_iteration):
+                access_db.get(schema_collection, [('user_arg', '=', i)], '', False)
+            elapsed_get = round((time.perf_counter() - start) * 1000, 2)
+            print("{}: {} puts in {} ms, {} gets by index in {} ms.".format(access_db.__class__.__name__,
+                                                                          max_iteration, elapsed_put, max_iteration,
+                                                                          elapsed_get))
+
+        # Both datastores get same documents in same order
+        sort = [('user_arg', AccessDatabase.ORDER_DESCENDING), (AccessDatabase.TIMESTAMP_FIELD,
+                                                                AccessDatabase.ORDER_ASCENDING)]
+        for conditions in queries:
+            assert_equal(sqlite_db.get(schema_collection, conditions, '', False, sort=sort),
+                         self.module.access_db.get(schema_collection, conditions, '', False, sort=sort))
+            assert_equal(sqlite_db.count(schema_collection, conditions, '', False),
+                         self.module.access_db.count(schema_collection, conditions, '', False))
+
+        # Booleans are not equal to numbers, and conditions of indexed attributes use their indexes
+        assert_equal(sqlite_db.get(schema_collection, [('bool_arg', '=', 1)], '', False), [])
+        sqlite_where, parameters = AccessDatabaseSQLite._create_sqlite_criteria([('user_arg', '=', 3)], '', False)
+        sqlite_plan = sqlite_db.connection.execute('EXPLAIN QUERY PLAN SELECT * FROM "{}" WHERE {}'.format(
+            schema_collection, sqlite_where), parameters).fetchall()
+        index_name = AccessDatabase.SEPARATOR.join((schema_collection, DatabaseObjectTest5.INDEXES[0].name))
+        assert_true(any('INDEX {} '.format(index_name) in str(step) for step in sqlite_plan))
+
+        # Unique index is checked, and updated documents are found by their new values
+        assert_equal(sqlite_db.update(schema_collection, {'user_arg': 20}, [('user_arg', '=', 3)], '', False),
+                     [{AccessDatabase.UPDATED_COUNT: max_iteration // 10}])
+        assert_equal(sqlite_db.count(schema_collection, [('user_arg', '=', 20)], '', False)[0]
+                     [AccessDatabase.COUNT_FIELD], max_iteration // 10)
+        try:
+            sqlite_db.put(schema_collection, dict(data_list[0], **{AccessDatabase.ID_FIELD: max_iteration + 1,
+                                                                   AccessDatabase.TIMESTAMP_FIELD: 0}))
+            assert_true(False)
+        except DatabaseObjectException:
+            pass
+
+        assert_equal(sqlite_db.remove(schema_collection, [], '', False),
+                     [{AccessDatabase.DELETED_COUNT: max_iteration}])
+        self.module.access_db.remove(schema_collection, [], '', False)
+        sqlite_db.close_connection()
+        directory.cleanup()
+
+    def test_43_segment_database(self) -> None:
+        """
+        Base de datos de segmentos con los mismos resultados que mongodb, compactacion y recuperacion desde disco
+        """
+
+        max_iteration = 1000
+
+        schema_collection = AccessDatabase.get_schema_collection('TEST', DatabaseObjectTest4.__name__)
+        directory = tempfile.TemporaryDirectory()
+        segment_db = AccessDatabaseSegment('segment://' + directory.name)
+        self.module.access_db.remove(schema_collection, [], '', False)
+
+        data_list = [{AccessDatabase.ID_FIELD: i + 1, AccessDatabase.TIMESTAMP_FIELD: i + 1, 'user_arg': i % 10,
+                      'str_arg': 'cadena {}'.format(i), 'list_arg': [i % 3, 'one thing'],
+                      'opt_arg': None if i % 4 == 0 else i % 4}
+                     for i in range(max_iteration)]
+        queries = [[(AccessDatabase.ID_FIELD, '=', 10)], [(AccessDatabase.ID_FIELD, 'in', [5, 6, 7])],
+                   [(AccessDatabase.ID_FIELD, '>', 500), (AccessDatabase.ID_FIELD, '<=', 510)],
+                   [(AccessDatabase.TIMESTAMP_FIELD, '>=', 900), ('user_arg', '!=', 3)], [('list_arg', '=', 2)],
+                   [('opt_arg', '>=', None)], [('opt_arg', '<=', None), (AccessDatabase.ID_FIELD, '<', 50)],
+                   [(AccessDatabase.ID_FIELD, 'in', [7, 5, 5, 7])]]
+
+        for access_db in (segment_db, self.module.access_db):
+            start = time.perf_counter()
+            for data in data_list:
+                access_db.put(schema_collection, data)
+            elapsed_put = round((time.perf_counter() - start) * 1000, 2)
+
+            start = time.perf_counter()
+            for i in range(max_iteration):
+                access_db.get(schema_collection, [(AccessDatabase.ID_FIELD, '=', i + 1)], '', False)
+            elapsed_get = round((time.perf_counter() - start) * 1000, 2)
+            print("{}: {} puts in {} ms, {} gets by id in {} ms.".format(access_db.__class__.__name__, max_iteration,
+                                                                        elapsed_put, max_iteration, elapsed_get))
+
+        # Both datastores get same documents in same order
+        for conditions in queries:
+            assert_equal(segment_db.get(schema_collection, conditions, '', False),
+                         self.module.access_db.get(schema_collection, conditions, '', False))
+            assert_equal(segment_db.count(schema_collection, conditions, '', False),
+                         self.module.access_db.count(schema_collection, conditions, '', False))
+
+        # Repeated identifiers delete each document once
+        assert_equal(segment_db.remove(schema_collection, [(AccessDatabase.ID_FIELD, 'in', [9, 9])], '', False),
+                     [{AccessDatabase.DELETED_COUNT: 1}])
+
+        # Removed and updated documents are old records, that are deleted by compaction
+        assert_equal(segment_db.remove(schema_collection, [('user_arg', '<', 8)], '', False),
+                     [{AccessDatabase.DELETED_COUNT: max_iteration * 8 // 10}])
+        assert_equal(segment_db.update(schema_collection, {'str_arg': 'actualizado'}, [('user_arg', '=', 9)], '',
+                                       False), [{AccessDatabase.UPDATED_COUNT: max_iteration // 10}])
+        segment_collect = segment_db.collections[schema_collection]
+        assert_true(segment_collect.garbage_bytes > segment_collect.live_bytes)
+
+        documents = segment_db.get(schema_collection, [], '', False)
+        segment_db._compact_collection(schema_collection, segment_collect)
+        assert_equal(segment_collect.garbage_bytes, 0)
+        assert_equal(segment_db.get(schema_collection, [], '', False), documents)
+
+        # Documents are recovered from segments when datastore is opened again
+        segment_db.close_connection()
+        segment_db = AccessDatabaseSegment('segment://' + directory.name)
+        assert_equal(segment_db.get(schema_collection, [], '', False), documents)
+        assert_equal(segment_db.count(schema_collection, [('str_arg', '=', 'actualizado')], '', False),
+                     [{AccessDatabase.COUNT_FIELD: max_iteration // 10}])
+
+        self.module.access_db.remove(schema_collection, [], '', False)
+        segment_db.close_connection()
+        directory.cleanup()
+
+    def test_44_tiered_database(self) -> None:
+        """
+        Base de datos en dos niveles con documentos recientes en memoria, mezcla de resultados con mongodb y tasa de
+        aciertos
+        """
+
+        max_iteration = 1000
+        hot_window = 100
+
+        schema_collection = AccessDatabase.get_schema_collection('TEST', DatabaseObjectTest4.__name__)
+        tiered_db = AccessDatabaseTiered(self.module.access_db)
+        tiered_db.set_hot_window(schema_collection, hot_window, 0)
+        self.module.access_db.remove(schema_collection, [], '', False)
+
+        for i in range(max_iteration):
+            tiered_db.put(schema_collection, {AccessDatabase.ID_FIELD: i + 1, AccessDatabase.TIMESTAMP_FIELD: i + 1,
+                                              'user_arg': i % 10, 'str_arg': 'cadena {}'.format(i)})
+
+        # Reads after the window are served from memory, other reads are merged with mongodb
+        hot_queries = [[(AccessDatabase.TIMESTAMP_FIELD, '>=', max_iteration - 50)],
+                       [(AccessDatabase.ID_FIELD, '=', max_iteration - 10)],
+                       [(AccessDatabase.TIMESTAMP_FIELD, '>', max_iteration - 20), ('user_arg', '=', 5)]]
+        cold_queries = [[('user_arg', '=', 3)], [(AccessDatabase.ID_FIELD, '>', 850), ('user_arg', '!=', 1)],
+                        [(AccessDatabase.ID_FIELD, '=', 10)], [(AccessDatabase.TIMESTAMP_FIELD, '>=', None)],
+                        [(AccessDatabase.TIMESTAMP_FIELD, 'in', [None])], [(AccessDatabase.ID_FIELD, '=', None)]]
+        for conditions in hot_queries + cold_queries:
+            assert_equal(tiered_db.get(schema_collection, conditions, '', False),
+                         self.module.access_db.get(schema_collection, conditions, '', False))
+        sort = [('user_arg', AccessDatabase.ORDER_DESCENDING), (AccessDatabase.TIMESTAMP_FIELD,
+                                                                AccessDatabase.ORDER_DESCENDING)]
+        assert_equal(tiered_db.get(schema_collection, [(AccessDatabase.ID_FIELD, '>', 880)], '', False, sort=sort,
+                                   limit=25),
+                     self.module.access_db.get(schema_collection, [(AccessDatabase.ID_FIELD, '>', 880)], '', False,
+                                               sort=sort, limit=25))
+
+        # Fields of the sort are recovered to merge both tiers, although they are not requested
+        assert_equal(tiered_db.get(schema_collection, [(AccessDatabase.ID_FIELD, '>', 850)], '', False,
+                                   fields=['str_arg'], sort=sort, limit=25),
+                     self.module.access_db.get(schema_collection, [(AccessDatabase.ID_FIELD, '>', 850)], '', False,
+                                               fields=['str_arg'], sort=sort, limit=25))
+        stats = tiered_db.get_tier_stats()[schema_collection]
+        assert_equal((stats['hits'], stats['misses'], stats['documents']), (3, 8, hot_window))
+
+        for access_db in (tiered_db, self.module.access_db):
+            start = time.perf_counter()
+            for i in range(max_iteration):
+                access_db.get(schema_collection, [(AccessDatabase.ID_FIELD, '=', max_iteration - i % hot_window)], '',
+                              False)
+            elapsed_get = round((time.perf_counter() - start) * 1000, 2)
+            print("{}: {} gets by id of recent documents in {} ms.".format(access_db.__class__.__name__,
+                                                                         max_iteration, elapsed_get))
+
+        # New documents move the window and old ones are evicted from memory
+        for i in range(max_iteration, max_iteration + 10):
+            tiered_db.put(schema_collection, {AccessDatabase.ID_FIELD: i + 1, AccessDatabase.TIMESTAMP_FIELD: i + 1,
+                                              'user_arg': i % 10, 'str_arg': 'cadena {}'.format(i)})
+        stats = tiered_db.get_tier_stats()[schema_collection]
+        assert_equal((stats['documents'], stats['watermark']), (hot_window, max_iteration + 10 - hot_window + 1))
+
+        # Writes are applied to both tiers
+        tiered_db.update(schema_collection, {'str_arg': 'actualizado'}, [('user_arg', '=', 9)], '', False)
+        tiered_db.remove(schema_collection, [('user_arg', '=', 3)], '', False)
+        for conditions in ([], [(AccessDatabase.TIMESTAMP_FIELD, '>=', max_iteration - 50)]):
+            assert_equal(tiered_db.get(schema_collection, conditions, '', False),
+                         self.module.access_db.get(schema_collection, conditions, '', False))
+
+        stats = tiered_db.get_tier_stats()[schema_collection]
+        print("Tier stats: {}".format(stats))
+        assert_equal((stats['hits'], stats['misses']), (max_iteration + 4, 9))
+
+        self.module.access_db.remove(schema_collection, [], '', False)
+
+    def test_45_sharded_database(self) -> None:
+        """
+        Base de datos repartida en varias bases de datos mongodb con los mismos resultados que una sola
+        """
+
+        max_iteration = 1000
+
+        schema_collection = AccessDatabase.get_schema_collection('TEST', DatabaseObjectTest4.__name__)
+        schema_collection_index = AccessDatabase.get_schema_collection_index('TEST', DatabaseObjectTest4.__name__)
+        connection_url = self.module.access_db.connection_url.rsplit('/', 1)[0]
+        shards = [AccessDatabaseMongoDB('{}/database_shard_{}'.format(connection_url, shard)) for shard in range(3)]
+        sharded_db = AccessDatabaseSharded(shards, range_size=100)
+        self.module.access_db.remove(schema_collection, [], '', False)
+
+        data_list = [{AccessDatabase.ID_FIELD: i + 1, AccessDatabase.TIMESTAMP_FIELD: i + 1, 'user_arg': i % 10,
+                      'str_arg': 'cadena {}'.format(i % 7)} for i in range(max_iteration)]
+        for access_db in (sharded_db, self.module.access_db):
+            start = time.perf_counter()
+            result = access_db.put_many(schema_collection, [dict(data) for data in data_list], 100)
+            elapsed_put = round((time.perf_counter() - start) * 1000, 2)
+            assert_equal(result, [{AccessDatabase.ID_FIELD: start + 1, AccessDatabase.INSERTED_COUNT: 100}
+                                  for start in range(0, max_iteration, 100)])
+            print("{}: put_many of {} in {} ms.".format(access_db.__class__.__name__, max_iteration, elapsed_put))
+
+        # Documents are distributed among all shards
+        counts = [shard.count(schema_collection, [], '', False)[0][AccessDatabase.COUNT_FIELD] for shard in shards]
+        assert_true(all(count > 0 for count in counts))
+        assert_equal(sum(counts), max_iteration)
+
+        # Conditions on _identifier are only sent to shards of their ranges
+        assert_equal(len(sharded_db._get_shards(schema_collection, [(AccessDatabase.ID_FIELD, '=', 10)], False)), 1)
+        assert_equal(len(sharded_db._get_shards(schema_collection, [('user_arg', '=', 1)], False)), len(shards))
+        for value in (None, 0, -5):
+            assert_equal(len(sharded_db._get_shards(schema_collection, [(AccessDatabase.ID_FIELD, '=', value)],
+                                                    False)), len(shards))
+            assert_equal(sharded_db.count(schema_collection, [(AccessDatabase.ID_FIELD, '=', value)], '', False),
+                         self.module.access_db.count(schema_collection, [(AccessDatabase.ID_FIELD, '=', value)], '',
+                                                     False))
+
+        # Results of all shards are merged in the same order as one datastore
+        sort = [('str_arg', AccessDatabase.ORDER_DESCENDING), ('user_arg', AccessDatabase.ORDER_ASCENDING)]
+        queries = [([(AccessDatabase.ID_FIELD, '=', 10)], AccessDatabase.DEFAULT_SORT, 0),
+                   ([(AccessDatabase.ID_FIELD, 'in', [5, 150, 777])], AccessDatabase.DEFAULT_SORT, 0),
+                   ([(AccessDatabase.ID_FIELD, '>', 250), (AccessDatabase.ID_FIELD, '<=', 520)],
+                    AccessDatabase.DEFAULT_SORT, 0),
+                   ([('user_arg', '!=', 3)], [(AccessDatabase.TIMESTAMP_FIELD, AccessDatabase.ORDER_DESCENDING)], 50),
+                   ([('user_arg', 'in', [1, 2])], sort, 0)]
+        for conditions, query_sort, limit in queries:
+            assert_equal(sharded_db.get(schema_collection, conditions, '', False, sort=query_sort, limit=limit),
+                         self.module.access_db.get(schema_collection, conditions, '', False, sort=query_sort,
+                                                   limit=limit))
+            assert_equal(sharded_db.count(schema_collection, conditions, '', False),
+                         self.module.access_db.count(schema_collection, conditions, '', False))
+        assert_equal(list(sharded_db.iter_get(schema_collection, [('user_arg', '=', 4)], '', False, 10, 20, 30)),
+                     self.module.access_db.get(schema_collection, [('user_arg', '=', 4)], '', False)[30:50])
+
+        # Fields of the sort outside the projection are merged too, but not returned
+        assert_equal(sharded_db.get(schema_collection, [], '', False, ['str_arg'], sort, 40),
+                     self.module.access_db.get(schema_collection, [], '', False, ['str_arg'], sort, 40))
+        assert_equal(list(sharded_db.iter_get(schema_collection, [], '', False, 10, 20, 30, ['str_arg'], sort)),
+                     self.module.access_db.get(schema_collection, [], '', False, ['str_arg'], sort)[30:50])
+        assert_equal(sorted(element['str_arg'] for element in
+                            sharded_db.distinct(schema_collection, 'str_arg', [], '', False)),
+                     ['cadena {}'.format(i) for i in range(7)])
+
+        # Pages of all shards by _identifier
+        identifiers = list()
+        page = sharded_db.get_page(schema_collection, [], '', False, None, 150, AccessDatabase.ORDER_DESCENDING)
+        while len(page) > 0:
+            identifiers.extend(element[AccessDatabase.ID_FIELD] for element in page)
+            page = sharded_db.get_page(schema_collection, [], '', False, identifiers[-1], 150,
+                                       AccessDatabase.ORDER_DESCENDING)
+        assert_equal(identifiers, list(range(max_iteration, 0, -1)))
+
+        # Writes in all shards
+        assert_equal(sharded_db.update(schema_collection, {'str_arg': 'actualizado'}, [('user_arg', '=', 9)], '',
+                                       False), [{AccessDatabase.UPDATED_COUNT: max_iteration // 10}])
+        assert_equal(sharded_db.remove(schema_collection, [(AccessDatabase.ID_FIELD, '<=', 300)], '', False),
+                     [{AccessDatabase.DELETED_COUNT: 300}])
+        assert_equal(sharded_db.count(schema_collection, [('str_arg', '=', 'actualizado')], '', False),
+                     [{AccessDatabase.COUNT_FIELD: 70}])
+
+        # Collection index is in one shard and starts after identifiers of all shards
+        assert_equal(sharded_db.reserve_index('TEST', DatabaseObjectTest4.__name__, 10), max_iteration + 10)
+        assert_equal(sharded_db.get_last_index('TEST', DatabaseObjectTest4.__name__), max_iteration + 10)
+
+        # Shards without the collection are not read nor updated
+        small_collection = AccessDatabase.get_schema_collection('TEST', DatabaseObjectTest3.__name__)
+        small_db = AccessDatabaseSharded(shards)
+        small_db.put(small_collection, {AccessDatabase.ID_FIELD: 1, AccessDatabase.TIMESTAMP_FIELD: 1, 'v': 1})
+        assert_equal(small_db.get(small_collection, [(AccessDatabase.ID_FIELD, '!=', None)], '', False),
+                     [{AccessDatabase.ID_FIELD: 1, AccessDatabase.TIMESTAMP_FIELD: 1, 'v': 1}])
+        assert_equal(small_db.get_page(small_collection, [], '', False, None, 10, AccessDatabase.ORDER_ASCENDING),
+                     [{AccessDatabase.ID_FIELD: 1, AccessDatabase.TIMESTAMP_FIELD: 1, 'v': 1}])
+        assert_equal(len(list(small_db.iter_get(small_collection, [], '', False, 10, 0, 0))), 1)
+        assert_equal(small_db.update(small_collection, {'v': 2}, [('v', '=', 1)], '', False),
+                     [{AccessDatabase.UPDATED_COUNT: 1}])
+        assert_equal(small_db.update_many(small_collection, [([('v', '=', 2)], {'v': 3})], 10),
+                     [{AccessDatabase.MATCHED_COUNT: 1, AccessDatabase.UPDATED_COUNT: 1}])
+        small_db._drop_collection(small_collection)
+
+        self.module.access_db.remove(schema_collection, [], '', False)
+        for shard in shards:
+            shard._drop_collection(schema_collection)
+            shard._drop_collection(schema_collection_index)
+
+        # Threads that send requests to shards are stopped with the connection, and created again when it is opened
+        sharded_db.close_connection()
+        assert_equal(sharded_db.executor, None)
+        sharded_db.open_connection()
+        assert_equal(sharded_db.count(schema_collection, [], '', False), [{AccessDatabase.COUNT_FIELD: 0}])
+        sharded_db.close_connection()
+        small_db.close_connection()
+
+    def test_46_bucketed_database(self) -> None:
+        """
+        Colecciones particionadas por dias con los mismos resultados que una sola coleccion, lecturas solo de los dias
+        de las condiciones y borrado de dias completos
+        """
+
+        max_iteration = 1000
+        days = 10
+
+        schema_collection = AccessDatabase.get_schema_collection('TEST', DatabaseObjectTest4.__name__)
+        bucketed_db = AccessDatabaseBucketed(self.module.access_db)
+        bucketed_db.set_time_buckets(schema_collection, AccessDatabaseBucketed.BUCKET_DAY)
+        self.module.access_db.remove(schema_collection, [], '', False)
+
+        # Objects of 10 days from 2026-10-01 UTC
+        first_timestamp = 1790812800 * AccessDatabase.TIMESTAMP_UNITS
+        day = 86400 * AccessDatabase.TIMESTAMP_UNITS
+        step = days * day // max_iteration
+        data_list = [{AccessDatabase.ID_FIELD: i + 1, AccessDatabase.TIMESTAMP_FIELD: first_timestamp + i * step,
+                      'user_arg': i % 10} for i in range(max_iteration)]
+        bucketed_db.put_many(schema_collection, [dict(data) for data in data_list], 100)
+        self.module.access_db.put_many(schema_collection, [dict(data) for data in data_list], 100)
+        buckets = bucketed_db._get_buckets(schema_collection, [])
+        assert_equal(buckets, ['{}_202610{:02d}'.format(schema_collection, i + 1) for i in range(days)])
+
+        # Reads only go to buckets of conditions on _timestamp
+        queries = [[(AccessDatabase.TIMESTAMP_FIELD, '>=', first_timestamp + 2 * day),
+                    (AccessDatabase.TIMESTAMP_FIELD, '<', first_timestamp + 3 * day)],
+                   [(AccessDatabase.TIMESTAMP_FIELD, '=', data_list[555][AccessDatabase.TIMESTAMP_FIELD])],
+                   [(AccessDatabase.TIMESTAMP_FIELD, '>', first_timestamp + 8 * day), ('user_arg', '=', 3)]]
+        assert_equal([len(bucketed_db._get_buckets(schema_collection, conditions)) for conditions in queries],
+                     [1, 1, 2])
+        for conditions in queries + [[('user_arg', '!=', 5)]]:
+            assert_equal(bucketed_db.get(schema_collection, conditions, '', False),
+                         self.module.access_db.get(schema_collection, conditions, '', False))
+            assert_equal(bucketed_db.count(schema_collection, conditions, '', False),
+                         self.module.access_db.count(schema_collection, conditions, '', False))
+        for sort in ([(AccessDatabase.TIMESTAMP_FIELD, AccessDatabase.ORDER_DESCENDING)],
+                     [('user_arg', AccessDatabase.ORDER_DESCENDING)]):
+            assert_equal(bucketed_db.get(schema_collection, [], '', False, sort=sort, limit=150),
+                         self.module.access_db.get(schema_collection, [], '', False, sort=sort, limit=150))
+            assert_equal(bucketed_db.get(schema_collection, [], '', False, list(), sort, 150),
+                         self.module.access_db.get(schema_collection, [], '', False, list(), sort, 150))
+            assert_equal(list(bucketed_db.iter_get(schema_collection, [], '', False, 10, 20, 30, list(), sort)),
+                         self.module.access_db.get(schema_collection, [], '', False, list(), sort)[30:50])
+        assert_equal(bucketed_db.get_page(schema_collection, [], '', False, 480, 50, AccessDatabase.ORDER_ASCENDING),
+                     self.module.access_db.get_page(schema_collection, [], '', False, 480, 50,
+                                                    AccessDatabase.ORDER_ASCENDING))
+        assert_equal(bucketed_db.get_last_index('TEST', DatabaseObjectTest4.__name__), max_iteration)
+
+        # Retention drops buckets before a day and deletes objects of the partial bucket
+        for access_db in (bucketed_db, self.module.access_db):
+            start = time.perf_counter()
+            result = access_db.remove(schema_collection,
+                                      [(AccessDatabase.TIMESTAMP_FIELD, '<', first_timestamp + 4 * day + day // 2)], '',
+                                      False)
+            elapsed_remove = round((time.perf_counter() - start) * 1000, 2)
+            assert_equal(result, [{AccessDatabase.DELETED_COUNT: 450}])
+            print("{}: retention of {} objects in {} ms.".format(access_db.__class__.__name__, 450, elapsed_remove))
+        assert_equal(len(bucketed_db._get_buckets(schema_collection, [])), days - 4)
+        assert_equal(bucketed_db.get(schema_collection, [], '', False),
+                     self.module.access_db.get(schema_collection, [], '', False))
+        self.module.access_db.remove(schema_collection, [], '', False)
+
+        # A new module configures buckets of the sub_schema in its first read, also in datastores wrapping buckets
+        for access_db in (AccessDatabaseBucketed(self.module.access_db),
+                          AccessDatabaseTiered(AccessDatabaseBucketed(self.module.access_db))):
+            module = DatabaseObjectModule(config)
+            module.access_db = access_db
+            module.time_buckets = AccessDatabaseBucketed.BUCKET_DAY
+            result_count = module.count('TEST', DatabaseObjectTest4.__name__)
+            assert_equal(result_count.data[0][AccessDatabase.COUNT_FIELD], max_iteration - 450)
+            result_exists = module.exists('TEST', DatabaseObjectTest4.__name__, [('user_arg', '=', 3)])
+            assert_equal(result_exists.data[0][AccessDatabase.EXISTS_FIELD], True)
+            result_distinct = module.distinct('TEST', DatabaseObjectTest4.__name__, 'user_arg')
+            assert_equal(sorted(data['user_arg'] for data in result_distinct.data), list(range(10)))
+            module.exit()
+
+        bucketed_db._drop_collection(schema_collection)
+        assert_equal(bucketed_db.get(schema_collection, [], '', False), list())